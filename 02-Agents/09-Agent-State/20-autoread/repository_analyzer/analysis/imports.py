@@ -1,8 +1,9 @@
 """Import analysis for source code files."""
 
 import re
-from typing import Dict, List, Set, Optional
-from ..core.data_structures import FileInfo
+from pathlib import Path
+from typing import Dict, List, Set, Optional, Tuple
+from ..core.data_structures import FileInfo, FileType
 from ..core.exceptions import AnalysisError
 
 
@@ -13,20 +14,37 @@ class ImportAnalyzer:
         """Initialize the ImportAnalyzer."""
         self.language_import_patterns = self._create_import_patterns()
     
-    def analyze_imports(self, files: Dict[str, FileInfo]) -> Dict[str, FileInfo]:
+    def analyze_imports(self, files: Dict[str, FileInfo],
+                        repo_path: Optional[str] = None) -> Dict[str, FileInfo]:
         """Analyze imports in source code files.
         
+        Files cataloged with content hashing (``metadata['content_hash']``)
+        are only parsed once per distinct content; copies share the same
+        import list.
+        
         Args:
             files: Dictionary of FileInfo objects
+            repo_path: Repository root that file paths are relative to
             
         Returns:
             Updated dictionary of FileInfo objects with import analysis
         """
+        imports_by_content: Dict[Tuple[str, str], List[str]] = {}
+        
         for file_path, file_info in files.items():
-            if file_info.type == file_info.SOURCE and file_info.language:
+            if file_info.type == FileType.SOURCE and file_info.language:
                 try:
-                    # Extract imports from the file
-                    imports = self._extract_imports(file_path, file_info.language)
+                    content_hash = file_info.metadata.get('content_hash')
+                    content_key = (content_hash, file_info.language) if content_hash else None
+                    
+                    if content_key is not None and content_key in imports_by_content:
+                        imports = imports_by_content[content_key]
+                    else:
+                        # Extract imports from the file
+                        full_path = str(Path(repo_path) / file_path) if repo_path else file_path
+                        imports = self._extract_imports(full_path, file_info.language)
+                        if content_key is not None:
+                            imports_by_content[content_key] = imports
                     file_info.imports = imports
                     
                     # Update file info
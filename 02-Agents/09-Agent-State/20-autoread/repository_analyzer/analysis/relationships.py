@@ -2,7 +2,7 @@
 
 import re
 from typing import Dict, List, Set, Tuple, Optional
-from ..core.data_structures import FileInfo, DirectoryInfo, Relationship
+from ..core.data_structures import FileInfo, DirectoryInfo, FileType, Relationship
 from ..core.exceptions import RelationshipMappingError
 
 
@@ -95,7 +95,7 @@ class RelationshipMapper:
         
         # Look for configuration files that reference other files
         for config_file_path, config_file in files.items():
-            if config_file.type != config_file.CONFIG:
+            if config_file.type != FileType.CONFIG:
                 continue
             
             # Check if this config file references other files
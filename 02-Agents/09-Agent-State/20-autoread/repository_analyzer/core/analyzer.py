@@ -5,11 +5,13 @@ import tempfile
 from pathlib import Path
 from typing import Dict, List, Optional
 from ..core.config import AnalysisConfig, DEFAULT_CONFIG
-from ..core.data_structures import RepositoryStructure, RepositoryMetadata, ProjectType, FileInfo, DirectoryInfo, Framework
-from ..core.exceptions import RepositoryAnalyzerError, RepositoryNotFoundError
+from ..core.data_structures import RepositoryStructure, RepositoryMetadata, ProjectType, FileInfo, FileType, DirectoryInfo, Framework
+from ..core.exceptions import RepositoryAnalyzerError, RepositoryNotFoundError, GitError
 from ..git.cloner import GitCloner
+from ..git.history import GitHistoryCollector
 from ..scanner.filesystem import FileSystemScanner
-from ..scanner.cataloger import FileCataloger
+from ..scanner.cataloger import FileCataloger, find_duplicate_clusters
+from ..scanner.sampling import SampleResult
 from ..patterns.detector import PatternDetector
 from ..patterns.frameworks import FrameworkDetector
 from ..analysis.relationships import RelationshipMapper
@@ -30,8 +32,9 @@ class RepositoryAnalyzer:
         """
         self.config = config or DEFAULT_CONFIG
         self.git_cloner = GitCloner(self.config)
+        self.history_collector = GitHistoryCollector(self.config)
         self.file_scanner = FileSystemScanner(self.config)
-        self.file_cataloger = FileCataloger()
+        self.file_cataloger = FileCataloger(deduplicate=self.config.deduplicate_content)
         self.pattern_detector = PatternDetector()
         self.framework_detector = FrameworkDetector()
         self.relationship_mapper = RelationshipMapper()
@@ -72,8 +75,12 @@ class RepositoryAnalyzer:
             repo_path = processed_input.local_path
             is_temp_repo = processed_input.is_temporary
             
-            # Scan repository structure
-            files, directories = self.file_scanner.scan_repository(repo_path)
+            # Scan repository structure, or a bounded sample of it in approximate mode
+            sample = None
+            if self.config.approximate:
+                files, directories, sample = self.file_scanner.sample_repository(repo_path)
+            else:
+                files, directories = self.file_scanner.scan_repository(repo_path)
             
             # Catalog files and extract metadata
             files = self.file_cataloger.catalog_files(files, directories, repo_path)
@@ -81,7 +88,7 @@ class RepositoryAnalyzer:
             
             # Analyze imports if enabled
             if self.config.analyze_imports:
-                files = self.import_analyzer.analyze_imports(files)
+                files = self.import_analyzer.analyze_imports(files, repo_path)
             
             # Detect patterns and project type
             patterns = self.pattern_detector.detect_patterns(directories, files)
@@ -98,7 +105,15 @@ class RepositoryAnalyzer:
                 relationships = self.relationship_mapper.map_relationships(files, directories)
             
             # Create repository metadata
-            metadata = self._create_repository_metadata(repo_path, files, directories, frameworks)
+            metadata = self._create_repository_metadata(repo_path, files, directories, frameworks, sample)
+            
+            # Add git history to file and repository metadata if enabled
+            if self.config.collect_git_history:
+                try:
+                    self.history_collector.collect(repo_path, files, metadata)
+                except GitError:
+                    # Not a git repository or git unavailable, history stays empty
+                    pass
             
             # Create repository structure object
             structure = RepositoryStructure(
@@ -155,7 +170,8 @@ class RepositoryAnalyzer:
     
     def _create_repository_metadata(self, repo_path: str, files: Dict[str, FileInfo], 
                                   directories: Dict[str, DirectoryInfo], 
-                                  frameworks: List[Framework]) -> RepositoryMetadata:
+                                  frameworks: List[Framework],
+                                  sample: Optional[SampleResult] = None) -> RepositoryMetadata:
         """Create repository metadata.
         
         Args:
@@ -163,6 +179,7 @@ class RepositoryAnalyzer:
             files: Dictionary of FileInfo objects
             directories: Dictionary of DirectoryInfo objects
             frameworks: List of detected Framework objects
+            sample: Sampling result when files is a sample (approximate mode)
             
         Returns:
             RepositoryMetadata object
@@ -174,11 +191,12 @@ class RepositoryAnalyzer:
             repo_path_obj = Path(repo_path)
             metadata.name = repo_path_obj.name
             
-            # Determine primary language
+            # Determine primary language, weighting sampled files by the files they stand for
+            weights = sample.weights() if sample else {}
             language_counts = {}
-            for file_info in files.values():
+            for file_path, file_info in files.items():
                 if file_info.language:
-                    language_counts[file_info.language] = language_counts.get(file_info.language, 0) + 1
+                    language_counts[file_info.language] = language_counts.get(file_info.language, 0) + weights.get(file_path, 1)
             
             if language_counts:
                 metadata.primary_language = max(language_counts, key=language_counts.get)
@@ -191,14 +209,18 @@ class RepositoryAnalyzer:
             project_type = self.pattern_detector.detect_project_type(directories, files)
             metadata.architecture_type = project_type.value
             
-            # Calculate complexity score
-            metadata.complexity_score = self._calculate_complexity_score(files, directories)
-            
-            # Calculate documentation coverage
-            metadata.documentation_coverage = self._calculate_documentation_coverage(files)
-            
-            # Calculate test coverage estimate
-            metadata.test_coverage_estimate = self._calculate_test_coverage(files)
+            if sample:
+                # Estimate metrics from the sample with 95% confidence intervals
+                self._estimate_sampled_metrics(metadata, files, sample)
+            else:
+                # Calculate complexity score
+                metadata.complexity_score = self._calculate_complexity_score(files, directories)
+                
+                # Calculate documentation coverage
+                metadata.documentation_coverage = self._calculate_documentation_coverage(files)
+                
+                # Calculate test coverage estimate
+                metadata.test_coverage_estimate = self._calculate_test_coverage(files)
             
             # Find entry points
             metadata.entry_points = self._find_entry_points(files)
@@ -206,6 +228,9 @@ class RepositoryAnalyzer:
             # Find configuration files
             metadata.configuration_files = self._find_configuration_files(files)
             
+            # Report clusters of identical files (only populated when content hashing is enabled)
+            metadata.duplicate_clusters = find_duplicate_clusters(files)
+            
         except Exception:
             # Silently continue if metadata creation fails
             pass
@@ -223,10 +248,19 @@ class RepositoryAnalyzer:
         Returns:
             Complexity score between 0.0 and 1.0
         """
-        # Simple complexity calculation based on file count and directory depth
-        file_count = len(files)
-        dir_count = len(directories)
+        return self._complexity_from_counts(len(files), len(directories))
+    
+    def _complexity_from_counts(self, file_count: int, dir_count: int) -> float:
+        """Calculate the complexity score from file and directory counts.
         
+        Args:
+            file_count: Number of files in the repository
+            dir_count: Number of directories in the repository
+            
+        Returns:
+            Complexity score between 0.0 and 1.0
+        """
+        # Simple complexity calculation based on file count and directory depth
         # Normalize scores
         file_score = min(file_count / 1000.0, 1.0)  # Cap at 1000 files
         dir_score = min(dir_count / 100.0, 1.0)     # Cap at 100 directories
@@ -235,6 +269,42 @@ class RepositoryAnalyzer:
         complexity = (file_score * 0.7) + (dir_score * 0.3)
         return min(complexity, 1.0)
     
+    def _estimate_sampled_metrics(self, metadata: RepositoryMetadata, files: Dict[str, FileInfo],
+                                  sample: SampleResult) -> None:
+        """Estimate repository metrics from a stratified sample.
+        
+        The complexity score only depends on file and directory counts, which
+        the sampling walk counts exactly; its interval is only open-ended when
+        discovery was cut short by the time budget.
+        
+        Args:
+            metadata: RepositoryMetadata object to update
+            files: Dictionary of sampled FileInfo objects
+            sample: Sampling result describing the strata
+        """
+        complexity = self._complexity_from_counts(sample.total_files, sample.total_directories)
+        doc_estimate, doc_lower, doc_upper = sample.estimate_proportion(
+            files, lambda file_info: file_info.type == FileType.DOC)
+        test_estimate, test_lower, test_upper = sample.estimate_proportion(
+            files, lambda file_info: file_info.type == FileType.TEST)
+        
+        metadata.complexity_score = complexity
+        metadata.documentation_coverage = doc_estimate
+        metadata.test_coverage_estimate = test_estimate
+        metadata.confidence_intervals = {
+            "complexity_score": (complexity, complexity if sample.complete else 1.0),
+            "documentation_coverage": (doc_lower, doc_upper),
+            "test_coverage_estimate": (test_lower, test_upper),
+        }
+        metadata.metadata["sampling"] = {
+            "budget": sample.budget,
+            "sampled_files": len(sample.sampled),
+            "total_files": sample.total_files,
+            "total_directories": sample.total_directories,
+            "strata": len(sample.strata_counts),
+            "complete": sample.complete,
+        }
+    
     def _calculate_documentation_coverage(self, files: Dict[str, FileInfo]) -> float:
         """Calculate documentation coverage.
         
@@ -249,7 +319,7 @@ class RepositoryAnalyzer:
             return 0.0
         
         doc_files = sum(1 for file_info in files.values() 
-                       if file_info.type == file_info.DOC)
+                       if file_info.type == FileType.DOC)
         
         return doc_files / total_files if total_files > 0 else 0.0
     
@@ -267,7 +337,7 @@ class RepositoryAnalyzer:
             return 0.0
         
         test_files = sum(1 for file_info in files.values() 
-                        if file_info.type == file_info.TEST)
+                        if file_info.type == FileType.TEST)
         
         return test_files / total_files if total_files > 0 else 0.0
     
@@ -306,7 +376,7 @@ class RepositoryAnalyzer:
         config_files = []
         
         for file_path, file_info in files.items():
-            if file_info.type == file_info.CONFIG:
+            if file_info.type == FileType.CONFIG:
                 config_files.append(file_path)
         
         return config_files
@@ -29,6 +29,23 @@ class AnalysisConfig:
     max_file_size: int = 10 * 1024 * 1024  # 10MB limit by default
     parallel_processing: bool = True
     max_workers: int = 4
+    deduplicate_content: bool = False  # Hash file contents so identical files are parsed once
+    
+    # Approximate mode: analyze a stratified sample instead of every file
+    approximate: bool = False
+    sample_budget: int = 5000  # Maximum number of files analyzed in approximate mode
+    sample_seed: Optional[int] = None
+    sample_time_budget: Optional[float] = 60.0  # Seconds allowed for file discovery, None for no limit
+    
+    # Storage of intermediate results: "memory" (dicts) or "sqlite" (spilled to disk)
+    storage_backend: str = "memory"
+    storage_dir: Optional[str] = None  # Defaults to temp_dir
+    storage_cache_size: int = 10000  # Values kept in memory by the sqlite backend
+    
+    # Git history collection (per-file last commit, authors and churn); runs git log, so opt-in
+    collect_git_history: bool = False
+    git_history_max_commits: int = 10000
+    git_history_time_budget: float = 30.0  # Seconds
     
     def __post_init__(self):
         """Initialize configuration with environment variables."""
@@ -1,7 +1,7 @@
 """Data structures for repository analysis."""
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union
 from enum import Enum
 from pathlib import Path
 
@@ -114,6 +114,8 @@ class RepositoryMetadata:
     configuration_files: List[str] = field(default_factory=list)
     last_commit: Optional[str] = None
     created_at: Optional[str] = None
+    duplicate_clusters: Dict[str, List[str]] = field(default_factory=dict)
+    confidence_intervals: Dict[str, Tuple[float, float]] = field(default_factory=dict)
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
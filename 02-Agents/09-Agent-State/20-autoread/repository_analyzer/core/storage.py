@@ -0,0 +1,219 @@
+"""Storage backends for intermediate analysis results."""
+
+import os
+import pickle
+import sqlite3
+import tempfile
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, MutableMapping, Optional, Tuple
+from ..core.config import AnalysisConfig
+from ..core.exceptions import ConfigurationError
+
+
+class SQLiteMapping(MutableMapping):
+    """Dictionary-like mapping that spills its values to an SQLite file.
+
+    Values are pickled into a single key/value table and only a bounded
+    number of them are kept in memory: an LRU cache of recently used values
+    and a batch of pending writes. Values handed out are not tracked, so
+    modified values must be assigned back (``mapping[key] = value``) to be
+    persisted, which is what the scanner, cataloger and import analyzer do.
+
+    Iteration pages through the table in insertion order, so iterating
+    never loads more than ``page_size`` values at once.
+    """
+
+    def __init__(self, path: Optional[str] = None, table: str = "items",
+                 cache_size: int = 10000, write_batch_size: int = 1000,
+                 page_size: int = 1000, directory: Optional[str] = None):
+        """Initialize the SQLiteMapping.
+
+        Args:
+            path: SQLite database file; if None, a temporary file is created
+                and deleted again when the mapping is closed or collected
+            table: Name of the table holding the mapping
+            cache_size: Maximum number of values kept in memory
+            write_batch_size: Number of pending writes flushed together
+            page_size: Number of rows fetched per query while iterating
+            directory: Directory for the temporary database file
+        """
+        if not table.isidentifier():
+            raise ConfigurationError(f"Invalid storage table name: {table}")
+
+        owns_file = path is None
+        if owns_file:
+            fd, path = tempfile.mkstemp(prefix=f"repo_analyzer_{table}_", suffix=".sqlite", dir=directory)
+            os.close(fd)
+
+        self.path = path
+        self.table = table
+        self.cache_size = max(cache_size, 0)
+        self.write_batch_size = max(write_batch_size, 1)
+        self.page_size = max(page_size, 1)
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=OFF")
+        self._connection.execute("PRAGMA synchronous=OFF")
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+        )
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._pending: Dict[str, Any] = {}
+
+        # Close the connection and remove temporary files when the mapping is collected
+        self._finalizer = weakref.finalize(
+            self, SQLiteMapping._release, self._connection, path if owns_file else None
+        )
+
+    @staticmethod
+    def _release(connection: sqlite3.Connection, path: Optional[str]) -> None:
+        """Close a connection and delete the database file if it was temporary."""
+        try:
+            connection.close()
+        finally:
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._pending:
+            return self._pending[key]
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        row = self._connection.execute(
+            f"SELECT value FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+
+        value = pickle.loads(row[0])
+        self._remember(key, value)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._cache.pop(key, None)
+        self._pending[key] = value
+        if len(self._pending) >= self.write_batch_size:
+            self.flush()
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self._pending.pop(key, None)
+        self._cache.pop(key, None)
+        self._connection.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._pending or key in self._cache:
+            return True
+        row = self._connection.execute(
+            f"SELECT 1 FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        self.flush()
+        return self._connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        for key, _ in self._iter_rows(load_values=False):
+            yield key
+
+    def items(self) -> Iterator[Tuple[str, Any]]:  # type: ignore[override]
+        """Iterate over (key, value) pairs, one page of rows at a time."""
+        return self._iter_rows(load_values=True)
+
+    def values(self) -> Iterator[Any]:  # type: ignore[override]
+        """Iterate over values, one page of rows at a time."""
+        return (value for _, value in self._iter_rows(load_values=True))
+
+    def flush(self) -> None:
+        """Write pending values to the database."""
+        if not self._pending:
+            return
+
+        rows = [(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)) for key, value in self._pending.items()]
+        # Upsert keeps the rowid of existing keys, so in-progress iterations are not disturbed
+        self._connection.executemany(
+            f"INSERT INTO {self.table} (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            rows,
+        )
+        self._connection.commit()
+
+        for key, value in self._pending.items():
+            self._remember(key, value)
+        self._pending.clear()
+
+    def close(self) -> None:
+        """Close the database, deleting it if it was a temporary file."""
+        self._cache.clear()
+        self._pending.clear()
+        self._finalizer()
+
+    def _remember(self, key: str, value: Any) -> None:
+        """Add a value to the LRU cache, evicting the oldest entries."""
+        if self.cache_size == 0:
+            return
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _iter_rows(self, load_values: bool) -> Iterator[Tuple[str, Any]]:
+        """Page through the table in insertion order.
+
+        Args:
+            load_values: Whether to unpickle values (cached values are reused)
+
+        Yields:
+            Tuples of (key, value), value being None if not loaded
+        """
+        self.flush()
+        column = "value" if load_values else "NULL"
+        last_rowid = 0
+        while True:
+            rows: List[Tuple[int, str, Any]] = self._connection.execute(
+                f"SELECT rowid, key, {column} FROM {self.table} "
+                "WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last_rowid, self.page_size),
+            ).fetchall()
+            if not rows:
+                return
+
+            for rowid, key, blob in rows:
+                last_rowid = rowid
+                if not load_values:
+                    yield key, None
+                elif key in self._pending:
+                    yield key, self._pending[key]
+                elif key in self._cache:
+                    yield key, self._cache[key]
+                else:
+                    yield key, pickle.loads(blob)
+
+
+def create_storage(config: AnalysisConfig, table: str) -> MutableMapping:
+    """Create the mapping used to hold intermediate analysis results.
+
+    Args:
+        config: Analysis configuration selecting the storage backend
+        table: Name of the collection (e.g. ``"files"`` or ``"directories"``)
+
+    Returns:
+        A plain dict for the ``"memory"`` backend, or an SQLiteMapping
+
+    Raises:
+        ConfigurationError: If the storage backend is unknown
+    """
+    if config.storage_backend == "memory":
+        return {}
+
+    if config.storage_backend == "sqlite":
+        storage_dir = config.storage_dir or config.temp_dir
+        os.makedirs(storage_dir, exist_ok=True)
+        return SQLiteMapping(table=table, cache_size=config.storage_cache_size, directory=storage_dir)
+
+    raise ConfigurationError(f"Unknown storage backend: {config.storage_backend}")
@@ -0,0 +1,218 @@
+"""Git history collection for repository metadata."""
+
+import os
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Dict, IO, MutableMapping, Optional, Set
+from ..core.config import AnalysisConfig
+from ..core.data_structures import FileInfo, RepositoryMetadata
+from ..core.exceptions import GitError
+
+
+# Separators used in the ``git log`` format: record separator starts a commit,
+# unit separator splits its fields
+COMMIT_MARKER = "\x1e"
+FIELD_SEPARATOR = "\x1f"
+LOG_FORMAT = f"{COMMIT_MARKER}%H{FIELD_SEPARATOR}%ae{FIELD_SEPARATOR}%aI"
+
+
+@dataclass
+class FileHistory:
+    """Accumulated history of a single file."""
+    last_commit: str
+    last_modified: str
+    authors: Set[str] = field(default_factory=set)
+    churn: int = 0
+
+
+@dataclass
+class HistoryResult:
+    """Outcome of parsing a repository's git log."""
+    files: Dict[str, FileHistory] = field(default_factory=dict)
+    commit_count: int = 0
+    last_commit: Optional[str] = None
+    last_commit_date: Optional[str] = None
+    oldest_commit_date: Optional[str] = None
+    truncated: bool = False
+
+
+class GitHistoryCollector:
+    """Collects per-file and repository-level history from a single git log stream.
+
+    One ``git log --name-only`` process is started for the whole repository
+    and its output is parsed line by line, instead of running one
+    ``git log`` per file. Collection stops at ``config.git_history_max_commits``
+    commits or after ``config.git_history_time_budget`` seconds, whichever
+    comes first.
+    """
+
+    def __init__(self, config: AnalysisConfig):
+        """Initialize the GitHistoryCollector.
+
+        Args:
+            config: Analysis configuration
+        """
+        self.config = config
+
+    def collect(self, repo_path: str, files: MutableMapping[str, FileInfo],
+                metadata: RepositoryMetadata) -> HistoryResult:
+        """Collect git history and store it in file and repository metadata.
+
+        Adds ``last_commit``, ``last_modified``, ``author_count`` and ``churn``
+        (number of commits touching the file) to ``FileInfo.metadata`` and
+        fills ``last_commit`` and ``created_at`` of the repository metadata.
+
+        Args:
+            repo_path: Path to the repository (or a directory inside it)
+            files: Dictionary of FileInfo objects keyed by relative path
+            metadata: RepositoryMetadata object to update
+
+        Returns:
+            HistoryResult with the parsed history
+
+        Raises:
+            GitError: If the path is not a git repository or git fails
+        """
+        deadline = time.monotonic() + self.config.git_history_time_budget
+        result = self._read_log(repo_path, deadline)
+
+        for git_path, history in result.files.items():
+            file_path = git_path.replace("/", os.sep)
+            if file_path not in files:
+                continue
+            file_info = files[file_path]
+            file_info.metadata["last_commit"] = history.last_commit
+            file_info.metadata["last_modified"] = history.last_modified
+            file_info.metadata["author_count"] = len(history.authors)
+            file_info.metadata["churn"] = history.churn
+            files[file_path] = file_info
+
+        metadata.last_commit = result.last_commit
+        if result.truncated:
+            # The oldest commit seen is not the first one, look the root commit up directly
+            metadata.created_at = self._root_commit_date(repo_path, deadline)
+        else:
+            metadata.created_at = result.oldest_commit_date
+        metadata.metadata["git_history"] = {
+            "commits": result.commit_count,
+            "truncated": result.truncated,
+        }
+
+        return result
+
+    def _read_log(self, repo_path: str, deadline: float) -> HistoryResult:
+        """Run ``git log`` and parse its output as it streams in.
+
+        Args:
+            repo_path: Path to the repository
+            deadline: time.monotonic() value after which parsing stops
+
+        Returns:
+            HistoryResult with the parsed history
+        """
+        command = [
+            "git", "-C", repo_path, "-c", "core.quotepath=off", "log",
+            "--name-only", "--no-renames", "--relative",
+            f"--format={LOG_FORMAT}",
+            f"--max-count={self.config.git_history_max_commits}",
+        ]
+        # stderr goes to a file: a pipe nobody reads while stdout is parsed
+        # would block git once its warnings fill the pipe buffer
+        with tempfile.TemporaryFile() as stderr_file:
+            try:
+                process = subprocess.Popen(
+                    command, stdout=subprocess.PIPE, stderr=stderr_file,
+                    text=True, encoding="utf-8", errors="replace",
+                )
+            except OSError as e:
+                raise GitError(f"Failed to run git log: {e}")
+
+            killed = False
+            try:
+                result = self.parse_log(process.stdout, deadline)
+                # Stop git if parsing ended early because of the time budget
+                if result.truncated and process.poll() is None:
+                    process.kill()
+                    killed = True
+            except BaseException:
+                process.kill()
+                raise
+            finally:
+                process.communicate()
+
+            if not killed and process.returncode != 0:
+                stderr_file.seek(0)
+                stderr = stderr_file.read().decode("utf-8", errors="replace")
+                raise GitError(f"git log failed: {stderr.strip()}")
+        return result
+
+    def parse_log(self, lines: IO[str], deadline: Optional[float] = None) -> HistoryResult:
+        """Parse ``git log --name-only`` output produced with LOG_FORMAT.
+
+        Commits are listed newest first, so the first commit touching a
+        file is its last modification.
+
+        Args:
+            lines: Iterable of log output lines
+            deadline: time.monotonic() value after which parsing stops
+
+        Returns:
+            HistoryResult with the parsed history
+        """
+        result = HistoryResult()
+        commit_hash = author = date = None
+
+        for line in lines:
+            if deadline is not None and time.monotonic() > deadline:
+                result.truncated = True
+                break
+
+            line = line.rstrip("\n")
+            if line.startswith(COMMIT_MARKER):
+                commit_hash, author, date = line[1:].split(FIELD_SEPARATOR, 2)
+                result.commit_count += 1
+                if result.last_commit is None:
+                    result.last_commit = commit_hash
+                    result.last_commit_date = date
+                result.oldest_commit_date = date
+                continue
+
+            if not line or commit_hash is None:
+                continue
+
+            history = result.files.get(line)
+            if history is None:
+                history = FileHistory(last_commit=commit_hash, last_modified=date)
+                result.files[line] = history
+            history.authors.add(author)
+            history.churn += 1
+
+        if result.commit_count >= self.config.git_history_max_commits:
+            result.truncated = True
+        return result
+
+    def _root_commit_date(self, repo_path: str, deadline: float) -> Optional[str]:
+        """Get the author date of the repository's oldest root commit.
+
+        Args:
+            repo_path: Path to the repository
+            deadline: time.monotonic() value after which the lookup is abandoned
+
+        Returns:
+            ISO 8601 date, or None if it cannot be determined in time
+        """
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            return None
+        try:
+            output = subprocess.run(
+                ["git", "-C", repo_path, "log", "--max-parents=0", "--format=%aI", "HEAD"],
+                capture_output=True, text=True, timeout=timeout, check=True,
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+        dates = output.split()
+        return dates[-1] if dates else None
@@ -5,7 +5,7 @@ import yaml
 import re
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-from ..core.data_structures import FileInfo, DirectoryInfo, Framework
+from ..core.data_structures import FileInfo, DirectoryInfo, FileType, Framework
 from ..core.exceptions import FrameworkDetectionError
 
 
@@ -33,7 +33,7 @@ class FrameworkDetector:
         
         # Check configuration files for framework signatures
         for file_path, file_info in files.items():
-            if file_info.type == file_info.CONFIG:
+            if file_info.type == FileType.CONFIG:
                 framework_matches = self._detect_frameworks_in_config(file_path, file_info)
                 for framework_name, confidence in framework_matches:
                     if framework_name not in detected_frameworks:
@@ -47,7 +47,7 @@ class FrameworkDetector:
         
         # Check source files for framework signatures
         for file_path, file_info in files.items():
-            if file_info.type == file_info.SOURCE and file_info.language:
+            if file_info.type == FileType.SOURCE and file_info.language:
                 framework_matches = self._detect_frameworks_in_source(file_path, file_info)
                 for framework_name, confidence in framework_matches:
                     if framework_name not in detected_frameworks:
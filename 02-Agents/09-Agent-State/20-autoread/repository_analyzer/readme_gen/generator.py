@@ -1,16 +1,71 @@
 """README Generator for repository analysis results."""
 
-from typing import Dict, List, Optional
+import re
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
 from pathlib import Path
 from ..core.data_structures import RepositoryStructure, RepositoryMetadata, Framework
 
 
+# Matches template placeholders such as ``{{project_name}}``
+_PLACEHOLDER_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+
+
+class CompiledTemplate:
+    """A README template pre-split into literal text and placeholder names.
+
+    Rendering a compiled template is a single pass over its segments, instead
+    of one ``str.replace`` over the whole document per placeholder.
+    """
+
+    def __init__(self, source: str):
+        """Compile a template.
+
+        Args:
+            source: Template content using ``{{name}}`` placeholders
+        """
+        self.source = source
+        # re.split alternates literal text (even indices) and placeholder names (odd indices)
+        self.segments = _PLACEHOLDER_PATTERN.split(source)
+        self.placeholders = frozenset(self.segments[1::2])
+
+    def render(self, values: Dict[str, str]) -> str:
+        """Render the template with the given placeholder values.
+
+        Placeholders without a value are left untouched.
+
+        Args:
+            values: Mapping of placeholder names to replacement text
+
+        Returns:
+            Rendered template content
+        """
+        parts = []
+        for index, segment in enumerate(self.segments):
+            if index % 2 == 0:
+                parts.append(segment)
+            else:
+                value = values.get(segment)
+                parts.append(value if value is not None else "{{" + segment + "}}")
+        return "".join(parts)
+
+
 class READMEGenerator:
     """Generates professional README files from repository analysis results."""
     
-    def __init__(self):
-        """Initialize the READMEGenerator."""
-        self.templates = self._load_templates()
+    # Templates are compiled once per process and shared by all generators
+    _compiled_templates: Optional[Dict[str, CompiledTemplate]] = None
+    
+    def __init__(self, section_cache_size: int = 1024):
+        """Initialize the READMEGenerator.
+        
+        Args:
+            section_cache_size: Maximum number of generated sections to memoise
+        """
+        self.compiled_templates = self._get_compiled_templates()
+        self.templates = {name: compiled.source for name, compiled in self.compiled_templates.items()}
+        self.section_cache_size = section_cache_size
+        self._section_cache: "OrderedDict[Tuple[str, Hashable], str]" = OrderedDict()
     
     def generate_readme(self, structure: RepositoryStructure) -> str:
         """Generate a README.md content from repository structure analysis.
@@ -22,13 +77,49 @@ class READMEGenerator:
             Generated README content as string
         """
         # Determine the appropriate template based on project type
-        template = self._select_template(structure)
+        template_name = self._select_template(structure)
         
         # Populate template with repository information
-        readme_content = self._populate_template(template, structure)
+        readme_content = self._populate_template(template_name, structure)
         
         return readme_content
     
+    def generate_many(self, structures: Iterable[RepositoryStructure]) -> List[str]:
+        """Generate README content for several repository structures.
+        
+        Sections shared between repositories (installation instructions for
+        the same language, identical framework sets, ...) are generated once
+        and reused across the batch.
+        
+        Args:
+            structures: RepositoryStructure objects with analysis results
+            
+        Returns:
+            Generated README contents, in the same order as the input
+        """
+        return [self.generate_readme(structure) for structure in structures]
+    
+    def clear_cache(self) -> None:
+        """Discard all memoised sections."""
+        self._section_cache.clear()
+    
+    def _get_compiled_templates(self) -> Dict[str, CompiledTemplate]:
+        """Get the process-wide compiled templates, compiling them on first use.
+        
+        Compiled templates are stored per class so that subclasses providing
+        their own templates get their own compiled set.
+        
+        Returns:
+            Dictionary mapping template names to compiled templates
+        """
+        cls = type(self)
+        if cls.__dict__.get("_compiled_templates") is None:
+            cls._compiled_templates = {
+                name: CompiledTemplate(content)
+                for name, content in self._load_templates().items()
+            }
+        return cls._compiled_templates
+    
     def _load_templates(self) -> Dict[str, str]:
         """Load README templates for different project types.
         
@@ -77,11 +168,11 @@ class READMEGenerator:
         # Default to generic template
         return "default"
     
-    def _populate_template(self, template: str, structure: RepositoryStructure) -> str:
+    def _populate_template(self, template_name: str, structure: RepositoryStructure) -> str:
         """Populate template with repository analysis data.
         
         Args:
-            template: Template content
+            template_name: Name of the template to render
             structure: RepositoryStructure object with analysis results
             
         Returns:
@@ -90,41 +181,71 @@ class READMEGenerator:
         # Extract key information
         metadata = structure.metadata
         frameworks = [f.name for f in structure.frameworks]
+        template = self.compiled_templates.get(template_name, self.compiled_templates["default"])
+        
+        values = {
+            "project_name": metadata.name or "Project",
+            "primary_language": metadata.primary_language or "Not detected",
+            "languages": ", ".join(metadata.languages) if metadata.languages else "Not detected",
+            "frameworks": ", ".join(frameworks) if frameworks else "Not detected",
+            "architecture_type": metadata.architecture_type or "Not detected",
+            "entry_points": "\n".join([f"- `{ep}`" for ep in metadata.entry_points]) if metadata.entry_points else "Not detected",
+            "complexity_score": f"{metadata.complexity_score:.2f}" if metadata.complexity_score else "Not calculated",
+            "documentation_coverage": f"{metadata.documentation_coverage*100:.1f}%" if metadata.documentation_coverage else "Not calculated",
+            "test_coverage": f"{metadata.test_coverage_estimate*100:.1f}%" if metadata.test_coverage_estimate else "Not calculated",
+        }
         
-        # Replace template placeholders with actual data
-        readme_content = template
-        readme_content = readme_content.replace("{{project_name}}", metadata.name or "Project")
-        readme_content = readme_content.replace("{{primary_language}}", metadata.primary_language or "Not detected")
-        readme_content = readme_content.replace("{{languages}}", ", ".join(metadata.languages) if metadata.languages else "Not detected")
-        readme_content = readme_content.replace("{{frameworks}}", ", ".join(frameworks) if frameworks else "Not detected")
-        readme_content = readme_content.replace("{{architecture_type}}", metadata.architecture_type or "Not detected")
-        
-        # Add framework-specific sections
-        framework_details = self._generate_framework_details(structure.frameworks)
-        readme_content = readme_content.replace("{{framework_details}}", framework_details)
-        
-        # Add installation instructions
-        installation_instructions = self._generate_installation_instructions(structure)
-        readme_content = readme_content.replace("{{installation_instructions}}", installation_instructions)
-        
-        # Add usage examples
-        usage_examples = self._generate_usage_examples(structure)
-        readme_content = readme_content.replace("{{usage_examples}}", usage_examples)
-        
-        # Add configuration details
-        config_details = self._generate_configuration_details(structure)
-        readme_content = readme_content.replace("{{configuration_details}}", config_details)
-        
-        # Add entry points
-        entry_points = "\n".join([f"- `{ep}`" for ep in metadata.entry_points]) if metadata.entry_points else "Not detected"
-        readme_content = readme_content.replace("{{entry_points}}", entry_points)
-        
-        # Add complexity metrics
-        readme_content = readme_content.replace("{{complexity_score}}", f"{metadata.complexity_score:.2f}" if metadata.complexity_score else "Not calculated")
-        readme_content = readme_content.replace("{{documentation_coverage}}", f"{metadata.documentation_coverage*100:.1f}%" if metadata.documentation_coverage else "Not calculated")
-        readme_content = readme_content.replace("{{test_coverage}}", f"{metadata.test_coverage_estimate*100:.1f}%" if metadata.test_coverage_estimate else "Not calculated")
+        # Generated sections are memoised on the slice of the structure they depend on
+        if "framework_details" in template.placeholders:
+            values["framework_details"] = self._cached_section(
+                "framework_details",
+                tuple((f.name, f.confidence) for f in structure.frameworks),
+                lambda: self._generate_framework_details(structure.frameworks),
+            )
+        if "installation_instructions" in template.placeholders:
+            values["installation_instructions"] = self._cached_section(
+                "installation_instructions",
+                metadata.primary_language,
+                lambda: self._generate_installation_instructions(structure),
+            )
+        if "usage_examples" in template.placeholders:
+            values["usage_examples"] = self._cached_section(
+                "usage_examples",
+                (tuple(frameworks), tuple(metadata.entry_points)),
+                lambda: self._generate_usage_examples(structure),
+            )
+        if "configuration_details" in template.placeholders:
+            values["configuration_details"] = self._cached_section(
+                "configuration_details",
+                tuple(metadata.configuration_files[:5]) + (len(metadata.configuration_files),),
+                lambda: self._generate_configuration_details(structure),
+            )
+        
+        return template.render(values)
+    
+    def _cached_section(self, section: str, key: Hashable, factory: Callable[[], str]) -> str:
+        """Return a memoised section, generating it on a cache miss.
         
-        return readme_content
+        Args:
+            section: Name of the section
+            key: Hashable slice of the repository structure the section depends on
+            factory: Callable that generates the section content
+            
+        Returns:
+            Section content
+        """
+        cache_key = (section, key)
+        cached = self._section_cache.get(cache_key)
+        if cached is not None:
+            self._section_cache.move_to_end(cache_key)
+            return cached
+        
+        content = factory()
+        if self.section_cache_size > 0:
+            self._section_cache[cache_key] = content
+            if len(self._section_cache) > self.section_cache_size:
+                self._section_cache.popitem(last=False)
+        return content
     
     def _generate_framework_details(self, frameworks: List[Framework]) -> str:
         """Generate framework details section.
@@ -2,19 +2,86 @@
 
 import os
 import json
+import hashlib
 import yaml
 import re
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from ..core.data_structures import FileInfo, DirectoryInfo
+from typing import Dict, List, Optional, Any, Tuple
+from ..core.data_structures import FileInfo, DirectoryInfo, FileType
 from ..core.exceptions import AnalysisError
 
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - optional dependency
+    xxhash = None
+
+
+# Metadata keys derived purely from file content, safe to share between identical files
+CONTENT_METADATA_KEYS = (
+    'lines', 'characters', 'words', 'classes', 'functions',
+    'module_docstring', 'interfaces', 'types', 'package'
+)
+
+
+def compute_content_hash(data: bytes) -> str:
+    """Compute a fast content hash for duplicate detection.
+    
+    Uses xxh3-128 when ``xxhash`` is installed and falls back to a 128-bit
+    BLAKE2b digest from the standard library otherwise.
+    
+    Args:
+        data: Raw file content
+        
+    Returns:
+        Hex digest of the content
+    """
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def decode_text(data: bytes) -> str:
+    """Decode raw file content the way text-mode ``open(..., errors='ignore')`` reads it.
+    
+    Args:
+        data: Raw file content
+        
+    Returns:
+        UTF-8 text with invalid bytes dropped and newlines normalised to ``\n``
+    """
+    return data.decode('utf-8', errors='ignore').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def find_duplicate_clusters(files: Dict[str, FileInfo]) -> Dict[str, List[str]]:
+    """Group files with identical content.
+    
+    Args:
+        files: Dictionary of FileInfo objects, hashed by ``catalog_files``
+        
+    Returns:
+        Dictionary mapping content hashes to the paths sharing that content,
+        limited to clusters of two or more files
+    """
+    clusters: Dict[str, List[str]] = {}
+    for file_path, file_info in files.items():
+        content_hash = file_info.metadata.get('content_hash')
+        if content_hash:
+            clusters.setdefault(content_hash, []).append(file_path)
+    
+    return {content_hash: sorted(paths) for content_hash, paths in clusters.items() if len(paths) > 1}
+
 
 class FileCataloger:
     """Catalogs files and extracts detailed metadata."""
     
-    def __init__(self):
-        """Initialize the FileCataloger."""
+    def __init__(self, deduplicate: bool = False):
+        """Initialize the FileCataloger.
+        
+        Args:
+            deduplicate: Hash file contents so identical files share a single
+                parsed result instead of being parsed once per copy
+        """
+        self.deduplicate = deduplicate
         self.language_parsers = {
             'python': self._parse_python_file,
             'javascript': self._parse_javascript_file,
@@ -35,22 +102,38 @@ class FileCataloger:
             Updated dictionary of FileInfo objects with metadata
         """
         repo_path_obj = Path(repo_path)
+        parsed_by_content: Dict[Tuple, FileInfo] = {}
         
         for file_path, file_info in files.items():
             try:
                 full_path = repo_path_obj / file_path
                 
+                # Reuse the parsed result of an identical file if one was already cataloged
+                content = None
+                if self.deduplicate:
+                    data = self._read_bytes(full_path)
+                    content_key = self._content_key(file_info, data) if data is not None else None
+                    if content_key is not None:
+                        original = parsed_by_content.get(content_key)
+                        if original is not None:
+                            self._share_parsed_results(file_info, original, full_path)
+                            files[file_path] = file_info
+                            continue
+                        parsed_by_content[content_key] = file_info
+                        # Parse the buffer that was hashed instead of reading the file again
+                        content = decode_text(data)
+                
                 # Extract basic metadata
-                self._extract_basic_metadata(file_info, full_path)
+                self._extract_basic_metadata(file_info, full_path, content)
                 
                 # Extract language-specific metadata
                 if file_info.language:
                     language_key = file_info.language.lower()
                     if language_key in self.language_parsers:
-                        self.language_parsers[language_key](file_info, full_path)
+                        self.language_parsers[language_key](file_info, full_path, content)
                 
                 # Extract framework markers
-                self._extract_framework_markers(file_info, full_path)
+                self._extract_framework_markers(file_info, full_path, content)
                 
                 # Update file info
                 files[file_path] = file_info
@@ -60,41 +143,112 @@ class FileCataloger:
         
         return files
     
-    def _extract_basic_metadata(self, file_info: FileInfo, file_path: Path) -> None:
-        """Extract basic metadata from a file.
+    @staticmethod
+    def _read_bytes(file_path: Path) -> Optional[bytes]:
+        """Read a file's raw content, or None if it cannot be read."""
+        try:
+            with open(file_path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    @staticmethod
+    def _read_text(file_path: Path) -> str:
+        """Read a file as UTF-8 text, dropping undecodable bytes."""
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+    
+    def _content_key(self, file_info: FileInfo, data: bytes) -> Tuple:
+        """Hash file content and build the key used to share parsed results.
+        
+        The content hash is stored in ``file_info.metadata['content_hash']``.
+        Files only share results when their type and language also match,
+        and configuration files additionally by name since some markers are
+        name-dependent (e.g. ``package.json``).
+        
+        Args:
+            file_info: FileInfo object to update
+            data: Raw file content
+            
+        Returns:
+            Hashable content key
+        """
+        content_hash = compute_content_hash(data)
+        file_info.metadata['content_hash'] = content_hash
+        name_key = file_info.name.lower() if file_info.type == FileType.CONFIG else ''
+        return (content_hash, file_info.type, file_info.language, name_key)
+    
+    def _share_parsed_results(self, file_info: FileInfo, original: FileInfo, file_path: Path) -> None:
+        """Copy parsed results from an identical, already cataloged file.
+        
+        Content-derived values are shared by reference rather than copied;
+        per-file stat metadata is still read from the file itself.
+        
+        Args:
+            file_info: FileInfo object to update
+            original: FileInfo object of the first file with the same content
+            file_path: Path to the file
+        """
+        self._extract_stat_metadata(file_info, file_path)
+        for key in CONTENT_METADATA_KEYS:
+            if key in original.metadata:
+                file_info.metadata[key] = original.metadata[key]
+        file_info.imports = original.imports
+        file_info.framework_markers = original.framework_markers
+        file_info.metadata['duplicate_of'] = original.path
+    
+    def _extract_stat_metadata(self, file_info: FileInfo, file_path: Path) -> None:
+        """Extract file system stat metadata from a file.
         
         Args:
             file_info: FileInfo object to update
             file_path: Path to the file
         """
         try:
-            # Get file stats
             stat = file_path.stat()
             file_info.metadata['created'] = stat.st_ctime
             file_info.metadata['modified'] = stat.st_mtime
             file_info.metadata['permissions'] = oct(stat.st_mode)[-3:]
+        except OSError:
+            # Silently continue if the file cannot be stat'ed
+            pass
+    
+    def _extract_basic_metadata(self, file_info: FileInfo, file_path: Path,
+                                content: Optional[str] = None) -> None:
+        """Extract basic metadata from a file.
+        
+        Args:
+            file_info: FileInfo object to update
+            file_path: Path to the file
+            content: Text of the file if it was already read, otherwise it is read here
+        """
+        try:
+            # Get file stats
+            self._extract_stat_metadata(file_info, file_path)
             
             # Extract file content information
-            if file_info.type in [FileInfo.SOURCE, FileInfo.CONFIG, FileInfo.DOC]:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    file_info.metadata['lines'] = len(content.splitlines())
-                    file_info.metadata['characters'] = len(content)
-                    file_info.metadata['words'] = len(content.split())
+            if file_info.type in [FileType.SOURCE, FileType.CONFIG, FileType.DOC]:
+                if content is None:
+                    content = self._read_text(file_path)
+                file_info.metadata['lines'] = len(content.splitlines())
+                file_info.metadata['characters'] = len(content)
+                file_info.metadata['words'] = len(content.split())
         except Exception:
             # Silently continue if metadata extraction fails
             pass
     
-    def _parse_python_file(self, file_info: FileInfo, file_path: Path) -> None:
+    def _parse_python_file(self, file_info: FileInfo, file_path: Path,
+                           content: Optional[str] = None) -> None:
         """Parse a Python file and extract imports and other metadata.
         
         Args:
             file_info: FileInfo object to update
             file_path: Path to the Python file
+            content: Text of the file if it was already read
         """
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            if content is None:
+                content = self._read_text(file_path)
                 
             # Extract imports
             imports = []
@@ -125,16 +279,18 @@ class FileCataloger:
             # Silently continue if parsing fails
             pass
     
-    def _parse_javascript_file(self, file_info: FileInfo, file_path: Path) -> None:
+    def _parse_javascript_file(self, file_info: FileInfo, file_path: Path,
+                               content: Optional[str] = None) -> None:
         """Parse a JavaScript file and extract imports and other metadata.
         
         Args:
             file_info: FileInfo object to update
             file_path: Path to the JavaScript file
+            content: Text of the file if it was already read
         """
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            if content is None:
+                content = self._read_text(file_path)
                 
             # Extract ES6 imports
             es6_imports = re.findall(r'^import.*?from\s+["\'](.+?)["\']', content, re.MULTILINE)
@@ -158,20 +314,24 @@ class FileCataloger:
             # Silently continue if parsing fails
             pass
     
-    def _parse_typescript_file(self, file_info: FileInfo, file_path: Path) -> None:
+    def _parse_typescript_file(self, file_info: FileInfo, file_path: Path,
+                               content: Optional[str] = None) -> None:
         """Parse a TypeScript file and extract imports and other metadata.
         
         Args:
             file_info: FileInfo object to update
             file_path: Path to the TypeScript file
+            content: Text of the file if it was already read
         """
-        # TypeScript parsing is similar to JavaScript
-        self._parse_javascript_file(file_info, file_path)
+        # TypeScript parsing is similar to JavaScript; read the file once for both passes
+        if content is None:
+            try:
+                content = self._read_text(file_path)
+            except OSError:
+                return
+        self._parse_javascript_file(file_info, file_path, content)
         
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                
             # Extract TypeScript-specific features
             interfaces = re.findall(r'^interface\s+(\w+)', content, re.MULTILINE)
             types = re.findall(r'^type\s+(\w+)', content, re.MULTILINE)
@@ -183,16 +343,18 @@ class FileCataloger:
             # Silently continue if parsing fails
             pass
     
-    def _parse_java_file(self, file_info: FileInfo, file_path: Path) -> None:
+    def _parse_java_file(self, file_info: FileInfo, file_path: Path,
+                         content: Optional[str] = None) -> None:
         """Parse a Java file and extract imports and other metadata.
         
         Args:
             file_info: FileInfo object to update
             file_path: Path to the Java file
+            content: Text of the file if it was already read
         """
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            if content is None:
+                content = self._read_text(file_path)
                 
             # Extract imports
             imports = re.findall(r'^import\s+(?:static\s+)?([\w.]+)', content, re.MULTILINE)
@@ -212,20 +374,22 @@ class FileCataloger:
             # Silently continue if parsing fails
             pass
     
-    def _extract_framework_markers(self, file_info: FileInfo, file_path: Path) -> None:
+    def _extract_framework_markers(self, file_info: FileInfo, file_path: Path,
+                                   content: Optional[str] = None) -> None:
         """Extract framework-specific markers from files.
         
         Args:
             file_info: FileInfo object to update
             file_path: Path to the file
+            content: Text of the file if it was already read
         """
         try:
             # Only process certain file types
-            if file_info.type not in [FileInfo.SOURCE, FileInfo.CONFIG, FileInfo.DOC]:
+            if file_info.type not in [FileType.SOURCE, FileType.CONFIG, FileType.DOC]:
                 return
                 
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            if content is None:
+                content = self._read_text(file_path)
                 
             markers = []
             
@@ -246,30 +410,24 @@ class FileCataloger:
                 markers.append('express')
                 
             # Configuration file specific markers
-            if file_info.type == FileInfo.CONFIG:
+            if file_info.type == FileType.CONFIG:
                 if 'package.json' in file_path.name:
                     try:
-                        with open(file_path, 'r') as f:
-                            package_data = json.load(f)
-                            if 'dependencies' in package_data:
-                                deps = package_data['dependencies']
-                                markers.extend([dep for dep in deps.keys() if dep in [
-                                    'react', 'vue', 'angular', '@angular/core',
-                                    'express', 'koa', 'fastify',
-                                    'next', 'nuxt', 'gatsby'
-                                ]])
+                        package_data = json.loads(content)
+                        if 'dependencies' in package_data:
+                            deps = package_data['dependencies']
+                            markers.extend([dep for dep in deps.keys() if dep in [
+                                'react', 'vue', 'angular', '@angular/core',
+                                'express', 'koa', 'fastify',
+                                'next', 'nuxt', 'gatsby'
+                            ]])
                     except:
                         pass
                 elif 'requirements.txt' in file_path.name:
-                    try:
-                        with open(file_path, 'r') as f:
-                            content = f.read()
-                            if 'Django' in content:
-                                markers.append('django')
-                            if 'Flask' in content:
-                                markers.append('flask')
-                    except:
-                        pass
+                    if 'Django' in content:
+                        markers.append('django')
+                    if 'Flask' in content:
+                        markers.append('flask')
                         
             file_info.framework_markers = list(set(markers))
                 
@@ -1,12 +1,15 @@
 """File system scanner for repository analysis."""
 
 import os
+import time
 from pathlib import Path
 from typing import Dict, List, Optional, Callable, Generator
 from ..core.config import AnalysisConfig
 from ..core.data_structures import FileInfo, DirectoryInfo, FileType, DirectoryType
 from ..core.exceptions import AnalysisError
+from ..core.storage import create_storage
 from .filters import FileFilter
+from .sampling import DirectoryCounter, SampleResult, StratifiedSampler
 
 
 class FileSystemScanner:
@@ -47,6 +50,62 @@ class FileSystemScanner:
         except Exception as e:
             raise AnalysisError(f"Failed to scan repository: {e}")
     
+    def sample_repository(self, repo_path: str) -> tuple[Dict[str, FileInfo], Dict[str, DirectoryInfo], SampleResult]:
+        """Scan a stratified sample of a repository's files.
+        
+        The walk only keeps counters and a bounded sample in memory, so
+        memory use depends on ``config.sample_budget`` rather than on the
+        repository size. Discovery stops once ``config.sample_time_budget``
+        is exhausted (unless it is None) and the sample is drawn from the
+        files seen so far.
+        
+        Args:
+            repo_path: Path to the repository root
+            
+        Returns:
+            Tuple of (files_dict, directories_dict, sample_result) where the
+            dictionaries only contain sampled files and their directories
+            
+        Raises:
+            AnalysisError: If scanning fails
+        """
+        try:
+            self.file_filter.setup_filters(repo_path)
+            
+            sampler = StratifiedSampler(self.config.sample_budget, seed=self.config.sample_seed)
+            repo_path_obj = Path(repo_path)
+            time_budget = self.config.sample_time_budget
+            deadline = time.monotonic() + time_budget if time_budget is not None else None
+            directory_counter = DirectoryCounter()
+            
+            for file_path in self._walk_repository(repo_path):
+                if deadline is not None and time.monotonic() >= deadline:
+                    sampler.result.complete = False
+                    break
+                
+                if not self.file_filter.should_include_file(str(file_path), repo_path):
+                    continue
+                
+                rel_path = str(file_path.relative_to(repo_path_obj))
+                sampler.add(rel_path)
+                
+                # Count every ancestor directory, as _scan_directories does
+                directory_counter.add(os.path.dirname(rel_path))
+            
+            sample = sampler.finish()
+            sample.total_directories = directory_counter.count + 1  # Include the root directory
+            
+            files = create_storage(self.config, "files")
+            for rel_path in sample.sampled:
+                file_info = self._create_file_info(repo_path_obj / rel_path, repo_path_obj)
+                if file_info is not None:
+                    files[rel_path] = file_info
+            directories = self._scan_directories(repo_path, files)
+            
+            return files, directories, sample
+        except Exception as e:
+            raise AnalysisError(f"Failed to sample repository: {e}")
+    
     def _scan_files(self, repo_path: str) -> Dict[str, FileInfo]:
         """Scan all files in a repository.
         
@@ -56,7 +115,7 @@ class FileSystemScanner:
         Returns:
             Dictionary mapping file paths to FileInfo objects
         """
-        files = {}
+        files = create_storage(self.config, "files")
         repo_path_obj = Path(repo_path)
         
         for file_path in self._walk_repository(repo_path):
@@ -64,30 +123,42 @@ class FileSystemScanner:
             if not self.file_filter.should_include_file(str(file_path), repo_path):
                 continue
             
-            try:
-                # Get file stats
-                stat = file_path.stat()
-                
-                # Determine file type and language
-                file_type, language = self._classify_file(str(file_path.relative_to(repo_path_obj)))
-                
-                # Create FileInfo object
-                file_info = FileInfo(
-                    name=file_path.name,
-                    path=str(file_path.relative_to(repo_path_obj)),
-                    extension=file_path.suffix,
-                    size=stat.st_size,
-                    type=file_type,
-                    language=language
-                )
-                
-                files[str(file_path.relative_to(repo_path_obj))] = file_info
-            except Exception:
-                # Skip files that cause errors
-                continue
+            file_info = self._create_file_info(file_path, repo_path_obj)
+            if file_info is not None:
+                files[file_info.path] = file_info
         
         return files
     
+    def _create_file_info(self, file_path: Path, repo_path_obj: Path) -> Optional[FileInfo]:
+        """Create a FileInfo object for a file.
+        
+        Args:
+            file_path: Absolute path to the file
+            repo_path_obj: Path to the repository root
+            
+        Returns:
+            FileInfo object, or None if the file cannot be read
+        """
+        try:
+            # Get file stats
+            stat = file_path.stat()
+            rel_path = str(file_path.relative_to(repo_path_obj))
+            
+            # Determine file type and language
+            file_type, language = self._classify_file(rel_path)
+            
+            return FileInfo(
+                name=file_path.name,
+                path=rel_path,
+                extension=file_path.suffix,
+                size=stat.st_size,
+                type=file_type,
+                language=language
+            )
+        except Exception:
+            # Skip files that cause errors
+            return None
+    
     def _scan_directories(self, repo_path: str, files: Dict[str, FileInfo]) -> Dict[str, DirectoryInfo]:
         """Scan all directories in a repository.
         
@@ -98,7 +169,7 @@ class FileSystemScanner:
         Returns:
             Dictionary mapping directory paths to DirectoryInfo objects
         """
-        directories = {}
+        directories = create_storage(self.config, "directories")
         repo_path_obj = Path(repo_path)
         
         # Get all unique directory paths from files
@@ -112,31 +183,27 @@ class FileSystemScanner:
         # Add root directory
         dir_paths.add('.')
         
+        # Group files and subdirectories by parent once instead of rescanning per directory
+        child_files: Dict[str, List[str]] = {}
+        for file_path_key in files.keys():
+            child_files.setdefault(str(Path(file_path_key).parent), []).append(file_path_key)
+        
+        child_dirs: Dict[str, List[str]] = {}
+        for other_dir_path in dir_paths:
+            if other_dir_path != '.':
+                child_dirs.setdefault(str(Path(other_dir_path).parent), []).append(other_dir_path)
+        
         # Create DirectoryInfo for each directory
         for dir_path_str in dir_paths:
             dir_path = Path(dir_path_str)
-            full_path = repo_path_obj / dir_path
             
             try:
                 # Determine directory type and purpose
                 dir_type, purpose = self._classify_directory(dir_path_str)
                 
                 # Get child files and directories
-                children = []
-                file_count = 0
-                
-                # Count files in this directory
-                for file_path_key in files.keys():
-                    if str(Path(file_path_key).parent) == dir_path_str or \
-                       (dir_path_str == '.' and str(Path(file_path_key).parent) == '.'):
-                        file_count += 1
-                        children.append(file_path_key)
-                
-                # Add subdirectories
-                for other_dir_path in dir_paths:
-                    if other_dir_path != dir_path_str and \
-                       str(Path(other_dir_path).parent) == dir_path_str:
-                        children.append(other_dir_path)
+                dir_files = child_files.get(dir_path_str, [])
+                children = dir_files + child_dirs.get(dir_path_str, [])
                 
                 # Create DirectoryInfo object
                 dir_info = DirectoryInfo(
@@ -145,7 +212,7 @@ class FileSystemScanner:
                     type=dir_type,
                     purpose=purpose,
                     children=children,
-                    file_count=file_count
+                    file_count=len(dir_files)
                 )
                 
                 directories[dir_path_str] = dir_info
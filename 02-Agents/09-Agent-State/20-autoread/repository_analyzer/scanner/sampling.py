@@ -0,0 +1,232 @@
+"""Stratified file sampling for approximate analysis of very large repositories."""
+
+import heapq
+import math
+import os
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from ..core.data_structures import FileInfo
+
+
+# A stratum groups files by top-level directory and extension
+Stratum = Tuple[str, str]
+
+# Catch-all stratum used once the number of tracked strata reaches its limit
+OVERFLOW_STRATUM: Stratum = ("*", "*")
+
+# z-score for 95% confidence intervals
+Z_95 = 1.96
+
+
+def stratum_for(rel_path: str) -> Stratum:
+    """Get the sampling stratum of a file.
+
+    Args:
+        rel_path: File path relative to the repository root
+
+    Returns:
+        Tuple of (top-level directory, lowercase extension)
+    """
+    path_obj = Path(rel_path)
+    top_level = path_obj.parts[0] if len(path_obj.parts) > 1 else "."
+    return top_level, path_obj.suffix.lower()
+
+
+class DirectoryCounter:
+    """Count the distinct ancestor directories of files met in a depth-first walk.
+
+    Files must arrive grouped by directory in ``os.walk`` (top-down) order.
+    Only the directories on the current walk path are remembered, so memory
+    is bounded by the tree depth rather than by the number of directories.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._counted: List[str] = []  # Counted directories on the current walk path, outermost first
+        self._current: Optional[str] = None
+
+    def add(self, rel_dir: str) -> None:
+        """Count a file's directory and its ancestors if not counted yet.
+
+        Args:
+            rel_dir: Directory of the file relative to the repository root,
+                ``""`` for the root itself
+        """
+        if rel_dir == self._current:
+            return
+        self._current = rel_dir
+        # The walk never returns to a subtree it left, so forget directories that are not ancestors
+        while self._counted and not (rel_dir == self._counted[-1] or
+                                     rel_dir.startswith(self._counted[-1] + os.sep)):
+            self._counted.pop()
+
+        new_dirs = []
+        parent = rel_dir
+        while parent and (not self._counted or parent != self._counted[-1]):
+            new_dirs.append(parent)
+            parent = os.path.dirname(parent)
+        self._counted.extend(reversed(new_dirs))
+        self.count += len(new_dirs)
+
+
+@dataclass
+class SampleResult:
+    """Outcome of sampling a repository."""
+    budget: int
+    strata_counts: Dict[Stratum, int] = field(default_factory=dict)
+    sampled: Dict[str, Stratum] = field(default_factory=dict)
+    total_files: int = 0
+    total_directories: int = 0
+    complete: bool = True
+
+    def sampled_counts(self) -> Dict[Stratum, int]:
+        """Count sampled files per stratum.
+
+        Returns:
+            Dictionary mapping strata to the number of sampled files
+        """
+        counts: Dict[Stratum, int] = {}
+        for stratum in self.sampled.values():
+            counts[stratum] = counts.get(stratum, 0) + 1
+        return counts
+
+    def weights(self) -> Dict[str, float]:
+        """Get the number of repository files each sampled file stands for.
+
+        Returns:
+            Dictionary mapping sampled paths to the expansion weight N_h / n_h
+            of their stratum
+        """
+        sampled_counts = self.sampled_counts()
+        return {
+            rel_path: self.strata_counts[stratum] / sampled_counts[stratum]
+            for rel_path, stratum in self.sampled.items()
+        }
+
+    def estimate_proportion(self, files: Dict[str, FileInfo],
+                            predicate: Callable[[FileInfo], bool]) -> Tuple[float, float, float]:
+        """Estimate the fraction of repository files matching a predicate.
+
+        Uses the stratified estimator with finite population correction.
+        Strata without any sampled file cannot be estimated; the interval
+        is widened to cover them matching either none or all of their files.
+
+        Args:
+            files: Sampled FileInfo objects keyed by relative path
+            predicate: Function returning True for files to count
+
+        Returns:
+            Tuple of (estimate, lower bound, upper bound) of the 95% interval
+        """
+        if self.total_files == 0:
+            return 0.0, 0.0, 0.0
+
+        matches: Dict[Stratum, int] = {}
+        for rel_path, stratum in self.sampled.items():
+            file_info = files.get(rel_path)
+            if file_info is not None and predicate(file_info):
+                matches[stratum] = matches.get(stratum, 0) + 1
+
+        sampled_counts = self.sampled_counts()
+        covered = sum(self.strata_counts[s] for s in sampled_counts)
+        uncovered_share = 1.0 - covered / self.total_files
+
+        estimate = 0.0
+        variance = 0.0
+        for stratum, n_h in sampled_counts.items():
+            total_h = self.strata_counts[stratum]
+            share_h = total_h / self.total_files
+            p_h = matches.get(stratum, 0) / n_h
+            estimate += share_h * p_h
+
+            # Finite population correction; a single sample gets the worst-case variance
+            fpc = 1.0 - n_h / total_h
+            stratum_variance = p_h * (1.0 - p_h) / (n_h - 1) if n_h > 1 else 0.25
+            variance += share_h ** 2 * fpc * stratum_variance
+
+        # Rescale the covered estimate so that it represents the whole repository
+        if covered:
+            point = estimate / (1.0 - uncovered_share)
+        else:
+            point = 0.0
+        margin = Z_95 * math.sqrt(variance)
+        lower = max(0.0, estimate - margin)
+        upper = min(1.0, estimate + margin + uncovered_share)
+        return point, lower, upper
+
+
+class StratifiedSampler:
+    """Bounded-memory stratified sampler fed one file at a time.
+
+    Every file receives a random priority and the ``budget`` lowest
+    priorities are kept in a heap, which yields a uniform sample within
+    each stratum. One file per stratum is additionally kept aside so that
+    small strata (a lone ``setup.py``, a handful of docs) are represented.
+    Memory is bounded by the budget plus ``max_strata`` counters.
+    """
+
+    def __init__(self, budget: int, seed: Optional[int] = None, max_strata: Optional[int] = None):
+        """Initialize the StratifiedSampler.
+
+        Args:
+            budget: Maximum number of files in the sample
+            seed: Random seed for reproducible samples
+            max_strata: Maximum number of distinct strata to track,
+                defaults to four times the budget
+        """
+        self.budget = max(budget, 1)
+        self.max_strata = max_strata or self.budget * 4
+        self._random = random.Random(seed)
+        self._heap: List[Tuple[float, str, Stratum]] = []
+        self._representatives: Dict[Stratum, str] = {}
+        self.result = SampleResult(budget=self.budget)
+
+    def add(self, rel_path: str) -> None:
+        """Offer a file to the sampler.
+
+        Args:
+            rel_path: File path relative to the repository root
+        """
+        stratum = stratum_for(rel_path)
+        counts = self.result.strata_counts
+        if stratum not in counts and len(counts) >= self.max_strata:
+            stratum = OVERFLOW_STRATUM
+        counts[stratum] = counts.get(stratum, 0) + 1
+        self.result.total_files += 1
+
+        # Reservoir of size one per stratum (Algorithm R)
+        if self._random.random() * counts[stratum] < 1.0:
+            self._representatives[stratum] = rel_path
+
+        # Keep the files with the lowest priorities, using a max-heap of negated priorities
+        priority = self._random.random()
+        if len(self._heap) < self.budget:
+            heapq.heappush(self._heap, (-priority, rel_path, stratum))
+        elif -self._heap[0][0] > priority:
+            heapq.heapreplace(self._heap, (-priority, rel_path, stratum))
+
+    def finish(self) -> SampleResult:
+        """Select the final sample.
+
+        Returns:
+            SampleResult describing the sampled files and stratum sizes
+        """
+        counts = self.result.strata_counts
+        sampled: Dict[str, Stratum] = {}
+
+        # One representative per stratum first, largest strata first
+        for stratum in sorted(self._representatives, key=lambda s: counts[s], reverse=True):
+            if len(sampled) >= self.budget:
+                break
+            sampled[self._representatives[stratum]] = stratum
+
+        # Fill the rest of the budget with the lowest-priority files
+        for _, rel_path, stratum in sorted(self._heap, reverse=True):
+            if len(sampled) >= self.budget:
+                break
+            sampled.setdefault(rel_path, stratum)
+
+        self.result.sampled = sampled
+        return self.result
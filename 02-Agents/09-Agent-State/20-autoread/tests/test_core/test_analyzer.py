@@ -160,4 +160,22 @@ def test_analyzer_find_configuration_files():
     config_files = analyzer._find_configuration_files({})
     
     assert isinstance(config_files, list)
-    assert len(config_files) == 0
\ No newline at end of file
+    assert len(config_files) == 0
+
+
+def test_analyzer_analyze_local_repository(temp_dir):
+    """Test a full analyze() run over a small local repository without mocks."""
+    (temp_dir / "src").mkdir()
+    (temp_dir / "tests").mkdir()
+    (temp_dir / "src" / "app.py").write_text("from flask import Flask\n\napp = Flask(__name__)\n")
+    (temp_dir / "tests" / "test_app.py").write_text("from src.app import app\n")
+    (temp_dir / "requirements.txt").write_text("flask==3.0.0\n")
+    (temp_dir / "package.json").write_text('{"dependencies": {"react": "^18.0.0"}}')
+    (temp_dir / "README.md").write_text("# Demo\n")
+
+    structure = RepositoryAnalyzer(AnalysisConfig()).analyze(str(temp_dir))
+
+    assert isinstance(structure, RepositoryStructure)
+    assert "src/app.py" in structure.files
+    assert "package.json" in structure.files
+    assert structure.files["src/app.py"].language == "Python"
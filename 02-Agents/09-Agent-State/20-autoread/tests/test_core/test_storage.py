@@ -0,0 +1,99 @@
+"""Tests for intermediate result storage backends."""
+
+import os
+import pytest
+from repository_analyzer.core.config import AnalysisConfig
+from repository_analyzer.core.data_structures import FileInfo, FileType
+from repository_analyzer.core.exceptions import ConfigurationError
+from repository_analyzer.core.storage import SQLiteMapping, create_storage
+from repository_analyzer.scanner.filesystem import FileSystemScanner
+from repository_analyzer.scanner.cataloger import FileCataloger
+
+
+def _file_info(path: str) -> FileInfo:
+    """Create a FileInfo for a relative path."""
+    return FileInfo(name=path, path=path, extension=".py", size=1, type=FileType.SOURCE, language="Python")
+
+
+def test_sqlite_mapping_basic_operations(temp_dir):
+    """Test dictionary operations on an SQLiteMapping."""
+    mapping = SQLiteMapping(table="files", cache_size=2, write_batch_size=2, directory=str(temp_dir))
+    for i in range(10):
+        mapping[f"file_{i}.py"] = _file_info(f"file_{i}.py")
+    
+    assert len(mapping) == 10
+    assert "file_3.py" in mapping
+    assert "missing.py" not in mapping
+    assert mapping["file_7.py"].path == "file_7.py"
+    assert mapping.get("missing.py") is None
+    assert len(mapping._cache) <= 2
+    assert list(mapping) == [f"file_{i}.py" for i in range(10)]
+    
+    del mapping["file_0.py"]
+    assert len(mapping) == 9
+    with pytest.raises(KeyError):
+        mapping["file_0.py"]
+
+
+def test_sqlite_mapping_write_back_during_iteration(temp_dir):
+    """Test that values reassigned while iterating are persisted once each."""
+    mapping = SQLiteMapping(table="files", cache_size=0, write_batch_size=3, page_size=4,
+                            directory=str(temp_dir))
+    for i in range(10):
+        mapping[f"file_{i}.py"] = _file_info(f"file_{i}.py")
+    
+    visited = []
+    for key, file_info in mapping.items():
+        visited.append(key)
+        file_info.metadata["lines"] = 42
+        mapping[key] = file_info
+    
+    assert len(visited) == 10
+    assert all(file_info.metadata["lines"] == 42 for file_info in mapping.values())
+
+
+def test_sqlite_mapping_removes_temporary_file(temp_dir):
+    """Test that closing the mapping deletes its temporary database."""
+    mapping = SQLiteMapping(directory=str(temp_dir))
+    mapping["a"] = 1
+    path = mapping.path
+    assert os.path.exists(path)
+    
+    mapping.close()
+    assert not os.path.exists(path)
+
+
+def test_create_storage(temp_dir):
+    """Test storage backend selection."""
+    assert create_storage(AnalysisConfig(temp_dir=str(temp_dir)), "files") == {}
+    
+    config = AnalysisConfig(temp_dir=str(temp_dir), storage_backend="sqlite")
+    assert isinstance(create_storage(config, "files"), SQLiteMapping)
+    
+    with pytest.raises(ConfigurationError):
+        create_storage(AnalysisConfig(temp_dir=str(temp_dir), storage_backend="redis"), "files")
+
+
+def test_sqlite_backend_matches_memory_backend(temp_dir):
+    """Test that scanning and cataloging produce the same results with both backends."""
+    repo = temp_dir / "repo"
+    (repo / "src").mkdir(parents=True)
+    (repo / "src" / "main.py").write_text("import os\n\n\ndef main():\n    pass\n")
+    (repo / "README.md").write_text("# Repo\n")
+    
+    results = {}
+    for backend in ["memory", "sqlite"]:
+        config = AnalysisConfig(temp_dir=str(temp_dir), storage_backend=backend, storage_cache_size=1)
+        files, directories = FileSystemScanner(config).scan_repository(str(repo))
+        files = FileCataloger().catalog_files(files, directories, str(repo))
+        results[backend] = (
+            {path: (info.type, info.metadata.get("functions")) for path, info in files.items()},
+            {path: sorted(info.children) for path, info in directories.items()},
+        )
+    
+    assert results["memory"] == results["sqlite"]
+    assert results["sqlite"][0]["src/main.py"] == (FileType.SOURCE, ["main"])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
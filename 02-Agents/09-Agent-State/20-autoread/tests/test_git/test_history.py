@@ -0,0 +1,134 @@
+"""Tests for git history collection."""
+
+import os
+import subprocess
+import pytest
+from repository_analyzer.core.config import AnalysisConfig
+from repository_analyzer.core.data_structures import FileInfo, FileType, RepositoryMetadata
+from repository_analyzer.core.exceptions import GitError
+from repository_analyzer.git.history import GitHistoryCollector, COMMIT_MARKER, FIELD_SEPARATOR
+
+
+def _git(repo, *args, author="Alice", date="2024-01-01T00:00:00+00:00"):
+    """Run a git command in a test repository."""
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_NAME": author, "GIT_AUTHOR_EMAIL": f"{author.lower()}@example.com",
+        "GIT_COMMITTER_NAME": author, "GIT_COMMITTER_EMAIL": f"{author.lower()}@example.com",
+        "GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date,
+    }
+    subprocess.run(["git", *args], cwd=repo, env=env, check=True, capture_output=True)
+
+
+def _file_info(path):
+    """Create a FileInfo for a relative path."""
+    return FileInfo(name=os.path.basename(path), path=path, extension=".py", size=0, type=FileType.SOURCE)
+
+
+@pytest.fixture
+def git_repo(temp_dir):
+    """Create a git repository with three commits by two authors."""
+    _git(temp_dir, "init", "-q")
+    (temp_dir / "main.py").write_text("print('v1')\n")
+    (temp_dir / "README.md").write_text("# Repo\n")
+    _git(temp_dir, "add", ".")
+    _git(temp_dir, "commit", "-q", "-m", "initial", date="2024-01-01T00:00:00+00:00")
+    
+    (temp_dir / "main.py").write_text("print('v2')\n")
+    _git(temp_dir, "commit", "-q", "-am", "update", author="Bob", date="2024-02-01T00:00:00+00:00")
+    
+    (temp_dir / "main.py").write_text("print('v3')\n")
+    _git(temp_dir, "commit", "-q", "-am", "update again", date="2024-03-01T00:00:00+00:00")
+    return temp_dir
+
+
+def test_parse_log():
+    """Test parsing of the git log stream."""
+    log = [
+        f"{COMMIT_MARKER}c2{FIELD_SEPARATOR}bob@example.com{FIELD_SEPARATOR}2024-02-01\n",
+        "\n",
+        "src/app.py\n",
+        f"{COMMIT_MARKER}c1{FIELD_SEPARATOR}alice@example.com{FIELD_SEPARATOR}2024-01-01\n",
+        "\n",
+        "src/app.py\n",
+        "README.md\n",
+    ]
+    result = GitHistoryCollector(AnalysisConfig()).parse_log(log)
+    
+    assert result.commit_count == 2
+    assert result.last_commit == "c2"
+    assert result.oldest_commit_date == "2024-01-01"
+    assert result.files["src/app.py"].last_commit == "c2"
+    assert result.files["src/app.py"].authors == {"alice@example.com", "bob@example.com"}
+    assert result.files["src/app.py"].churn == 2
+    assert result.files["README.md"].last_modified == "2024-01-01"
+    assert result.truncated is False
+
+
+def test_collect_fills_metadata(git_repo):
+    """Test that history is stored in file and repository metadata."""
+    files = {"main.py": _file_info("main.py"), "README.md": _file_info("README.md")}
+    metadata = RepositoryMetadata()
+    
+    GitHistoryCollector(AnalysisConfig()).collect(str(git_repo), files, metadata)
+    
+    assert files["main.py"].metadata["churn"] == 3
+    assert files["main.py"].metadata["author_count"] == 2
+    assert files["main.py"].metadata["last_modified"].startswith("2024-03-01")
+    assert files["README.md"].metadata["churn"] == 1
+    assert files["README.md"].metadata["last_commit"] != files["main.py"].metadata["last_commit"]
+    assert metadata.last_commit == files["main.py"].metadata["last_commit"]
+    assert metadata.created_at.startswith("2024-01-01")
+    assert metadata.metadata["git_history"] == {"commits": 3, "truncated": False}
+
+
+def test_collect_respects_commit_cap(git_repo):
+    """Test that the commit cap truncates the log but still finds the creation date."""
+    files = {"main.py": _file_info("main.py"), "README.md": _file_info("README.md")}
+    metadata = RepositoryMetadata()
+    
+    config = AnalysisConfig(git_history_max_commits=1)
+    result = GitHistoryCollector(config).collect(str(git_repo), files, metadata)
+    
+    assert result.commit_count == 1
+    assert result.truncated is True
+    assert files["main.py"].metadata["churn"] == 1
+    assert "churn" not in files["README.md"].metadata
+    assert metadata.created_at.startswith("2024-01-01")
+
+
+def test_collect_outside_git_repository(temp_dir):
+    """Test that a non-repository raises GitError."""
+    with pytest.raises(GitError):
+        GitHistoryCollector(AnalysisConfig()).collect(str(temp_dir), {}, RepositoryMetadata())
+
+
+
+def test_collect_survives_verbose_stderr(temp_dir, monkeypatch):
+    """Test that git writing more than a pipe buffer to stderr does not block collection."""
+    bin_dir = temp_dir / "bin"
+    bin_dir.mkdir()
+    fake_git = bin_dir / "git"
+    fake_git.write_text(
+        "#!/bin/sh\n"
+        "head -c 1000000 /dev/zero | tr '\\0' w >&2\n"
+        f"printf '{COMMIT_MARKER}c1{FIELD_SEPARATOR}alice@example.com{FIELD_SEPARATOR}2024-01-01\\n\\nmain.py\\n'\n"
+    )
+    fake_git.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    
+    files = {"main.py": _file_info("main.py")}
+    config = AnalysisConfig(git_history_time_budget=10.0)
+    result = GitHistoryCollector(config).collect(str(temp_dir), files, RepositoryMetadata())
+    
+    assert result.commit_count == 1
+    assert files["main.py"].metadata["churn"] == 1
+
+
+def test_git_history_is_opt_in():
+    """Test that analysis only runs git log when history is requested."""
+    assert AnalysisConfig().collect_git_history is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
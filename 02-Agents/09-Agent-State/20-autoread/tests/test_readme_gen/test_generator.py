@@ -1,7 +1,7 @@
 """Tests for the README generator module."""
 
 import pytest
-from repository_analyzer.readme_gen.generator import READMEGenerator
+from repository_analyzer.readme_gen.generator import READMEGenerator, CompiledTemplate
 from repository_analyzer.core.data_structures import (
     RepositoryStructure, RepositoryMetadata, FileInfo, DirectoryInfo, Framework
 )
@@ -167,6 +167,59 @@ class TestREADMEGenerator:
         assert "config.yaml" in config_details
         assert "settings.py" in config_details
 
+    def test_compiled_template_render(self):
+        """Test that compiled templates render placeholders in a single pass."""
+        template = CompiledTemplate("# {{title}}\n\n{{body}} {{missing}}")
+        
+        assert template.placeholders == {"title", "body", "missing"}
+        rendered = template.render({"title": "Demo", "body": "Uses {{title}} literally"})
+        assert rendered == "# Demo\n\nUses {{title}} literally {{missing}}"
+    
+    def test_templates_compiled_once_per_process(self):
+        """Test that generators share the same compiled templates."""
+        first = READMEGenerator()
+        second = READMEGenerator()
+        assert first.compiled_templates is second.compiled_templates
+    
+    def test_generate_many(self):
+        """Test batch README generation and section reuse."""
+        structures = []
+        for name in ["alpha", "beta"]:
+            metadata = RepositoryMetadata(name=name, primary_language="Python")
+            structures.append(RepositoryStructure(
+                source="",
+                root_path="",
+                project_type=None,
+                metadata=metadata
+            ))
+        
+        generator = READMEGenerator()
+        readmes = generator.generate_many(structures)
+        
+        assert len(readmes) == 2
+        assert readmes[0].startswith("# alpha")
+        assert readmes[1].startswith("# beta")
+        assert "pip install -r requirements.txt" in readmes[1]
+        # Both repositories share every generated section
+        assert len(generator._section_cache) == 4
+        
+        generator.clear_cache()
+        assert len(generator._section_cache) == 0
+    
+    def test_section_cache_is_bounded(self):
+        """Test that the section cache evicts least recently used entries."""
+        generator = READMEGenerator(section_cache_size=2)
+        for language in ["Python", "Java", "Go"]:
+            structure = RepositoryStructure(
+                source="",
+                root_path="",
+                project_type=None,
+                metadata=RepositoryMetadata(primary_language=language)
+            )
+            generator.generate_readme(structure)
+        
+        assert len(generator._section_cache) == 2
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""Tests for the file cataloger."""
+
+import pytest
+from repository_analyzer.scanner.cataloger import (
+    FileCataloger, compute_content_hash, find_duplicate_clusters
+)
+from repository_analyzer.analysis.imports import ImportAnalyzer
+from repository_analyzer.core.data_structures import FileInfo, FileType
+
+
+VENDORED_MODULE = '"""Vendored helper."""\n\nimport os\nfrom json import loads\n\n\ndef helper():\n    return os.getcwd()\n'
+
+
+def _make_file_info(path: str) -> FileInfo:
+    """Create a Python source FileInfo for a relative path."""
+    return FileInfo(
+        name=path.split("/")[-1],
+        path=path,
+        extension=".py",
+        size=0,
+        type=FileType.SOURCE,
+        language="Python"
+    )
+
+
+@pytest.fixture
+def duplicated_repo(temp_dir):
+    """Create a repository with two identical modules and one unique module."""
+    for path in ["vendor_a/helper.py", "vendor_b/helper.py"]:
+        (temp_dir / path).parent.mkdir(parents=True, exist_ok=True)
+        (temp_dir / path).write_text(VENDORED_MODULE)
+    (temp_dir / "main.py").write_text("import sys\n\n\ndef main():\n    pass\n")
+    
+    files = {path: _make_file_info(path) for path in ["vendor_a/helper.py", "vendor_b/helper.py", "main.py"]}
+    return temp_dir, files
+
+
+def test_compute_content_hash():
+    """Test that identical content hashes identically."""
+    assert compute_content_hash(b"abc") == compute_content_hash(b"abc")
+    assert compute_content_hash(b"abc") != compute_content_hash(b"abd")
+
+
+def test_catalog_files_without_deduplication(duplicated_repo):
+    """Test that content hashing is off by default."""
+    repo_path, files = duplicated_repo
+    files = FileCataloger().catalog_files(files, {}, str(repo_path))
+    
+    assert "content_hash" not in files["main.py"].metadata
+    assert files["vendor_a/helper.py"].metadata["functions"] == ["helper"]
+    assert find_duplicate_clusters(files) == {}
+
+
+def test_catalog_files_shares_parsed_results(duplicated_repo):
+    """Test that identical files share a single parsed result."""
+    repo_path, files = duplicated_repo
+    files = FileCataloger(deduplicate=True).catalog_files(files, {}, str(repo_path))
+    
+    original = files["vendor_a/helper.py"]
+    duplicate = files["vendor_b/helper.py"]
+    
+    assert original.metadata["content_hash"] == duplicate.metadata["content_hash"]
+    assert duplicate.metadata["duplicate_of"] == "vendor_a/helper.py"
+    assert duplicate.metadata["functions"] is original.metadata["functions"]
+    assert duplicate.imports is original.imports
+    assert sorted(duplicate.imports) == ["json", "os"]
+    assert "modified" in duplicate.metadata
+    assert "duplicate_of" not in files["main.py"].metadata
+    
+    clusters = find_duplicate_clusters(files)
+    assert list(clusters.values()) == [["vendor_a/helper.py", "vendor_b/helper.py"]]
+
+
+def test_deduplication_reads_each_file_once(duplicated_repo, monkeypatch):
+    """Test that hashed files are parsed from the buffer that was hashed."""
+    repo_path, files = duplicated_repo
+    (repo_path / "main.py").write_bytes(b"import sys\r\n\r\n\r\ndef main():\r\n    return '\xff'\r\n")
+    expected = FileCataloger().catalog_files(
+        {path: _make_file_info(path) for path in files}, {}, str(repo_path)
+    )
+
+    opened = []
+    real_open = open
+
+    def counting_open(file, *args, **kwargs):
+        opened.append(str(file))
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", counting_open)
+    files = FileCataloger(deduplicate=True).catalog_files(files, {}, str(repo_path))
+
+    assert sorted(opened) == sorted(str(repo_path / path) for path in files)
+    for path in ["vendor_a/helper.py", "main.py"]:
+        for key in ["lines", "characters", "words", "functions"]:
+            assert files[path].metadata[key] == expected[path].metadata[key]
+        assert files[path].imports == expected[path].imports
+
+
+def test_import_analyzer_reuses_duplicate_imports(duplicated_repo):
+    """Test that ImportAnalyzer parses identical contents once."""
+    repo_path, files = duplicated_repo
+    files = FileCataloger(deduplicate=True).catalog_files(files, {}, str(repo_path))
+    
+    analyzer = ImportAnalyzer()
+    calls = []
+    extract_imports = analyzer._extract_imports
+    
+    def counting_extract(file_path, language):
+        calls.append(file_path)
+        return extract_imports(file_path, language)
+    
+    analyzer._extract_imports = counting_extract
+    files = analyzer.analyze_imports(files, str(repo_path))
+    
+    assert len(calls) == 2
+    assert files["vendor_a/helper.py"].imports is files["vendor_b/helper.py"].imports
+    assert files["main.py"].imports == ["sys"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
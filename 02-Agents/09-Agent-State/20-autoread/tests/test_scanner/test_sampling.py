@@ -0,0 +1,131 @@
+"""Tests for stratified sampling in approximate mode."""
+
+import pytest
+import os
+from repository_analyzer.scanner.sampling import DirectoryCounter, StratifiedSampler, stratum_for
+from repository_analyzer.scanner.filesystem import FileSystemScanner
+from repository_analyzer.core.config import AnalysisConfig
+from repository_analyzer.core.data_structures import FileInfo, FileType
+
+
+def _file_info(path: str, file_type: FileType) -> FileInfo:
+    """Create a FileInfo for a relative path."""
+    return FileInfo(name=path.split("/")[-1], path=path, extension="", size=0, type=file_type)
+
+
+def test_stratum_for():
+    """Test that files are stratified by top-level directory and extension."""
+    assert stratum_for("src/pkg/module.PY") == ("src", ".py")
+    assert stratum_for("setup.py") == (".", ".py")
+
+
+def test_sampler_respects_budget_and_covers_strata():
+    """Test that the sample is bounded and every stratum is represented."""
+    sampler = StratifiedSampler(budget=50, seed=1)
+    for i in range(5000):
+        sampler.add(f"src/module_{i}.py")
+    sampler.add("docs/index.md")
+    sampler.add("setup.py")
+    
+    sample = sampler.finish()
+    
+    assert len(sample.sampled) == 50
+    assert sample.total_files == 5002
+    assert "docs/index.md" in sample.sampled
+    assert "setup.py" in sample.sampled
+    assert sample.strata_counts[("src", ".py")] == 5000
+
+
+def test_estimate_proportion_is_exact_for_full_sample():
+    """Test that sampling every file yields an exact, zero-width interval."""
+    sampler = StratifiedSampler(budget=100, seed=1)
+    files = {}
+    for i in range(10):
+        path = f"docs/page_{i}.md" if i < 3 else f"src/module_{i}.py"
+        sampler.add(path)
+        files[path] = _file_info(path, FileType.DOC if i < 3 else FileType.SOURCE)
+    sample = sampler.finish()
+    
+    estimate, lower, upper = sample.estimate_proportion(files, lambda f: f.type == FileType.DOC)
+    
+    assert estimate == pytest.approx(0.3)
+    assert lower == pytest.approx(0.3)
+    assert upper == pytest.approx(0.3)
+
+
+def test_estimate_proportion_interval_contains_truth():
+    """Test that the confidence interval brackets the true proportion."""
+    sampler = StratifiedSampler(budget=200, seed=7)
+    files = {}
+    for i in range(4000):
+        path = f"pkg_{i % 4}/file_{i}.py"
+        sampler.add(path)
+        files[path] = _file_info(path, FileType.TEST if i % 5 == 0 else FileType.SOURCE)
+    sample = sampler.finish()
+    
+    estimate, lower, upper = sample.estimate_proportion(files, lambda f: f.type == FileType.TEST)
+    
+    assert lower <= 0.2 <= upper
+    assert lower <= estimate <= upper
+    assert upper - lower < 0.25
+
+
+def test_scanner_sample_repository(temp_dir):
+    """Test that sample_repository only builds FileInfo objects for sampled files."""
+    (temp_dir / "src").mkdir()
+    for i in range(30):
+        (temp_dir / "src" / f"module_{i}.py").write_text("x = 1\n")
+    (temp_dir / "README.md").write_text("# Sample\n")
+    
+    config = AnalysisConfig(sample_budget=10, sample_seed=3, temp_dir=str(temp_dir))
+    files, directories, sample = FileSystemScanner(config).sample_repository(str(temp_dir))
+    
+    assert len(files) == 10
+    assert "README.md" in files
+    assert sample.total_files == 31
+    assert sample.total_directories == 2
+    assert sample.complete is True
+    assert set(directories) <= {".", "src"}
+
+
+
+def test_directory_counter_matches_distinct_ancestors(temp_dir):
+    """Test that the bounded counter counts each ancestor directory once."""
+    for rel_dir in ["a/b/c", "a/b/d", "a/e", "f/g", "h"]:
+        (temp_dir / rel_dir).mkdir(parents=True)
+        (temp_dir / rel_dir / "file.txt").write_text("x")
+    (temp_dir / "root.txt").write_text("x")
+    
+    counter = DirectoryCounter()
+    expected = set()
+    for root, _, files in os.walk(temp_dir):
+        rel_dir = os.path.relpath(root, temp_dir)
+        rel_dir = "" if rel_dir == "." else rel_dir
+        for _ in files:
+            counter.add(rel_dir)
+            parent = rel_dir
+            while parent:
+                expected.add(parent)
+                parent = os.path.dirname(parent)
+    
+    assert counter.count == len(expected) == 8
+    assert len(counter._counted) <= 3
+
+
+def test_approximate_mode_has_finite_time_budget():
+    """Test that discovery in approximate mode is time-bounded by default."""
+    assert AnalysisConfig().sample_time_budget is not None
+
+
+def test_zero_time_budget_stops_discovery(temp_dir):
+    """Test that a zero time budget is a limit, not "no limit"."""
+    (temp_dir / "main.py").write_text("print('hello')")
+    
+    config = AnalysisConfig(sample_time_budget=0, temp_dir=str(temp_dir))
+    _, _, sample = FileSystemScanner(config).sample_repository(str(temp_dir))
+    
+    assert sample.complete is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of the RAG agents: retrieval quality, ingestion throughput and query latency
+
+Ingests a corpus with rag_agent.py (RAGAgent) and rag_agent/src (ChatAgent),
+then runs a question set whose entries list the passages a good answer is
+built from. Reports recall@k, MRR, chunks/s and p50/p95 query latency split
+into embed, search and generate.
+
+Embeddings and the LLM are deterministic local stubs, so no Ollama is needed
+and repeated runs give the same rankings: the numbers measure retrieval,
+storage and orchestration, not model quality.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from langchain_core.embeddings import Embeddings
+from langchain.schema.runnable import RunnableLambda
+
+BASE_DIR = Path(__file__).parent
+DEFAULT_CORPUS = BASE_DIR / "rag_agent" / "sample_docs"
+DEFAULT_QUESTIONS = BASE_DIR / "benchmark_questions.json"
+
+# Words of retrieved context the stub LLM echoes back as its answer
+STUB_ANSWER_WORDS = 40
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class PhaseTimer:
+    """Seconds spent per phase (embed, retrieve, generate) since the last reset"""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = defaultdict(float)
+
+    @contextmanager
+    def measure(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[phase] += time.perf_counter() - start
+
+    def reset(self):
+        self.seconds.clear()
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic bag-of-words embeddings: every token adds +-1 to a hashed dimension"""
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            value = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+            vector[value % self.dimensions] += 1.0 if value >> 63 else -1.0
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+
+class TimedEmbeddings(Embeddings):
+    """Embeddings wrapper adding the time of every call to the embed phase"""
+
+    def __init__(self, embeddings: Embeddings, timer: PhaseTimer):
+        self.embeddings = embeddings
+        self.timer = timer
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self.timer.measure("embed"):
+            return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with self.timer.measure("embed"):
+            return self.embeddings.embed_query(text)
+
+
+class TimedRetriever:
+    """Stands in for an agent's HybridRetriever: fixed k, timed, keeps the last results
+
+    The agents turn retrieval exceptions into an apology answer, so the last
+    error is kept too and run_questions fails the run instead of scoring it.
+    """
+
+    def __init__(self, retriever, timer: PhaseTimer, k: int):
+        self.retriever = retriever
+        self.vector_store = retriever.vector_store
+        self.timer = timer
+        self.k = k
+        self.last_results = []
+        self.last_error = None
+
+    def search(self, query: str, k: int = 5, filter=None):
+        self.last_results = []
+        self.last_error = None
+        with self.timer.measure("retrieve"):
+            try:
+                self.last_results = self.retriever.search(query, k=self.k, filter=filter)
+            except Exception as e:
+                self.last_error = e
+                raise
+        return self.last_results
+
+
+def stub_llm(timer: PhaseTimer, delay_ms: float = 0.0) -> RunnableLambda:
+    """LLM replacement answering with the first words of the context in its prompt"""
+    def generate(prompt) -> str:
+        with timer.measure("generate"):
+            if delay_ms:
+                time.sleep(delay_ms / 1000)
+            text = prompt.to_string() if hasattr(prompt, "to_string") else str(prompt)
+            context = text.split("Context:", 1)[-1]
+            return " ".join(context.split()[:STUB_ANSWER_WORDS])
+    return RunnableLambda(generate)
+
+
+def normalize(text: str) -> str:
+    """Lowercase words only, so passages match regardless of markup and line breaks"""
+    return " ".join(_TOKEN_PATTERN.findall(text.lower()))
+
+
+def score_results(results: List[str], passages: List[str]) -> Dict[str, float]:
+    """Recall of the expected passages and reciprocal rank of the first relevant chunk"""
+    chunks = [normalize(text) for text in results]
+    expected = [normalize(passage) for passage in passages]
+    found = [passage for passage in expected if any(passage in chunk for chunk in chunks)]
+    ranks = [i for i, chunk in enumerate(chunks) if any(passage in chunk for passage in expected)]
+    return {
+        "recall": len(found) / len(expected) if expected else 0.0,
+        "reciprocal_rank": 1 / (ranks[0] + 1) if ranks else 0.0,
+    }
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+
+def run_questions(chat: Callable[[str], str], clear_history: Callable[[], None],
+                  retriever: TimedRetriever, timer: PhaseTimer,
+                  questions: List[Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    """Ask every question through the agent, timing each phase"""
+    recalls, reciprocal_ranks = [], []
+    latencies: Dict[str, List[float]] = defaultdict(list)
+
+    for round_number in range(repeat):
+        for entry in questions:
+            clear_history()
+            timer.reset()
+            start = time.perf_counter()
+            chat(entry["question"])
+            total = time.perf_counter() - start
+            if retriever.last_error is not None:
+                raise RuntimeError(
+                    f"Retrieval failed for {entry['question']!r}: {retriever.last_error}"
+                ) from retriever.last_error
+
+            embed = timer.seconds["embed"]
+            latencies["embed"].append(embed * 1000)
+            latencies["search"].append(max(timer.seconds["retrieve"] - embed, 0.0) * 1000)
+            latencies["generate"].append(timer.seconds["generate"] * 1000)
+            latencies["total"].append(total * 1000)
+
+            if round_number == 0:
+                scores = score_results([doc.page_content for doc in retriever.last_results], entry["passages"])
+                recalls.append(scores["recall"])
+                reciprocal_ranks.append(scores["reciprocal_rank"])
+
+    return {
+        "recall": statistics.mean(recalls) if recalls else 0.0,
+        "mrr": statistics.mean(reciprocal_ranks) if reciprocal_ranks else 0.0,
+        "latency_ms": {
+            phase: {"p50": percentile(values, 0.5), "p95": percentile(values, 0.95)}
+            for phase, values in latencies.items()
+        },
+    }
+
+
+def benchmark_rag_agent(corpus: Path, questions: List[Dict[str, Any]], workdir: str,
+                        args: argparse.Namespace) -> Dict[str, Any]:
+    """Ingest and query with the LangGraph RAGAgent of rag_agent.py"""
+    from rag_agent import RAGAgent
+    logging.getLogger("rag_agent").setLevel(logging.WARNING)
+
+    timer = PhaseTimer()
+    agent = RAGAgent(
+        persist_directory=os.path.join(workdir, "rag_agent_db"),
+        embedding_cache_path=os.path.join(workdir, "rag_agent_embeddings.sqlite"),
+        dense_weight=args.dense_weight,
+        keyword_weight=args.keyword_weight,
+        cache_answers=False,
+        llm=stub_llm(timer, args.llm_delay_ms),
+        embeddings=TimedEmbeddings(HashingEmbeddings(args.dimensions), timer),
+    )
+
+    start = time.perf_counter()
+    if not agent.load_documents(str(corpus)):
+        raise RuntimeError(f"RAGAgent could not load {corpus}")
+    ingest_seconds = time.perf_counter() - start
+    ingest_embed_seconds = timer.seconds["embed"]
+
+    retriever = TimedRetriever(agent._get_retriever(agent.vector_store), timer, args.k)
+    agent._retriever = retriever
+    result = run_questions(agent.chat, agent.clear_history, retriever, timer, questions, args.repeat)
+    result.update(chunks=agent.last_ingestion.added, ingest_seconds=ingest_seconds,
+                  ingest_embed_seconds=ingest_embed_seconds)
+    return result
+
+
+def benchmark_src_agent(corpus: Path, questions: List[Dict[str, Any]], workdir: str,
+                        args: argparse.Namespace) -> Dict[str, Any]:
+    """Ingest with the streaming pipeline and query with the ChatAgent of rag_agent/src"""
+    sys.path.insert(0, str(BASE_DIR / "rag_agent"))
+    from src.chat_agent import ChatAgent
+    from src.document_processor import DocumentProcessor
+    from src.embedding_cache import CachedEmbeddings
+    from src.pipeline import IngestionPipeline
+    from src.vector_store import VectorStoreManager
+
+    timer = PhaseTimer()
+    embeddings = CachedEmbeddings(
+        TimedEmbeddings(HashingEmbeddings(args.dimensions), timer),
+        model_name=HashingEmbeddings.__name__,
+        path=os.path.join(workdir, "src_embeddings.sqlite")
+    )
+    store = VectorStoreManager(
+        collection_name="benchmark",
+        persist_directory=os.path.join(workdir, "src_db"),
+        embeddings=embeddings
+    )
+
+    start = time.perf_counter()
+    progress = IngestionPipeline(DocumentProcessor(), store, workers=args.workers).run(corpus)
+    ingest_seconds = time.perf_counter() - start
+    ingest_embed_seconds = timer.seconds["embed"]
+
+    agent = ChatAgent(
+        vector_store=store,
+        dense_weight=args.dense_weight,
+        keyword_weight=args.keyword_weight,
+        cache_answers=False,
+        llm=stub_llm(timer, args.llm_delay_ms)
+    )
+    retriever = TimedRetriever(agent.retriever, timer, args.k)
+    agent.retriever = retriever
+    result = run_questions(agent.chat, agent.clear_history, retriever, timer, questions, args.repeat)
+    result.update(chunks=progress.report.added, ingest_seconds=ingest_seconds,
+                  ingest_embed_seconds=ingest_embed_seconds)
+    return result
+
+
+AGENTS = {
+    "rag_agent.py": benchmark_rag_agent,
+    "src": benchmark_src_agent,
+}
+
+
+def print_results(results: Dict[str, Dict[str, Any]], k: int):
+    print(f"{'agent':<14} {'chunks':>7} {'ingest s':>9} {'chunks/s':>9} {'embed s':>8} "
+          f"{f'recall@{k}':>9} {'MRR':>6}")
+    for name, result in results.items():
+        throughput = result["chunks"] / result["ingest_seconds"] if result["ingest_seconds"] else 0.0
+        print(f"{name:<14} {result['chunks']:>7} {result['ingest_seconds']:>9.2f} {throughput:>9.1f} "
+              f"{result['ingest_embed_seconds']:>8.2f} {result['recall']:>9.2f} {result['mrr']:>6.2f}")
+
+    print(f"\n{'agent':<14} {'phase':<9} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, result in results.items():
+        for phase in ("embed", "search", "generate", "total"):
+            latency = result["latency_ms"][phase]
+            print(f"{name:<14} {phase:<9} {latency['p50']:>8.2f} {latency['p95']:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS, help="File or directory to ingest")
+    parser.add_argument("--questions", type=Path, default=DEFAULT_QUESTIONS,
+                        help="JSON list of {\"question\": ..., \"passages\": [...]}")
+    parser.add_argument("--agent", choices=[*AGENTS, "both"], default="both", help="Agent(s) to benchmark")
+    parser.add_argument("--k", type=int, default=4, help="Chunks retrieved per question")
+    parser.add_argument("--repeat", type=int, default=5, help="Times the question set is run for latency")
+    parser.add_argument("--dimensions", type=int, default=384, help="Size of the stub embeddings")
+    parser.add_argument("--llm-delay-ms", type=float, default=0.0, help="Simulated generation time per answer")
+    parser.add_argument("--workers", type=int, default=1, help="Parser processes of the src ingestion pipeline")
+    parser.add_argument("--dense-weight", type=float, default=1.0, help="Weight of vector similarity")
+    parser.add_argument("--keyword-weight", type=float, default=1.0, help="Weight of BM25 keyword matches")
+    parser.add_argument("--output", type=Path, help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    with open(args.questions, "r", encoding="utf-8") as file:
+        questions = json.load(file)
+    names = list(AGENTS) if args.agent == "both" else [args.agent]
+    print(f"Corpus {args.corpus}, {len(questions)} questions x {args.repeat}, k={args.k}\n")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in names:
+            results[name] = AGENTS[name](args.corpus, questions, workdir, args)
+
+    print_results(results, args.k)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,33 +9,64 @@ A CLI application that allows chatting with PDF and markdown files using:
 
 import os
 import sys
+import json
 import argparse
 import asyncio
 from pathlib import Path
-from typing import List, Dict, Any, Optional, TypedDict
+from typing import List, Dict, Any, Iterator, Optional, TypedDict
 import logging
+import time
 
 # Core dependencies
-from langchain_community.llms import Ollama
+import chromadb
+from langchain_ollama import ChatOllama
 from langchain_community.embeddings import OllamaEmbeddings
 from langchain_community.vectorstores import Chroma
 from langchain_community.document_loaders import PyPDFLoader, UnstructuredMarkdownLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 from langchain.prompts import ChatPromptTemplate
-from langchain.schema.runnable import RunnablePassthrough
+from langchain.schema.runnable import RunnableConfig, RunnablePassthrough
 from langchain.schema.output_parser import StrOutputParser
 
 # LangGraph imports
-from langgraph.graph import Graph, StateGraph
-from langgraph.graph.message import MessageGraph
-from langgraph.prebuilt import ToolExecutor
-from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import StateGraph
+
+# Shared helpers from the rag_agent CLI package (imported as ``src.*`` like its main.py)
+sys.path.insert(0, str(Path(__file__).parent / "rag_agent"))
+from src.answer_cache import AnswerCache, LazyEmbedding
+from src.context_assembler import ContextAssembler
+from src.embedding_cache import CachedEmbeddings
+from src.embedding_executor import EmbeddingExecutor
+from src.markdown_chunker import MarkdownChunker
+from src.ingestion import IngestionReport, sync_documents
+from src.keyword_index import KeywordIndex
+from src.metadata_filter import parse_filter
+from src.retrieval import HybridRetriever, HybridSearchConfig
+from src.streaming import GraphTokenStream, LatencyStats, QueryTiming
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Chroma collection holding the chunks (LangChain's default name, so existing databases still open)
+COLLECTION_NAME = "langchain"
+
+RAG_PROMPT_TEMPLATE = """
+You are a helpful AI assistant that answers questions based on the provided context.
+Use the following context to answer the user's question. If you cannot find the answer
+in the context, say so clearly.
+
+Context:
+{context}
+
+Chat History:
+{chat_history}
+
+Question: {question}
+
+Answer:
+"""
+
 class RAGState(TypedDict):
     """State for the RAG agent"""
     query: str
@@ -49,34 +80,69 @@ class RAGState(TypedDict):
 class RAGAgent:
     """RAG Agent using LangGraph for document chat functionality"""
     
-    def __init__(self, model_name: str = "llama3.2", persist_directory: str = "./chroma_db"):
+    def __init__(self, model_name: str = "llama3.2", persist_directory: str = "./chroma_db",
+                 embedding_cache_path: Optional[str] = None,
+                 dense_weight: float = 1.0, keyword_weight: float = 1.0,
+                 cache_answers: bool = True, context_tokens: int = 2000,
+                 llm=None, embeddings=None, embed_batch_size: int = 32, embed_concurrency: int = 4,
+                 search_filter: Optional[Dict[str, Any]] = None):
         """
         Initialize the RAG Agent
         
         Args:
             model_name: Ollama model name (default: llama3.2)
             persist_directory: Directory to persist ChromaDB
+            embedding_cache_path: SQLite file caching embeddings (default: ~/.langchat/embedding_cache.sqlite)
+            dense_weight: Weight of vector similarity in hybrid retrieval
+            keyword_weight: Weight of BM25 keyword matches in hybrid retrieval
+            cache_answers: Reuse answers to repeated questions until the documents change
+            context_tokens: Token budget of the retrieved context sent to the LLM
+            llm: Language model to use instead of Ollama (e.g. a local stub for benchmarks)
+            embeddings: Embedding model to use instead of Ollama embeddings
+            embed_batch_size: Chunks sent per embedding request while indexing
+            embed_concurrency: Embedding requests kept in flight while indexing
+            search_filter: Metadata filter (Chroma where syntax) narrowing retrieval, e.g. {"source": "notes.pdf"}
         """
         self.model_name = model_name
         self.persist_directory = persist_directory
         self.vector_store = None
+        self.collection = None
         self.chat_history = []
+        self.last_ingestion: Optional[IngestionReport] = None
+        self.latency = LatencyStats()
+        
+        # BM25 index maintained next to the Chroma store
+        self.keyword_index = KeywordIndex(os.path.join(persist_directory, "keyword_index.sqlite"))
+        self.search_config = HybridSearchConfig(dense_weight=dense_weight, keyword_weight=keyword_weight)
+        self.answer_cache = AnswerCache() if cache_answers else None
+        self.search_filter = search_filter
+        self.context_assembler = ContextAssembler(max_tokens=context_tokens)
         
         # Initialize LLM and embeddings
         try:
-            self.llm = Ollama(model=model_name, temperature=0.7)
-            self.embeddings = OllamaEmbeddings(model=model_name)
+            # A chat model, so LangGraph's "messages" stream mode can pass its tokens on
+            self.llm = llm or ChatOllama(model=model_name, temperature=0.7)
+            self.embeddings = CachedEmbeddings(
+                embeddings or OllamaEmbeddings(model=model_name),
+                # Cached vectors of a custom embedding model must not mix with Ollama's
+                model_name=model_name if embeddings is None else type(embeddings).__name__,
+                path=embedding_cache_path
+            )
+            self.embedding_executor = EmbeddingExecutor(
+                self.embeddings, batch_size=embed_batch_size, max_in_flight=embed_concurrency
+            )
             logger.info(f"Initialized Ollama with model: {model_name}")
         except Exception as e:
             logger.error(f"Failed to initialize Ollama: {e}")
             raise
         
-        # Text splitter for document chunking
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len,
-        )
+        # Structure-aware chunker: keeps code blocks and tables whole, never straddles a heading
+        self.text_splitter = MarkdownChunker(chunk_size=1000, chunk_overlap=200)
+        
+        # Prompt and chain are built once and reused for every query
+        self.prompt_template = ChatPromptTemplate.from_template(RAG_PROMPT_TEMPLATE)
+        self.chain = self.prompt_template | self.llm | StrOutputParser()
+        self._retriever: Optional[HybridRetriever] = None
         
         # Create the RAG graph
         self.graph = self._create_rag_graph()
@@ -136,12 +202,10 @@ class RAGAgent:
         """Retrieve relevant documents based on the query"""
         try:
             if state["vector_store"] and state["query"]:
-                # Retrieve relevant documents
-                retriever = state["vector_store"].as_retriever(
-                    search_type="similarity",
-                    search_kwargs={"k": 4}
+                # Retrieve relevant documents, fusing vector and keyword rankings
+                retrieved_docs = self._get_retriever(state["vector_store"]).search(
+                    state["query"], k=4, filter=self.search_filter
                 )
-                retrieved_docs = retriever.get_relevant_documents(state["query"])
                 state["retrieved_docs"] = retrieved_docs
                 logger.info(f"Retrieved {len(retrieved_docs)} relevant documents")
             else:
@@ -152,49 +216,24 @@ class RAGAgent:
         
         return state
     
-    def _generate_response_node(self, state: RAGState) -> RAGState:
+    def _get_retriever(self, vector_store) -> HybridRetriever:
+        """Hybrid retriever over a vector store, rebuilt only when the store changes"""
+        if self._retriever is None or self._retriever.vector_store is not vector_store:
+            self._retriever = HybridRetriever(vector_store, self.keyword_index, self.search_config)
+        return self._retriever
+    
+    def _generate_response_node(self, state: RAGState, config: RunnableConfig) -> RAGState:
         """Generate response using LLM and retrieved documents"""
         try:
-            # Create prompt template
-            prompt_template = ChatPromptTemplate.from_template("""
-            You are a helpful AI assistant that answers questions based on the provided context.
-            Use the following context to answer the user's question. If you cannot find the answer
-            in the context, say so clearly.
-            
-            Context:
-            {context}
-            
-            Chat History:
-            {chat_history}
-            
-            Question: {question}
-            
-            Answer:
-            """)
-            
-            # Prepare context from retrieved documents
-            context = "\n\n".join([doc.page_content for doc in state.get("retrieved_docs", [])])
-            
-            # Prepare chat history
-            chat_history = "\n".join([
-                f"Human: {entry['human']}\nAssistant: {entry['assistant']}"
-                for entry in state.get("chat_history", [])[-3:]  # Last 3 exchanges
-            ])
-            
-            # Create the chain
-            chain = (
-                {
-                    "context": lambda x: context,
-                    "chat_history": lambda x: chat_history,
-                    "question": RunnablePassthrough()
-                }
-                | prompt_template
-                | self.llm
-                | StrOutputParser()
-            )
+            # Prepare context from retrieved documents: merged, de-duplicated and within the token budget
+            context = self.context_assembler.assemble(state.get("retrieved_docs", [])).text
             
             # Generate response
-            response = chain.invoke(state["query"])
+            response = self.chain.invoke({
+                "context": context,
+                "chat_history": self._format_chat_history(state.get("chat_history", [])),
+                "question": state["query"]
+            }, config=config)
             state["response"] = response
             
             # Update chat history
@@ -213,6 +252,14 @@ class RAGAgent:
         
         return state
     
+    @staticmethod
+    def _format_chat_history(chat_history: List[Dict[str, str]]) -> str:
+        """Format the last 3 exchanges for the prompt"""
+        return "\n".join([
+            f"Human: {entry['human']}\nAssistant: {entry['assistant']}"
+            for entry in chat_history[-3:]
+        ])
+    
     def _handle_error_node(self, state: RAGState) -> RAGState:
         """Handle errors gracefully"""
         error_msg = state.get("error", "Unknown error occurred")
@@ -251,27 +298,22 @@ class RAGAgent:
             split_docs = self.text_splitter.split_documents(documents)
             logger.info(f"Created {len(split_docs)} document chunks")
             
-            # Create or update vector store
-            if os.path.exists(self.persist_directory):
-                # Load existing vector store
-                self.vector_store = Chroma(
-                    persist_directory=self.persist_directory,
-                    embedding_function=self.embeddings
-                )
-                # Add new documents
-                self.vector_store.add_documents(split_docs)
-                logger.info("Added documents to existing vector store")
-            else:
-                # Create new vector store
-                self.vector_store = Chroma.from_documents(
-                    documents=split_docs,
-                    embedding=self.embeddings,
-                    persist_directory=self.persist_directory
-                )
-                logger.info("Created new vector store")
+            # Open (or create) the persisted vector store
+            if self.vector_store is None:
+                self.open_vector_store()
+            
+            # Only embed chunks that are not stored yet; drop stale chunks of changed files
+            report = sync_documents(
+                self.vector_store, split_docs, self.keyword_index, self.embedding_executor, self.collection
+            )
+            self.last_ingestion = report
+            logger.info(f"Synced vector store: {report}")
+            logger.info(f"Embedding: {self.embedding_executor.stats}")
+            logger.info(f"Embedding cache: {self.embeddings.stats}")
             
             # Persist the vector store
-            self.vector_store.persist()
+            if report.added or report.removed:
+                self.vector_store.persist()
             logger.info(f"Successfully loaded and indexed {len(documents)} documents")
             return True
             
@@ -295,6 +337,9 @@ class RAGAgent:
                 logger.info(f"Loaded Markdown: {file_path}")
             else:
                 logger.warning(f"Unsupported file type: {file_path}")
+            # Tag chunks with their type so retrieval can be filtered by it (--where file_type=pdf)
+            for document in documents:
+                document.metadata["file_type"] = file_path.suffix.lower()[1:]
         except Exception as e:
             logger.error(f"Error loading file {file_path}: {e}")
         
@@ -325,7 +370,28 @@ class RAGAgent:
         Returns:
             str: AI response
         """
+        return "".join(self.stream(query))
+    
+    def stream(self, query: str) -> Iterator[str]:
+        """
+        Chat with the loaded documents, yielding the answer as it is generated
+        
+        Args:
+            query: User's question
+            
+        Yields:
+            str: Pieces of the AI response, token by token when the LLM streams
+        """
+        started = time.perf_counter()
         try:
+            # Answer repeated questions from the cache without retrieval or LLM calls
+            cache_key, cached = self._cached_answer(query)
+            if cached is not None:
+                elapsed = time.perf_counter() - started
+                self.latency.record(QueryTiming(elapsed, elapsed, cached=True))
+                yield cached
+                return
+            
             # Create initial state
             initial_state = RAGState(
                 query=query,
@@ -337,24 +403,114 @@ class RAGAgent:
                 error=None
             )
             
-            # Run the graph
-            result = self.graph.invoke(initial_state)
+            # Run the graph, passing on tokens of the generation node as they arrive
+            tokens = GraphTokenStream(self.graph, initial_state, node="generate_response", started=started)
+            yield from tokens
+            result = tokens.state or {}
+            if not result.get("response"):
+                yield "Sorry, I couldn't generate a response."
+                return
             
             # Update chat history
             if result.get("chat_history"):
                 self.chat_history = result["chat_history"]
             
-            return result.get("response", "Sorry, I couldn't generate a response.")
+            if cache_key is not None and not result.get("error"):
+                self.answer_cache.store(query, answer=result["response"], **cache_key)
+            
+            self.latency.record(tokens.timing)
+            logger.info(f"Answered in {tokens.timing}")
             
         except Exception as e:
             logger.error(f"Error in chat: {e}")
+            yield f"Sorry, I encountered an error: {str(e)}"
+    
+    async def achat(self, query: str) -> str:
+        """
+        Async chat: retrieval and chat history formatting run concurrently
+        
+        Args:
+            query: User's question
+            
+        Returns:
+            str: AI response
+        """
+        if self.vector_store is None:
+            return "Sorry, I encountered an error: No documents loaded. Please load documents using load_documents() method."
+        
+        try:
+            loop = asyncio.get_running_loop()
+            cache_key, cached = await loop.run_in_executor(None, self._cached_answer, query)
+            if cached is not None:
+                return cached
+            
+            retriever = self._get_retriever(self.vector_store)
+            retrieved_docs, chat_history = await asyncio.gather(
+                loop.run_in_executor(None, retriever.search, query, 4, self.search_filter),
+                loop.run_in_executor(None, self._format_chat_history, self.chat_history)
+            )
+            context = self.context_assembler.assemble(retrieved_docs).text
+            
+            response = await self.chain.ainvoke({
+                "context": context,
+                "chat_history": chat_history,
+                "question": query
+            })
+            
+            self.chat_history.append({"human": query, "assistant": response})
+            if cache_key is not None:
+                self.answer_cache.store(query, answer=response, **cache_key)
+            return response
+            
+        except Exception as e:
+            logger.error(f"Error in achat: {e}")
             return f"Sorry, I encountered an error: {str(e)}"
     
+    def _cached_answer(self, query: str):
+        """Look the query up in the answer cache, recording a hit in the chat history"""
+        cache_key = self._answer_cache_key(query)
+        if cache_key is None:
+            return None, None
+        
+        cached = self.answer_cache.lookup(query, **cache_key)
+        if cached is not None:
+            self.chat_history.append({"human": query, "assistant": cached})
+            logger.info(f"Answered from cache ({self.answer_cache.stats})")
+        return cache_key, cached
+    
+    def _answer_cache_key(self, query: str) -> Optional[Dict[str, Any]]:
+        """Model, collection version, conversation context and lazy query embedding used by the answer cache"""
+        if self.answer_cache is None or self.vector_store is None:
+            return None
+        
+        # Follow-up questions only match answers given after the same previous question and filter
+        context = self.chat_history[-1]["human"] if self.chat_history else ""
+        if self.search_filter:
+            context += "\n" + json.dumps(self.search_filter, sort_keys=True, default=str)
+        return {
+            "version": f"{os.path.abspath(self.persist_directory)}:{self.keyword_index.version}",
+            "context": context,
+            "embedding": LazyEmbedding(self.embeddings.embed_query, query),
+            "model": self.model_name
+        }
+    
     def clear_history(self):
         """Clear chat history"""
         self.chat_history = []
         logger.info("Chat history cleared")
     
+    def open_vector_store(self):
+        """Open (or create) the persisted Chroma store and the collection behind it"""
+        client = chromadb.PersistentClient(path=self.persist_directory)
+        self.vector_store = Chroma(
+            client=client,
+            collection_name=COLLECTION_NAME,
+            persist_directory=self.persist_directory,
+            embedding_function=self.embeddings
+        )
+        # Vectors embedded by the executor are upserted here through the public client API
+        self.collection = client.get_or_create_collection(name=COLLECTION_NAME, embedding_function=None)
+    
     def get_document_count(self) -> int:
         """Get the number of documents in the vector store"""
         if self.vector_store:
@@ -364,6 +520,12 @@ class RAGAgent:
                 return 0
         return 0
 
+def print_stream(tokens: Iterator[str]):
+    """Print tokens as they arrive, ending the line when the answer is complete"""
+    for token in tokens:
+        print(token, end="", flush=True)
+    print()
+
 def main():
     """Main CLI function"""
     parser = argparse.ArgumentParser(description="RAG Agent - Chat with your documents")
@@ -371,6 +533,11 @@ def main():
     parser.add_argument("--db-path", default="./chroma_db", help="ChromaDB persistence directory")
     parser.add_argument("--load", help="Path to document or directory to load")
     parser.add_argument("--query", help="Single query mode")
+    parser.add_argument("--dense-weight", type=float, default=1.0, help="Weight of vector similarity in hybrid search")
+    parser.add_argument("--keyword-weight", type=float, default=1.0, help="Weight of BM25 keyword matches in hybrid search")
+    parser.add_argument("--no-answer-cache", action="store_true", help="Always generate fresh answers")
+    parser.add_argument("--where", action="append", default=[],
+                        help="Only retrieve chunks whose metadata matches, e.g. file_type=pdf (repeatable)")
     
     args = parser.parse_args()
     
@@ -379,7 +546,14 @@ def main():
     
     # Initialize the agent
     try:
-        agent = RAGAgent(model_name=args.model, persist_directory=args.db_path)
+        agent = RAGAgent(
+            model_name=args.model,
+            persist_directory=args.db_path,
+            dense_weight=args.dense_weight,
+            keyword_weight=args.keyword_weight,
+            cache_answers=not args.no_answer_cache,
+            search_filter=parse_filter(args.where)
+        )
         print(f"✅ Initialized RAG Agent with model: {args.model}")
     except Exception as e:
         print(f"❌ Failed to initialize agent: {e}")
@@ -398,10 +572,7 @@ def main():
     elif os.path.exists(args.db_path):
         # Try to load existing vector store
         try:
-            agent.vector_store = Chroma(
-                persist_directory=args.db_path,
-                embedding_function=agent.embeddings
-            )
+            agent.open_vector_store()
             doc_count = agent.get_document_count()
             print(f"📖 Loaded existing document database ({doc_count} chunks)")
         except Exception as e:
@@ -414,8 +585,8 @@ def main():
             sys.exit(1)
         
         print(f"\n❓ Query: {args.query}")
-        response = agent.chat(args.query)
-        print(f"🤖 Response: {response}")
+        print("🤖 Response: ", end="", flush=True)
+        print_stream(agent.stream(args.query))
         sys.exit(0)
     
     # Interactive chat mode
@@ -461,9 +632,8 @@ def main():
                 print("❌ No documents loaded. Use 'load <path>' to load documents first.")
                 continue
             
-            print("🤖 Thinking...")
-            response = agent.chat(user_input)
-            print(f"🤖 Assistant: {response}")
+            print("🤖 Assistant: ", end="", flush=True)
+            print_stream(agent.stream(user_input))
             
         except KeyboardInterrupt:
             print("\n👋 Goodbye!")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Chunking benchmark: RecursiveCharacterTextSplitter vs the structure-aware MarkdownChunker
+
+Chunks Markdown files (or a generated document of a given size) with both
+splitters and reports throughput, chunk counts and sizes, and how many
+chunks cut through a fenced code block or table that would have fit in one
+chunk. The generated document is also chunked at several sizes to show how
+the time grows with input size.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from src.markdown_chunker import MarkdownChunker, scan_blocks
+
+WORDS = ("index vector query chunk embedding retrieval model token latency cache "
+         "document section parser batch score ranking context answer").split()
+
+
+def generate_markdown(size: int, seed: int = 0) -> str:
+    """Markdown of about size characters: nested sections of prose, code blocks, tables and lists"""
+    rng = random.Random(seed)
+    parts: List[str] = []
+    length = 0
+    section = 0
+    while length < size:
+        section += 1
+        kind = rng.random()
+        if section % 5 == 1:
+            part = f"# Chapter {section}\n\n"
+        elif kind < 0.3:
+            part = f"## Section {section}\n\n"
+        elif kind < 0.55:
+            sentences = [" ".join(rng.choices(WORDS, k=rng.randint(6, 18))).capitalize() + "."
+                         for _ in range(rng.randint(3, 12))]
+            part = " ".join(sentences) + "\n\n"
+        elif kind < 0.7:
+            lines = [f"    result_{i} = compute({rng.choice(WORDS)!r}, {i})" for i in range(rng.randint(5, 40))]
+            part = "```python\ndef step():\n" + "\n".join(lines) + "\n```\n\n"
+        elif kind < 0.85:
+            rows = [f"| {rng.choice(WORDS)} | {rng.randint(1, 999)} | {rng.choice(WORDS)} |"
+                    for _ in range(rng.randint(3, 25))]
+            part = "| name | value | note |\n|---|---|---|\n" + "\n".join(rows) + "\n\n"
+        else:
+            items = [f"- {' '.join(rng.choices(WORDS, k=rng.randint(3, 10)))}" for _ in range(rng.randint(2, 10))]
+            part = "\n".join(items) + "\n\n"
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
+
+
+def broken_structures(documents: List[Document], chunks: List[Document], chunk_size: int) -> int:
+    """Chunks that cut through a fenced code block or table of their source that would fit in one chunk"""
+    spans = {}
+    for doc in documents:
+        text = doc.page_content
+        # Block ends include the line break, which chunks do not
+        spans[doc.metadata["source"]] = [
+            (block.start, block.start + len(text[block.start:block.end].rstrip()))
+            for block in scan_blocks(text)
+            if block.kind in ("code", "table") and len(text[block.start:block.end].strip()) <= chunk_size
+        ]
+    broken = 0
+    for chunk in chunks:
+        start = chunk.metadata["start_index"]
+        end = start + len(chunk.page_content)
+        if any(s < start < e or s < end < e for s, e in spans[chunk.metadata["source"]]):
+            broken += 1
+    return broken
+
+
+def measure(split: Callable[[List[Document]], List[Document]], documents: List[Document],
+            chunk_size: int, repeat: int) -> Dict[str, float]:
+    """Best-of-repeat time and chunk statistics of one splitter"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = split(documents)
+        timings.append(time.perf_counter() - start)
+    texts = [chunk.page_content for chunk in chunks]
+    characters = sum(len(doc.page_content) for doc in documents)
+    seconds = min(timings)
+    return {
+        "seconds": seconds,
+        "mb_per_s": characters / seconds / 1e6 if seconds else 0.0,
+        "chunks": len(texts),
+        "mean_chars": statistics.mean(len(text) for text in texts) if texts else 0.0,
+        "broken": broken_structures(documents, chunks, chunk_size),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", type=Path, help="Markdown files to chunk (default: generated)")
+    parser.add_argument("--size", type=int, default=5_000_000, help="Characters of the generated document")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Maximum chunk size in characters")
+    parser.add_argument("--chunk-overlap", type=int, default=200, help="Overlap between chunks in characters")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per splitter; the fastest is reported")
+    args = parser.parse_args()
+
+    if args.files:
+        documents = [Document(page_content=path.read_text(encoding="utf-8"), metadata={"source": str(path)})
+                     for path in args.files]
+    else:
+        # Split the generated text into one document per chapter, like a directory of files
+        text = generate_markdown(args.size)
+        documents = [Document(page_content=part, metadata={"source": f"generated-{i}.md"})
+                     for i, part in enumerate(text.split("# Chapter ")) if part]
+
+    recursive = RecursiveCharacterTextSplitter(
+        chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap,
+        separators=["\n\n", "\n", " ", ""], add_start_index=True
+    )
+    chunker = MarkdownChunker(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    splitters = {
+        "recursive": recursive.split_documents,
+        "markdown": chunker.split_documents,
+    }
+
+    characters = sum(len(doc.page_content) for doc in documents)
+    print(f"{len(documents)} documents, {characters / 1e6:.1f}M characters, "
+          f"chunk size {args.chunk_size}, overlap {args.chunk_overlap}\n")
+    print(f"{'splitter':<13} {'seconds':>8} {'MB/s':>7} {'chunks':>8} {'mean chars':>11} {'broken':>7}")
+    for name, split in splitters.items():
+        metrics = measure(split, documents, args.chunk_size, args.repeat)
+        print(f"{name:<13} {metrics['seconds']:>8.2f} {metrics['mb_per_s']:>7.2f} {metrics['chunks']:>8} "
+              f"{metrics['mean_chars']:>11.0f} {metrics['broken']:>7}")
+
+    if not args.files:
+        # A single document of growing size: linear chunking keeps the time per MB flat
+        print(f"\n{'characters':>11} {'recursive s':>12} {'markdown s':>11}")
+        for size in (args.size // 4, args.size // 2, args.size):
+            document = [Document(page_content=generate_markdown(size), metadata={"source": "generated.md"})]
+            recursive_seconds = measure(recursive.split_documents, document, args.chunk_size, 1)["seconds"]
+            markdown_seconds = measure(chunker.split_documents, document, args.chunk_size, 1)["seconds"]
+            print(f"{size:>11} {recursive_seconds:>12.2f} {markdown_seconds:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
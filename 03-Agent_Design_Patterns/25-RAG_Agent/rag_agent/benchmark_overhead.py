@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of per-query overhead around the LLM call
+
+Compares building the prompt template and LCEL chain on every query (the old
+ChatAgent behaviour) with reusing the chain built once per agent. The LLM is
+replaced by a constant runnable so only LangChain overhead is measured.
+"""
+
+import argparse
+import time
+
+from langchain.prompts import ChatPromptTemplate
+from langchain.schema.output_parser import StrOutputParser
+from langchain.schema.runnable import RunnableLambda, RunnablePassthrough
+
+SYSTEM_PROMPT = "You are a helpful AI assistant.\n\nContext: {context}\n\nChat History: {chat_history}"
+HUMAN_PROMPT = "Question: {question}"
+
+INPUTS = {
+    "context": "Machine learning is a subset of artificial intelligence. " * 40,
+    "chat_history": "Human: What is ML?\nAssistant: A field of AI.",
+    "question": "What are the types of machine learning?",
+}
+
+# Stands in for the model so that only prompt and chain overhead is timed
+stub_llm = RunnableLambda(lambda prompt: "stub answer")
+
+
+def per_query_chain() -> str:
+    """Old pattern: build the prompt and the chain inside every call"""
+    prompt_template = ChatPromptTemplate.from_messages([
+        ("system", SYSTEM_PROMPT),
+        ("human", HUMAN_PROMPT),
+    ])
+    chain = RunnablePassthrough() | prompt_template | stub_llm | StrOutputParser()
+    return chain.invoke(INPUTS)
+
+
+prebuilt_chain = ChatPromptTemplate.from_messages([
+    ("system", SYSTEM_PROMPT),
+    ("human", HUMAN_PROMPT),
+]) | stub_llm | StrOutputParser()
+
+
+def reused_chain() -> str:
+    """New pattern: invoke the chain built once per agent"""
+    return prebuilt_chain.invoke(INPUTS)
+
+
+def measure(function, iterations: int) -> float:
+    """Mean microseconds per call"""
+    function()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-query chain overhead, excluding the LLM")
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls per variant")
+    args = parser.parse_args()
+
+    rebuilt = measure(per_query_chain, args.iterations)
+    reused = measure(reused_chain, args.iterations)
+    print(f"{'build per query':<18} {rebuilt:>10.1f} us/query")
+    print(f"{'built once':<18} {reused:>10.1f} us/query")
+    print(f"{'saved':<18} {rebuilt - reused:>10.1f} us/query ({1 - reused / rebuilt:.0%})")
+
+
+if __name__ == "__main__":
+    main()
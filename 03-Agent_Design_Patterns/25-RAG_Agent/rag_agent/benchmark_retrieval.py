@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Retrieval benchmark on sample_docs: dense vs BM25 vs hybrid (reciprocal rank fusion)
+
+Reports recall@k, MRR and per-query latency. Dense and hybrid modes need
+Ollama running; use --keyword-only to benchmark the BM25 index alone.
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from src.document_processor import DocumentProcessor
+from src.ingestion import assign_chunk_ids
+from src.keyword_index import KeywordIndex
+
+SAMPLE_DOCS = Path(__file__).parent / "sample_docs"
+
+# Query -> phrase that marks a relevant chunk
+QUERIES = {
+    "What is backpropagation?": "backpropagation",
+    "Which techniques find clusters in unlabeled data?": "clustering",
+    "Which game did deep learning master?": "alphago",
+    "How does reinforcement learning learn?": "rewards and penalties",
+    "SVM": "support vector machines",
+    "Which layers do deep networks use?": "convolutional layers",
+    "Examples of supervised learning": "classification, regression",
+    "speech recognition": "speech recognition",
+}
+
+
+def evaluate(search: Callable[[str, int], List[str]], k: int,
+             relevant_counts: Dict[str, int]) -> Dict[str, float]:
+    """Run every query and compute recall@k, MRR and latency percentiles"""
+    recalls, reciprocal_ranks, latencies = [], [], []
+    for query, phrase in QUERIES.items():
+        start = time.perf_counter()
+        results = search(query, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        relevant = [i for i, text in enumerate(results) if phrase in text.lower()]
+        total_relevant = max(relevant_counts[phrase], 1)
+        recalls.append(min(len(relevant), total_relevant) / total_relevant)
+        reciprocal_ranks.append(1 / (relevant[0] + 1) if relevant else 0.0)
+
+    latencies.sort()
+    return {
+        "recall": statistics.mean(recalls),
+        "mrr": statistics.mean(reciprocal_ranks),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--k", type=int, default=3, help="Number of chunks retrieved per query")
+    parser.add_argument("--chunk-size", type=int, default=200, help="Chunk size used to index sample_docs")
+    parser.add_argument("--keyword-only", action="store_true", help="Skip dense and hybrid modes (no Ollama needed)")
+    args = parser.parse_args()
+
+    processor = DocumentProcessor(chunk_size=args.chunk_size, chunk_overlap=args.chunk_size // 5)
+    chunks = processor.process_path(SAMPLE_DOCS)
+
+    relevant_counts = {
+        phrase: sum(phrase in chunk.page_content.lower() for chunk in chunks)
+        for phrase in QUERIES.values()
+    }
+    print(f"Indexed {len(chunks)} chunks from {SAMPLE_DOCS}, k={args.k}\n")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        modes: Dict[str, Callable[[str, int], List[str]]] = {}
+
+        if args.keyword_only:
+            index = KeywordIndex(str(Path(workdir) / "keyword_index.sqlite"))
+            index.add(assign_chunk_ids(chunks), chunks)
+
+            def keyword_search(query: str, k: int) -> List[str]:
+                ids = [doc_id for doc_id, _ in index.search(query, k)]
+                documents = index.get_documents(ids)
+                return [documents[doc_id].page_content for doc_id in ids]
+            modes["bm25"] = keyword_search
+        else:
+            from src.vector_store import VectorStoreManager
+            store = VectorStoreManager(collection_name="benchmark", persist_directory=workdir)
+            store.ingest_documents(chunks)
+
+            def weighted(dense: float, keyword: float) -> Callable[[str, int], List[str]]:
+                def search(query: str, k: int) -> List[str]:
+                    docs = store.hybrid_search(query, k=k, dense_weight=dense, keyword_weight=keyword)
+                    return [doc.page_content for doc in docs]
+                return search
+            modes["dense"] = weighted(1.0, 0.0)
+            modes["bm25"] = weighted(0.0, 1.0)
+            modes["hybrid"] = weighted(1.0, 1.0)
+
+        print(f"{'mode':<8} {'recall@k':>9} {'MRR':>6} {'p50 ms':>8} {'p95 ms':>8}")
+        for name, search in modes.items():
+            metrics = evaluate(search, args.k, relevant_counts)
+            print(f"{name:<8} {metrics['recall']:>9.2f} {metrics['mrr']:>6.2f} "
+                  f"{metrics['p50_ms']:>8.2f} {metrics['p95_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Vector backend benchmark: Chroma vs the embedded NumPy index (float32, int8, IVF)
+
+Stores synthetic clustered vectors, so no Ollama is needed, and reports the
+time to open the populated store, insert throughput, query latency, recall@k
+against exact search and size on disk for every backend.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+from langchain.schema import Document
+from langchain_core.embeddings import Embeddings
+
+from src.numpy_store import NumpyVectorStore
+
+
+class PrecomputedEmbeddings(Embeddings):
+    """Embeddings looked up by text, so every backend stores identical vectors"""
+
+    def __init__(self, vectors: Dict[str, np.ndarray]):
+        self.vectors = vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.vectors[text].tolist() for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.vectors[text].tolist()
+
+
+def synthetic_corpus(count: int, queries: int, dimensions: int, clusters: int, seed: int = 0):
+    """Unit vectors around random cluster centres, and queries near random documents"""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dimensions))
+    documents = centres[rng.integers(clusters, size=count)] + 0.6 * rng.normal(size=(count, dimensions))
+    documents /= np.linalg.norm(documents, axis=1, keepdims=True)
+    query_vectors = documents[rng.integers(count, size=queries)] + 0.3 * rng.normal(size=(queries, dimensions))
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    return documents.astype(np.float32), query_vectors.astype(np.float32)
+
+
+def directory_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path) for name in names
+    )
+
+
+def run_backend(name: str, open_store: Callable[[str], object], directory: str,
+                texts: List[str], query_texts: List[str], truth: List[set],
+                k: int, batch_size: int) -> Dict[str, float]:
+    store = open_store(directory)
+    start = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        batch = texts[offset:offset + batch_size]
+        store.add_documents([Document(page_content=text, metadata={"source": "synthetic"}) for text in batch],
+                            ids=batch)
+    insert_seconds = time.perf_counter() - start
+    if hasattr(store, "persist"):
+        store.persist()
+
+    # Reopen to measure the startup cost a CLI launch pays
+    start = time.perf_counter()
+    store = open_store(directory)
+    reopen_seconds = time.perf_counter() - start
+
+    latencies, recalls = [], []
+    for query, expected in zip(query_texts, truth):
+        start = time.perf_counter()
+        results = store.similarity_search_with_score(query, k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(len({doc.page_content for doc, _ in results} & expected) / k)
+
+    latencies.sort()
+    return {
+        "open_ms": reopen_seconds * 1000,
+        "insert_per_s": len(texts) / insert_seconds if insert_seconds else 0.0,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+        "recall": sum(recalls) / len(recalls),
+        "disk_mb": directory_size(directory) / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=20000, help="Stored vectors")
+    parser.add_argument("--queries", type=int, default=200, help="Queries timed per backend")
+    parser.add_argument("--dimensions", type=int, default=384, help="Vector size")
+    parser.add_argument("--clusters", type=int, default=100, help="Clusters of the synthetic corpus")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Vectors inserted per call")
+    parser.add_argument("--ivf-lists", type=int, default=64, help="IVF partitions of the numpy-ivf backend")
+    parser.add_argument("--nprobe", type=int, default=8, help="IVF partitions searched per query")
+    parser.add_argument("--backends", nargs="+", default=["chroma", "numpy", "numpy-int8", "numpy-ivf"],
+                        help="Backends to compare")
+    args = parser.parse_args()
+
+    vectors, query_vectors = synthetic_corpus(args.count, args.queries, args.dimensions, args.clusters)
+    texts = [f"doc-{i}" for i in range(args.count)]
+    query_texts = [f"query-{i}" for i in range(args.queries)]
+    embeddings = PrecomputedEmbeddings({**dict(zip(texts, vectors)), **dict(zip(query_texts, query_vectors))})
+
+    # Exact cosine top-k as ground truth
+    truth = [
+        {texts[i] for i in np.argsort(-(vectors @ query))[:args.k]}
+        for query in query_vectors
+    ]
+
+    def chroma(directory):
+        from langchain_community.vectorstores import Chroma
+        return Chroma(collection_name="benchmark", embedding_function=embeddings, persist_directory=directory,
+                      collection_metadata={"hnsw:space": "cosine"})
+
+    backends = {
+        "chroma": chroma,
+        "numpy": lambda directory: NumpyVectorStore(directory, embeddings),
+        "numpy-int8": lambda directory: NumpyVectorStore(directory, embeddings, quantize=True),
+        "numpy-ivf": lambda directory: NumpyVectorStore(directory, embeddings, ivf_lists=args.ivf_lists,
+                                                        nprobe=args.nprobe),
+    }
+
+    print(f"{args.count} vectors x {args.dimensions} dims, {args.queries} queries, k={args.k}\n")
+    print(f"{'backend':<11} {'open ms':>8} {'insert/s':>10} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'recall@k':>9} {'disk MB':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in args.backends:
+            metrics = run_backend(name, backends[name], os.path.join(workdir, name), texts, query_texts,
+                                  truth, args.k, args.batch_size)
+            print(f"{name:<11} {metrics['open_ms']:>8.1f} {metrics['insert_per_s']:>10.0f} "
+                  f"{metrics['p50_ms']:>8.2f} {metrics['p95_ms']:>8.2f} {metrics['recall']:>9.3f} "
+                  f"{metrics['disk_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
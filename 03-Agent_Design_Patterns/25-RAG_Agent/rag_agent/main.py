@@ -9,14 +9,20 @@ import os
 import sys
 from pathlib import Path
 from rich.console import Console
+from rich.live import Live
 from rich.panel import Panel
 from rich.text import Text
 from rich.prompt import Prompt
 from dotenv import load_dotenv
 
 from src.chat_agent import ChatAgent
+from src.collection_router import CollectionRouter
+from src.config import Config
 from src.document_processor import DocumentProcessor
-from src.vector_store import VectorStoreManager
+from src.metadata_filter import parse_filter
+from src.pipeline import IngestionPipeline
+from src.vector_store import VECTOR_BACKENDS, VectorStoreManager
+from src.watcher import DirectoryWatcher
 
 # Load environment variables
 load_dotenv()
@@ -34,33 +40,67 @@ def cli():
 @click.option('--model', '-m', default='llama3.2', help='Ollama model name')
 @click.option('--chunk-size', default=1000, help='Document chunk size')
 @click.option('--chunk-overlap', default=200, help='Document chunk overlap')
-def chat(path, collection, model, chunk_size, chunk_overlap):
+@click.option('--dense-weight', default=1.0, help='Weight of vector similarity in hybrid search')
+@click.option('--keyword-weight', default=1.0, help='Weight of BM25 keyword matches in hybrid search')
+@click.option('--no-answer-cache', is_flag=True, help='Always generate fresh answers')
+@click.option('--context-tokens', default=2000, help='Token budget of the context sent to the model')
+@click.option('--tenant', '-t', default=None, help='Tenant owning the collection')
+@click.option('--backend', type=click.Choice(VECTOR_BACKENDS), default=Config.DEFAULT_VECTOR_BACKEND,
+              help='Vector storage: ChromaDB or the embedded NumPy index')
+@click.option('--quantize', is_flag=True, help='Store NumPy index vectors as int8')
+@click.option('--ivf-lists', default=0, help='IVF partitions of the NumPy index (0: exact search)')
+@click.option('--watch', is_flag=True, help='Re-index changed, new and deleted files while chatting')
+@click.option('--watch-interval', default=2.0, help='Seconds between checks for changed files')
+@click.option('--where', multiple=True,
+              help='Only retrieve chunks whose metadata matches, e.g. file_type=pdf or page_start>=3 (repeatable)')
+def chat(path, collection, model, chunk_size, chunk_overlap, dense_weight, keyword_weight, no_answer_cache,
+         context_tokens, tenant, backend, quantize, ivf_lists, watch, watch_interval, where):
     """Start a chat session with documents from PATH"""
     
     console.print(Panel.fit(
         "[bold blue]LangGraph Document Chat[/bold blue]\n"
         f"Path: {path}\n"
         f"Model: {model}\n"
-        f"Collection: {collection}",
+        f"Collection: {collection}" + (f"\nFilter: {', '.join(where)}" if where else ""),
         title="Starting Chat Session"
     ))
     
     try:
+        search_filter = parse_filter(where)
         # Initialize components
         with console.status("[bold green]Initializing components..."):
             doc_processor = DocumentProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-            vector_store = VectorStoreManager(collection_name=collection)
-            chat_agent = ChatAgent(model_name=model, vector_store=vector_store)
+            vector_store = open_vector_store(collection, tenant, backend, quantize, ivf_lists)
+            chat_agent = ChatAgent(
+                model_name=model, vector_store=vector_store,
+                dense_weight=dense_weight, keyword_weight=keyword_weight,
+                cache_answers=not no_answer_cache,
+                context_tokens=context_tokens,
+                search_filter=search_filter
+            )
+        
+        # Files seen before ingestion starts, so edits made during it are re-indexed
+        watcher = None
+        if watch:
+            watcher = DirectoryWatcher(
+                path, doc_processor, vector_store, interval=watch_interval,
+                on_update=lambda update: console.print(f"[dim]Re-indexed {path}: {update}[/dim]")
+            )
+            watcher.snapshot()
         
         # Process documents
-        with console.status("[bold green]Processing documents..."):
-            documents = doc_processor.process_path(path)
-            if not documents:
+        with console.status("[bold green]Processing documents...") as status:
+            pipeline = IngestionPipeline(doc_processor, vector_store, progress=progress_reporter(status))
+            result = pipeline.run(path)
+            if not result.chunks and watcher is None:
                 console.print("[red]No supported documents found![/red]")
                 return
             
-            vector_store.add_documents(documents)
-            console.print(f"[green]Processed {len(documents)} document chunks[/green]")
+            console.print(f"[green]Processed {result.chunks} document chunks ({result.report})[/green]")
+        
+        if watcher is not None:
+            watcher.start()
+            console.print(f"[dim]Watching {path} for changes every {watch_interval:g}s[/dim]")
         
         # Start chat loop
         console.print("\n[bold cyan]Chat started! Type 'quit' or 'exit' to end the session.[/bold cyan]")
@@ -82,22 +122,36 @@ def chat(path, collection, model, chunk_size, chunk_overlap):
                     os.system('clear' if os.name == 'posix' else 'cls')
                     continue
                 
-                # Get response from chat agent
-                with console.status("[bold green]Thinking..."):
-                    response = chat_agent.chat(user_input)
+                if user_input.lower() == 'stats':
+                    console.print(f"[dim]Latency: {chat_agent.latency}[/dim]")
+                    if chat_agent.answer_cache:
+                        console.print(f"[dim]Answer cache: {chat_agent.answer_cache.stats}[/dim]")
+                    console.print(f"[dim]Embedding: {vector_store.embedding_executor.stats}[/dim]")
+                    console.print(f"[dim]Embedding cache: {vector_store.embeddings.stats}[/dim]")
+                    if watcher is not None:
+                        console.print(f"[dim]Watching {watcher.file_count} files[/dim]")
+                    continue
                 
-                # Display response
-                console.print(Panel(
-                    response,
-                    title="[bold green]Assistant[/bold green]",
-                    border_style="green"
-                ))
+                # Render the response in its panel token by token as the agent streams it
+                previous_timing = chat_agent.latency.last
+                response = Text()
+                with Live(assistant_panel(Text("Thinking...", style="dim")), console=console,
+                          refresh_per_second=15) as live:
+                    for token in chat_agent.stream(user_input):
+                        response.append(token)
+                        live.update(assistant_panel(response))
+                    timing = chat_agent.latency.last
+                    if timing is not previous_timing:
+                        live.update(assistant_panel(response, subtitle=f"[dim]{timing}[/dim]"))
                 
             except KeyboardInterrupt:
                 console.print("\n[yellow]Goodbye![/yellow]")
                 break
             except Exception as e:
                 console.print(f"[red]Error: {e}[/red]")
+        
+        if watcher is not None:
+            watcher.stop()
     
     except Exception as e:
         console.print(f"[red]Failed to initialize: {e}[/red]")
@@ -106,7 +160,17 @@ def chat(path, collection, model, chunk_size, chunk_overlap):
 @cli.command()
 @click.argument('path', type=click.Path(exists=True))
 @click.option('--collection', '-c', default='default', help='ChromaDB collection name')
-def index(path, collection):
+@click.option('--workers', '-w', default=None, type=int, help='Parser processes (default: CPU count)')
+@click.option('--batch-size', default=64, help='Chunks embedded and stored per batch')
+@click.option('--tenant', '-t', default=None, help='Tenant owning the collection')
+@click.option('--backend', type=click.Choice(VECTOR_BACKENDS), default=Config.DEFAULT_VECTOR_BACKEND,
+              help='Vector storage: ChromaDB or the embedded NumPy index')
+@click.option('--quantize', is_flag=True, help='Store NumPy index vectors as int8')
+@click.option('--ivf-lists', default=0, help='IVF partitions of the NumPy index (0: exact search)')
+@click.option('--embed-batch-size', default=Config.EMBED_BATCH_SIZE, help='Chunks per embedding request')
+@click.option('--embed-concurrency', default=Config.EMBED_CONCURRENCY, help='Embedding requests in flight')
+def index(path, collection, workers, batch_size, tenant, backend, quantize, ivf_lists,
+          embed_batch_size, embed_concurrency):
     """Index documents from PATH without starting chat"""
     
     console.print(Panel.fit(
@@ -117,38 +181,119 @@ def index(path, collection):
     ))
     
     try:
-        with console.status("[bold green]Processing documents..."):
+        with console.status("[bold green]Processing documents...") as status:
             doc_processor = DocumentProcessor()
-            vector_store = VectorStoreManager(collection_name=collection)
+            vector_store = open_vector_store(collection, tenant, backend, quantize, ivf_lists,
+                                             embed_batch_size, embed_concurrency)
             
-            documents = doc_processor.process_path(path)
-            if not documents:
+            pipeline = IngestionPipeline(
+                doc_processor, vector_store,
+                workers=workers, batch_size=batch_size,
+                progress=progress_reporter(status)
+            )
+            result = pipeline.run(path)
+            if not result.chunks:
                 console.print("[red]No supported documents found![/red]")
                 return
             
-            vector_store.add_documents(documents)
-            console.print(f"[green]Successfully indexed {len(documents)} document chunks[/green]")
+            console.print(f"[green]Successfully indexed {result.chunks} document chunks "
+                          f"from {result.files_parsed} files in {result.elapsed:.1f}s ({result.report})[/green]")
+            for metrics in result.stages.values():
+                console.print(f"[dim]  {metrics}[/dim]")
+            console.print(f"[dim]Embedding: {vector_store.embedding_executor.stats}[/dim]")
+            console.print(f"[dim]Embedding cache: {vector_store.embeddings.stats}[/dim]")
     
     except Exception as e:
         console.print(f"[red]Failed to index documents: {e}[/red]")
 
 @cli.command()
-def list_collections():
-    """List all ChromaDB collections"""
+@click.option('--tenant', '-t', default=None, help='Only list collections of this tenant')
+@click.option('--backend', type=click.Choice(VECTOR_BACKENDS), default=Config.DEFAULT_VECTOR_BACKEND,
+              help='Vector storage to list')
+def list_collections(tenant, backend):
+    """List all collections with their size and search latency"""
     try:
-        vector_store = VectorStoreManager()
-        collections = vector_store.list_collections()
+        if tenant or Config.COLLECTION_DIRS:
+            stats = CollectionRouter(Config.COLLECTION_DIRS, backend=backend).collection_stats(tenant)
+        else:
+            vector_store = VectorStoreManager(backend=backend)
+            stats = [
+                VectorStoreManager(collection_name=name, embeddings=vector_store.embeddings,
+                                   backend=backend).get_collection_stats()
+                for name in vector_store.list_collections()
+            ]
         
-        if collections:
+        if stats:
             console.print("[bold blue]Available Collections:[/bold blue]")
-            for collection in collections:
-                console.print(f"  • {collection}")
+            for entry in stats:
+                name = f"{entry['tenant']}/{entry['collection']}" if 'tenant' in entry else entry['name']
+                console.print(f"  • {name}: {entry['count']} chunks [dim]({entry['directory']})[/dim]")
         else:
             console.print("[yellow]No collections found[/yellow]")
     
     except Exception as e:
         console.print(f"[red]Error listing collections: {e}[/red]")
 
+@cli.command()
+@click.argument('query')
+@click.option('--tenant', '-t', required=True, help='Tenant whose collections are searched')
+@click.option('--collection', '-c', multiple=True, help='Collections to search (default: all of the tenant)')
+@click.option('-k', default=5, help='Number of results')
+@click.option('--where', multiple=True,
+              help='Only return chunks whose metadata matches, e.g. source=notes.md or total_pages>10 (repeatable)')
+def search(query, tenant, collection, k, where):
+    """Search several collections of a tenant at once"""
+    try:
+        router = CollectionRouter(Config.COLLECTION_DIRS, backend=Config.DEFAULT_VECTOR_BACKEND)
+        results = router.search(query, tenant, list(collection) or None, k=k, filter=parse_filter(where))
+        if not results:
+            console.print("[yellow]No results[/yellow]")
+            return
+        
+        for doc, distance in results:
+            console.print(Panel(
+                doc.page_content,
+                title=f"{doc.metadata.get('collection')} · {doc.metadata.get('source', '')}",
+                subtitle=f"distance {distance:.3f}",
+                border_style="blue"
+            ))
+        for entry in router.collection_stats(tenant):
+            if entry['searches']:
+                console.print(f"[dim]{entry['collection']}: {entry['count']} chunks, "
+                              f"{entry['avg_search_ms']:.1f} ms avg search[/dim]")
+    
+    except Exception as e:
+        console.print(f"[red]Error searching collections: {e}[/red]")
+
+def open_vector_store(collection, tenant=None, backend="chroma", quantize=False, ivf_lists=0,
+                      embed_batch_size=Config.EMBED_BATCH_SIZE, embed_concurrency=Config.EMBED_CONCURRENCY):
+    """Open a collection, routed through the tenant-aware router when a tenant is given"""
+    options = {
+        "backend": backend, "quantize": quantize, "ivf_lists": ivf_lists,
+        "embed_batch_size": embed_batch_size, "embed_concurrency": embed_concurrency
+    }
+    if tenant or Config.COLLECTION_DIRS:
+        return CollectionRouter(Config.COLLECTION_DIRS, **options).get(tenant or "default", collection)
+    return VectorStoreManager(collection_name=collection, **options)
+
+def progress_reporter(status):
+    """Build a pipeline progress callback that updates a console status line"""
+    def report(progress):
+        status.update(
+            f"[bold green]Indexing... {progress.files_parsed}/{progress.files_discovered} files, "
+            f"{progress.chunks} chunks, {progress.report}"
+        )
+    return report
+
+def assistant_panel(response, subtitle=None):
+    """Panel showing the assistant's (partial) response"""
+    return Panel(
+        response,
+        title="[bold green]Assistant[/bold green]",
+        subtitle=subtitle,
+        border_style="green"
+    )
+
 def show_help():
     """Display help information"""
     help_text = """
@@ -156,6 +301,7 @@ def show_help():
 
 • [bold]help[/bold] - Show this help message
 • [bold]clear[/bold] - Clear the screen
+• [bold]stats[/bold] - Show latency, answer and embedding cache statistics
 • [bold]quit/exit[/bold] - Exit the chat session
 
 [bold blue]Tips:[/bold blue]
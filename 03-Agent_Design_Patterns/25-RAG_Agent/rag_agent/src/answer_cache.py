@@ -0,0 +1,237 @@
+"""
+Two-level answer cache: exact normalised query, then semantic similarity
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .embedding_cache import normalize_text
+
+
+# A query embedding, or a function computing it when the semantic level is reached
+Embedding = Union[List[float], Callable[[], List[float]]]
+
+
+class LazyEmbedding:
+    """Query embedding computed on first use and reused afterwards, so exact hits never embed"""
+
+    def __init__(self, embed_query: Callable[[str], List[float]], query: str):
+        self.embed_query = embed_query
+        self.query = query
+        self._embedding: Optional[List[float]] = None
+
+    def __call__(self) -> List[float]:
+        if self._embedding is None:
+            self._embedding = self.embed_query(self.query)
+        return self._embedding
+
+
+def default_cache_path() -> str:
+    """Answer cache shared by all sessions"""
+    return os.path.join(os.path.expanduser("~"), ".langchat", "answer_cache.sqlite")
+
+
+@dataclass
+class AnswerCacheStats:
+    """Hit and miss counters of an answer cache"""
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.exact_hits + self.semantic_hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.hits} hits ({self.exact_hits} exact, {self.semantic_hits} semantic, "
+                f"{self.hit_rate:.0%}), {self.misses} misses")
+
+
+@dataclass
+class _ScopeVectors:
+    """Unit-length embeddings of one scope's cached questions, a row per answer"""
+    answers: List[str]
+    created_at: np.ndarray
+    matrix: np.ndarray
+
+
+class AnswerCache:
+    """Cache of generated answers, scoped by model, collection version and conversation context.
+
+    An exact lookup matches the normalised query text. A semantic lookup
+    compares the query embedding with cached questions of the same scope
+    and accepts the closest one above ``similarity_threshold`` (cosine).
+    The embedding may be passed as a function, which is only called when
+    the exact lookup misses, outside the cache lock.
+
+    The version identifies the collection contents, so ingesting documents
+    makes earlier answers unreachable. The context is a fingerprint of the
+    preceding exchange, so a follow-up like "tell me more" never returns an
+    answer given in a different conversation. The model name keeps answers
+    of one LLM from being served after switching to another. Entries
+    expire after ``ttl_seconds``.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: float = 24 * 3600,
+                 similarity_threshold: float = 0.95, max_entries: int = 5000):
+        self.path = path or default_cache_path()
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max(max_entries, 1)
+        self.stats = AnswerCacheStats()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Embedding matrices per (scope, dimensions), built on the first semantic lookup
+        self._matrices: Dict[Tuple[str, int], _ScopeVectors] = {}
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS answers (
+                key TEXT PRIMARY KEY, scope TEXT NOT NULL, answer TEXT NOT NULL,
+                embedding BLOB, created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS answers_scope ON answers (scope, created_at);
+        """)
+
+    @staticmethod
+    def scope(version: str, context: str = "", model: str = "") -> str:
+        """Partition of the cache an answer belongs to"""
+        return hashlib.sha256(
+            f"{model}\0{version}\0{normalize_text(context).lower()}".encode("utf-8")
+        ).hexdigest()
+
+    def lookup(self, query: str, version: str, context: str = "",
+               embedding: Optional[Embedding] = None, model: str = "") -> Optional[str]:
+        """Cached answer for a query, or None"""
+        scope = self.scope(version, context, model)
+        oldest = time.time() - self.ttl_seconds
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT answer FROM answers WHERE key = ? AND created_at >= ?",
+                (self._key(scope, query), oldest)
+            ).fetchone()
+            if row is not None:
+                self.stats.exact_hits += 1
+                return row[0]
+            if embedding is None:
+                self.stats.misses += 1
+                return None
+
+        # Embedding may call the model, so other sessions' lookups are not blocked meanwhile
+        vector = _resolve(embedding)
+        with self._lock:
+            answer = self._nearest(scope, vector, oldest)
+            if answer is None:
+                self.stats.misses += 1
+            else:
+                self.stats.semantic_hits += 1
+            return answer
+
+    def store(self, query: str, version: str, answer: str, context: str = "",
+              embedding: Optional[Embedding] = None, model: str = "") -> None:
+        """Cache an answer"""
+        scope = self.scope(version, context, model)
+        blob = array("f", _resolve(embedding)).tobytes() if embedding is not None else None
+        with self._lock:
+            key = self._key(scope, query)
+            self._drop_matrices(scope)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?)",
+                (key, scope, answer, blob, time.time())
+            )
+            self._evict()
+            self._connection.commit()
+
+    def clear(self) -> None:
+        """Remove every cached answer"""
+        with self._lock:
+            self._connection.execute("DELETE FROM answers")
+            self._connection.commit()
+            self._matrices.clear()
+
+    def close(self) -> None:
+        """Close the cache database"""
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _key(scope: str, query: str) -> str:
+        return hashlib.sha256(f"{scope}\0{normalize_text(query).lower()}".encode("utf-8")).hexdigest()
+
+    def _nearest(self, scope: str, embedding: List[float], oldest: float) -> Optional[str]:
+        """Answer of the most similar cached question above the threshold"""
+        query = np.asarray(embedding, dtype=np.float32)
+        query_norm = float(np.linalg.norm(query))
+        if not query_norm:
+            return None
+
+        vectors = self._scope_vectors(scope, len(query))
+        if not vectors.answers:
+            return None
+        similarities = vectors.matrix @ (query / query_norm)
+        similarities[vectors.created_at < oldest] = -np.inf
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+        return vectors.answers[best]
+
+    def _scope_vectors(self, scope: str, dimensions: int) -> _ScopeVectors:
+        """Normalised embedding matrix of a scope's cached questions with this many dimensions"""
+        vectors = self._matrices.get((scope, dimensions))
+        if vectors is None:
+            rows = self._connection.execute(
+                "SELECT answer, embedding, created_at FROM answers WHERE scope = ? AND length(embedding) = ?",
+                (scope, dimensions * array("f").itemsize)
+            ).fetchall()
+            matrix = np.frombuffer(b"".join(blob for _, blob, _ in rows), dtype=np.float32)
+            matrix = matrix.reshape(len(rows), dimensions)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            vectors = _ScopeVectors(
+                answers=[answer for answer, _, _ in rows],
+                created_at=np.array([created_at for _, _, created_at in rows], dtype=np.float64),
+                matrix=np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0),
+            )
+            self._matrices[(scope, dimensions)] = vectors
+        return vectors
+
+    def _drop_matrices(self, scope: str) -> None:
+        for key in [key for key in self._matrices if key[0] == scope]:
+            del self._matrices[key]
+
+    def _evict(self) -> None:
+        """Drop expired entries and the oldest ones over the size limit"""
+        stale = [key for (key,) in self._connection.execute(
+            "SELECT key FROM answers WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+        )]
+        count = self._connection.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        excess = count - len(stale) - self.max_entries
+        if excess > 0:
+            stale.extend(key for (key,) in self._connection.execute(
+                "SELECT key FROM answers WHERE created_at >= ? ORDER BY created_at LIMIT ?",
+                (time.time() - self.ttl_seconds, excess)
+            ))
+        if stale:
+            self._connection.executemany("DELETE FROM answers WHERE key = ?", [(key,) for key in stale])
+            self._matrices.clear()
+
+
+def _resolve(embedding: Embedding) -> List[float]:
+    return embedding() if callable(embedding) else embedding
@@ -2,14 +2,21 @@
 Chat Agent using LangGraph for document-based conversations
 """
 
-from typing import Dict, Any, List
-from langgraph.graph import Graph, StateGraph, END
+import asyncio
+import json
+import time
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from langgraph.graph import StateGraph, END
 from langchain_ollama import ChatOllama
 from langchain.schema import HumanMessage, AIMessage
 from langchain.prompts import ChatPromptTemplate
-from langchain.schema.runnable import RunnablePassthrough
+from langchain.schema.runnable import RunnableConfig
 from langchain.schema.output_parser import StrOutputParser
 
+from .answer_cache import AnswerCache, LazyEmbedding
+from .context_assembler import ContextAssembler
+from .retrieval import HybridRetriever, HybridSearchConfig
+from .streaming import GraphTokenStream, LatencyStats, QueryTiming
 from .vector_store import VectorStoreManager
 
 class ChatState:
@@ -24,11 +31,33 @@ class ChatState:
 class ChatAgent:
     """Main chat agent using LangGraph"""
     
-    def __init__(self, model_name: str = "llama3.2", vector_store: VectorStoreManager = None):
+    def __init__(self, model_name: str = "llama3.2", vector_store: VectorStoreManager = None,
+                 dense_weight: float = 1.0, keyword_weight: float = 1.0,
+                 answer_cache: Optional[AnswerCache] = None, cache_answers: bool = True,
+                 context_tokens: int = 2000, llm=None, search_filter: Optional[Dict[str, Any]] = None):
         self.model_name = model_name
         self.vector_store = vector_store
-        self.llm = ChatOllama(model=model_name, temperature=0.7)
+        # Metadata filter (Chroma where syntax) narrowing retrieval, e.g. to one document
+        self.search_filter = search_filter
+        self.dense_weight = dense_weight
+        self.keyword_weight = keyword_weight
+        self.answer_cache = answer_cache or (AnswerCache() if cache_answers else None)
+        self.context_assembler = ContextAssembler(max_tokens=context_tokens)
+        self.llm = llm or ChatOllama(model=model_name, temperature=0.7)
         self.conversation_history = []
+        self.latency = LatencyStats()
+        
+        # Prompt, chain and retriever are built once and reused for every query
+        self.prompt_template = ChatPromptTemplate.from_messages([
+            ("system", self._get_system_prompt()),
+            ("human", self._get_human_prompt())
+        ])
+        self.chain = self.prompt_template | self.llm | StrOutputParser()
+        self.retriever = None
+        if vector_store is not None:
+            self.retriever = vector_store.get_hybrid_retriever(
+                HybridSearchConfig(dense_weight=dense_weight, keyword_weight=keyword_weight)
+            )
         
         # Create the LangGraph workflow
         self.graph = self._create_graph()
@@ -54,45 +83,32 @@ class ChatAgent:
     
     def _retrieve_context(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Retrieve relevant context from vector store"""
-        query = state.get("query", "")
-        
-        if self.vector_store and query:
-            # Search for relevant documents
-            relevant_docs = self.vector_store.similarity_search(query, k=5)
-            context = "\n\n".join([doc.page_content for doc in relevant_docs])
-            state["context"] = context
-        else:
-            state["context"] = ""
-        
+        state["context"] = self._build_context(state.get("query", ""))
         return state
     
-    def _generate_response(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate response using LLM"""
-        query = state.get("query", "")
-        context = state.get("context", "")
-        
-        # Create prompt template
-        prompt_template = ChatPromptTemplate.from_messages([
-            ("system", self._get_system_prompt()),
-            ("human", self._get_human_prompt())
-        ])
+    def _build_context(self, query: str) -> str:
+        """Search for relevant chunks and assemble them into the prompt context"""
+        if not self.retriever or not query:
+            return ""
         
-        # Create chain
-        chain = (
-            RunnablePassthrough()
-            | prompt_template
-            | self.llm
-            | StrOutputParser()
-        )
+        try:
+            # Search for relevant documents (dense + keyword)
+            relevant_docs = self.retriever.search(query, k=5, filter=self.search_filter)
+        except Exception as e:
+            print(f"Error during hybrid search: {e}")
+            return ""
         
-        # Generate response
-        response = chain.invoke({
-            "context": context,
-            "question": query,
+        # Merge overlapping chunks, drop near-duplicates and fit the token budget
+        return self.context_assembler.assemble(relevant_docs).text
+    
+    def _generate_response(self, state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        """Generate response using LLM"""
+        # The graph's config carries the callbacks that stream tokens out with stream_mode="messages"
+        state["response"] = self.chain.invoke({
+            "context": state.get("context", ""),
+            "question": state.get("query", ""),
             "chat_history": self._format_chat_history()
-        })
-        
-        state["response"] = response
+        }, config=config)
         return state
     
     def _get_system_prompt(self) -> str:
@@ -129,7 +145,20 @@ Chat History: {chat_history}"""
     
     def chat(self, query: str) -> str:
         """Main chat method"""
+        return "".join(self.stream(query))
+    
+    def stream(self, query: str) -> Iterator[str]:
+        """Answer a query, yielding tokens as the LLM generates them"""
+        started = time.perf_counter()
         try:
+            # Answer repeated questions from the cache without retrieval or LLM calls
+            cache_key, cached = self._cached_answer(query)
+            if cached is not None:
+                elapsed = time.perf_counter() - started
+                self.latency.record(QueryTiming(elapsed, elapsed, cached=True))
+                yield cached
+                return
+            
             # Prepare initial state
             initial_state = {
                 "query": query,
@@ -137,25 +166,88 @@ Chat History: {chat_history}"""
                 "response": ""
             }
             
-            # Run the graph
-            result = self.graph.invoke(initial_state)
-            response = result.get("response", "I'm sorry, I couldn't generate a response.")
+            # Run the graph, passing on tokens of the generation node as they arrive
+            tokens = GraphTokenStream(self.graph, initial_state, node="generate_response", started=started)
+            yield from tokens
+            response = (tokens.state or {}).get("response")
+            if response is None:
+                yield "I'm sorry, I couldn't generate a response."
+                return
             
-            # Update conversation history
-            self.conversation_history.append({
-                "human": query,
-                "assistant": response
-            })
+            self.latency.record(tokens.timing)
+            self._finish_exchange(query, response, cache_key)
             
-            # Keep only last 10 exchanges
-            if len(self.conversation_history) > 10:
-                self.conversation_history = self.conversation_history[-10:]
+        except Exception as e:
+            yield f"I encountered an error while processing your request: {str(e)}"
+    
+    async def achat(self, query: str) -> str:
+        """Async chat: retrieval and history formatting run concurrently, then the LLM streams in"""
+        try:
+            loop = asyncio.get_running_loop()
+            cache_key, cached = await loop.run_in_executor(None, self._cached_answer, query)
+            if cached is not None:
+                return cached
+            
+            context, chat_history = await asyncio.gather(
+                loop.run_in_executor(None, self._build_context, query),
+                loop.run_in_executor(None, self._format_chat_history)
+            )
+            response = await self.chain.ainvoke({
+                "context": context,
+                "question": query,
+                "chat_history": chat_history
+            })
             
+            self._finish_exchange(query, response, cache_key)
             return response
             
         except Exception as e:
             return f"I encountered an error while processing your request: {str(e)}"
     
+    def _cached_answer(self, query: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Look the query up in the answer cache, recording a hit in the history"""
+        cache_key = self._answer_cache_key(query)
+        if cache_key is None:
+            return None, None
+        
+        cached = self.answer_cache.lookup(query, **cache_key)
+        if cached is not None:
+            self._remember_exchange(query, cached)
+        return cache_key, cached
+    
+    def _finish_exchange(self, query: str, response: str, cache_key: Optional[Dict[str, Any]]):
+        """Cache a generated answer and add it to the history"""
+        if cache_key is not None:
+            self.answer_cache.store(query, answer=response, **cache_key)
+        self._remember_exchange(query, response)
+    
+    def _remember_exchange(self, query: str, response: str):
+        """Append an exchange to the conversation history"""
+        self.conversation_history.append({
+            "human": query,
+            "assistant": response
+        })
+        
+        # Keep only last 10 exchanges
+        if len(self.conversation_history) > 10:
+            self.conversation_history = self.conversation_history[-10:]
+    
+    def _answer_cache_key(self, query: str) -> Optional[Dict[str, Any]]:
+        """Model, collection version, conversation context and lazy query embedding used by the answer cache"""
+        if self.answer_cache is None or self.vector_store is None:
+            return None
+        
+        # Follow-up questions only match answers given after the same previous question and filter
+        context = self.conversation_history[-1]["human"] if self.conversation_history else ""
+        if self.search_filter:
+            context += "\n" + json.dumps(self.search_filter, sort_keys=True, default=str)
+        return {
+            "version": self.vector_store.collection_version,
+            "context": context,
+            "embedding": LazyEmbedding(self.vector_store.embeddings.embed_query, query),
+            "model": self.model_name
+        }
+    
     def clear_history(self):
         """Clear conversation history"""
         self.conversation_history = []
\ No newline at end of file
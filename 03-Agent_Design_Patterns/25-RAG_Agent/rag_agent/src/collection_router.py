@@ -0,0 +1,191 @@
+"""
+Tenant-aware routing of collections across storage directories
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from langchain.schema import Document
+from langchain_community.embeddings import OllamaEmbeddings
+
+from .embedding_cache import CachedEmbeddings
+from .vector_store import VectorStoreManager
+
+# Separates tenant and collection in physical Chroma collection names
+TENANT_SEPARATOR = "__"
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_-]+")
+# Tenant names are used verbatim and cannot contain "_", so the first separator always ends the tenant
+_TENANT_NAME = re.compile(r"^[a-zA-Z0-9](?:[a-zA-Z0-9-]*[a-zA-Z0-9])?$")
+
+
+def validate_tenant(tenant: str) -> str:
+    """Tenant name, if it only uses letters, digits and inner hyphens"""
+    if not _TENANT_NAME.match(tenant or ""):
+        raise ValueError(
+            f"Invalid tenant name {tenant!r}: use letters, digits and hyphens, "
+            "starting and ending with a letter or digit"
+        )
+    return tenant
+
+
+def physical_name(tenant: str, collection: str) -> str:
+    """Chroma collection name of a tenant's collection
+
+    Distinct tenants never share a name; collection names are sanitised, so
+    the router checks that a name is not already taken by another collection.
+    """
+    tenant = validate_tenant(tenant)
+    collection = _INVALID_NAME_CHARS.sub("-", collection).strip("-_") or "default"
+    name = f"{tenant}{TENANT_SEPARATOR}{collection}"
+    if len(name) > 63:
+        # Chroma limits names to 63 characters; keep them unique with a hash suffix
+        digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:8]
+        name = f"{name[:54]}-{digest}"
+    return name
+
+
+class CollectionRouter:
+    """Route tenants' collections to VectorStoreManagers spread over several directories.
+
+    A new collection is placed in one of ``directories`` by a stable hash of
+    its name. Placements are recorded in ``collections.json`` in the first
+    directory, so adding directories later never moves existing collections.
+    All managers share one embedding cache and use the same vector backend.
+    """
+
+    def __init__(self, directories: Optional[Sequence[str]] = None,
+                 embedding_cache_path: Optional[str] = None, max_workers: int = 8,
+                 backend: str = "chroma", quantize: bool = False, ivf_lists: int = 0,
+                 embed_batch_size: int = 32, embed_concurrency: int = 4):
+        if not directories:
+            directories = [os.path.join(os.path.expanduser("~"), ".langchat", "chromadb")]
+        self.directories = [os.path.abspath(os.path.expanduser(d)) for d in directories]
+        for directory in self.directories:
+            os.makedirs(directory, exist_ok=True)
+
+        self.embeddings = CachedEmbeddings(
+            OllamaEmbeddings(model="llama3.2"),
+            model_name="llama3.2",
+            path=embedding_cache_path
+        )
+        self.max_workers = max_workers
+        self.store_options = {
+            "backend": backend, "quantize": quantize, "ivf_lists": ivf_lists,
+            "embed_batch_size": embed_batch_size, "embed_concurrency": embed_concurrency
+        }
+        self._registry_path = os.path.join(self.directories[0], "collections.json")
+        self._registry: Dict[str, Dict[str, str]] = self._load_registry()
+        self._managers: Dict[str, VectorStoreManager] = {}
+        self._lock = threading.Lock()
+
+    def get(self, tenant: str, collection: str = "default") -> VectorStoreManager:
+        """Manager of a tenant's collection, creating and placing it on first use"""
+        name = physical_name(tenant, collection)
+        with self._lock:
+            entry = self._registry.get(name)
+            if entry is None:
+                entry = {"tenant": tenant, "collection": collection, "directory": self._place(name)}
+                self._registry[name] = entry
+                self._save_registry()
+            elif (entry["tenant"], entry["collection"]) != (tenant, collection):
+                raise ValueError(
+                    f"Collection {collection!r} of tenant {tenant!r} maps to {name!r}, which is already "
+                    f"used by collection {entry['collection']!r} of tenant {entry['tenant']!r}"
+                )
+
+            manager = self._managers.get(name)
+            if manager is None:
+                manager = VectorStoreManager(
+                    collection_name=name,
+                    persist_directory=entry["directory"],
+                    embeddings=self.embeddings,
+                    **self.store_options
+                )
+                self._managers[name] = manager
+            return manager
+
+    def list_collections(self, tenant: Optional[str] = None) -> List[Tuple[str, str]]:
+        """(tenant, collection) pairs known to the router"""
+        return sorted(
+            (entry["tenant"], entry["collection"])
+            for entry in self._registry.values()
+            if tenant is None or entry["tenant"] == tenant
+        )
+
+    def collection_stats(self, tenant: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Size, directory and search latency of every collection of a tenant"""
+        stats = []
+        for tenant_name, collection in self.list_collections(tenant):
+            entry = self.get(tenant_name, collection).get_collection_stats()
+            entry.update(tenant=tenant_name, collection=collection)
+            stats.append(entry)
+        return stats
+
+    def search(self, query: str, tenant: str, collections: Optional[Sequence[str]] = None,
+               k: int = 5, filter: Optional[Dict[str, Any]] = None) -> List[Tuple[Document, float]]:
+        """Search several collections in parallel and merge their top-k by distance
+
+        Args:
+            query: Search query
+            tenant: Tenant whose collections are searched
+            collections: Collection names, defaults to all of the tenant's collections
+            k: Number of results to return
+            filter: Metadata filter in Chroma's where syntax, applied in every collection
+
+        Returns:
+            List of (document, distance) tuples, closest first; each document's
+            metadata records the collection it came from
+        """
+        if collections is None:
+            collections = [name for _, name in self.list_collections(tenant)]
+        if not collections:
+            return []
+
+        managers = [(name, self.get(tenant, name)) for name in collections]
+
+        # Embed the query once; every collection then hits the shared embedding cache
+        self.embeddings.embed_query(query)
+
+        def search_one(item):
+            name, manager = item
+            results = manager.similarity_search_with_score(query, k=k, filter=filter)
+            for doc, _ in results:
+                doc.metadata["collection"] = name
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(managers))) as pool:
+            merged = [result for results in pool.map(search_one, managers) for result in results]
+
+        merged.sort(key=lambda item: item[1])
+        return merged[:k]
+
+    def delete(self, tenant: str, collection: str):
+        """Delete a tenant's collection and forget its placement"""
+        name = physical_name(tenant, collection)
+        self.get(tenant, collection).delete_collection()
+        with self._lock:
+            self._managers.pop(name, None)
+            self._registry.pop(name, None)
+            self._save_registry()
+
+    def _place(self, name: str) -> str:
+        """Directory for a new collection, by a stable hash of its name"""
+        digest = int(hashlib.sha256(name.encode("utf-8")).hexdigest(), 16)
+        return self.directories[digest % len(self.directories)]
+
+    def _load_registry(self) -> Dict[str, Dict[str, str]]:
+        if not os.path.exists(self._registry_path):
+            return {}
+        with open(self._registry_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def _save_registry(self):
+        temp_path = f"{self._registry_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self._registry, file, indent=2, sort_keys=True)
+        os.replace(temp_path, self._registry_path)
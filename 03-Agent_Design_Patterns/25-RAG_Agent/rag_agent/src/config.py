@@ -15,11 +15,28 @@ class Config:
     DEFAULT_CHUNK_OVERLAP = 200
     DEFAULT_SEARCH_K = 5
     
+    # Hybrid search: reciprocal rank fusion weights of dense and BM25 rankings
+    DEFAULT_DENSE_WEIGHT = 1.0
+    DEFAULT_KEYWORD_WEIGHT = 1.0
+    
+    # Token budget of the retrieved context sent to the LLM
+    DEFAULT_CONTEXT_TOKENS = 2000
+    
     # Paths
     HOME_DIR = Path.home()
     APP_DIR = HOME_DIR / ".langchat"
     CHROMADB_DIR = APP_DIR / "chromadb"
     
+    # Directories collections are spread over (os.pathsep separated), used for multi-tenant routing
+    COLLECTION_DIRS = [d for d in os.getenv("LANGCHAT_COLLECTION_DIRS", "").split(os.pathsep) if d]
+    
+    # Vector storage: "chroma", or "numpy" for the embedded memory-mapped index
+    DEFAULT_VECTOR_BACKEND = os.getenv("LANGCHAT_VECTOR_BACKEND", "chroma")
+    
+    # Chunks per embedding request and embedding requests kept in flight during ingestion
+    EMBED_BATCH_SIZE = int(os.getenv("LANGCHAT_EMBED_BATCH_SIZE", "32"))
+    EMBED_CONCURRENCY = int(os.getenv("LANGCHAT_EMBED_CONCURRENCY", "4"))
+    
     # Ollama settings
     OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
     
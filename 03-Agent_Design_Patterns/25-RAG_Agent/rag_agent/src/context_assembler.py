@@ -0,0 +1,217 @@
+"""
+Context assembly: merge adjacent chunks, drop near-duplicates and pack to a token budget
+"""
+
+import hashlib
+import random
+import re
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Set, Tuple
+from langchain.schema import Document
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken missing or its encoding files unavailable offline
+    _ENCODING = None
+
+_WORD_PATTERN = re.compile(r"\w+")
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count from tiktoken if available, else about four characters per token"""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def shingles(text: str, size: int = 5) -> Set[int]:
+    """Hashes of overlapping word n-grams"""
+    words = _WORD_PATTERN.findall(text.lower())
+    grams = [" ".join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))] if words else []
+    return {
+        int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big")
+        for gram in grams
+    }
+
+
+class MinHasher:
+    """MinHash signatures estimating the Jaccard similarity of shingle sets"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self._params = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, hashes: Set[int]) -> List[int]:
+        if not hashes:
+            return []
+        return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._params]
+
+    @staticmethod
+    def similarity(first: List[int], second: List[int]) -> float:
+        if not first or not second:
+            return 0.0
+        return sum(x == y for x, y in zip(first, second)) / len(first)
+
+
+@dataclass
+class AssembledContext:
+    """Context text handed to the LLM and how it was built"""
+    text: str
+    documents: List[Document] = field(default_factory=list)
+    tokens: int = 0
+    merged: int = 0
+    duplicates: int = 0
+    truncated: int = 0
+    dropped: int = 0
+
+
+@dataclass
+class _Passage:
+    document: Document
+    rank: int
+    start: Optional[int]
+    end: Optional[int]
+
+
+class ContextAssembler:
+    """Turn ranked chunks into a compact context for generation.
+
+    1. Overlapping or touching chunks of the same source (by ``start_index``
+       metadata) are merged into one passage, keeping the best rank. Loaders
+       that emit one document per page (PyPDFLoader) restart ``start_index``
+       on every page, so chunks are only merged within the same ``page``.
+    2. Passages whose MinHash similarity to a better-ranked passage reaches
+       ``duplicate_threshold`` are dropped.
+    3. Passages are packed in relevance order until ``max_tokens`` is used;
+       a passage that does not fit is truncated if at least
+       ``min_passage_tokens`` remain, otherwise skipped.
+    """
+
+    def __init__(self, max_tokens: int = 2000, duplicate_threshold: float = 0.8,
+                 min_passage_tokens: int = 50, separator: str = "\n\n",
+                 token_counter: Callable[[str], int] = estimate_tokens):
+        self.max_tokens = max_tokens
+        self.duplicate_threshold = duplicate_threshold
+        self.min_passage_tokens = min_passage_tokens
+        self.separator = separator
+        self.count_tokens = token_counter
+        self._minhash = MinHasher()
+
+    def assemble(self, documents: List[Document]) -> AssembledContext:
+        """Build the context from chunks ordered by decreasing relevance"""
+        passages = self._merge_adjacent(documents)
+        merged = len(documents) - len(passages)
+        passages, duplicates = self._deduplicate(passages)
+
+        result = AssembledContext(text="", merged=merged, duplicates=duplicates)
+        separator_tokens = self.count_tokens(self.separator)
+        parts = []
+        for passage in passages:
+            text = passage.document.page_content
+            cost = self.count_tokens(text) + (separator_tokens if parts else 0)
+            remaining = self.max_tokens - result.tokens
+
+            if cost > remaining:
+                available = remaining - (separator_tokens if parts else 0)
+                if available < self.min_passage_tokens:
+                    result.dropped += 1
+                    continue
+                text = self._truncate(text, available)
+                cost = self.count_tokens(text) + (separator_tokens if parts else 0)
+                result.truncated += 1
+
+            parts.append(text)
+            result.tokens += cost
+            result.documents.append(Document(page_content=text, metadata=passage.document.metadata))
+
+        result.text = self.separator.join(parts)
+        return result
+
+    def _merge_adjacent(self, documents: List[Document]) -> List[_Passage]:
+        """Merge overlapping chunks of the same source and page, ordered by best rank"""
+        passages = [
+            _Passage(doc, rank, doc.metadata.get("start_index"), None)
+            for rank, doc in enumerate(documents)
+        ]
+        for passage in passages:
+            if isinstance(passage.start, int) and passage.start >= 0:
+                passage.end = passage.start + len(passage.document.page_content)
+            else:
+                passage.start = None
+
+        result: List[_Passage] = [p for p in passages if p.start is None]
+        # Offsets are only comparable within one loaded document: a source, or one page of it
+        by_document = {}
+        for passage in passages:
+            if passage.start is not None:
+                metadata = passage.document.metadata
+                key = (str(metadata.get("source", "")), metadata.get("page"))
+                by_document.setdefault(key, []).append(passage)
+
+        for group in by_document.values():
+            group.sort(key=lambda p: p.start)
+            current = group[0]
+            for passage in group[1:]:
+                if passage.start <= current.end:
+                    current = self._join(current, passage)
+                else:
+                    result.append(current)
+                    current = passage
+            result.append(current)
+
+        result.sort(key=lambda p: p.rank)
+        return result
+
+    @staticmethod
+    def _join(first: _Passage, second: _Passage) -> _Passage:
+        """Concatenate two overlapping passages, first.start <= second.start"""
+        if second.end <= first.end:
+            text = first.document.page_content
+            end = first.end
+        else:
+            tail = second.document.page_content[first.end - second.start:]
+            text = first.document.page_content + tail
+            end = second.end
+
+        metadata = dict(first.document.metadata)
+        if "page_end" in second.document.metadata:
+            metadata["page_end"] = max(metadata.get("page_end", 0), second.document.metadata["page_end"])
+        metadata["end_index"] = end
+        return _Passage(Document(page_content=text, metadata=metadata),
+                        min(first.rank, second.rank), first.start, end)
+
+    def _deduplicate(self, passages: List[_Passage]) -> Tuple[List[_Passage], int]:
+        """Drop passages nearly identical to a better-ranked one"""
+        kept: List[_Passage] = []
+        signatures: List[List[int]] = []
+        duplicates = 0
+        for passage in passages:
+            signature = self._minhash.signature(shingles(passage.document.page_content))
+            if any(MinHasher.similarity(signature, other) >= self.duplicate_threshold for other in signatures):
+                duplicates += 1
+                continue
+            kept.append(passage)
+            signatures.append(signature)
+        return kept, duplicates
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text to roughly max_tokens, at a word boundary"""
+        marker = " ..."
+        low, high = 0, len(text)
+        # Binary search on character length; token counts grow monotonically with prefixes
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count_tokens(text[:middle] + marker) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        cut = text[:low]
+        boundary = cut.rfind(" ")
+        if boundary > len(cut) // 2:
+            cut = cut[:boundary]
+        return cut.rstrip() + marker
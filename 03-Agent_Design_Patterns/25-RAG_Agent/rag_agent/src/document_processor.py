@@ -3,121 +3,198 @@ Document processing for PDF and Markdown files
 """
 
 import os
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
 from pathlib import Path
-from typing import List, Union
+from typing import Iterator, List, Optional, Union
 from langchain.schema import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import PyPDFLoader, TextLoader
 import PyPDF2
 from io import StringIO
 
+from .markdown_chunker import MarkdownChunker
+
+SUPPORTED_EXTENSIONS = {'.pdf', '.md', '.txt', '.markdown'}
+
+# Text placed between consecutive PDF pages before splitting
+PAGE_SEPARATOR = "\n\n"
+
+# PDFs with at least this many pages are extracted by several processes
+PARALLEL_PDF_MIN_PAGES = 200
+
+
+def load_file(file_path: Union[str, Path], pdf_workers: int = 1) -> List[Document]:
+    """Load a single file into unsplit documents (one per page for PDFs)
+    
+    Module-level so it can run in worker processes.
+    """
+    file_path = Path(file_path)
+    try:
+        if file_path.suffix.lower() == '.pdf':
+            return _load_pdf(file_path, pdf_workers)
+        elif file_path.suffix.lower() in {'.md', '.markdown', '.txt'}:
+            return _load_text_file(file_path)
+        else:
+            return []
+    except Exception as e:
+        print(f"Error processing {file_path}: {e}")
+        return []
+
+
+def _load_pdf(file_path: Path, workers: int = 1) -> List[Document]:
+    """Load PDF file as one document per page"""
+    try:
+        page_texts = extract_pdf_pages(file_path, workers)
+        if not any(text.strip() for text in page_texts):
+            return []
+        
+        return [
+            Document(
+                page_content=text,
+                metadata={
+                    "source": str(file_path),
+                    "file_type": "pdf",
+                    "page": page_num + 1,
+                    "total_pages": len(page_texts)
+                }
+            )
+            for page_num, text in enumerate(page_texts)
+        ]
+    
+    except Exception as e:
+        print(f"Error processing PDF {file_path}: {e}")
+    
+    return []
+
+
+def extract_pdf_pages(file_path: Union[str, Path], workers: int = 1) -> List[str]:
+    """Extract the text of every page, splitting large PDFs across worker processes"""
+    with open(file_path, 'rb') as file:
+        total_pages = len(PyPDF2.PdfReader(file).pages)
+    
+    if workers <= 1 or total_pages < PARALLEL_PDF_MIN_PAGES:
+        return _extract_page_range(str(file_path), 0, total_pages)
+    
+    # Contiguous page ranges, one per worker, concatenated in order
+    step = -(-total_pages // workers)
+    ranges = [(start, min(start + step, total_pages)) for start in range(0, total_pages, step)]
+    pages: List[str] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_extract_page_range, str(file_path), start, stop) for start, stop in ranges]
+        for future in futures:
+            pages.extend(future.result())
+    return pages
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) of a PDF"""
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [pdf_reader.pages[index].extract_text() or "" for index in range(start, stop)]
+
+
+def _load_text_file(file_path: Path) -> List[Document]:
+    """Load text-based files (Markdown, TXT)"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            content = file.read()
+            
+            if content.strip():
+                # Create document with metadata
+                return [Document(
+                    page_content=content,
+                    metadata={
+                        "source": str(file_path),
+                        "file_type": file_path.suffix.lower()[1:],  # Remove the dot
+                        "file_size": len(content)
+                    }
+                )]
+    
+    except Exception as e:
+        print(f"Error processing text file {file_path}: {e}")
+    
+    return []
+
+
 class DocumentProcessor:
     """Process documents from various sources"""
     
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200, pdf_workers: Optional[int] = None):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            separators=["\n\n", "\n", " ", ""]
-        )
+        self.pdf_workers = (os.cpu_count() or 1) if pdf_workers is None else pdf_workers
+        # Structure-aware, linear-time chunking with character and byte offsets
+        self.text_splitter = MarkdownChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
         
         # Supported file extensions
-        self.supported_extensions = {'.pdf', '.md', '.txt', '.markdown'}
+        self.supported_extensions = set(SUPPORTED_EXTENSIONS)
     
     def process_path(self, path: Union[str, Path]) -> List[Document]:
         """Process a file or directory path"""
-        path = Path(path)
         documents = []
+        for file_path in self.iter_files(path):
+            documents.extend(self._process_file(file_path))
+        return documents
+    
+    def iter_files(self, path: Union[str, Path]) -> Iterator[Path]:
+        """Lazily yield supported files under a file or directory path"""
+        path = Path(path)
         
         if path.is_file():
             if path.suffix.lower() in self.supported_extensions:
-                docs = self._process_file(path)
-                documents.extend(docs)
+                yield path
         elif path.is_dir():
-            for file_path in path.rglob("*"):
-                if file_path.is_file() and file_path.suffix.lower() in self.supported_extensions:
-                    docs = self._process_file(file_path)
-                    documents.extend(docs)
-        
-        return documents
+            for root, _, file_names in os.walk(path):
+                for file_name in sorted(file_names):
+                    if Path(file_name).suffix.lower() in self.supported_extensions:
+                        yield Path(root) / file_name
     
-    def _process_file(self, file_path: Path) -> List[Document]:
-        """Process a single file"""
-        try:
-            if file_path.suffix.lower() == '.pdf':
-                return self._process_pdf(file_path)
-            elif file_path.suffix.lower() in {'.md', '.markdown', '.txt'}:
-                return self._process_text_file(file_path)
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        """Split loaded documents into chunks
+        
+        Pages of a PDF are split together so chunks can span page breaks.
+        """
+        chunks = []
+        for (_source, is_paged), group in groupby(
+            documents, key=lambda doc: (doc.metadata.get("source"), "page" in doc.metadata)
+        ):
+            group = list(group)
+            if is_paged:
+                chunks.extend(self._split_pages(group))
             else:
-                return []
-        except Exception as e:
-            print(f"Error processing {file_path}: {e}")
-            return []
+                chunks.extend(self.text_splitter.split_documents(group))
+        return chunks
     
-    def _process_pdf(self, file_path: Path) -> List[Document]:
-        """Process PDF file"""
-        documents = []
-        
-        try:
-            # Use PyPDF2 for better handling
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                
-                for page_num, page in enumerate(pdf_reader.pages):
-                    page_text = page.extract_text()
-                    text += f"\n--- Page {page_num + 1} ---\n{page_text}"
-                
-                if text.strip():
-                    # Create document with metadata
-                    doc = Document(
-                        page_content=text,
-                        metadata={
-                            "source": str(file_path),
-                            "file_type": "pdf",
-                            "total_pages": len(pdf_reader.pages)
-                        }
-                    )
-                    
-                    # Split into chunks
-                    chunks = self.text_splitter.split_documents([doc])
-                    documents.extend(chunks)
+    def _split_pages(self, pages: List[Document]) -> List[Document]:
+        """Split the pages of one PDF, adding page ranges and character offsets to each chunk
         
-        except Exception as e:
-            print(f"Error processing PDF {file_path}: {e}")
+        Page texts are joined once (linear time) and the page of every chunk
+        boundary is found by binary search over the page start offsets.
+        """
+        page_offsets = []
+        offset = 0
+        for page in pages:
+            page_offsets.append(offset)
+            offset += len(page.page_content) + len(PAGE_SEPARATOR)
+        text = PAGE_SEPARATOR.join(page.page_content for page in pages)
+        page_numbers = [page.metadata["page"] for page in pages]
         
-        return documents
+        metadata = {key: value for key, value in pages[0].metadata.items() if key != "page"}
+        chunks = self.text_splitter.create_documents([text], metadatas=[metadata])
+        for chunk in chunks:
+            start = max(chunk.metadata.get("start_index", 0), 0)
+            end = start + len(chunk.page_content)
+            chunk.metadata["start_index"] = start
+            chunk.metadata["end_index"] = end
+            chunk.metadata["page_start"] = page_numbers[bisect_right(page_offsets, start) - 1]
+            chunk.metadata["page_end"] = page_numbers[bisect_right(page_offsets, max(end - 1, start)) - 1]
+        return chunks
     
-    def _process_text_file(self, file_path: Path) -> List[Document]:
-        """Process text-based files (Markdown, TXT)"""
-        documents = []
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-                
-                if content.strip():
-                    # Create document with metadata
-                    doc = Document(
-                        page_content=content,
-                        metadata={
-                            "source": str(file_path),
-                            "file_type": file_path.suffix.lower()[1:],  # Remove the dot
-                            "file_size": len(content)
-                        }
-                    )
-                    
-                    # Split into chunks
-                    chunks = self.text_splitter.split_documents([doc])
-                    documents.extend(chunks)
-        
-        except Exception as e:
-            print(f"Error processing text file {file_path}: {e}")
-        
-        return documents
+    def _process_file(self, file_path: Path) -> List[Document]:
+        """Process a single file"""
+        return self.split_documents(load_file(file_path, self.pdf_workers))
     
     def get_supported_extensions(self) -> set:
         """Get supported file extensions"""
-        return self.supported_extensions.copy()
\ No newline at end of file
+        return self.supported_extensions.copy()
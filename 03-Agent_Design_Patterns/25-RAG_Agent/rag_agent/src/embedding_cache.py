@@ -0,0 +1,218 @@
+"""
+Persistent embedding cache in front of an embeddings model
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_BATCH = 500
+
+
+def default_cache_path() -> str:
+    """Embedding cache shared by all collections and sessions"""
+    return os.path.join(os.path.expanduser("~"), ".langchat", "embedding_cache.sqlite")
+
+
+def normalize_text(text: str) -> str:
+    """Normalise text so trivially different copies share a cache entry"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+@dataclass
+class EmbeddingCacheStats:
+    """Hit and miss counters of an embedding cache"""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    embed_calls: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.hits} hits ({self.hit_rate:.0%}), {self.misses} misses, "
+                f"{self.embed_calls} embedding calls")
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that stores vectors in SQLite, keyed by model and text hash.
+
+    Lookups go through an in-memory LRU, then the SQLite table. Misses of a
+    call are de-duplicated and embedded in batches of ``batch_size`` texts.
+    The table keeps at most ``max_entries`` vectors, evicting the least
+    recently used ones.
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str, path: Optional[str] = None,
+                 max_entries: int = 200_000, memory_size: int = 10_000, batch_size: int = 64):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.path = path or default_cache_path()
+        self.max_entries = max(max_entries, 1)
+        self.memory_size = max(memory_size, 0)
+        self.batch_size = max(batch_size, 1)
+        self.stats = EmbeddingCacheStats()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._count, max_used = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(MAX(last_used), 0) FROM embeddings"
+        ).fetchone()
+        self._clock = max_used
+
+    def cache_key(self, text: str, kind: str) -> str:
+        """Key of a text; queries and documents may be embedded differently"""
+        digest = hashlib.sha256()
+        digest.update(f"{self.model_name}\0{kind}\0".encode("utf-8"))
+        digest.update(normalize_text(text).encode("utf-8"))
+        return digest.hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, only calling the model for texts not in the cache"""
+        return self._embed(texts, "document")
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, only calling the model if it is not in the cache"""
+        return self._embed([text], "query")[0]
+
+    def clear(self) -> None:
+        """Remove all cached vectors of this model"""
+        with self._lock:
+            self._memory.clear()
+            self._connection.execute("DELETE FROM embeddings WHERE model = ?", (self.model_name,))
+            self._connection.commit()
+            self._count = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the cache database"""
+        with self._lock:
+            self._connection.close()
+
+    def _embed(self, texts: List[str], kind: str) -> List[List[float]]:
+        keys = [self.cache_key(text, kind) for text in texts]
+        with self._lock:
+            found = self._lookup(keys)
+
+        # Embed each distinct missing text once, in batches
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        if missing:
+            missing_keys = list(missing)
+            computed: Dict[str, List[float]] = {}
+            for start in range(0, len(missing_keys), self.batch_size):
+                batch_keys = missing_keys[start:start + self.batch_size]
+                batch_texts = [missing[key] for key in batch_keys]
+                if kind == "query":
+                    vectors = [self.embeddings.embed_query(text) for text in batch_texts]
+                else:
+                    vectors = self.embeddings.embed_documents(batch_texts)
+                self.stats.embed_calls += 1
+                computed.update(zip(batch_keys, vectors))
+            with self._lock:
+                self._store(computed)
+            found.update(computed)
+
+        return [found[key] for key in keys]
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Find cached vectors in memory, then on disk, refreshing their LRU position"""
+        found: Dict[str, List[float]] = {}
+        disk_keys = []
+        for key in dict.fromkeys(keys):
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                found[key] = vector
+            else:
+                disk_keys.append(key)
+        memory_keys = set(found)
+
+        for start in range(0, len(disk_keys), _LOOKUP_BATCH):
+            batch = disk_keys[start:start + _LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._connection.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+            ).fetchall()
+            for key, blob in rows:
+                vector = array("f")
+                vector.frombytes(blob)
+                found[key] = vector.tolist()
+                self._remember(key, found[key])
+
+        for key in keys:
+            if key in memory_keys:
+                self.stats.memory_hits += 1
+            elif key in found:
+                self.stats.disk_hits += 1
+            else:
+                self.stats.misses += 1
+
+        # Touch every hit with a single statement batch
+        if found:
+            self._clock += 1
+            self._connection.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(self._clock, key) for key in found],
+            )
+            self._connection.commit()
+        return found
+
+    def _store(self, vectors: Dict[str, List[float]]) -> None:
+        """Write new vectors and evict the least recently used ones over the limit"""
+        self._clock += 1
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, model, vector, last_used) VALUES (?, ?, ?, ?)",
+            [(key, self.model_name, array("f", vector).tobytes(), self._clock) for key, vector in vectors.items()],
+        )
+        self._count += len(vectors)
+        for key, vector in vectors.items():
+            self._remember(key, vector)
+
+        if self._count > self.max_entries:
+            self._count = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            excess = self._count - self.max_entries
+            if excess > 0:
+                self._connection.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+                self._count -= excess
+        self._connection.commit()
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        if self.memory_size == 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
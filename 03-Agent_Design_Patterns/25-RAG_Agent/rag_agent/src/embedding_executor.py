@@ -0,0 +1,138 @@
+"""
+Concurrent, batched embedding of chunks, streamed into a vector store as batches complete
+"""
+
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Deque, Iterator, List, Optional, Sequence, Tuple
+
+from langchain.schema import Document
+from langchain_core.embeddings import Embeddings
+
+
+@dataclass
+class EmbeddingThroughput:
+    """Work done by an embedding executor"""
+    chunks: int = 0
+    batches: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.chunks} chunks in {self.batches} batches, {self.seconds:.2f}s "
+                f"({self.chunks_per_second:.1f} chunks/s, {self.retries} retries)")
+
+
+class EmbeddingExecutor:
+    """Embed chunks in fixed-size batches with several requests in flight.
+
+    Batches are submitted to a thread pool, at most ``max_in_flight`` at a
+    time, and handed back in submission order as soon as each completes, so
+    the caller writes batch n to the index while batches n+1.. are still
+    being embedded. A failed request is retried up to ``max_retries`` times
+    with exponential backoff and jitter before the error propagates.
+    """
+
+    def __init__(self, embeddings: Embeddings, batch_size: int = 32, max_in_flight: int = 4,
+                 max_retries: int = 3, backoff: float = 0.5):
+        self.embeddings = embeddings
+        self.batch_size = max(batch_size, 1)
+        self.max_in_flight = max(max_in_flight, 1)
+        self.max_retries = max(max_retries, 0)
+        self.backoff = backoff
+        self.stats = EmbeddingThroughput()
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, keeping their order"""
+        vectors: List[List[float]] = []
+        for _, batch_vectors in self.stream(texts):
+            vectors.extend(batch_vectors)
+        return vectors
+
+    def stream(self, texts: Sequence[str]) -> Iterator[Tuple[int, List[List[float]]]]:
+        """Yield (offset, vectors) of each batch in order, while later batches are in flight"""
+        started = time.perf_counter()
+        pending: Deque[Tuple[int, Future]] = deque()
+        with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="embed") as pool:
+            try:
+                for offset in range(0, len(texts), self.batch_size):
+                    batch = list(texts[offset:offset + self.batch_size])
+                    pending.append((offset, pool.submit(self._embed_batch, batch)))
+                    # One batch waits behind the busy workers, so none idles while the caller writes
+                    if len(pending) > self.max_in_flight:
+                        yield self._next(pending)
+                while pending:
+                    yield self._next(pending)
+            finally:
+                for _, future in pending:
+                    future.cancel()
+                with self._lock:
+                    self.stats.seconds += time.perf_counter() - started
+
+    def add_documents(self, vector_store, documents: List[Document], ids: Optional[List[str]] = None,
+                      collection=None) -> List[str]:
+        """Embed documents and write each completed batch into the vector store
+
+        ``collection`` is the chromadb collection behind a Chroma store, see add_embedded.
+        """
+        if not documents:
+            return []
+        texts = [doc.page_content for doc in documents]
+        added: List[str] = []
+        for offset, vectors in self.stream(texts):
+            batch = documents[offset:offset + len(vectors)]
+            batch_ids = ids[offset:offset + len(vectors)] if ids else None
+            added.extend(add_embedded(vector_store, batch, vectors, batch_ids, collection))
+        return added
+
+    def _next(self, pending: Deque[Tuple[int, Future]]) -> Tuple[int, List[List[float]]]:
+        offset, future = pending.popleft()
+        return offset, future.result()
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                vectors = self.embeddings.embed_documents(texts)
+                break
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                with self._lock:
+                    self.stats.retries += 1
+                time.sleep(self.backoff * (2 ** attempt) * (1 + random.random()))
+        with self._lock:
+            self.stats.chunks += len(texts)
+            self.stats.batches += 1
+        return vectors
+
+
+def add_embedded(vector_store, documents: List[Document], vectors: List[List[float]],
+                 ids: Optional[List[str]] = None, collection=None) -> List[str]:
+    """Write documents with precomputed vectors, without embedding them again
+
+    LangChain's Chroma store has no method taking vectors, so for Chroma pass
+    the chromadb collection it wraps (``client.get_or_create_collection(name)``)
+    and the vectors are upserted into it directly. Other stores without
+    ``add_embeddings`` fall back to ``add_documents``, which embeds again.
+    """
+    texts = [doc.page_content for doc in documents]
+    metadatas = [doc.metadata for doc in documents]
+    if collection is not None:
+        # Chroma: the same upsert its add_texts issues after embedding
+        ids = ids or [str(uuid.uuid4()) for _ in documents]
+        collection.upsert(ids=ids, embeddings=vectors, documents=texts, metadatas=metadatas)
+        return ids
+    if hasattr(vector_store, "add_embeddings"):
+        # FAISS and the NumPy store
+        return vector_store.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas, ids=ids)
+    return vector_store.add_documents(documents, ids=ids)
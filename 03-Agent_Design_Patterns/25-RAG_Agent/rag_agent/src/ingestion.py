@@ -0,0 +1,165 @@
+"""
+Idempotent, content-addressed ingestion into a Chroma vector store
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from langchain.schema import Document
+
+from .embedding_executor import EmbeddingExecutor
+from .keyword_index import KeywordIndex
+
+
+@dataclass
+class IngestionReport:
+    """Outcome of syncing documents into a vector store"""
+    added: int = 0
+    skipped: int = 0
+    removed: int = 0
+    added_ids: List[str] = field(default_factory=list)
+    error: Optional[str] = None  # Set when the write failed and nothing was stored
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+    def merge(self, other: "IngestionReport") -> None:
+        """Add another report's counts, keeping its error if it failed"""
+        self.added += other.added
+        self.skipped += other.skipped
+        self.removed += other.removed
+        if other.failed:
+            self.error = other.error
+
+    def __str__(self) -> str:
+        summary = f"{self.added} added, {self.skipped} unchanged, {self.removed} removed"
+        return f"{summary}, failed: {self.error}" if self.failed else summary
+
+
+def chunk_id(source: str, content: str, occurrence: int = 0) -> str:
+    """Deterministic ID for a chunk: hash of its source and content.
+
+    ``occurrence`` distinguishes identical chunks repeated within one source.
+    """
+    digest = hashlib.sha256()
+    digest.update(source.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(content.encode("utf-8"))
+    if occurrence:
+        digest.update(f"\0{occurrence}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def assign_chunk_ids(documents: List[Document]) -> List[str]:
+    """Compute deterministic IDs for a list of chunks"""
+    ids = []
+    occurrences: Dict[str, int] = {}
+    for doc in documents:
+        source = str(doc.metadata.get("source", ""))
+        base_id = chunk_id(source, doc.page_content)
+        occurrence = occurrences.get(base_id, 0)
+        occurrences[base_id] = occurrence + 1
+        ids.append(base_id if occurrence == 0 else chunk_id(source, doc.page_content, occurrence))
+    return ids
+
+
+def existing_ids_for_source(vector_store, source: str) -> Set[str]:
+    """IDs of all chunks stored for a source"""
+    result = vector_store.get(where={"source": source}, include=[])
+    return set(result.get("ids", []))
+
+
+def sync_documents(vector_store, documents: List[Document],
+                   keyword_index: Optional[KeywordIndex] = None,
+                   executor: Optional[EmbeddingExecutor] = None,
+                   collection=None) -> IngestionReport:
+    """Add new chunks, skip unchanged ones and remove stale chunks of changed files.
+
+    Every chunk gets an ID derived from its source and content, so re-ingesting
+    the same files costs no embedding calls. For each source in ``documents``,
+    stored chunks that are no longer produced (the file changed) are deleted.
+    Sources not present in ``documents`` are left untouched.
+
+    The keyword index, if given, receives the same additions and removals;
+    unchanged chunks it does not know yet are backfilled.
+
+    Args:
+        vector_store: LangChain Chroma vector store
+        documents: Chunks to ingest, with a ``source`` metadata entry
+        keyword_index: BM25 index kept in step with the vector store
+        executor: Embeds new chunks concurrently and writes them batch by batch
+        collection: chromadb collection behind a Chroma store, receiving the executor's vectors
+
+    Returns:
+        IngestionReport with added/skipped/removed counts
+    """
+    report = IngestionReport()
+    if not documents:
+        return report
+
+    ids = assign_chunk_ids(documents)
+
+    # Group the new chunk IDs by source file
+    ids_by_source: Dict[str, Set[str]] = {}
+    for doc, doc_id in zip(documents, ids):
+        ids_by_source.setdefault(str(doc.metadata.get("source", "")), set()).add(doc_id)
+
+    stored_ids: Set[str] = set()
+    stale_ids: List[str] = []
+    for source, new_ids in ids_by_source.items():
+        existing = existing_ids_for_source(vector_store, source)
+        stored_ids.update(existing & new_ids)
+        stale_ids.extend(existing - new_ids)
+
+    if stale_ids:
+        vector_store.delete(ids=stale_ids)
+        if keyword_index is not None:
+            keyword_index.remove(stale_ids)
+        report.removed = len(stale_ids)
+
+    new_docs = []
+    new_ids = []
+    for doc, doc_id in zip(documents, ids):
+        if doc_id in stored_ids:
+            report.skipped += 1
+        else:
+            new_docs.append(doc)
+            new_ids.append(doc_id)
+
+    if new_docs:
+        if executor is not None:
+            executor.add_documents(vector_store, new_docs, new_ids, collection)
+        else:
+            vector_store.add_documents(new_docs, ids=new_ids)
+        report.added = len(new_docs)
+        report.added_ids = new_ids
+
+    if keyword_index is not None:
+        if report.added or report.removed:
+            # Invalidates answers cached against the previous collection contents
+            keyword_index.bump_version()
+        unindexed = keyword_index.missing(ids)
+        if unindexed:
+            keyword_index.add(
+                [doc_id for doc_id in ids if doc_id in unindexed],
+                [doc for doc, doc_id in zip(documents, ids) if doc_id in unindexed],
+            )
+
+    return report
+
+
+def remove_sources(vector_store, sources: List[str],
+                   keyword_index: Optional[KeywordIndex] = None) -> int:
+    """Delete every chunk of the given source files, returning how many were removed"""
+    stale_ids: List[str] = []
+    for source in sources:
+        stale_ids.extend(existing_ids_for_source(vector_store, source))
+    if not stale_ids:
+        return 0
+
+    vector_store.delete(ids=stale_ids)
+    if keyword_index is not None:
+        keyword_index.remove(stale_ids)
+        keyword_index.bump_version()
+    return len(stale_ids)
@@ -0,0 +1,195 @@
+"""
+BM25 keyword index stored in SQLite alongside a Chroma collection
+"""
+
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from langchain.schema import Document
+
+from .metadata_filter import create_filter_indexes, filter_sql
+
+# Words, keeping identifiers such as error codes, dotted names and versions in one piece
+_TOKEN_PATTERN = re.compile(r"\w+(?:[.\-:/]\w+)*")
+_PART_PATTERN = re.compile(r"[.\-:/_]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase tokens; compound identifiers also yield their parts"""
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group()
+        tokens.append(token)
+        parts = [part for part in _PART_PATTERN.split(token) if part]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+class KeywordIndex:
+    """Inverted index with BM25 scoring, updated incrementally at ingest time.
+
+    Postings, document lengths and chunk texts live in SQLite, so the index
+    survives restarts and only the postings of the query terms are read at
+    search time. Chunk metadata is indexed on the filter fields, so filtered
+    searches only read postings of matching chunks. Every statement on the
+    shared connection runs under one lock, so a background writer never
+    interleaves with reads.
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id TEXT PRIMARY KEY, length INTEGER NOT NULL,
+                content TEXT NOT NULL, metadata TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL, id TEXT NOT NULL, tf INTEGER NOT NULL,
+                PRIMARY KEY (term, id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_id ON postings (id);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO meta VALUES ('version', 0);
+        """)
+        create_filter_indexes(self._connection, "documents")
+        self._connection.commit()
+        self._doc_count, self._total_length = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM documents"
+        ).fetchone()
+
+    def __len__(self) -> int:
+        return self._doc_count
+
+    @property
+    def version(self) -> int:
+        """Counter bumped whenever the indexed collection changes, shared across processes"""
+        with self._lock:
+            return self._connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def bump_version(self) -> None:
+        """Mark the collection as changed"""
+        with self._lock:
+            self._connection.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            self._connection.commit()
+
+    def add(self, ids: Sequence[str], documents: Sequence[Document]) -> None:
+        """Index documents under the given IDs, replacing existing entries"""
+        with self._lock:
+            self._delete(ids)
+            doc_rows = []
+            posting_rows = []
+            for doc_id, doc in zip(ids, documents):
+                terms = Counter(tokenize(doc.page_content))
+                length = sum(terms.values())
+                doc_rows.append((doc_id, length, doc.page_content, json.dumps(doc.metadata, default=str)))
+                posting_rows.extend((term, doc_id, tf) for term, tf in terms.items())
+                self._doc_count += 1
+                self._total_length += length
+
+            self._connection.executemany("INSERT INTO documents VALUES (?, ?, ?, ?)", doc_rows)
+            self._connection.executemany("INSERT INTO postings VALUES (?, ?, ?)", posting_rows)
+            self._connection.commit()
+
+    def remove(self, ids: Iterable[str]) -> None:
+        """Remove documents from the index"""
+        with self._lock:
+            self._delete(list(ids))
+            self._connection.commit()
+
+    def missing(self, ids: Iterable[str]) -> Set[str]:
+        """IDs that are not indexed yet"""
+        ids = list(ids)
+        found: Set[str] = set()
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                found.update(row[0] for row in self._connection.execute(
+                    f"SELECT id FROM documents WHERE id IN ({placeholders})", batch
+                ))
+        return set(ids) - found
+
+    def clear(self) -> None:
+        """Remove every document"""
+        with self._lock:
+            self._connection.execute("DELETE FROM postings")
+            self._connection.execute("DELETE FROM documents")
+            self._connection.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            self._connection.commit()
+            self._doc_count = self._total_length = 0
+
+    def search(self, query: str, k: int = 5, filter: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        """Top-k (id, BM25 score) pairs for a query, among chunks whose metadata matches filter"""
+        terms = set(tokenize(query))
+        condition, params = filter_sql(filter, metadata_column="d.metadata")
+        scores: Dict[str, float] = {}
+        with self._lock:
+            if not terms or not self._doc_count:
+                return []
+            average_length = self._total_length / self._doc_count
+            for term in terms:
+                postings = self._connection.execute(
+                    "SELECT p.id, p.tf, d.length FROM postings p JOIN documents d ON d.id = p.id "
+                    f"WHERE p.term = ? AND {condition}", (term, *params)
+                ).fetchall()
+                if not postings:
+                    continue
+                df = len(postings)
+                if filter:
+                    # Document frequency over the whole collection, so filtering does not change the scores
+                    df = self._connection.execute(
+                        "SELECT COUNT(*) FROM postings WHERE term = ?", (term,)
+                    ).fetchone()[0]
+                idf = math.log(1 + (self._doc_count - df + 0.5) / (df + 0.5))
+                for doc_id, tf, length in postings:
+                    norm = tf + self.k1 * (1 - self.b + self.b * length / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def get_documents(self, ids: Sequence[str]) -> Dict[str, Document]:
+        """Stored documents keyed by ID; unknown IDs are left out"""
+        if not ids:
+            return {}
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT id, content, metadata FROM documents WHERE id IN ({placeholders})", list(ids)
+            ).fetchall()
+        return {
+            doc_id: Document(page_content=content, metadata=json.loads(metadata))
+            for doc_id, content, metadata in rows
+        }
+
+    def close(self) -> None:
+        """Close the index database"""
+        with self._lock:
+            self._connection.close()
+
+    def _delete(self, ids: Sequence[str]) -> None:
+        for start in range(0, len(ids), 500):
+            batch = list(ids[start:start + 500])
+            placeholders = ",".join("?" * len(batch))
+            removed = self._connection.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(length), 0) FROM documents WHERE id IN ({placeholders})", batch
+            ).fetchone()
+            self._doc_count -= removed[0]
+            self._total_length -= removed[1]
+            self._connection.execute(f"DELETE FROM postings WHERE id IN ({placeholders})", batch)
+            self._connection.execute(f"DELETE FROM documents WHERE id IN ({placeholders})", batch)
@@ -0,0 +1,271 @@
+"""
+Single-pass, structure-aware chunking of Markdown and plain text
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from langchain.schema import Document
+
+FENCE = re.compile(r" {0,3}(`{3,}|~{3,})")
+HEADING = re.compile(r" {0,3}(#{1,6})[ \t]+(.*?)[ \t#]*$")
+
+# Separator between heading titles in a chunk's "headings" metadata
+HEADING_SEPARATOR = " > "
+
+
+@dataclass
+class Block:
+    """A structural unit of the text: heading, fenced code, table or paragraph"""
+    kind: str
+    start: int
+    end: int
+    headings: Tuple[str, ...]
+
+
+@dataclass
+class Chunk:
+    """A chunk of text with its character and UTF-8 byte offsets in the source"""
+    text: str
+    start: int
+    end: int
+    start_byte: int
+    end_byte: int
+    headings: Tuple[str, ...] = ()
+
+
+def scan_blocks(text: str) -> List[Block]:
+    """Split text into blocks in one pass over its lines
+
+    Fenced code blocks and tables are kept whole, every heading is its own
+    block, and other lines are grouped into paragraphs separated by blank
+    lines. Each block records the heading path it appears under.
+    """
+    blocks: List[Block] = []
+    path: List[Tuple[int, str]] = []
+    headings: Tuple[str, ...] = ()
+    current: Optional[List] = None  # [kind, start, end] of the open paragraph or table
+    fence: Optional[Tuple[str, int, int]] = None  # (marker, length, start) of the open code block
+    position = 0
+
+    for line in text.splitlines(keepends=True):
+        # Blocks end before their final line break, so it does not count towards their size
+        end = position + len(line.rstrip("\r\n"))
+        if fence is not None:
+            stripped = line.strip()
+            if stripped.startswith(fence[0] * fence[1]) and not stripped.strip(fence[0]):
+                blocks.append(Block("code", fence[2], end, headings))
+                fence = None
+            position += len(line)
+            continue
+
+        if not line.strip():
+            kind = None
+        elif FENCE.match(line):
+            kind = "fence"
+        elif HEADING.match(line):
+            kind = "heading"
+        elif line.lstrip().startswith("|"):
+            kind = "table"
+        else:
+            kind = "text"
+
+        # A paragraph or table continues until the kind of line changes
+        if current is not None and current[0] == kind:
+            current[2] = end
+            position += len(line)
+            continue
+        if current is not None:
+            blocks.append(Block(current[0], current[1], current[2], headings))
+            current = None
+
+        if kind == "fence":
+            marker = FENCE.match(line).group(1)
+            fence = (marker[0], len(marker), position)
+        elif kind == "heading":
+            match = HEADING.match(line.rstrip("\r\n"))
+            level = len(match.group(1))
+            while path and path[-1][0] >= level:
+                path.pop()
+            path.append((level, match.group(2)))
+            headings = tuple(title for _, title in path)
+            blocks.append(Block("heading", position, end, headings))
+        elif kind is not None:
+            current = [kind, position, end]
+        position += len(line)
+
+    if current is not None:
+        blocks.append(Block(current[0], current[1], current[2], headings))
+    if fence is not None:
+        # Unterminated fence: the code block runs to the end of the text
+        blocks.append(Block("code", fence[2], len(text), headings))
+    return blocks
+
+
+class MarkdownChunker:
+    """Chunk Markdown (and plain text) along its structure in linear time.
+
+    Chunks are packed from whole blocks and never straddle a heading, so a
+    chunk belongs to one section. Code blocks and tables stay intact unless
+    a single one exceeds ``chunk_size``; it is then cut at line boundaries.
+    Oversized paragraphs are cut at the last newline, sentence end or space
+    before the limit. When a section continues in a new chunk, up to
+    ``chunk_overlap`` characters of trailing paragraphs are repeated.
+
+    Every chunk is an exact slice of the input and carries its character and
+    UTF-8 byte offsets. It is a drop-in replacement for LangChain's text
+    splitters (split_text, create_documents, split_documents), adding
+    start_index, end_index, start_byte, end_byte and headings metadata.
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) must be smaller than chunk_size ({chunk_size})")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = max(chunk_overlap, 0)
+
+    def chunk(self, text: str) -> List[Chunk]:
+        """Chunks of a text with their offsets and heading paths"""
+        spans = self._pack(text, scan_blocks(text))
+        byte_offsets = _byte_offsets(text, [position for start, end, _ in spans for position in (start, end)])
+        return [
+            Chunk(text[start:end], start, end, byte_offsets[start], byte_offsets[end], headings)
+            for start, end, headings in spans
+        ]
+
+    def split_text(self, text: str) -> List[str]:
+        """Chunk texts only"""
+        return [chunk.text for chunk in self.chunk(text)]
+
+    def create_documents(self, texts: Sequence[str],
+                         metadatas: Optional[Sequence[Dict]] = None) -> List[Document]:
+        """Chunk texts into documents, copying each text's metadata and adding offsets"""
+        documents = []
+        for i, text in enumerate(texts):
+            metadata = metadatas[i] if metadatas else {}
+            for chunk in self.chunk(text):
+                chunk_metadata = dict(metadata)
+                chunk_metadata.update(
+                    start_index=chunk.start, end_index=chunk.end,
+                    start_byte=chunk.start_byte, end_byte=chunk.end_byte
+                )
+                if chunk.headings:
+                    chunk_metadata["headings"] = HEADING_SEPARATOR.join(chunk.headings)
+                documents.append(Document(page_content=chunk.text, metadata=chunk_metadata))
+        return documents
+
+    def split_documents(self, documents: Iterable[Document]) -> List[Document]:
+        """Chunk documents, keeping each one's metadata"""
+        documents = list(documents)
+        return self.create_documents([doc.page_content for doc in documents], [doc.metadata for doc in documents])
+
+    def _pack(self, text: str, blocks: List[Block]) -> List[Tuple[int, int, Tuple[str, ...]]]:
+        """Group consecutive blocks into (start, end, headings) spans of at most chunk_size characters"""
+        spans: List[Tuple[int, int, Tuple[str, ...]]] = []
+        current: List[Block] = []
+
+        def flush():
+            if current:
+                self._add_span(spans, text, current[0].start, current[-1].end, current[0].headings)
+
+        for block in blocks:
+            # A heading starts a new chunk unless the chunk so far holds only headings
+            if block.kind == "heading" and any(b.kind != "heading" for b in current):
+                flush()
+                current = []
+
+            if block.end - block.start > self.chunk_size:
+                # Headings waiting for content open the first piece instead of forming a chunk alone
+                start = block.start
+                if current and all(b.kind == "heading" for b in current):
+                    start = current[0].start
+                else:
+                    flush()
+                current = []
+                for piece_start, piece_end in self._split_block(text, block, start):
+                    self._add_span(spans, text, piece_start, piece_end, block.headings)
+                continue
+
+            if current and block.end - current[0].start > self.chunk_size:
+                flush()
+                current = self._overlap(current, block)
+            current.append(block)
+        flush()
+        return spans
+
+    def _overlap(self, previous: List[Block], block: Block) -> List[Block]:
+        """Trailing paragraphs of the previous chunk to repeat before block"""
+        carried: List[Block] = []
+        for candidate in reversed(previous):
+            if (candidate.kind != "text" or previous[-1].end - candidate.start > self.chunk_overlap
+                    or block.end - candidate.start > self.chunk_size):
+                break
+            carried.insert(0, candidate)
+        return carried
+
+    def _split_block(self, text: str, block: Block, start: int) -> Iterable[Tuple[int, int]]:
+        """Cut text[start:block.end] into pieces: code and tables at lines, prose at natural breaks"""
+        if block.kind in ("code", "table"):
+            line_end = start
+            while line_end < block.end:
+                next_line = text.find("\n", line_end, block.end)
+                next_line = block.end if next_line == -1 else next_line + 1
+                if next_line - start > self.chunk_size:
+                    if line_end > start:
+                        yield start, line_end
+                        start = line_end
+                    # A single line longer than a chunk is cut hard
+                    while next_line - start > self.chunk_size:
+                        yield start, start + self.chunk_size
+                        start += self.chunk_size
+                line_end = next_line
+            if block.end > start:
+                yield start, block.end
+            return
+
+        while start < block.end:
+            limit = min(start + self.chunk_size, block.end)
+            if limit == block.end:
+                yield start, limit
+                return
+            end = self._break_before(text, start, limit)
+            yield start, end
+            # Step back by the overlap, then forward to the start of a word
+            next_start = max(end - self.chunk_overlap, start + 1)
+            if next_start < end:
+                space = text.find(" ", next_start, end)
+                next_start = space + 1 if space != -1 else end
+            start = next_start
+
+    @staticmethod
+    def _break_before(text: str, start: int, limit: int) -> int:
+        """Last natural break in text[start:limit], preferring newlines, then sentence ends, then spaces"""
+        floor = start + (limit - start) // 2
+        for separator, keep in (("\n", 0), (". ", 1), (" ", 0)):
+            position = text.rfind(separator, floor, limit)
+            if position != -1:
+                return position + keep
+        return limit
+
+    @staticmethod
+    def _add_span(spans: List, text: str, start: int, end: int, headings: Tuple[str, ...]) -> None:
+        """Record a span without surrounding whitespace, dropping empty ones"""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if end > start:
+            spans.append((start, end, headings))
+
+
+def _byte_offsets(text: str, positions: List[int]) -> Dict[int, int]:
+    """UTF-8 byte offset of each character position, computed in one pass"""
+    if text.isascii():
+        return {position: position for position in positions}
+    offsets = {}
+    previous, byte = 0, 0
+    for position in sorted(set(positions)):
+        byte += len(text[previous:position].encode("utf-8", "surrogatepass"))
+        offsets[position] = byte
+        previous = position
+    return offsets
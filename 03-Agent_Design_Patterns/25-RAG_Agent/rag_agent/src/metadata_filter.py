@@ -0,0 +1,189 @@
+"""
+Metadata filters for retrieval, written in Chroma's ``where`` syntax
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Metadata attached at ingestion that the SQLite-backed indexes build filter indexes for
+FILTER_FIELDS = ("source", "file_type", "total_pages", "page_start", "page_end", "depth", "title")
+
+COMPARISONS = {"$eq": "=", "$ne": "!=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+MEMBERSHIP = {"$in": "IN", "$nin": "NOT IN"}
+
+# CLI expressions: field, operator, value ("file_type=pdf", "page_start>=3")
+_EXPRESSION = re.compile(r"^\s*([\w.]+)\s*(>=|<=|!=|=|>|<)\s*(.*?)\s*$")
+_CLI_OPERATORS = {"=": "$eq", "!=": "$ne", ">": "$gt", ">=": "$gte", "<": "$lt", "<=": "$lte"}
+_IDENTIFIER = re.compile(r"^[A-Za-z_]\w*$")
+
+
+def normalize_filter(filter: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Canonical where clause: one operator per condition, several conditions joined with $and
+
+    Accepts the shorthand ``{"source": "a.pdf", "page_start": {"$gte": 3}}``,
+    which Chroma rejects, and returns ``None`` for an empty filter.
+    """
+    if not filter:
+        return None
+
+    conditions = []
+    for key, value in filter.items():
+        if key in ("$and", "$or"):
+            parts = [part for part in (normalize_filter(part) for part in value) if part]
+            if len(parts) == 1:
+                conditions.append(parts[0])
+            elif parts:
+                conditions.append({key: parts})
+        elif key.startswith("$"):
+            raise ValueError(f"Unsupported filter operator {key!r}")
+        elif isinstance(value, dict):
+            for operator, operand in value.items():
+                if operator not in COMPARISONS and operator not in MEMBERSHIP:
+                    raise ValueError(f"Unsupported filter operator {operator!r} on {key!r}")
+                if operator in MEMBERSHIP and not isinstance(operand, (list, tuple)):
+                    raise ValueError(f"{operator} on {key!r} needs a list of values")
+                conditions.append({key: {operator: list(operand) if operator in MEMBERSHIP else operand}})
+        else:
+            conditions.append({key: {"$eq": value}})
+
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def parse_filter(expressions: Sequence[str]) -> Optional[Dict[str, Any]]:
+    """Filter from CLI expressions such as ``file_type=pdf`` or ``page_start>=3``
+
+    Numbers are compared as numbers. Repeating ``field=value`` for the same
+    field matches any of the values.
+    """
+    equal: Dict[str, List[Any]] = {}
+    conditions = []
+    for expression in expressions:
+        match = _EXPRESSION.match(expression)
+        if not match:
+            raise ValueError(f"Invalid filter {expression!r}, expected e.g. file_type=pdf or page_start>=3")
+        field, operator, raw = match.groups()
+        value = _parse_value(raw)
+        if operator == "=":
+            equal.setdefault(field, []).append(value)
+        else:
+            conditions.append({field: {_CLI_OPERATORS[operator]: value}})
+
+    for field, values in equal.items():
+        conditions.append({field: {"$eq": values[0]} if len(values) == 1 else {"$in": values}})
+    return normalize_filter({"$and": conditions}) if conditions else None
+
+
+def _parse_value(raw: str) -> Any:
+    for convert in (int, float):
+        try:
+            return convert(raw)
+        except ValueError:
+            pass
+    return raw
+
+
+def matches(metadata: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+    """Whether metadata satisfies a filter; a missing field fails every condition on it"""
+    filter = normalize_filter(filter)
+    if filter is None:
+        return True
+    if "$and" in filter:
+        return all(matches(metadata, part) for part in filter["$and"])
+    if "$or" in filter:
+        return any(matches(metadata, part) for part in filter["$or"])
+
+    (key, condition), = filter.items()
+    (operator, operand), = condition.items()
+    if key not in metadata:
+        return False
+    value = metadata[key]
+    try:
+        if operator == "$eq":
+            return value == operand
+        if operator == "$ne":
+            return value != operand
+        if operator == "$gt":
+            return value > operand
+        if operator == "$gte":
+            return value >= operand
+        if operator == "$lt":
+            return value < operand
+        if operator == "$lte":
+            return value <= operand
+        if operator == "$in":
+            return value in operand
+        return value not in operand
+    except TypeError:
+        # Incomparable types (e.g. a number against a string) never match
+        return False
+
+
+def json_field(field: str, column: str = "metadata") -> Tuple[str, List[Any]]:
+    """SQL expression extracting a field from a JSON column
+
+    Plain identifiers are written as literal paths, so the expression matches
+    the one the filter indexes were created on and SQLite can use them.
+    """
+    if _IDENTIFIER.match(field):
+        return f"json_extract({column}, '$.{field}')", []
+    return f"json_extract({column}, ?)", [f'$."{field}"']
+
+
+def filter_sql(filter: Optional[Dict[str, Any]], columns: Optional[Dict[str, str]] = None,
+               metadata_column: str = "metadata") -> Tuple[str, List[Any]]:
+    """SQL condition and parameters selecting rows whose metadata satisfies a filter
+
+    Fields listed in ``columns`` are read from those table columns instead of
+    the JSON metadata. An empty filter selects every row.
+    """
+    filter = normalize_filter(filter)
+    if filter is None:
+        return "1", []
+
+    for combinator, joiner in (("$and", " AND "), ("$or", " OR ")):
+        if combinator in filter:
+            parts = [filter_sql(part, columns, metadata_column) for part in filter[combinator]]
+            return (
+                "(" + joiner.join(sql for sql, _ in parts) + ")",
+                [param for _, params in parts for param in params]
+            )
+
+    (key, condition), = filter.items()
+    (operator, operand), = condition.items()
+    if columns and key in columns:
+        expression, params = columns[key], []
+    else:
+        expression, params = json_field(key, metadata_column)
+
+    if operator in MEMBERSHIP:
+        values = [_sql_value(value) for value in operand]
+        if not values:
+            return ("0" if operator == "$in" else f"{expression} IS NOT NULL"), params
+        placeholders = ",".join("?" * len(values))
+        return f"{expression} {MEMBERSHIP[operator]} ({placeholders})", params + values
+    return f"{expression} {COMPARISONS[operator]} ?", params + [_sql_value(operand)]
+
+
+def _sql_value(value: Any) -> Any:
+    # json_extract returns JSON true/false as 1/0
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def create_filter_indexes(connection, table: str, columns: Sequence[str] = (),
+                          metadata_column: str = "metadata") -> None:
+    """Create expression indexes on the filter fields of a table's JSON metadata
+
+    Fields stored in their own ``columns`` are expected to be indexed already.
+    """
+    for field in FILTER_FIELDS:
+        if field in columns:
+            continue
+        expression, _ = json_field(field, metadata_column)
+        connection.execute(f"CREATE INDEX IF NOT EXISTS {table}_{field} ON {table} ({expression})")
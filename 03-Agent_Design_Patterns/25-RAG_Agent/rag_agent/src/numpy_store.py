@@ -0,0 +1,437 @@
+"""
+In-process vector index on a memory-mapped NumPy matrix, an embedded alternative to Chroma
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain.schema import Document
+
+from .metadata_filter import create_filter_indexes, filter_sql
+
+# Rows scored per matrix multiplication, bounding temporary memory
+BLOCK_ROWS = 16384
+INITIAL_CAPACITY = 1024
+
+# IVF lists are trained once the collection holds this many vectors per list
+IVF_MIN_ROWS_PER_LIST = 39
+IVF_SAMPLE_PER_LIST = 256
+IVF_ITERATIONS = 10
+
+
+class NumpyVectorStore:
+    """Cosine similarity search over a memory-mapped matrix, without a database server.
+
+    Vectors are L2-normalised and stored in ``vectors.npy``, as float32 or,
+    with ``quantize``, as int8 with a per-row scale (4x smaller, slightly
+    lower recall). IDs, chunk text and metadata live in a SQLite side table
+    with an index per filter field, which resolves metadata filters (Chroma
+    ``where`` syntax) to the rows a search may score. Rows freed by deletions
+    are reused.
+
+    A search multiplies the query batch with the matrix block by block and
+    keeps the top k of each block. With ``ivf_lists`` > 0 the rows are
+    partitioned by spherical k-means once the collection is large enough,
+    and only the ``nprobe`` lists closest to a query are scored.
+
+    Implements the part of the LangChain vector store API that
+    VectorStoreManager and ingestion use: add_documents, add_embeddings,
+    delete, get, similarity_search, similarity_search_with_score and persist.
+    Scores are cosine distances (lower is closer). Chroma collections are
+    created with its default squared L2 distance, so scores of the two
+    backends are ordered the same way but not comparable with each other.
+    """
+
+    def __init__(self, directory: str, embeddings, quantize: bool = False,
+                 ivf_lists: int = 0, nprobe: int = 8):
+        self.directory = directory
+        self.embeddings = embeddings
+        self.quantize = quantize
+        self.ivf_lists = max(ivf_lists, 0)
+        self.nprobe = max(nprobe, 1)
+        self.dtype = np.int8 if quantize else np.float32
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(os.path.join(directory, "metadata.sqlite"), check_same_thread=False)
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS rows (
+                row INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, source TEXT,
+                content TEXT NOT NULL, metadata TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS rows_source ON rows (source);
+            CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        """)
+        create_filter_indexes(self._connection, "rows", columns=("source",))
+        self._connection.commit()
+        self._check_dtype()
+        self._open()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._alive[:self._size].sum())
+
+    def add_documents(self, documents: List[Document], ids: Optional[List[str]] = None, **kwargs) -> List[str]:
+        """Embed and store documents; an existing ID is replaced"""
+        if not documents:
+            return []
+        vectors = self.embeddings.embed_documents([doc.page_content for doc in documents])
+        return self.add_embeddings(
+            list(zip([doc.page_content for doc in documents], vectors)),
+            metadatas=[doc.metadata for doc in documents], ids=ids
+        )
+
+    def add_embeddings(self, text_embeddings: Sequence[Tuple[str, Sequence[float]]],
+                       metadatas: Optional[List[Dict[str, Any]]] = None,
+                       ids: Optional[List[str]] = None, **kwargs) -> List[str]:
+        """Store texts with vectors computed elsewhere; an existing ID is replaced"""
+        if not text_embeddings:
+            return []
+        texts = [text for text, _ in text_embeddings]
+        metadatas = metadatas or [{} for _ in texts]
+        ids = list(ids) if ids else [uuid.uuid4().hex for _ in texts]
+        vectors = self._normalize([vector for _, vector in text_embeddings])
+
+        with self._lock:
+            self._delete_ids(ids)
+            rows = self._allocate(len(ids))
+            self._ensure_capacity(int(rows.max()) + 1, vectors.shape[1])
+            self._write_vectors(rows, vectors)
+            self._connection.executemany(
+                "INSERT INTO rows VALUES (?, ?, ?, ?, ?)",
+                [
+                    (int(row), doc_id, metadata.get("source"), text, json.dumps(metadata, default=str))
+                    for row, doc_id, text, metadata in zip(rows, ids, texts, metadatas)
+                ]
+            )
+            self._connection.commit()
+            self._alive[rows] = True
+            self._size = max(self._size, int(rows.max()) + 1)
+            self._update_ivf(rows, vectors)
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs) -> bool:
+        """Delete documents by ID"""
+        if not ids:
+            return False
+        with self._lock:
+            self._delete_ids(ids)
+            self._connection.commit()
+        return True
+
+    def delete_all(self) -> None:
+        """Remove every vector, document and IVF list"""
+        with self._lock:
+            self._connection.execute("DELETE FROM rows")
+            self._connection.execute("DELETE FROM settings WHERE key != 'dtype'")
+            self._connection.commit()
+            self._close_arrays()
+            for name in ("vectors.npy", "scales.npy", "lists.npy", "centroids.npy"):
+                path = os.path.join(self.directory, name)
+                if os.path.exists(path):
+                    os.remove(path)
+            self._open()
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+            include: Optional[Sequence[str]] = None, **kwargs) -> Dict[str, List[Any]]:
+        """Chroma-style lookup by IDs and/or a metadata filter"""
+        include = ["documents", "metadatas"] if include is None else include
+        condition, params = self._filter_sql(where)
+        if ids is not None:
+            condition += f" AND id IN ({','.join('?' * len(ids))})"
+            params.extend(ids)
+        query = f"SELECT id, content, metadata FROM rows WHERE {condition}"
+
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        result: Dict[str, List[Any]] = {"ids": [doc_id for doc_id, _, _ in rows]}
+        if "documents" in include:
+            result["documents"] = [content for _, content, _ in rows]
+        if "metadatas" in include:
+            result["metadatas"] = [json.loads(metadata) for _, _, metadata in rows]
+        return result
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None,
+                          **kwargs) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None,
+                                     **kwargs) -> List[Tuple[Document, float]]:
+        """Top-k documents with their cosine distance"""
+        return self.similarity_search_with_score_by_vectors([self.embeddings.embed_query(query)], k, filter)[0]
+
+    def batch_similarity_search_with_score(self, queries: List[str], k: int = 4,
+                                           filter: Optional[Dict[str, Any]] = None
+                                           ) -> List[List[Tuple[Document, float]]]:
+        """Search several queries with one matrix multiplication per block"""
+        return self.similarity_search_with_score_by_vectors(
+            [self.embeddings.embed_query(query) for query in queries], k, filter
+        )
+
+    def similarity_search_with_score_by_vectors(self, vectors: Sequence[Sequence[float]], k: int = 4,
+                                                filter: Optional[Dict[str, Any]] = None
+                                                ) -> List[List[Tuple[Document, float]]]:
+        """Top-k documents with their cosine distance for each query vector"""
+        queries = self._normalize(vectors)
+        with self._lock:
+            if self._vectors is None or k <= 0:
+                return [[] for _ in range(len(queries))]
+
+            # A filter is resolved through the side table's indexes before any vector is scored
+            candidates = None
+            if filter:
+                condition, params = self._filter_sql(filter)
+                candidates = np.array(sorted(
+                    row for (row,) in self._connection.execute(f"SELECT row FROM rows WHERE {condition}", params)
+                ), dtype=np.int64)
+
+            if self._centroids is None or (candidates is not None and len(candidates) <= BLOCK_ROWS):
+                # Few enough candidates to score them all exactly, without missing any in unprobed lists
+                hits = self._top_k(queries, k, candidates)
+            else:
+                # Each query probes its own lists
+                hits = [self._top_k(query[None, :], k, self._probe(query, candidates))[0] for query in queries]
+            return [self._documents(query_hits) for query_hits in hits]
+
+    def persist(self) -> None:
+        """Flush the memory-mapped arrays to disk"""
+        with self._lock:
+            for array in (self._vectors, self._scales, self._lists):
+                if array is not None:
+                    array.flush()
+            self._connection.commit()
+
+    def train_ivf(self) -> bool:
+        """Partition the stored vectors into ``ivf_lists`` lists; False if there are too few"""
+        with self._lock:
+            rows = np.flatnonzero(self._alive[:self._size])
+            if not self.ivf_lists or len(rows) < self.ivf_lists * IVF_MIN_ROWS_PER_LIST:
+                return False
+
+            rng = np.random.default_rng(0)
+            sample_size = min(len(rows), self.ivf_lists * IVF_SAMPLE_PER_LIST)
+            sample = self._read_vectors(np.sort(rng.choice(rows, sample_size, replace=False)))
+            centroids = sample[rng.choice(len(sample), self.ivf_lists, replace=False)].copy()
+            for _ in range(IVF_ITERATIONS):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                for list_id in range(self.ivf_lists):
+                    members = sample[assignment == list_id]
+                    if len(members):
+                        centroids[list_id] = members.sum(axis=0)
+                centroids = self._normalize(centroids)
+
+            self._centroids = centroids
+            np.save(os.path.join(self.directory, "centroids.npy"), centroids)
+            for start in range(0, len(rows), BLOCK_ROWS):
+                block = rows[start:start + BLOCK_ROWS]
+                self._lists[block] = np.argmax(self._read_vectors(block) @ centroids.T, axis=1)
+            self._set_setting("ivf_trained_rows", len(rows))
+            self._connection.commit()
+            return True
+
+    def _open(self) -> None:
+        """Map the arrays stored in the directory and rebuild the live-row mask"""
+        self._vectors = self._load_array("vectors.npy")
+        self._scales = self._load_array("scales.npy")
+        self._lists = self._load_array("lists.npy")
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+
+        self._alive = np.zeros(capacity, dtype=bool)
+        live_rows = [row for (row,) in self._connection.execute("SELECT row FROM rows")]
+        if live_rows:
+            self._alive[live_rows] = True
+        self._size = max(live_rows) + 1 if live_rows else 0
+
+        self._centroids = None
+        centroids_path = os.path.join(self.directory, "centroids.npy")
+        if self.ivf_lists and self._lists is not None and os.path.exists(centroids_path):
+            centroids = np.load(centroids_path)
+            if centroids.shape[0] == self.ivf_lists:
+                self._centroids = centroids
+            else:
+                # Trained for another list count: search exactly until retrained
+                self._lists[:] = -1
+                self._set_setting("ivf_trained_rows", 0)
+                self._connection.commit()
+
+    def _load_array(self, name: str) -> Optional[np.ndarray]:
+        path = os.path.join(self.directory, name)
+        return np.load(path, mmap_mode="r+") if os.path.exists(path) else None
+
+    def _close_arrays(self) -> None:
+        self._vectors = self._scales = self._lists = None
+        self._centroids = None
+
+    def _check_dtype(self) -> None:
+        """Refuse to open a float32 index as int8 and vice versa"""
+        stored = self._get_setting("dtype")
+        requested = np.dtype(self.dtype).name
+        if stored is None:
+            self._set_setting("dtype", requested)
+            self._connection.commit()
+        elif stored != requested:
+            raise ValueError(f"Vector index at {self.directory} stores {stored} vectors; "
+                             f"open it with quantize={stored == 'int8'} or delete the collection")
+
+    def _get_setting(self, key: str) -> Optional[str]:
+        row = self._connection.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_setting(self, key: str, value: Any) -> None:
+        self._connection.execute("INSERT OR REPLACE INTO settings VALUES (?, ?)", (key, str(value)))
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _allocate(self, count: int) -> np.ndarray:
+        """Row numbers for new vectors, reusing rows of deleted ones first"""
+        free = np.flatnonzero(~self._alive[:self._size])[:count]
+        extra = np.arange(self._size, self._size + count - len(free))
+        return np.concatenate([free, extra]).astype(np.int64)
+
+    def _ensure_capacity(self, rows: int, dimensions: int) -> None:
+        """Create or grow (doubling) the memory-mapped arrays to hold ``rows`` rows"""
+        if self._vectors is not None:
+            if self._vectors.shape[1] != dimensions:
+                raise ValueError(f"Embedding size {dimensions} does not match the index ({self._vectors.shape[1]})")
+            if rows <= self._vectors.shape[0]:
+                return
+        old_capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        capacity = max(INITIAL_CAPACITY, old_capacity * 2, rows)
+
+        arrays = {"vectors.npy": (self._vectors, self.dtype, (capacity, dimensions), 0)}
+        if self.quantize:
+            arrays["scales.npy"] = (self._scales, np.float32, (capacity,), 0)
+        arrays["lists.npy"] = (self._lists, np.int32, (capacity,), -1)
+
+        for name, (old, dtype, shape, fill) in arrays.items():
+            path = os.path.join(self.directory, name)
+            temp_path = os.path.join(self.directory, f"tmp-{name}")
+            grown = np.lib.format.open_memmap(temp_path, mode="w+", dtype=dtype, shape=shape)
+            grown[:] = fill
+            if old is not None:
+                grown[:old.shape[0]] = old
+            grown.flush()
+            del grown
+            os.replace(temp_path, path)
+
+        self._vectors = self._load_array("vectors.npy")
+        self._scales = self._load_array("scales.npy")
+        self._lists = self._load_array("lists.npy")
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:old_capacity] = self._alive
+        self._alive = alive
+
+    def _write_vectors(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        if self.quantize:
+            scales = np.abs(vectors).max(axis=1) / 127
+            scales[scales == 0] = 1.0
+            self._vectors[rows] = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+            self._scales[rows] = scales
+        else:
+            self._vectors[rows] = vectors
+
+    def _read_vectors(self, rows) -> np.ndarray:
+        """Float32 vectors of rows (an index array or a slice)"""
+        vectors = np.asarray(self._vectors[rows], dtype=np.float32)
+        if self.quantize:
+            vectors *= self._scales[rows][:, None]
+        return vectors
+
+    def _delete_ids(self, ids: Sequence[str]) -> None:
+        for start in range(0, len(ids), 500):
+            batch = list(ids[start:start + 500])
+            placeholders = ",".join("?" * len(batch))
+            rows = [row for (row,) in self._connection.execute(
+                f"SELECT row FROM rows WHERE id IN ({placeholders})", batch
+            )]
+            if rows:
+                self._connection.execute(f"DELETE FROM rows WHERE id IN ({placeholders})", batch)
+                self._alive[rows] = False
+                self._lists[rows] = -1
+
+    def _update_ivf(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        """Assign new rows to their nearest list, retraining when the collection has doubled"""
+        if not self.ivf_lists:
+            return
+        trained_rows = int(self._get_setting("ivf_trained_rows") or 0)
+        live = int(self._alive[:self._size].sum())
+        if self._centroids is None or live >= 2 * trained_rows:
+            if self.train_ivf():
+                return
+        if self._centroids is not None:
+            self._lists[rows] = np.argmax(vectors @ self._centroids.T, axis=1)
+
+    def _probe(self, query: np.ndarray, candidates: Optional[np.ndarray]) -> np.ndarray:
+        """Rows in the query's nearest lists, plus rows not assigned to a list yet"""
+        probed = np.argsort(-(self._centroids @ query))[:self.nprobe]
+        lists = self._lists[:self._size]
+        rows = np.flatnonzero(self._alive[:self._size] & (np.isin(lists, probed) | (lists < 0)))
+        if candidates is not None:
+            rows = np.intersect1d(rows, candidates, assume_unique=True)
+        return rows
+
+    def _top_k(self, queries: np.ndarray, k: int,
+               candidates: Optional[np.ndarray]) -> List[List[Tuple[int, float]]]:
+        """Best k (row, similarity) pairs per query, scoring BLOCK_ROWS rows at a time"""
+        best_rows = [np.empty(0, dtype=np.int64) for _ in range(len(queries))]
+        best_scores = [np.empty(0, dtype=np.float32) for _ in range(len(queries))]
+
+        total = self._size if candidates is None else len(candidates)
+        for start in range(0, total, BLOCK_ROWS):
+            if candidates is None:
+                rows = np.arange(start, min(start + BLOCK_ROWS, total))
+                selection = slice(start, start + len(rows))
+            else:
+                rows = candidates[start:start + BLOCK_ROWS]
+                selection = rows
+
+            scores = np.asarray(self._vectors[selection], dtype=np.float32) @ queries.T
+            if self.quantize:
+                # Scale the scores rather than dequantising the whole block
+                scores *= self._scales[selection][:, None]
+            scores[~self._alive[selection]] = -np.inf
+            for i in range(len(queries)):
+                column = scores[:, i]
+                top = np.argpartition(-column, k - 1)[:k] if len(column) > k else np.arange(len(column))
+                best_rows[i] = np.concatenate([best_rows[i], rows[top]])
+                best_scores[i] = np.concatenate([best_scores[i], column[top]])
+
+        results = []
+        for rows, scores in zip(best_rows, best_scores):
+            order = np.argsort(-scores)[:k]
+            results.append([(int(rows[j]), float(scores[j])) for j in order if np.isfinite(scores[j])])
+        return results
+
+    def _documents(self, hits: List[Tuple[int, float]]) -> List[Tuple[Document, float]]:
+        """Load the documents of (row, similarity) hits, returning (document, distance)"""
+        if not hits:
+            return []
+        placeholders = ",".join("?" * len(hits))
+        stored = {
+            row: (doc_id, content, metadata)
+            for row, doc_id, content, metadata in self._connection.execute(
+                f"SELECT row, id, content, metadata FROM rows WHERE row IN ({placeholders})",
+                [row for row, _ in hits]
+            )
+        }
+        results = []
+        for row, similarity in hits:
+            doc_id, content, metadata = stored[row]
+            results.append((Document(page_content=content, metadata=json.loads(metadata), id=doc_id),
+                            1.0 - similarity))
+        return results
+
+    @staticmethod
+    def _filter_sql(where: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+        """SQL condition for a metadata filter; source has its own column"""
+        return filter_sql(where, columns={"source": "source"})
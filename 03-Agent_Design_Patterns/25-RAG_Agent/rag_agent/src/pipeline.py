@@ -0,0 +1,236 @@
+"""
+Streaming ingestion pipeline: discover -> parse -> split -> batch -> embed and upsert
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Union
+from langchain.schema import Document
+
+from .document_processor import DocumentProcessor, load_file
+from .ingestion import IngestionReport
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+@dataclass
+class StageMetrics:
+    """Work done by one pipeline stage"""
+    name: str
+    items: int = 0
+    busy_seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Items per busy second"""
+        return self.items / self.busy_seconds if self.busy_seconds else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.items} in {self.busy_seconds:.2f}s ({self.throughput:.1f}/s)"
+
+
+@dataclass
+class PipelineProgress:
+    """Snapshot passed to the progress callback after every upserted batch"""
+    files_discovered: int = 0
+    files_parsed: int = 0
+    chunks: int = 0
+    batches: int = 0
+    report: IngestionReport = field(default_factory=IngestionReport)
+    elapsed: float = 0.0
+    stages: Dict[str, StageMetrics] = field(default_factory=dict)
+
+
+class _Stopped(Exception):
+    """Raised inside a stage when the pipeline is shutting down"""
+
+
+class IngestionPipeline:
+    """Stream documents from disk into a VectorStoreManager.
+
+    Files are discovered lazily and parsed in a process pool, chunks are
+    split and grouped into batches that are embedded and upserted while
+    later files are still being parsed. Stages run in their own threads and
+    are connected by bounded queues, so a slow embedding stage blocks parsing
+    instead of letting parsed documents pile up in memory.
+
+    A file's chunks always go into the same batch, because ingestion removes
+    stale chunks per source.
+    """
+
+    def __init__(self, processor: DocumentProcessor, vector_store, workers: Optional[int] = None,
+                 batch_size: int = 64, queue_size: int = 8,
+                 progress: Optional[Callable[[PipelineProgress], None]] = None):
+        self.processor = processor
+        self.vector_store = vector_store
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.batch_size = max(batch_size, 1)
+        self.queue_size = max(queue_size, 1)
+        self.progress = progress
+
+    def run(self, path: Union[str, Path]) -> PipelineProgress:
+        """Ingest every supported file under path, returning the final progress"""
+        state = PipelineProgress(stages={
+            name: StageMetrics(name) for name in ("discover", "parse", "split", "upsert")
+        })
+        stop = threading.Event()
+        parsed: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        batches: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        errors: List[BaseException] = []
+        started = time.perf_counter()
+
+        def run_stage(target, *args):
+            try:
+                target(*args)
+            except _Stopped:
+                pass
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+
+        threads = [
+            threading.Thread(target=run_stage, args=(self._parse_stage, path, parsed, state, stop), daemon=True),
+            threading.Thread(target=run_stage, args=(self._split_stage, parsed, batches, state, stop), daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        # Embed and upsert in the calling thread
+        try:
+            for batch in self._drain(batches, stop):
+                timer = time.perf_counter()
+                report = self.vector_store.ingest_documents(batch)
+                metrics = state.stages["upsert"]
+                metrics.busy_seconds += time.perf_counter() - timer
+                metrics.items += len(batch)
+
+                state.report.merge(report)
+                state.batches += 1
+                state.elapsed = time.perf_counter() - started
+                if self.progress:
+                    self.progress(state)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            raise errors[0]
+        state.elapsed = time.perf_counter() - started
+        return state
+
+    def _parse_stage(self, path, output: "queue.Queue", state: PipelineProgress,
+                     stop: threading.Event) -> None:
+        """Discover files and parse them, keeping a bounded number in flight"""
+        discover = state.stages["discover"]
+        parse = state.stages["parse"]
+        max_in_flight = max(self.workers, 1) * 2
+
+        files = self.processor.iter_files(path)
+        if self.workers <= 1:
+            for file_path in self._timed(files, discover, state):
+                timer = time.perf_counter()
+                documents = load_file(file_path, self.processor.pdf_workers)
+                parse.busy_seconds += time.perf_counter() - timer
+                parse.items += 1
+                state.files_parsed += 1
+                self._put(output, documents, stop)
+            self._put(output, _DONE, stop)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending: Set[Future] = set()
+            submitted: Dict[Future, float] = {}
+            try:
+                for file_path in self._timed(files, discover, state):
+                    # Files are already parsed in parallel, so each PDF is read by one worker
+                    future = pool.submit(load_file, str(file_path))
+                    submitted[future] = time.perf_counter()
+                    pending.add(future)
+                    # Backpressure: stop discovering while the pool is saturated
+                    while len(pending) >= max_in_flight:
+                        pending = self._collect(pending, submitted, output, state, stop)
+                while pending:
+                    pending = self._collect(pending, submitted, output, state, stop)
+            finally:
+                for future in pending:
+                    future.cancel()
+        self._put(output, _DONE, stop)
+
+    def _collect(self, pending: Set[Future], submitted: Dict[Future, float], output: "queue.Queue",
+                 state: PipelineProgress, stop: threading.Event) -> Set[Future]:
+        """Wait for at least one parse to finish and forward its documents"""
+        done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+        if stop.is_set():
+            raise _Stopped()
+        parse = state.stages["parse"]
+        for future in done:
+            parse.busy_seconds += time.perf_counter() - submitted.pop(future)
+            parse.items += 1
+            state.files_parsed += 1
+            self._put(output, future.result(), stop)
+        return pending
+
+    def _split_stage(self, parsed: "queue.Queue", output: "queue.Queue", state: PipelineProgress,
+                     stop: threading.Event) -> None:
+        """Split parsed documents and group whole files into batches"""
+        split = state.stages["split"]
+        batch: List[Document] = []
+        for documents in self._drain(parsed, stop):
+            timer = time.perf_counter()
+            chunks = self.processor.split_documents(documents)
+            split.busy_seconds += time.perf_counter() - timer
+            split.items += len(chunks)
+            state.chunks += len(chunks)
+
+            batch.extend(chunks)
+            if len(batch) >= self.batch_size:
+                self._put(output, batch, stop)
+                batch = []
+        if batch:
+            self._put(output, batch, stop)
+        self._put(output, _DONE, stop)
+
+    @staticmethod
+    def _timed(files: Iterable[Path], metrics: StageMetrics, state: PipelineProgress) -> Iterator[Path]:
+        """Wrap file discovery to count files and time the walk"""
+        iterator = iter(files)
+        while True:
+            timer = time.perf_counter()
+            file_path = next(iterator, None)
+            metrics.busy_seconds += time.perf_counter() - timer
+            if file_path is None:
+                return
+            metrics.items += 1
+            state.files_discovered += 1
+            yield file_path
+
+    @staticmethod
+    def _put(output: "queue.Queue", item, stop: threading.Event) -> None:
+        """Put an item, blocking while the queue is full unless the pipeline stops"""
+        while True:
+            if stop.is_set():
+                raise _Stopped()
+            try:
+                output.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    @staticmethod
+    def _drain(source: "queue.Queue", stop: threading.Event) -> Iterator:
+        """Yield items from a queue until the end marker or a stop"""
+        while not stop.is_set():
+            try:
+                item = source.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                return
+            yield item
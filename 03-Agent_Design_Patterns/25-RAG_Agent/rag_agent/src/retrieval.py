@@ -0,0 +1,91 @@
+"""
+Hybrid retrieval: dense Chroma search fused with BM25 keyword search
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+from langchain.schema import Document
+
+from .ingestion import chunk_id
+from .keyword_index import KeywordIndex
+from .metadata_filter import normalize_filter
+
+# Rank offset of reciprocal rank fusion; dampens the weight of the very top ranks
+RRF_K = 60
+
+
+def document_key(doc: Document) -> str:
+    """Stable identity of a retrieved chunk, matching the IDs used at ingest time"""
+    doc_id = getattr(doc, "id", None)
+    if doc_id:
+        return doc_id
+    return chunk_id(str(doc.metadata.get("source", "")), doc.page_content)
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], weights: Optional[Sequence[float]] = None,
+                           rrf_k: int = RRF_K) -> List[str]:
+    """Fuse ranked ID lists: score(d) = sum_i weight_i / (rrf_k + rank_i(d))"""
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        if weight <= 0:
+            continue
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + weight / (rrf_k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+@dataclass
+class HybridSearchConfig:
+    """Weights and depths of hybrid search"""
+    dense_weight: float = 1.0
+    keyword_weight: float = 1.0
+    fetch_k: int = 20
+    rrf_k: int = RRF_K
+
+
+class HybridRetriever:
+    """Fetch candidates from a Chroma store and a KeywordIndex and fuse their rankings"""
+
+    def __init__(self, vector_store, keyword_index: Optional[KeywordIndex],
+                 config: Optional[HybridSearchConfig] = None):
+        self.vector_store = vector_store
+        self.keyword_index = keyword_index
+        self.config = config or HybridSearchConfig()
+
+    def search(self, query: str, k: int = 5, filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """Top-k chunks by weighted reciprocal rank fusion
+
+        A metadata filter (Chroma ``where`` syntax) restricts both rankings to
+        matching chunks before they are scored, so it never costs recall.
+        """
+        config = self.config
+        fetch_k = max(config.fetch_k, k)
+        filter = normalize_filter(filter)
+        filter_kwargs = {"filter": filter} if filter else {}
+
+        dense_docs: List[Document] = []
+        if config.dense_weight > 0:
+            dense_docs = self.vector_store.similarity_search(query, k=fetch_k, **filter_kwargs)
+        by_key = {document_key(doc): doc for doc in dense_docs}
+        dense_ranking = list(by_key)
+
+        keyword_ranking: List[str] = []
+        if self.keyword_index is not None and config.keyword_weight > 0:
+            keyword_ranking = [
+                doc_id for doc_id, _ in self.keyword_index.search(query, k=fetch_k, **filter_kwargs)
+            ]
+
+        if not keyword_ranking:
+            return dense_docs[:k]
+
+        fused = reciprocal_rank_fusion(
+            [dense_ranking, keyword_ranking],
+            [config.dense_weight, config.keyword_weight],
+            config.rrf_k,
+        )[:k]
+
+        # Keyword-only hits are loaded from the index's copy of the chunk text
+        missing = [key for key in fused if key not in by_key]
+        by_key.update(self.keyword_index.get_documents(missing))
+        return [by_key[key] for key in fused if key in by_key]
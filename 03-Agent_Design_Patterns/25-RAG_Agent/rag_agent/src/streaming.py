@@ -0,0 +1,104 @@
+"""
+Token streaming out of LangGraph agents, with time-to-first-token per query
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterator, Optional
+
+
+@dataclass
+class QueryTiming:
+    """Latency of one answered query"""
+    time_to_first_token: float
+    total: float
+    tokens: int = 0
+    cached: bool = False
+
+    def __str__(self) -> str:
+        produced = "from cache" if self.cached else f"{self.tokens} tokens"
+        return f"first token {self.time_to_first_token * 1000:.0f} ms, {produced} in {self.total:.2f}s"
+
+
+class LatencyStats:
+    """Time-to-first-token and total latency of the most recent queries"""
+
+    def __init__(self, window: int = 100):
+        self.timings: Deque[QueryTiming] = deque(maxlen=window)
+
+    def record(self, timing: QueryTiming):
+        self.timings.append(timing)
+
+    @property
+    def last(self) -> Optional[QueryTiming]:
+        return self.timings[-1] if self.timings else None
+
+    def __str__(self) -> str:
+        if not self.timings:
+            return "no queries yet"
+        first = sorted(timing.time_to_first_token for timing in self.timings)
+        total = sum(timing.total for timing in self.timings) / len(self.timings)
+        p50 = first[len(first) // 2]
+        p95 = first[min(int(len(first) * 0.95), len(first) - 1)]
+        return (f"{len(first)} queries, first token p50 {p50 * 1000:.0f} ms / p95 {p95 * 1000:.0f} ms, "
+                f"mean total {total:.2f}s")
+
+
+class GraphTokenStream:
+    """Tokens generated inside one node of a compiled graph, as they arrive.
+
+    Iterating runs the graph with ``stream_mode=["messages", "values"]``:
+    chat model chunks emitted while ``node`` runs are yielded as text, and
+    the latest full state is kept in ``state``. When the node streamed
+    nothing (a model that does not stream, or an error branch that skipped
+    it), the final state's ``response_key`` is yielded whole instead.
+    ``timing`` holds the query's latency once iteration finishes.
+    """
+
+    def __init__(self, graph, initial_state: Dict[str, Any], node: str = "generate_response",
+                 response_key: str = "response", started: Optional[float] = None):
+        self.graph = graph
+        self.initial_state = initial_state
+        self.node = node
+        self.response_key = response_key
+        self.started = started
+        self.state: Optional[Dict[str, Any]] = None
+        self.timing: Optional[QueryTiming] = None
+
+    def __iter__(self) -> Iterator[str]:
+        started = self.started if self.started is not None else time.perf_counter()
+        first_token = None
+        tokens = 0
+        for mode, payload in self.graph.stream(self.initial_state, stream_mode=["messages", "values"]):
+            if mode == "values":
+                self.state = payload
+                continue
+            message, metadata = payload
+            if metadata.get("langgraph_node") != self.node:
+                continue
+            text = message_text(message)
+            if not text:
+                continue
+            if first_token is None:
+                first_token = time.perf_counter() - started
+            tokens += 1
+            yield text
+
+        if first_token is None:
+            first_token = time.perf_counter() - started
+            response = (self.state or {}).get(self.response_key)
+            if response:
+                yield response
+        self.timing = QueryTiming(first_token, time.perf_counter() - started, tokens)
+
+
+def message_text(message) -> str:
+    """Text content of a message chunk, whose content may be a string or a list of parts"""
+    content = getattr(message, "content", message)
+    if isinstance(content, str):
+        return content
+    return "".join(
+        part if isinstance(part, str) else part.get("text", "")
+        for part in content if isinstance(part, (str, dict))
+    )
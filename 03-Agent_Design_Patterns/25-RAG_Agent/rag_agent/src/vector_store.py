@@ -4,18 +4,52 @@ Vector store management using ChromaDB
 
 import chromadb
 from chromadb.config import Settings
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
 from langchain.schema import Document
 from langchain_community.embeddings import OllamaEmbeddings
 from langchain_community.vectorstores import Chroma
 import tempfile
+import threading
+import time
 import os
 
+from .embedding_cache import CachedEmbeddings
+from .embedding_executor import EmbeddingExecutor
+from .ingestion import IngestionReport, remove_sources, sync_documents
+from .keyword_index import KeywordIndex
+from .metadata_filter import normalize_filter
+from .numpy_store import NumpyVectorStore
+from .retrieval import HybridRetriever, HybridSearchConfig
+
+# Storage engines a collection can live in
+VECTOR_BACKENDS = ("chroma", "numpy")
+
+@dataclass
+class SearchStats:
+    """Latency counters of the searches run against one collection"""
+    searches: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    
+    @property
+    def average_ms(self) -> float:
+        return self.total_seconds / self.searches * 1000 if self.searches else 0.0
+
+
 class VectorStoreManager:
     """Manage ChromaDB vector store operations"""
     
-    def __init__(self, collection_name: str = "default", persist_directory: str = None):
+    def __init__(self, collection_name: str = "default", persist_directory: str = None,
+                 embedding_cache_path: Optional[str] = None, embeddings: Optional[CachedEmbeddings] = None,
+                 backend: str = "chroma", quantize: bool = False, ivf_lists: int = 0,
+                 embed_batch_size: int = 32, embed_concurrency: int = 4):
+        if backend not in VECTOR_BACKENDS:
+            raise ValueError(f"Unknown vector backend {backend!r}, expected one of {', '.join(VECTOR_BACKENDS)}")
         self.collection_name = collection_name
+        self.backend = backend
+        self.quantize = quantize
+        self.ivf_lists = ivf_lists
         
         # Set up persist directory
         if persist_directory is None:
@@ -26,80 +60,199 @@ class VectorStoreManager:
         # Create directory if it doesn't exist
         os.makedirs(self.persist_directory, exist_ok=True)
         
-        # Initialize embeddings (using Ollama's embedding model)
-        self.embeddings = OllamaEmbeddings(model="llama3.2")
+        # Initialize embeddings (using Ollama's embedding model), cached on disk across collections
+        self.embeddings = embeddings or CachedEmbeddings(
+            OllamaEmbeddings(model="llama3.2"),
+            model_name="llama3.2",
+            path=embedding_cache_path
+        )
+        # New chunks are embedded with several requests in flight and stored batch by batch
+        self.embedding_executor = EmbeddingExecutor(
+            self.embeddings, batch_size=embed_batch_size, max_in_flight=embed_concurrency
+        )
+        self.search_stats = SearchStats()
+        self._stats_lock = threading.Lock()
+        
+        # Initialize ChromaDB client (the NumPy backend needs no client)
+        self.client = chromadb.PersistentClient(path=self.persist_directory) if backend == "chroma" else None
         
-        # Initialize ChromaDB client
-        self.client = chromadb.PersistentClient(path=self.persist_directory)
+        # BM25 index kept next to the collection for keyword matches (identifiers, error codes)
+        if backend == "numpy":
+            keyword_index_path = os.path.join(self._numpy_directory(), "keyword_index.sqlite")
+        else:
+            keyword_index_path = os.path.join(self.persist_directory, "keyword_index", f"{collection_name}.sqlite")
+        self.keyword_index = KeywordIndex(keyword_index_path)
         
         # Initialize vector store
         self.vector_store = None
+        self.collection = None
         self._initialize_vector_store()
+        
+        # Hybrid retrievers reused across queries, one per search configuration
+        self._retrievers = {}
     
     def _initialize_vector_store(self):
-        """Initialize the Chroma vector store"""
+        """Initialize the Chroma or NumPy vector store"""
         try:
+            if self.backend == "numpy":
+                self.vector_store = NumpyVectorStore(
+                    self._numpy_directory(), self.embeddings,
+                    quantize=self.quantize, ivf_lists=self.ivf_lists
+                )
+                return
             self.vector_store = Chroma(
+                client=self.client,
                 collection_name=self.collection_name,
                 embedding_function=self.embeddings,
                 persist_directory=self.persist_directory
             )
+            # Precomputed vectors are written to the same collection through the public client
+            self.collection = self.client.get_or_create_collection(name=self.collection_name, embedding_function=None)
         except Exception as e:
             print(f"Error initializing vector store: {e}")
             raise
     
+    def _numpy_directory(self) -> str:
+        return os.path.join(self.persist_directory, "numpy", self.collection_name)
+    
+    @property
+    def collection_version(self) -> str:
+        """Identifier of the current collection contents, changed by every ingestion that alters it"""
+        return f"{self.persist_directory}:{self.backend}:{self.collection_name}:{self.keyword_index.version}"
+    
     def add_documents(self, documents: List[Document]) -> List[str]:
-        """Add documents to the vector store"""
+        """Add documents to the vector store, skipping chunks already stored"""
+        return self.ingest_documents(documents).added_ids
+    
+    def ingest_documents(self, documents: List[Document]) -> IngestionReport:
+        """Sync documents into the vector store using content-addressed chunk IDs
+        
+        Unchanged chunks are skipped and stale chunks of changed files are
+        removed, so re-ingesting the same files makes no embedding calls.
+        If the write fails, the returned report's ``error`` is set.
+        """
         if not documents:
-            return []
+            return IngestionReport()
         
         try:
-            # Add documents to vector store
-            ids = self.vector_store.add_documents(documents)
+            report = sync_documents(
+                self.vector_store, documents, self.keyword_index, self.embedding_executor, self.collection
+            )
             
             # Persist the changes
-            self.vector_store.persist()
+            if report.added or report.removed:
+                self.vector_store.persist()
             
-            return ids
+            return report
         except Exception as e:
             print(f"Error adding documents: {e}")
-            return []
+            return IngestionReport(error=str(e) or type(e).__name__)
+    
+    def remove_sources(self, sources: List[str]) -> int:
+        """Delete all chunks of files that no longer exist"""
+        if not sources:
+            return 0
+        
+        try:
+            removed = remove_sources(self.vector_store, sources, self.keyword_index)
+            if removed:
+                self.vector_store.persist()
+            return removed
+        except Exception as e:
+            print(f"Error removing documents: {e}")
+            return 0
     
-    def similarity_search(self, query: str, k: int = 5) -> List[Document]:
-        """Search for similar documents"""
+    def similarity_search(self, query: str, k: int = 5, filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """Search for similar documents, only among chunks whose metadata matches filter
+        
+        Filters use Chroma's where syntax, e.g. {"source": "notes.pdf", "page_start": {"$gte": 3}}.
+        Both backends resolve them from their metadata indexes before scoring vectors.
+        """
         if not self.vector_store:
             return []
         
         try:
-            results = self.vector_store.similarity_search(query, k=k)
+            start = time.perf_counter()
+            results = self.vector_store.similarity_search(query, k=k, **self._filter_kwargs(filter))
+            self._record_search(time.perf_counter() - start)
             return results
         except Exception as e:
             print(f"Error during similarity search: {e}")
             return []
     
-    def similarity_search_with_score(self, query: str, k: int = 5) -> List[tuple]:
-        """Search for similar documents with similarity scores"""
+    def hybrid_search(self, query: str, k: int = 5, dense_weight: float = 1.0,
+                      keyword_weight: float = 1.0, fetch_k: int = 20,
+                      filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """Search with dense similarity and BM25, fused by weighted reciprocal rank"""
+        if not self.vector_store:
+            return []
+        
+        try:
+            retriever = self.get_hybrid_retriever(
+                HybridSearchConfig(dense_weight=dense_weight, keyword_weight=keyword_weight, fetch_k=fetch_k)
+            )
+            return retriever.search(query, k=k, filter=filter)
+        except Exception as e:
+            print(f"Error during hybrid search: {e}")
+            return []
+    
+    def get_hybrid_retriever(self, config: Optional[HybridSearchConfig] = None) -> HybridRetriever:
+        """Hybrid retriever for a search configuration, built once and reused"""
+        config = config or HybridSearchConfig()
+        key = (config.dense_weight, config.keyword_weight, config.fetch_k, config.rrf_k)
+        retriever = self._retrievers.get(key)
+        if retriever is None:
+            # Searches go through this manager, so the retriever survives collection re-initialisation
+            retriever = HybridRetriever(self, self.keyword_index, config)
+            self._retrievers[key] = retriever
+        return retriever
+    
+    def similarity_search_with_score(self, query: str, k: int = 5,
+                                     filter: Optional[Dict[str, Any]] = None) -> List[tuple]:
+        """Search for similar documents with similarity scores, optionally filtered by metadata"""
         if not self.vector_store:
             return []
         
         try:
-            results = self.vector_store.similarity_search_with_score(query, k=k)
+            start = time.perf_counter()
+            results = self.vector_store.similarity_search_with_score(query, k=k, **self._filter_kwargs(filter))
+            self._record_search(time.perf_counter() - start)
             return results
         except Exception as e:
             print(f"Error during similarity search with score: {e}")
             return []
     
+    @staticmethod
+    def _filter_kwargs(filter: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Search keyword arguments for a filter, in the canonical form Chroma accepts"""
+        filter = normalize_filter(filter)
+        return {"filter": filter} if filter else {}
+    
+    def _record_search(self, seconds: float):
+        """Add a search to the latency counters"""
+        with self._stats_lock:
+            self.search_stats.searches += 1
+            self.search_stats.total_seconds += seconds
+            self.search_stats.max_seconds = max(self.search_stats.max_seconds, seconds)
+    
     def delete_collection(self):
         """Delete the current collection"""
         try:
-            self.client.delete_collection(name=self.collection_name)
-            self._initialize_vector_store()
+            if self.backend == "numpy":
+                self.vector_store.delete_all()
+            else:
+                self.client.delete_collection(name=self.collection_name)
+                self._initialize_vector_store()
+            self.keyword_index.clear()
         except Exception as e:
             print(f"Error deleting collection: {e}")
     
     def list_collections(self) -> List[str]:
         """List all available collections"""
         try:
+            if self.backend == "numpy":
+                directory = os.path.join(self.persist_directory, "numpy")
+                return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
             collections = self.client.list_collections()
             return [collection.name for collection in collections]
         except Exception as e:
@@ -109,8 +262,22 @@ class VectorStoreManager:
     def get_collection_count(self) -> int:
         """Get the number of documents in the collection"""
         try:
+            if self.backend == "numpy":
+                return len(self.vector_store)
             collection = self.client.get_collection(name=self.collection_name)
             return collection.count()
         except Exception as e:
             print(f"Error getting collection count: {e}")
-            return 0
\ No newline at end of file
+            return 0
+    
+    def get_collection_stats(self) -> Dict[str, Any]:
+        """Size, location and search latency of the collection"""
+        return {
+            "name": self.collection_name,
+            "backend": self.backend,
+            "directory": self.persist_directory,
+            "count": self.get_collection_count(),
+            "searches": self.search_stats.searches,
+            "avg_search_ms": self.search_stats.average_ms,
+            "max_search_ms": self.search_stats.max_seconds * 1000,
+        }
@@ -0,0 +1,192 @@
+"""
+Live re-indexing: poll a file or directory and sync changed files into a vector store
+"""
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from .document_processor import DocumentProcessor, load_file
+from .ingestion import IngestionReport
+
+
+@dataclass
+class FileState:
+    """What the watcher last saw of a file"""
+    mtime_ns: int
+    size: int
+    digest: str
+
+
+@dataclass
+class WatchUpdate:
+    """Changes applied by one poll"""
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    report: IngestionReport = field(default_factory=IngestionReport)
+    elapsed: float = 0.0
+
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.removed)
+
+    def __str__(self) -> str:
+        return f"{len(self.changed)} files changed, {len(self.removed)} removed ({self.report})"
+
+
+def file_digest(path: Union[str, Path], block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DirectoryWatcher:
+    """Keep a vector store in sync with a file or directory by polling.
+
+    Every poll compares modification times and sizes with the previous scan.
+    Files whose metadata changed are hashed, and only those whose content
+    differs are parsed and ingested again; chunks of deleted files are
+    removed. Changed files are written a few at a time (whole files, about
+    ``batch_size`` chunks per write), so searches running concurrently in
+    the chat loop only ever wait for a short write. Files of a failed write
+    are not recorded, so the next poll tries them again.
+    """
+
+    def __init__(self, path: Union[str, Path], processor: DocumentProcessor, vector_store,
+                 interval: float = 2.0, batch_size: int = 32,
+                 on_update: Optional[Callable[[WatchUpdate], None]] = None):
+        self.path = Path(path)
+        self.processor = processor
+        self.vector_store = vector_store
+        self.interval = interval
+        self.batch_size = max(batch_size, 1)
+        self.on_update = on_update
+
+        self._files: Dict[str, FileState] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def file_count(self) -> int:
+        return len(self._files)
+
+    def snapshot(self) -> int:
+        """Record the current files as indexed without ingesting them, returning their count
+
+        Take the snapshot before the initial ingestion, so edits made while
+        it runs are picked up by the first poll.
+        """
+        self._files = {}
+        for source, stat in self._scan():
+            try:
+                self._files[source] = FileState(stat.st_mtime_ns, stat.st_size, file_digest(source))
+            except OSError:
+                continue
+        return len(self._files)
+
+    def poll(self) -> WatchUpdate:
+        """Scan once and apply every change to the vector store"""
+        started = time.perf_counter()
+        update = WatchUpdate()
+        current = dict(self._scan())
+
+        update.removed = sorted(self._files.keys() - current.keys())
+        if update.removed:
+            update.report.removed += self.vector_store.remove_sources(update.removed)
+            for source in update.removed:
+                del self._files[source]
+
+        changed = self._changed_files(current)
+        batch, pending, emptied = [], [], []
+        for source, state in changed:
+            if self._stop.is_set():
+                break  # unrecorded files are picked up again by the next poll
+
+            chunks = self.processor.split_documents(load_file(source, self.processor.pdf_workers))
+            if chunks:
+                batch.extend(chunks)
+                pending.append((source, state))
+            else:
+                emptied.append(source)
+                self._files[source] = state
+            update.changed.append(source)
+
+            if len(batch) >= self.batch_size:
+                self._flush(batch, pending, update.report)
+                batch, pending = [], []
+        self._flush(batch, pending, update.report)
+
+        if emptied:
+            # A file that no longer yields any text keeps no chunks
+            update.report.removed += self.vector_store.remove_sources(emptied)
+
+        update.elapsed = time.perf_counter() - started
+        return update
+
+    def start(self) -> None:
+        """Poll in a background thread until stop() is called"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="document-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling, waiting for a running poll to finish its current batch"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                update = self.poll()
+            except Exception as e:
+                print(f"Error watching {self.path}: {e}")
+                continue
+            if update and self.on_update:
+                self.on_update(update)
+
+    def _scan(self) -> Iterator[Tuple[str, object]]:
+        """(source, stat) of every supported file under the watched path"""
+        for file_path in self.processor.iter_files(self.path):
+            try:
+                yield str(file_path), file_path.stat()
+            except OSError:
+                continue  # deleted between listing and stat
+
+    def _changed_files(self, current: Dict[str, object]) -> List[Tuple[str, FileState]]:
+        """New files and files whose content differs from the last scan"""
+        changed = []
+        for source in sorted(current):
+            stat = current[source]
+            previous = self._files.get(source)
+            if previous is not None and (previous.mtime_ns, previous.size) == (stat.st_mtime_ns, stat.st_size):
+                continue
+
+            try:
+                state = FileState(stat.st_mtime_ns, stat.st_size, file_digest(source))
+            except OSError:
+                continue
+            if previous is not None and previous.digest == state.digest:
+                self._files[source] = state  # touched but not edited
+                continue
+            changed.append((source, state))
+        return changed
+
+    def _flush(self, batch, pending: List[Tuple[str, FileState]], report: IngestionReport) -> None:
+        """Upsert one batch of whole files and mark them as indexed if the write succeeded"""
+        if not batch:
+            return
+        result = self.vector_store.ingest_documents(batch)
+        report.merge(result)
+        if result.failed:
+            return  # unrecorded files are retried by the next poll
+        for source, state in pending:
+            self._files[source] = state
@@ -0,0 +1,59 @@
+"""Pytest configuration and fixtures"""
+
+import hashlib
+import tempfile
+from pathlib import Path
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic embeddings recording every request, failing the first `failures` calls
+
+    Vectors come from ``vectors`` when the text is listed there, otherwise
+    from a hash of the text, so equal texts always get equal vectors.
+    """
+
+    def __init__(self, vectors=None, failures: int = 0, dimensions: int = 16):
+        self.vectors = dict(vectors or {})
+        self.failures = failures
+        self.dimensions = dimensions
+        self.calls = []
+        self.queries = []
+
+    @property
+    def embedded(self):
+        """Every document text sent to embed_documents, in order"""
+        return [text for call in self.calls for text in call]
+
+    def embed_documents(self, texts):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("embedding server busy")
+        self.calls.append(list(texts))
+        return [self.vector(text) for text in texts]
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return self.vector(text)
+
+    def vector(self, text):
+        """The vector this model returns for a text"""
+        if text in self.vectors:
+            return list(self.vectors[text])
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [(byte - 127.5) / 127.5 for byte in digest[:self.dimensions]]
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary directory for tests"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+@pytest.fixture
+def embeddings():
+    """Fake embedding model recording the texts it embeds"""
+    return FakeEmbeddings()
@@ -0,0 +1,93 @@
+"""Tests for the two-level answer cache"""
+
+import pytest
+
+from src.answer_cache import AnswerCache, LazyEmbedding
+
+
+@pytest.fixture
+def cache(temp_dir):
+    """Answer cache in a temporary database"""
+    cache = AnswerCache(str(temp_dir / "answers.sqlite"), similarity_threshold=0.9)
+    yield cache
+    cache.close()
+
+
+def test_exact_hit_ignores_case_and_whitespace(cache):
+    """Test that the exact level matches normalised query text"""
+    cache.store("What is BM25?", version="v1", answer="A ranking function")
+
+    assert cache.lookup("  what is   bm25? ", version="v1") == "A ranking function"
+    assert cache.stats.exact_hits == 1
+
+
+def test_version_context_and_model_scope_answers(cache):
+    """Test that answers are not shared across collection versions, conversations or models"""
+    cache.store("What is BM25?", version="v1", answer="llama answer", model="llama3.2")
+
+    assert cache.lookup("What is BM25?", version="v2", model="llama3.2") is None
+    assert cache.lookup("What is BM25?", version="v1", context="earlier question", model="llama3.2") is None
+    assert cache.lookup("What is BM25?", version="v1", model="mistral") is None
+    assert cache.lookup("What is BM25?", version="v1", model="llama3.2") == "llama answer"
+
+
+def test_exact_hit_does_not_embed(cache, embeddings):
+    """Test that a lazy embedding is only computed when the semantic level is reached"""
+    embeddings.vectors.update({"What is BM25?": [1.0, 0.0], "Explain BM25": [0.99, 0.05]})
+    cache.store("What is BM25?", version="v1", answer="A ranking function",
+                embedding=LazyEmbedding(embeddings.embed_query, "What is BM25?"))
+    assert len(embeddings.queries) == 1
+
+    assert cache.lookup("what is bm25?", version="v1",
+                        embedding=LazyEmbedding(embeddings.embed_query, "what is bm25?")) == "A ranking function"
+    assert len(embeddings.queries) == 1
+
+    embedding = LazyEmbedding(embeddings.embed_query, "Explain BM25")
+    assert cache.lookup("Explain BM25", version="v1", embedding=embedding) == "A ranking function"
+    embedding()
+    assert len(embeddings.queries) == 2
+    assert cache.stats.semantic_hits == 1
+
+
+def test_semantic_lookup_respects_threshold(cache):
+    """Test that dissimilar questions miss"""
+    cache.store("What is BM25?", version="v1", answer="A ranking function", embedding=[1.0, 0.0])
+
+    assert cache.lookup("How do I install it?", version="v1", embedding=[0.0, 1.0]) is None
+    assert cache.stats.misses == 1
+
+
+def test_semantic_lookup_picks_the_closest_question(cache):
+    """Test that the most similar question of the scope wins and other dimensions are ignored"""
+    cache.store("What is BM25?", version="v1", answer="bm25", embedding=[1.0, 0.0, 0.0])
+    cache.store("What is RRF?", version="v1", answer="rrf", embedding=[0.95, 0.3, 0.0])
+    cache.store("Other model", version="v1", answer="other", embedding=[1.0, 0.0])
+
+    assert cache.lookup("Explain RRF", version="v1", embedding=[0.9, 0.35, 0.0]) == "rrf"
+    assert cache.lookup("Explain BM25", version="v1", embedding=[2.0, 0.1, 0.0]) == "bm25"
+    cache.store("Explain RRF", version="v1", answer="rrf, revised", embedding=[0.9, 0.35, 0.0])
+    assert cache.lookup("RRF?", version="v1", embedding=[0.9, 0.36, 0.0]) == "rrf, revised"
+
+
+def test_query_is_embedded_outside_the_lock(cache):
+    """Test that other threads can use the cache while a lookup waits for the embedding"""
+    cache.store("What is BM25?", version="v1", answer="A ranking function", embedding=[1.0, 0.0])
+    held = []
+
+    def embed():
+        held.append(cache._lock.locked())
+        return [1.0, 0.0]
+
+    assert cache.lookup("Explain BM25", version="v1", embedding=embed) == "A ranking function"
+    assert held == [False]
+
+
+def test_eviction_keeps_newest_entries(temp_dir):
+    """Test that the cache is bounded by max_entries"""
+    cache = AnswerCache(str(temp_dir / "answers.sqlite"), max_entries=2)
+    for i in range(3):
+        cache.store(f"question {i}", version="v1", answer=f"answer {i}")
+
+    assert cache.lookup("question 0", version="v1") is None
+    assert cache.lookup("question 2", version="v1") == "answer 2"
+    cache.close()
@@ -0,0 +1,83 @@
+"""Tests for the async chat paths of ChatAgent and RAGAgent"""
+
+import asyncio
+import importlib.util
+import os
+from pathlib import Path
+
+import pytest
+from langchain.schema import Document
+from langchain.schema.runnable import RunnableLambda
+
+from src.answer_cache import AnswerCache
+from src.chat_agent import ChatAgent
+from src.ingestion import sync_documents
+from src.vector_store import VectorStoreManager
+
+QUERY = "Which ranking function scores keyword matches?"
+
+DOCUMENTS = [
+    Document(page_content="BM25 is the ranking function that scores keyword matches.",
+             metadata={"source": "search.md"}),
+    Document(page_content="Chroma stores the dense vectors of every chunk.", metadata={"source": "store.md"}),
+]
+
+
+def stub_llm():
+    """LLM answering with the context line of its prompt"""
+    def generate(prompt):
+        text = prompt.to_string()
+        return "Answer: " + text.split("Context:", 1)[1].strip().splitlines()[0]
+    return RunnableLambda(generate)
+
+
+@pytest.fixture
+def answer_cache(temp_dir):
+    """Answer cache in a temporary database"""
+    cache = AnswerCache(str(temp_dir / "answers.sqlite"))
+    yield cache
+    cache.close()
+
+
+def test_chat_agent_achat(temp_dir, embeddings, answer_cache):
+    """Test that ChatAgent.achat answers from retrieved context, records the exchange and caches it"""
+    store = VectorStoreManager(collection_name="achat", persist_directory=str(temp_dir / "db"),
+                               embeddings=embeddings, backend="numpy")
+    store.ingest_documents(DOCUMENTS)
+    agent = ChatAgent(vector_store=store, answer_cache=answer_cache, llm=stub_llm())
+
+    answer = asyncio.run(agent.achat(QUERY))
+
+    assert answer.startswith("Answer: ")
+    assert "BM25" in answer
+    assert agent.conversation_history == [{"human": QUERY, "assistant": answer}]
+    assert answer_cache.lookup(QUERY, version=store.collection_version, model=agent.model_name) == answer
+
+
+@pytest.fixture
+def rag_agent_module():
+    """rag_agent.py, the single-file LangGraph agent next to this package"""
+    path = Path(__file__).resolve().parents[2] / "rag_agent.py"
+    spec = importlib.util.spec_from_file_location("rag_agent_script", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_rag_agent_achat(temp_dir, embeddings, answer_cache, rag_agent_module):
+    """Test that RAGAgent.achat answers from retrieved context, records the exchange and caches it"""
+    agent = rag_agent_module.RAGAgent(
+        persist_directory=str(temp_dir / "db"), embedding_cache_path=str(temp_dir / "embeddings.sqlite"),
+        cache_answers=False, llm=stub_llm(), embeddings=embeddings,
+    )
+    agent.answer_cache = answer_cache
+    agent.open_vector_store()
+    sync_documents(agent.vector_store, DOCUMENTS, agent.keyword_index, agent.embedding_executor, agent.collection)
+
+    answer = asyncio.run(agent.achat(QUERY))
+
+    assert answer.startswith("Answer: ")
+    assert "BM25" in answer
+    assert agent.chat_history == [{"human": QUERY, "assistant": answer}]
+    version = f"{os.path.abspath(temp_dir / 'db')}:{agent.keyword_index.version}"
+    assert answer_cache.lookup(QUERY, version=version, model=agent.model_name) == answer
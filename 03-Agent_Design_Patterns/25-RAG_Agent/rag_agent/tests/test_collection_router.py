@@ -0,0 +1,57 @@
+"""Tests for tenant-aware collection routing"""
+
+import pytest
+
+from src.collection_router import CollectionRouter, physical_name
+
+
+@pytest.fixture
+def router(temp_dir):
+    """Router over two storage directories"""
+    return CollectionRouter(
+        [str(temp_dir / "disk1"), str(temp_dir / "disk2")],
+        embedding_cache_path=str(temp_dir / "embeddings.sqlite"),
+        backend="numpy",
+    )
+
+
+def test_physical_names_of_tenants_never_collide():
+    """Test that a tenant cannot reach another tenant's collection through the separator"""
+    assert physical_name("acme", "docs") == "acme__docs"
+    assert physical_name("acme", "eng__docs") != physical_name("acme-eng", "docs")
+    with pytest.raises(ValueError):
+        physical_name("acme__eng", "docs")
+    with pytest.raises(ValueError):
+        physical_name("team.a", "docs")
+
+
+def test_long_names_fit_chroma_limit():
+    """Test that long names are shortened with a hash suffix"""
+    first = physical_name("tenant", "x" * 100)
+    second = physical_name("tenant", "x" * 99 + "y")
+
+    assert len(first) <= 63
+    assert first != second
+
+
+def test_get_places_and_records_collections(router, temp_dir):
+    """Test that collections are placed once and remembered across routers"""
+    manager = router.get("support", "handbook")
+
+    assert router.get("support", "handbook") is manager
+    assert router.list_collections() == [("support", "handbook")]
+    assert manager.persist_directory in router.directories
+
+    reopened = CollectionRouter(router.directories, embedding_cache_path=str(temp_dir / "embeddings.sqlite"),
+                                backend="numpy")
+    assert reopened.list_collections("support") == [("support", "handbook")]
+    assert reopened.get("support", "handbook").persist_directory == manager.persist_directory
+
+
+def test_sanitised_collection_names_are_not_shared(router):
+    """Test that a collection whose sanitised name is taken is refused"""
+    router.get("support", "team-a")
+
+    with pytest.raises(ValueError):
+        router.get("support", "team.a")
+    assert router.list_collections("support") == [("support", "team-a")]
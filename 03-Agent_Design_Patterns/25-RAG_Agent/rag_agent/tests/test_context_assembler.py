@@ -0,0 +1,83 @@
+"""Tests for context assembly"""
+
+from langchain.schema import Document
+
+from src.context_assembler import ContextAssembler, MinHasher, shingles
+
+TEXT = ("Chapter one introduces the widget and explains why it exists. "
+        "Chapter two covers installation with pip and the configuration file. "
+        "Chapter three lists troubleshooting steps for common errors.")
+
+
+def chunk(start: int, end: int, **metadata) -> Document:
+    """Chunk of TEXT at its character offsets"""
+    return Document(page_content=TEXT[start:end], metadata={"source": "guide.md", "start_index": start, **metadata})
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def test_overlapping_chunks_are_merged():
+    """Test that overlapping chunks of one source become a single passage"""
+    result = ContextAssembler(token_counter=count_words).assemble([chunk(50, 140), chunk(0, 80)])
+
+    assert result.merged == 1
+    assert result.text == TEXT[0:140]
+    assert result.documents[0].metadata["end_index"] == 140
+
+
+def test_distant_chunks_are_kept_apart_in_rank_order():
+    """Test that non-overlapping chunks stay separate and keep their relevance order"""
+    result = ContextAssembler(token_counter=count_words).assemble([chunk(140, 200), chunk(0, 60)])
+
+    assert result.merged == 0
+    assert result.text == TEXT[140:200] + "\n\n" + TEXT[0:60]
+
+
+def test_chunks_of_different_pages_are_not_merged():
+    """Test that per-page offsets (PyPDFLoader) never splice pages together"""
+    page_two = Document(page_content="Page two explains the configuration file in full.",
+                        metadata={"source": "guide.pdf", "page": 1, "start_index": 10})
+    page_three = Document(page_content="Page three talks about installing the widget using pip and configuring it.",
+                          metadata={"source": "guide.pdf", "page": 2, "start_index": 0})
+
+    result = ContextAssembler(token_counter=count_words).assemble([page_three, page_two])
+
+    assert result.merged == 0
+    assert result.text == page_three.page_content + "\n\n" + page_two.page_content
+
+
+def test_near_duplicates_are_dropped():
+    """Test that a passage nearly identical to a better-ranked one is dropped"""
+    first = Document(page_content=TEXT, metadata={"source": "a.md"})
+    copy = Document(page_content=TEXT + " Extra.", metadata={"source": "b.md"})
+
+    result = ContextAssembler(token_counter=count_words).assemble([first, copy])
+
+    assert result.duplicates == 1
+    assert result.documents[0].metadata["source"] == "a.md"
+
+
+def test_budget_truncates_then_drops():
+    """Test that passages are truncated to the remaining budget or dropped below the minimum"""
+    docs = [Document(page_content=" ".join(f"w{i}{j}" for j in range(30)), metadata={"source": f"{i}.md"})
+            for i in range(3)]
+    assembler = ContextAssembler(max_tokens=45, min_passage_tokens=10, token_counter=count_words)
+
+    result = assembler.assemble(docs)
+
+    assert result.tokens <= 45
+    assert result.truncated == 1
+    assert result.dropped == 1
+    assert result.documents[1].page_content.endswith(" ...")
+
+
+def test_minhash_similarity():
+    """Test that MinHash estimates identical and disjoint sets"""
+    hasher = MinHasher()
+    same = hasher.signature(shingles(TEXT))
+    other = hasher.signature(shingles("completely unrelated words about something else entirely here"))
+
+    assert MinHasher.similarity(same, hasher.signature(shingles(TEXT))) == 1.0
+    assert MinHasher.similarity(same, other) < 0.2
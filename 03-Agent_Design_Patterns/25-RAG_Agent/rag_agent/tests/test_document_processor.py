@@ -0,0 +1,85 @@
+"""Tests for page-aware document processing"""
+
+from langchain.schema import Document
+
+import src.document_processor as document_processor
+from src.document_processor import PAGE_SEPARATOR, DocumentProcessor, extract_pdf_pages, load_file
+
+
+def _write_pdf(path, page_texts):
+    """Write a minimal PDF with one line of Helvetica text per page"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    data += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    path.write_bytes(data)
+
+
+def _pages(*texts):
+    return [
+        Document(page_content=text, metadata={"source": "book.pdf", "file_type": "pdf", "page": number,
+                                              "total_pages": len(texts)})
+        for number, text in enumerate(texts, start=1)
+    ]
+
+
+def test_chunks_record_the_pages_they_span():
+    """Test that pages are split together and each chunk carries its page range and offsets"""
+    pages = _pages("First page text. " * 5, "Second page text. " * 5, "Third page text. " * 5)
+    text = PAGE_SEPARATOR.join(page.page_content for page in pages)
+    page_of = []
+    for page in pages:
+        page_of.extend([page.metadata["page"]] * (len(page.page_content) + len(PAGE_SEPARATOR)))
+
+    chunks = DocumentProcessor(chunk_size=200, chunk_overlap=0).split_documents(pages)
+
+    assert [(chunk.metadata["page_start"], chunk.metadata["page_end"]) for chunk in chunks] == [(1, 2), (3, 3)]
+    for chunk in chunks:
+        metadata = chunk.metadata
+        assert "page" not in metadata
+        assert metadata["total_pages"] == 3
+        assert text[metadata["start_index"]:metadata["end_index"]] == chunk.page_content
+        assert metadata["page_start"] == page_of[metadata["start_index"]]
+        assert metadata["page_end"] == page_of[metadata["end_index"] - 1]
+
+
+def test_unpaged_documents_are_split_per_source():
+    """Test that Markdown and PDF pages of different sources are never mixed"""
+    documents = [Document(page_content="# Notes\n\nSome notes.", metadata={"source": "notes.md"})]
+    documents += _pages("Only page.")
+
+    chunks = DocumentProcessor(chunk_size=200, chunk_overlap=0).split_documents(documents)
+
+    assert [chunk.metadata["source"] for chunk in chunks] == ["notes.md", "book.pdf"]
+    assert "page_start" not in chunks[0].metadata
+    assert (chunks[1].metadata["page_start"], chunks[1].metadata["page_end"]) == (1, 1)
+
+
+def test_pdf_pages_are_extracted_in_parallel_ranges(temp_dir, monkeypatch):
+    """Test that worker processes return the pages of a PDF in order"""
+    path = temp_dir / "book.pdf"
+    _write_pdf(path, [f"Page number {i}" for i in range(1, 6)])
+    sequential = extract_pdf_pages(path)
+
+    monkeypatch.setattr(document_processor, "PARALLEL_PDF_MIN_PAGES", 1)
+    assert extract_pdf_pages(path, workers=2) == sequential
+    assert [text.strip() for text in sequential] == [f"Page number {i}" for i in range(1, 6)]
+
+    pages = load_file(path)
+    assert [page.metadata["page"] for page in pages] == [1, 2, 3, 4, 5]
+    assert pages[0].metadata["total_pages"] == 5
@@ -0,0 +1,76 @@
+"""Tests for the persistent embedding cache"""
+
+import pytest
+
+from src.embedding_cache import CachedEmbeddings
+
+
+def test_misses_are_deduplicated_and_batched(temp_dir, embeddings):
+    """Test that each distinct missing text is embedded once, batch_size texts per call"""
+    cache = CachedEmbeddings(embeddings, "test-model", path=str(temp_dir / "cache.sqlite"), batch_size=2)
+
+    vectors = cache.embed_documents(["a", "bb", "a", "ccc", " bb "])
+
+    assert vectors == [embeddings.vector(text) for text in ["a", "bb", "a", "ccc", "bb"]]
+    assert embeddings.calls == [["a", "bb"], ["ccc"]]
+    assert cache.stats.misses == 5
+    assert cache.stats.embed_calls == 2
+
+
+def test_vectors_persist_across_instances(temp_dir, embeddings):
+    """Test that a new cache on the same file serves earlier vectors from disk"""
+    path = str(temp_dir / "cache.sqlite")
+    CachedEmbeddings(embeddings, "test-model", path=path).embed_documents(["alpha", "beta"])
+    embeddings.calls.clear()
+
+    cache = CachedEmbeddings(embeddings, "test-model", path=path)
+    vectors = cache.embed_documents(["beta", "alpha"])
+    assert vectors[0] == pytest.approx(embeddings.vector("beta"), abs=1e-6)
+    assert vectors[1] == pytest.approx(embeddings.vector("alpha"), abs=1e-6)
+    assert embeddings.calls == []
+    assert cache.stats.disk_hits == 2
+
+    cache.embed_documents(["alpha"])
+    assert cache.stats.memory_hits == 1
+
+
+def test_keys_separate_models_and_queries(temp_dir, embeddings):
+    """Test that vectors of another model or of queries are never reused for documents"""
+    path = str(temp_dir / "cache.sqlite")
+    CachedEmbeddings(embeddings, "model-a", path=path).embed_documents(["text"])
+    cache = CachedEmbeddings(embeddings, "model-b", path=path)
+
+    cache.embed_documents(["text"])
+    cache.embed_query("text")
+    assert len(embeddings.calls) == 2
+    assert embeddings.queries == ["text"]
+
+
+def test_least_recently_used_entries_are_evicted(temp_dir, embeddings):
+    """Test that the table never grows past max_entries, dropping the oldest vectors"""
+    cache = CachedEmbeddings(embeddings, "test-model", path=str(temp_dir / "cache.sqlite"),
+                             max_entries=2, memory_size=0)
+    cache.embed_documents(["one"])
+    cache.embed_documents(["two"])
+    cache.embed_documents(["one"])
+    cache.embed_documents(["three"])
+    embeddings.calls.clear()
+
+    cache.embed_documents(["one", "three"])
+    assert embeddings.calls == []
+    cache.embed_documents(["two"])
+    assert embeddings.calls == [["two"]]
+
+
+def test_clear_removes_only_this_model(temp_dir, embeddings):
+    """Test that clearing one model's cache keeps the others"""
+    path = str(temp_dir / "cache.sqlite")
+    CachedEmbeddings(embeddings, "other", path=path).embed_documents(["kept"])
+    cache = CachedEmbeddings(embeddings, "test-model", path=path)
+    cache.embed_documents(["dropped"])
+
+    cache.clear()
+    embeddings.calls.clear()
+    cache.embed_documents(["dropped"])
+    CachedEmbeddings(embeddings, "other", path=path, memory_size=0).embed_documents(["kept"])
+    assert embeddings.calls == [["dropped"]]
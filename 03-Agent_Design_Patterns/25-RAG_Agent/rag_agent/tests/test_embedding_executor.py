@@ -0,0 +1,56 @@
+"""Tests for concurrent, batched embedding into vector stores"""
+
+import chromadb
+import pytest
+from langchain.schema import Document
+from langchain_community.vectorstores import Chroma
+
+from src.embedding_executor import EmbeddingExecutor
+from src.ingestion import sync_documents
+
+
+def _documents(count):
+    return [Document(page_content=f"chunk number {i}", metadata={"source": "notes.md"}) for i in range(count)]
+
+
+def test_embed_documents_keeps_order_across_batches(embeddings):
+    """Test that batches embedded concurrently come back in submission order"""
+    executor = EmbeddingExecutor(embeddings, batch_size=3, max_in_flight=2)
+    texts = [f"text {i}" for i in range(10)]
+
+    assert executor.embed_documents(texts) == [embeddings.embed_query(text) for text in texts]
+    assert executor.stats.batches == 4
+    assert executor.stats.chunks == 10
+
+
+def test_failed_batches_are_retried(embeddings):
+    """Test that a failed request is retried before the error propagates"""
+    embeddings.failures = 2
+    executor = EmbeddingExecutor(embeddings, batch_size=4, max_retries=2, backoff=0)
+    assert len(executor.embed_documents(["a", "b"])) == 2
+    assert executor.stats.retries == 2
+
+    embeddings.failures = 2
+    executor = EmbeddingExecutor(embeddings, batch_size=4, max_retries=1, backoff=0)
+    with pytest.raises(ConnectionError):
+        executor.embed_documents(["a", "b"])
+
+
+def test_chroma_collection_receives_vectors_without_embedding_again(embeddings):
+    """Test that Chroma chunks are written through the client collection and embedded once"""
+    client = chromadb.EphemeralClient()
+    store = Chroma(client=client, collection_name="executor_test", embedding_function=embeddings)
+    collection = client.get_or_create_collection(name="executor_test", embedding_function=None)
+    executor = EmbeddingExecutor(embeddings, batch_size=2)
+    documents = _documents(5)
+
+    report = sync_documents(store, documents, executor=executor, collection=collection)
+
+    assert report.added == 5
+    assert len(embeddings.embedded) == 5
+    assert collection.count() == 5
+    stored = collection.get(ids=report.added_ids, include=["documents", "embeddings"])
+    assert sorted(stored["documents"]) == sorted(doc.page_content for doc in documents)
+    assert store.similarity_search("chunk number 3", k=1)[0].page_content == "chunk number 3"
+
+    client.delete_collection("executor_test")
@@ -0,0 +1,95 @@
+"""Tests for idempotent, content-addressed ingestion"""
+
+import chromadb
+import pytest
+from langchain.schema import Document
+from langchain_community.vectorstores import Chroma
+
+from src.ingestion import IngestionReport, assign_chunk_ids, chunk_id, remove_sources, sync_documents
+from src.keyword_index import KeywordIndex
+
+
+def _chunks(source, *texts):
+    return [Document(page_content=text, metadata={"source": source}) for text in texts]
+
+
+@pytest.fixture
+def store(temp_dir, embeddings):
+    """Chroma collection in a temporary directory"""
+    client = chromadb.PersistentClient(path=str(temp_dir / "chroma"))
+    return Chroma(client=client, collection_name="ingestion_test", embedding_function=embeddings)
+
+
+@pytest.fixture
+def keyword_index(temp_dir):
+    """Keyword index kept next to the store"""
+    return KeywordIndex(str(temp_dir / "keywords.sqlite"))
+
+
+def test_chunk_ids_are_deterministic():
+    """Test that IDs depend on source and content, and repeated chunks get distinct IDs"""
+    ids = assign_chunk_ids(_chunks("a.md", "same", "other", "same"))
+
+    assert ids == assign_chunk_ids(_chunks("a.md", "same", "other", "same"))
+    assert ids[0] == chunk_id("a.md", "same")
+    assert len(set(ids)) == 3
+    assert assign_chunk_ids(_chunks("b.md", "same"))[0] != ids[0]
+
+
+def test_reingesting_unchanged_files_embeds_nothing(store, keyword_index, embeddings):
+    """Test that a second sync of the same chunks only skips them"""
+    chunks = _chunks("a.md", "alpha", "beta") + _chunks("b.md", "gamma")
+    report = sync_documents(store, chunks, keyword_index)
+    assert (report.added, report.skipped, report.removed) == (3, 0, 0)
+
+    report = sync_documents(store, chunks, keyword_index)
+    assert (report.added, report.skipped, report.removed) == (0, 3, 0)
+    assert len(embeddings.embedded) == 3
+    assert len(store.get(include=[])["ids"]) == len(keyword_index) == 3
+
+
+def test_changed_file_replaces_its_stale_chunks(store, keyword_index, embeddings):
+    """Test that only new chunks of a changed file are embedded and its old ones removed"""
+    sync_documents(store, _chunks("a.md", "alpha", "beta") + _chunks("b.md", "gamma"), keyword_index)
+    embeddings.calls.clear()
+
+    report = sync_documents(store, _chunks("a.md", "alpha", "delta"), keyword_index)
+
+    assert (report.added, report.skipped, report.removed) == (1, 1, 1)
+    assert embeddings.embedded == ["delta"]
+    assert sorted(store.get(where={"source": "a.md"})["documents"]) == ["alpha", "delta"]
+    assert store.get(where={"source": "b.md"})["documents"] == ["gamma"]
+    assert keyword_index.search("beta") == []
+
+
+def test_keyword_index_is_backfilled(store, temp_dir):
+    """Test that chunks stored before the keyword index existed are added to it"""
+    chunks = _chunks("a.md", "alpha", "beta")
+    sync_documents(store, chunks)
+    keyword_index = KeywordIndex(str(temp_dir / "late.sqlite"))
+
+    report = sync_documents(store, chunks, keyword_index)
+
+    assert report.skipped == 2
+    assert len(keyword_index) == 2
+
+
+def test_remove_sources(store, keyword_index):
+    """Test that every chunk of removed files is deleted from both indexes"""
+    sync_documents(store, _chunks("a.md", "alpha", "beta") + _chunks("b.md", "gamma"), keyword_index)
+
+    assert remove_sources(store, ["a.md", "missing.md"], keyword_index) == 2
+    assert remove_sources(store, ["a.md"], keyword_index) == 0
+    assert store.get(include=[])["ids"] == [chunk_id("b.md", "gamma")]
+    assert len(keyword_index) == 1
+
+
+def test_report_merge_keeps_failure():
+    """Test that merged reports add their counts and keep an error"""
+    report = IngestionReport(added=1)
+    report.merge(IngestionReport(skipped=2))
+    assert not report.failed
+
+    report.merge(IngestionReport(error="disk full"))
+    assert (report.added, report.skipped) == (1, 2)
+    assert str(report) == "1 added, 2 unchanged, 0 removed, failed: disk full"
@@ -0,0 +1,79 @@
+"""Tests for the BM25 keyword index"""
+
+import threading
+import time
+
+import pytest
+from langchain.schema import Document
+
+from src.keyword_index import KeywordIndex, tokenize
+
+
+@pytest.fixture
+def index(temp_dir):
+    """Keyword index with three chunks"""
+    index = KeywordIndex(str(temp_dir / "keywords.db"))
+    index.add(["a", "b", "c"], [
+        Document(page_content="Error E1234 when installing the widget", metadata={"source": "a.md"}),
+        Document(page_content="Configuring the widget with config.yaml", metadata={"source": "b.md"}),
+        Document(page_content="Release notes for version 2.1.0", metadata={"source": "c.pdf", "file_type": "pdf"}),
+    ])
+    yield index
+    index.close()
+
+
+def test_tokenize_keeps_identifiers_and_parts():
+    """Test that compound identifiers are kept whole and split into parts"""
+    assert tokenize("See config.yaml") == ["see", "config.yaml", "config", "yaml"]
+
+
+def test_search_ranks_matching_chunks(index):
+    """Test that exact identifiers rank their chunk first"""
+    results = index.search("E1234", k=2)
+
+    assert [doc_id for doc_id, _ in results] == ["a"]
+    assert [doc_id for doc_id, _ in index.search("widget", k=5)] in (["a", "b"], ["b", "a"])
+
+
+def test_search_filter_keeps_scores(index):
+    """Test that filtered searches only return matching chunks with unfiltered scores"""
+    unfiltered = dict(index.search("widget"))
+    filtered = index.search("widget", filter={"source": "b.md"})
+
+    assert filtered == [("b", unfiltered["b"])]
+
+
+def test_add_replaces_and_remove_deletes(index):
+    """Test that re-adding an ID replaces it and removed IDs are reported missing"""
+    index.add(["a"], [Document(page_content="completely different text", metadata={})])
+    assert index.search("E1234") == []
+    assert len(index) == 3
+
+    index.remove(["a"])
+    assert index.missing(["a", "b"]) == {"a"}
+    assert set(index.get_documents(["a", "b"])) == {"b"}
+
+
+def test_readers_never_see_a_half_replaced_chunk(index):
+    """Test that reads on the shared connection never interleave with a writer's transaction"""
+    stop = threading.Event()
+    seen_missing = []
+
+    def write():
+        chunk = Document(page_content="Error E1234 when installing the widget " * 50, metadata={"source": "a.md"})
+        while not stop.is_set():
+            # Replacing deletes the old rows before inserting the new ones, in one transaction
+            index.add(["a"], [chunk])
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        deadline = time.monotonic() + 1.0
+        while time.monotonic() < deadline:
+            if index.missing(["a"]) or "a" not in index.get_documents(["a"]):
+                seen_missing.append(True)
+    finally:
+        stop.set()
+        writer.join()
+
+    assert seen_missing == []
@@ -0,0 +1,87 @@
+"""Tests for structure-aware Markdown chunking"""
+
+import pytest
+from langchain.schema import Document
+
+from src.markdown_chunker import MarkdownChunker, scan_blocks
+
+MARKDOWN = """# Guide
+
+Intro paragraph.
+
+## Install
+
+Run the installer.
+
+```bash
+# not a heading
+pip install tool
+```
+
+| Option | Default |
+| ------ | ------- |
+| fast   | off     |
+"""
+
+
+def test_scan_blocks_keeps_code_and_tables_whole():
+    """Test that fenced code and tables form single blocks under their heading path"""
+    blocks = scan_blocks(MARKDOWN)
+
+    assert [block.kind for block in blocks] == ["heading", "text", "heading", "text", "code", "table"]
+    code = blocks[4]
+    assert MARKDOWN[code.start:code.end].startswith("```bash")
+    assert MARKDOWN[code.start:code.end].endswith("```")
+    assert code.headings == ("Guide", "Install")
+    assert blocks[1].headings == ("Guide",)
+
+
+def test_chunks_never_straddle_headings():
+    """Test that each section becomes its own chunk carrying its heading path"""
+    chunks = MarkdownChunker(chunk_size=200, chunk_overlap=0).chunk(MARKDOWN)
+
+    assert [chunk.headings for chunk in chunks] == [("Guide",), ("Guide", "Install")]
+    assert chunks[0].text == "# Guide\n\nIntro paragraph."
+    assert "pip install tool" in chunks[1].text
+    assert "| fast   | off     |" in chunks[1].text
+
+
+def test_chunks_are_slices_with_byte_offsets():
+    """Test that offsets locate every chunk in the text and its UTF-8 encoding"""
+    text = "# Café\n\n" + "Crème brûlée is served cold. " * 20
+    encoded = text.encode("utf-8")
+
+    for chunk in MarkdownChunker(chunk_size=120, chunk_overlap=30).chunk(text):
+        assert len(chunk.text) <= 120
+        assert text[chunk.start:chunk.end] == chunk.text
+        assert encoded[chunk.start_byte:chunk.end_byte].decode("utf-8") == chunk.text
+
+
+def test_oversized_code_block_is_cut_at_lines():
+    """Test that a code block longer than a chunk is split between lines"""
+    code = "```\n" + "".join(f"line {i}\n" for i in range(40)) + "```\n"
+    chunks = MarkdownChunker(chunk_size=60, chunk_overlap=0).chunk(code)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert len(chunk.text) <= 60
+        assert code[chunk.end] == "\n"
+
+
+def test_split_documents_adds_offset_metadata():
+    """Test that documents keep their metadata and gain offsets and headings"""
+    documents = MarkdownChunker(chunk_size=200, chunk_overlap=0).split_documents(
+        [Document(page_content=MARKDOWN, metadata={"source": "guide.md"})]
+    )
+
+    assert len(documents) == 2
+    metadata = documents[1].metadata
+    assert metadata["source"] == "guide.md"
+    assert metadata["headings"] == "Guide > Install"
+    assert MARKDOWN[metadata["start_index"]:metadata["end_index"]] == documents[1].page_content
+
+
+def test_overlap_must_be_smaller_than_chunk_size():
+    """Test that an overlap as large as a chunk is rejected"""
+    with pytest.raises(ValueError):
+        MarkdownChunker(chunk_size=100, chunk_overlap=100)
@@ -0,0 +1,89 @@
+"""Tests for metadata filters in Chroma's where syntax"""
+
+import json
+import sqlite3
+
+import pytest
+
+from src.metadata_filter import create_filter_indexes, filter_sql, matches, normalize_filter, parse_filter
+
+
+def test_normalize_filter_expands_shorthand():
+    """Test that several conditions become one $and of single-operator clauses"""
+    assert normalize_filter({}) is None
+    assert normalize_filter({"source": "a.pdf"}) == {"source": {"$eq": "a.pdf"}}
+    assert normalize_filter({"source": "a.pdf", "page_start": {"$gte": 3, "$lt": 9}}) == {"$and": [
+        {"source": {"$eq": "a.pdf"}},
+        {"page_start": {"$gte": 3}},
+        {"page_start": {"$lt": 9}},
+    ]}
+    assert normalize_filter({"$or": [{"source": "a.pdf"}, {}]}) == {"source": {"$eq": "a.pdf"}}
+
+
+def test_normalize_filter_rejects_unknown_operators():
+    """Test that unsupported operators and non-list membership operands are errors"""
+    with pytest.raises(ValueError):
+        normalize_filter({"page_start": {"$regex": "3"}})
+    with pytest.raises(ValueError):
+        normalize_filter({"$not": {"source": "a.pdf"}})
+    with pytest.raises(ValueError):
+        normalize_filter({"source": {"$in": "a.pdf"}})
+
+
+def test_parse_filter_from_cli_expressions():
+    """Test that numbers are parsed and repeated equalities match any value"""
+    assert parse_filter([]) is None
+    assert parse_filter(["page_start>=3"]) == {"page_start": {"$gte": 3}}
+    assert parse_filter(["file_type=pdf", "file_type=md", "page_end<2.5"]) == {"$and": [
+        {"page_end": {"$lt": 2.5}},
+        {"file_type": {"$in": ["pdf", "md"]}},
+    ]}
+    with pytest.raises(ValueError):
+        parse_filter(["page_start"])
+
+
+def test_matches_evaluates_filters():
+    """Test that matches agrees with Chroma's semantics, including missing fields"""
+    metadata = {"source": "a.pdf", "page_start": 4}
+
+    assert matches(metadata, None)
+    assert matches(metadata, {"source": "a.pdf", "page_start": {"$gte": 3}})
+    assert matches(metadata, {"$or": [{"source": "b.pdf"}, {"page_start": {"$in": [4, 5]}}]})
+    assert not matches(metadata, {"page_start": {"$nin": [4]}})
+    assert not matches(metadata, {"title": {"$ne": "x"}})
+    assert not matches(metadata, {"page_start": {"$gt": "3"}})
+
+
+def test_filter_sql_selects_matching_rows():
+    """Test that the SQL condition selects the same rows as matches, using the filter indexes"""
+    rows = [
+        {"source": "a.pdf", "page_start": 1, "title": "Intro"},
+        {"source": "a.pdf", "page_start": 5},
+        {"source": "b.md", "depth": 2, "title": "Guide"},
+    ]
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE chunks (id INTEGER PRIMARY KEY, source TEXT, metadata TEXT)")
+    connection.executemany(
+        "INSERT INTO chunks (source, metadata) VALUES (?, ?)",
+        [(row["source"], json.dumps(row)) for row in rows]
+    )
+    create_filter_indexes(connection, "chunks", columns=("source",))
+
+    filters = [
+        {"source": "a.pdf", "page_start": {"$gte": 3}},
+        {"$or": [{"title": "Guide"}, {"page_start": {"$lt": 2}}]},
+        {"source": {"$nin": ["a.pdf"]}},
+        {"source": {"$in": []}},
+        None,
+    ]
+    for filter in filters:
+        condition, params = filter_sql(filter, columns={"source": "source"})
+        selected = [row_id - 1 for (row_id,) in connection.execute(
+            f"SELECT id FROM chunks WHERE {condition} ORDER BY id", params
+        )]
+        assert selected == [i for i, row in enumerate(rows) if matches(row, filter)], filter
+
+    plan = " ".join(str(row) for row in connection.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM chunks WHERE " + filter_sql({"page_start": {"$gte": 3}})[0], [3]
+    ))
+    assert "chunks_page_start" in plan
@@ -0,0 +1,73 @@
+"""Tests for the memory-mapped NumPy vector index"""
+
+import numpy as np
+import pytest
+from langchain.schema import Document
+
+from src.numpy_store import NumpyVectorStore
+
+
+def _documents(count, source="a.md"):
+    return [Document(page_content=f"chunk {i}", metadata={"source": source, "page_start": i}) for i in range(count)]
+
+
+def test_search_finds_stored_documents(temp_dir, embeddings):
+    """Test that a stored text is its own nearest neighbour at distance zero"""
+    store = NumpyVectorStore(str(temp_dir), embeddings)
+    store.add_documents(_documents(20), ids=[f"id{i}" for i in range(20)])
+
+    doc, distance = store.similarity_search_with_score("chunk 7", k=3)[0]
+    assert doc.page_content == "chunk 7"
+    assert doc.id == "id7"
+    assert distance == pytest.approx(0.0, abs=1e-5)
+    assert len(store) == 20
+
+
+def test_replace_delete_and_reopen(temp_dir, embeddings):
+    """Test that IDs are replaced in place, freed rows reused and contents persisted"""
+    store = NumpyVectorStore(str(temp_dir), embeddings)
+    store.add_documents(_documents(5), ids=[f"id{i}" for i in range(5)])
+    store.add_documents([Document(page_content="chunk 0 revised", metadata={"source": "a.md"})], ids=["id0"])
+    store.delete(ids=["id1", "id2"])
+    store.add_documents([Document(page_content="chunk 9", metadata={"source": "b.md"})], ids=["id9"])
+    store.persist()
+
+    reopened = NumpyVectorStore(str(temp_dir), embeddings)
+    assert len(reopened) == 4
+    assert reopened._size == 5
+    assert sorted(reopened.get(where={"source": "a.md"}, include=[])["ids"]) == ["id0", "id3", "id4"]
+    assert reopened.get(ids=["id0"])["documents"] == ["chunk 0 revised"]
+    assert reopened.similarity_search("chunk 9", k=1)[0].id == "id9"
+
+
+def test_filter_limits_candidates(temp_dir, embeddings):
+    """Test that only chunks matching the metadata filter are returned"""
+    store = NumpyVectorStore(str(temp_dir), embeddings)
+    store.add_documents(_documents(10) + _documents(10, source="b.md"))
+
+    results = store.similarity_search("chunk 3", k=5, filter={"source": "b.md", "page_start": {"$gte": 5}})
+    assert len(results) == 5
+    assert all(doc.metadata["source"] == "b.md" and doc.metadata["page_start"] >= 5 for doc in results)
+    assert store.similarity_search("chunk 3", k=5, filter={"source": "missing.md"}) == []
+
+
+def test_quantized_store_keeps_ranking(temp_dir, embeddings):
+    """Test that int8 vectors still rank an exact match first and refuse float32 reopening"""
+    store = NumpyVectorStore(str(temp_dir), embeddings, quantize=True)
+    store.add_documents(_documents(50))
+
+    assert store._vectors.dtype == np.int8
+    assert store.similarity_search("chunk 42", k=1)[0].page_content == "chunk 42"
+    with pytest.raises(ValueError):
+        NumpyVectorStore(str(temp_dir), embeddings)
+
+
+def test_ivf_lists_are_trained_and_probed(temp_dir, embeddings):
+    """Test that IVF partitions a large enough collection and still finds exact matches"""
+    store = NumpyVectorStore(str(temp_dir), embeddings, ivf_lists=2, nprobe=1)
+    store.add_documents(_documents(100))
+
+    assert store._centroids is not None
+    assert (store._lists[:store._size] >= 0).all()
+    for i in (0, 31, 99):
+        assert store.similarity_search(f"chunk {i}", k=1)[0].page_content == f"chunk {i}"
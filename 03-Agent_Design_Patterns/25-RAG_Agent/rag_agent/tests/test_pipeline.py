@@ -0,0 +1,72 @@
+"""Tests for the streaming ingestion pipeline"""
+
+import pytest
+
+from src.document_processor import DocumentProcessor
+from src.ingestion import IngestionReport
+from src.pipeline import IngestionPipeline
+
+
+class RecordingStore:
+    """Vector store recording the batches it ingests, optionally failing on one source"""
+
+    def __init__(self, fail_source=None, raise_source=None):
+        self.batches = []
+        self.fail_source = fail_source
+        self.raise_source = raise_source
+
+    def ingest_documents(self, documents):
+        sources = {doc.metadata["source"] for doc in documents}
+        if self.raise_source in sources:
+            raise RuntimeError("store unavailable")
+        self.batches.append(documents)
+        if self.fail_source in sources:
+            return IngestionReport(error="database is locked")
+        return IngestionReport(added=len(documents))
+
+
+@pytest.fixture
+def docs(temp_dir):
+    """Directory of Markdown and text files, one of them long enough for several chunks"""
+    (temp_dir / "nested").mkdir()
+    (temp_dir / "a.md").write_text("# A\n\n" + "Alpha sentence number one. " * 40)
+    (temp_dir / "b.txt").write_text("Plain text file.")
+    (temp_dir / "nested" / "c.md").write_text("# C\n\nNested file.")
+    (temp_dir / "ignored.csv").write_text("x,y\n")
+    return temp_dir
+
+
+def _pipeline(store, **kwargs):
+    return IngestionPipeline(DocumentProcessor(chunk_size=200, chunk_overlap=0), store, **kwargs)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_pipeline_ingests_every_file(docs, workers):
+    """Test that every chunk of every supported file is upserted, a file's chunks in one batch"""
+    store = RecordingStore()
+    updates = []
+    state = _pipeline(store, workers=workers, batch_size=2, progress=lambda s: updates.append(s.batches)).run(docs)
+
+    chunks = [doc for batch in store.batches for doc in batch]
+    expected = DocumentProcessor(chunk_size=200, chunk_overlap=0).process_path(docs)
+    assert sorted(doc.page_content for doc in chunks) == sorted(doc.page_content for doc in expected)
+    assert (state.files_discovered, state.files_parsed) == (3, 3)
+    assert state.chunks == state.report.added == len(expected)
+    assert updates == list(range(1, state.batches + 1))
+
+    a_source = str(docs / "a.md")
+    assert sum(any(doc.metadata["source"] == a_source for doc in batch) for batch in store.batches) == 1
+
+
+def test_failed_batches_are_reported(docs):
+    """Test that a batch the store could not write marks the final report as failed"""
+    state = _pipeline(RecordingStore(fail_source=str(docs / "b.txt")), workers=1).run(docs)
+
+    assert state.report.failed
+    assert state.report.error == "database is locked"
+
+
+def test_store_errors_stop_the_pipeline(docs):
+    """Test that an exception in the upsert stage propagates after the stages shut down"""
+    with pytest.raises(RuntimeError):
+        _pipeline(RecordingStore(raise_source=str(docs / "a.md")), workers=1, batch_size=1).run(docs)
@@ -0,0 +1,79 @@
+"""Tests for hybrid dense and keyword retrieval"""
+
+import chromadb
+import pytest
+from langchain.schema import Document
+from langchain_community.vectorstores import Chroma
+from langchain_core.embeddings import Embeddings
+
+from src.ingestion import sync_documents
+from src.keyword_index import KeywordIndex
+from src.retrieval import HybridRetriever, HybridSearchConfig, reciprocal_rank_fusion
+
+CHUNKS = [
+    ("guide.md", "How to configure the server timeout"),
+    ("guide.md", "Restart the server after changing the configuration"),
+    ("errors.md", "Error E1234 means the disk is full"),
+    ("errors.md", "Unknown errors are logged to the server log"),
+]
+
+
+class TopicEmbeddings(Embeddings):
+    """Embeddings that only know the words "server" and "configure", blind to error codes"""
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        text = text.lower()
+        return [float(text.count("server")), float(text.count("configur")), 0.1]
+
+
+@pytest.fixture
+def indexes(temp_dir):
+    """Chroma store and keyword index holding CHUNKS"""
+    client = chromadb.PersistentClient(path=str(temp_dir / "chroma"))
+    store = Chroma(client=client, collection_name="retrieval_test", embedding_function=TopicEmbeddings(),
+                   collection_metadata={"hnsw:space": "cosine"})
+    keyword_index = KeywordIndex(str(temp_dir / "keywords.sqlite"))
+    documents = [Document(page_content=text, metadata={"source": source}) for source, text in CHUNKS]
+    sync_documents(store, documents, keyword_index)
+    return store, keyword_index
+
+
+def test_reciprocal_rank_fusion_weights_rankings():
+    """Test that fused scores add weighted reciprocal ranks"""
+    assert reciprocal_rank_fusion([["a", "b"], ["b", "c"]]) == ["b", "a", "c"]
+    assert reciprocal_rank_fusion([["a", "b"], ["b", "c"]], weights=[1.0, 0.0]) == ["a", "b"]
+    assert reciprocal_rank_fusion([["a"], ["c"]], weights=[1.0, 2.0]) == ["c", "a"]
+
+
+def test_keyword_matches_reach_the_results(indexes):
+    """Test that an identifier the dense model cannot see is found through BM25"""
+    store, keyword_index = indexes
+    retriever = HybridRetriever(store, keyword_index, HybridSearchConfig(keyword_weight=2.0, fetch_k=3))
+
+    dense_only = HybridRetriever(store, None, HybridSearchConfig(fetch_k=3))
+    assert "E1234" not in " ".join(doc.page_content for doc in dense_only.search("server error E1234", k=3))
+
+    results = retriever.search("server error E1234", k=3)
+    assert any("E1234" in doc.page_content for doc in results)
+    assert len({doc.page_content for doc in results}) == len(results)
+
+
+def test_filter_applies_to_both_rankings(indexes):
+    """Test that a metadata filter restricts dense and keyword candidates alike"""
+    store, keyword_index = indexes
+    retriever = HybridRetriever(store, keyword_index)
+
+    results = retriever.search("server E1234", k=4, filter={"source": "guide.md"})
+    assert results
+    assert all(doc.metadata["source"] == "guide.md" for doc in results)
+
+
+def test_zero_keyword_weight_is_dense_search(indexes):
+    """Test that disabling the keyword ranking returns the dense results unchanged"""
+    store, keyword_index = indexes
+    retriever = HybridRetriever(store, keyword_index, HybridSearchConfig(keyword_weight=0.0))
+
+    assert retriever.search("configure server", k=2) == store.similarity_search("configure server", k=2)
@@ -0,0 +1,69 @@
+"""Tests for token streaming out of LangGraph agents"""
+
+from types import SimpleNamespace
+
+from src.streaming import GraphTokenStream, LatencyStats, QueryTiming, message_text
+
+
+class FakeGraph:
+    """Compiled graph replaying (mode, payload) events from stream()"""
+
+    def __init__(self, events):
+        self.events = events
+        self.calls = []
+
+    def stream(self, state, stream_mode):
+        self.calls.append((state, stream_mode))
+        yield from self.events
+
+
+def _token(text, node="generate_response"):
+    return "messages", (SimpleNamespace(content=text), {"langgraph_node": node})
+
+
+def test_tokens_of_the_answer_node_are_yielded():
+    """Test that only the generating node's chunks are streamed and the final state kept"""
+    graph = FakeGraph([
+        ("values", {"question": "q"}),
+        _token("ignored", node="rewrite_query"),
+        _token("Hel"),
+        _token(""),
+        _token("lo"),
+        ("values", {"question": "q", "response": "Hello"}),
+    ])
+    stream = GraphTokenStream(graph, {"question": "q"})
+
+    assert list(stream) == ["Hel", "lo"]
+    assert graph.calls == [({"question": "q"}, ["messages", "values"])]
+    assert stream.state["response"] == "Hello"
+    assert stream.timing.tokens == 2
+    assert stream.timing.time_to_first_token <= stream.timing.total
+
+
+def test_response_is_yielded_whole_when_nothing_streamed():
+    """Test that a node that did not stream still produces its answer"""
+    stream = GraphTokenStream(FakeGraph([("values", {"response": "Cannot answer."})]), {})
+
+    assert list(stream) == ["Cannot answer."]
+    assert stream.timing.tokens == 0
+
+
+def test_message_text_joins_content_parts():
+    """Test that string and list message contents are turned into text"""
+    assert message_text(SimpleNamespace(content="plain")) == "plain"
+    assert message_text(SimpleNamespace(content=["a", {"type": "text", "text": "b"}, {"type": "image"}, 3])) == "ab"
+    assert message_text("raw") == "raw"
+
+
+def test_latency_stats_summarise_recent_queries():
+    """Test that only the last window of queries is kept and summarised"""
+    stats = LatencyStats(window=3)
+    assert str(stats) == "no queries yet"
+
+    for first_token in (0.5, 0.1, 0.2, 0.3):
+        stats.record(QueryTiming(first_token, total=1.0, tokens=10))
+
+    assert len(stats.timings) == 3
+    assert stats.last.time_to_first_token == 0.3
+    assert str(stats) == "3 queries, first token p50 200 ms / p95 300 ms, mean total 1.00s"
+    assert str(QueryTiming(0.05, 0.2, cached=True)) == "first token 50 ms, from cache in 0.20s"
@@ -0,0 +1,75 @@
+"""Tests for live re-indexing of watched directories"""
+
+import os
+
+import pytest
+
+from src.document_processor import DocumentProcessor
+from src.ingestion import IngestionReport
+from src.watcher import DirectoryWatcher
+
+
+class FakeStore:
+    """Vector store recording ingested sources, failing the first `failures` writes"""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.ingested = []
+        self.removed = []
+
+    def ingest_documents(self, documents):
+        if self.failures:
+            self.failures -= 1
+            return IngestionReport(error="database is locked")
+        self.ingested.extend(doc.metadata["source"] for doc in documents)
+        return IngestionReport(added=len(documents))
+
+    def remove_sources(self, sources):
+        self.removed.extend(sources)
+        return len(sources)
+
+
+@pytest.fixture
+def docs(temp_dir):
+    """Directory with two Markdown files"""
+    (temp_dir / "a.md").write_text("# A\n\nFirst file.\n")
+    (temp_dir / "b.md").write_text("# B\n\nSecond file.\n")
+    return temp_dir
+
+
+def test_poll_indexes_new_changed_and_removed_files(docs):
+    """Test that only changed content is re-ingested and deleted files are removed"""
+    store = FakeStore()
+    watcher = DirectoryWatcher(docs, DocumentProcessor(chunk_size=200, chunk_overlap=20), store)
+
+    assert sorted(watcher.poll().changed) == [str(docs / "a.md"), str(docs / "b.md")]
+    assert not watcher.poll()
+
+    # Touching without editing is not a change
+    os.utime(docs / "a.md", ns=(1, 1))
+    assert not watcher.poll()
+
+    (docs / "b.md").write_text("# B\n\nEdited.\n")
+    (docs / "a.md").unlink()
+    update = watcher.poll()
+
+    assert update.changed == [str(docs / "b.md")]
+    assert update.removed == [str(docs / "a.md")]
+    assert store.removed == [str(docs / "a.md")]
+
+
+def test_failed_write_is_retried(docs):
+    """Test that files of a failed write are not recorded as indexed"""
+    store = FakeStore(failures=1)
+    watcher = DirectoryWatcher(docs, DocumentProcessor(chunk_size=200, chunk_overlap=20), store)
+
+    update = watcher.poll()
+    assert update.report.failed
+    assert store.ingested == []
+    assert watcher.file_count == 0
+
+    update = watcher.poll()
+    assert not update.report.failed
+    assert sorted(set(store.ingested)) == [str(docs / "a.md"), str(docs / "b.md")]
+    assert watcher.file_count == 2
+    assert not watcher.poll()
@@ -0,0 +1,74 @@
+"""
+Token streaming for the Crawl4AI chatbots.
+The conversational retrieval chain runs in a worker thread and the tokens of its answer model are handed to Streamlit
+as they arrive, with the time to the first token recorded for every question.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Tag of the model whose tokens are streamed, so the model condensing follow-up questions stays silent
+ANSWER_TAG = 'answer'
+
+_DONE = object()
+
+
+class TokenQueueHandler(BaseCallbackHandler):
+    """Put the new tokens of models tagged ANSWER_TAG on a queue."""
+
+    def __init__(self):
+        self.queue: queue.Queue = queue.Queue()
+
+    def on_llm_new_token(self, token: str, *, tags: Optional[list] = None, **kwargs: Any) -> None:
+        if token and ANSWER_TAG in (tags or []):
+            self.queue.put(token)
+
+
+class AnswerStream:
+    """Iterate the answer of a conversational retrieval chain token by token.
+
+    Once iteration finishes, result holds the chain's output (answer and source documents), and time_to_first_token
+    and total the latency in seconds. If the model did not stream, the whole answer is yielded at once.
+    """
+
+    def __init__(self, chain, question: str):
+        self.chain = chain
+        self.question = question
+        self.result: Dict[str, Any] = {}
+        self.time_to_first_token: Optional[float] = None
+        self.total: Optional[float] = None
+        self._error: Optional[BaseException] = None
+
+    def __iter__(self) -> Iterator[str]:
+        started = time.perf_counter()
+        handler = TokenQueueHandler()
+
+        def run():
+            try:
+                self.result = self.chain.invoke({'question': self.question}, config={'callbacks': [handler]})
+            except BaseException as e:
+                self._error = e
+            finally:
+                handler.queue.put(_DONE)
+
+        worker = threading.Thread(target=run, name='answer-stream', daemon=True)
+        worker.start()
+        while (token := handler.queue.get()) is not _DONE:
+            if self.time_to_first_token is None:
+                self.time_to_first_token = time.perf_counter() - started
+            yield token
+        worker.join()
+        if self._error is not None:
+            raise self._error
+
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.perf_counter() - started
+            yield self.result.get('answer', '')
+        self.total = time.perf_counter() - started
+
+    def __str__(self) -> str:
+        return f'First token in {self.time_to_first_token:.2f}s, answer in {self.total:.2f}s'
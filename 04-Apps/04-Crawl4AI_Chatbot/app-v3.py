@@ -7,7 +7,6 @@ import streamlit as st
 from dotenv import load_dotenv
 
 # LangChain
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 from langchain.docstore.document import Document
 from langchain.memory import ConversationBufferMemory
@@ -16,6 +15,11 @@ from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 
 from bs4 import BeautifulSoup
 
+from answer_stream import ANSWER_TAG, AnswerStream
+from embedding_executor import EmbeddingExecutor
+from filtered_retriever import FilteredFAISSRetriever
+from markdown_chunker import MarkdownChunker
+
 # Load environment from .env
 load_dotenv(override=False)
 
@@ -127,17 +131,22 @@ def build_vectorstore(pages: List[Dict[str, str]], chunk_size: int = 1000, chunk
         url = p.get('url') or ''
         docs.append(Document(page_content=text, metadata={'source': url}))
 
-    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    # Chunk along the page's Markdown structure so code blocks and tables stay whole
+    splitter = MarkdownChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
     split_docs = splitter.split_documents(docs)
 
-    embeddings = OpenAIEmbeddings()
-    vs = FAISS.from_documents(split_docs, embeddings)
+    # Embed several batches at a time, adding each to the index as it completes
+    executor = EmbeddingExecutor(OpenAIEmbeddings())
+    vs = executor.build_faiss(split_docs)
     return vs
 
 
 def build_conversational_chain(vectorstore: FAISS, model: str = 'gpt-4o-mini') -> ConversationalRetrievalChain:
-    llm = ChatOpenAI(model=model, temperature=0.2)
-    retriever = vectorstore.as_retriever(search_kwargs={'k': 4})
+    # Only the answer model is tagged for streaming; follow-up questions are condensed by an untagged one
+    llm = ChatOpenAI(model=model, temperature=0.2, streaming=True, tags=[ANSWER_TAG])
+    condense_question_llm = ChatOpenAI(model=model, temperature=0.2)
+    # Searches only score the chunks of the pages selected above the chat
+    retriever = FilteredFAISSRetriever.from_vector_store(vectorstore, k=4)
     memory = ConversationBufferMemory(
         memory_key='chat_history',
         return_messages=True,
@@ -145,6 +154,7 @@ def build_conversational_chain(vectorstore: FAISS, model: str = 'gpt-4o-mini') -
     )
     chain = ConversationalRetrievalChain.from_llm(
         llm=llm,
+        condense_question_llm=condense_question_llm,
         retriever=retriever,
         memory=memory,
         return_source_documents=True,
@@ -225,6 +235,12 @@ if st.session_state['pages']:
 st.divider()
 st.subheader('Chat with the Website')
 
+# Limit answers to chosen pages; the retriever prunes to their chunks before the vector search
+if st.session_state['chain']:
+    page_urls = [p.get('url') for p in st.session_state['pages'] if p.get('url')]
+    selected_urls = st.multiselect('Limit answers to pages', page_urls, placeholder='All pages')
+    st.session_state['chain'].retriever.filter = {'source': selected_urls} if selected_urls else None
+
 # Render chat history
 for role, msg in st.session_state['chat_messages']:
     with st.chat_message(role):
@@ -237,11 +253,12 @@ if user_msg:
     with st.chat_message('user'):
         st.markdown(user_msg)
 
-    res = st.session_state['chain']({'question': user_msg})
-    answer = res.get('answer') or res.get('result') or ''
     with st.chat_message('assistant'):
-        st.markdown(answer)
-        src_docs = res.get('source_documents') or []
+        # Write the answer incrementally as the model streams it
+        stream = AnswerStream(st.session_state['chain'], user_msg)
+        answer = st.write_stream(stream)
+        st.caption(str(stream))
+        src_docs = stream.result.get('source_documents') or []
         if src_docs:
             with st.expander('Sources'):
                 for i, d in enumerate(src_docs, 1):
@@ -5,135 +5,60 @@ A simple app to crawl websites, extract content, and chat with it using RAG.
 
 import streamlit as st
 import os
-from typing import List, Dict, Set
+from typing import List, Dict
 import asyncio
-from urllib.parse import urljoin, urlparse
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
 
 load_dotenv()
 
-from crawl4ai import AsyncWebCrawler
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from answer_stream import ANSWER_TAG, AnswerStream
+from crawler import crawl_website, get_base_domain
+from filtered_retriever import FilteredFAISSRetriever
+from recrawl import discover_sitemap, refresh_site
+from site_index import SiteIndex
+from markdown_chunker import MarkdownChunker
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_community.vectorstores import FAISS
 from langchain.chains import ConversationalRetrievalChain
 from langchain.memory import ConversationBufferMemory
-from langchain.schema import Document
 
 ################################ Helper Functions ################################
 
 
-def get_base_domain(url: str) -> str:
-    """Parse a URL to extract its scheme and network location (domain)."""
-    parsed = urlparse(url)
-    return f'{parsed.scheme}://{parsed.netloc}'
-
-
-def extract_links(html_content: str, base_url: str) -> Set[str]:
-    """Extract all internal links from a given HTML content."""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    links = set()
-    base_domain = get_base_domain(base_url)
-
-    # Find all anchor tags with an 'href' attribute
-    for link in soup.find_all('a', href=True):
-        # Convert relative URLs to absolute URLs
-        absolute_url = urljoin(base_url, link['href'])
-        # Only include links that belong to the same base domain
-        if get_base_domain(absolute_url) == base_domain:
-            links.add(absolute_url)
-
-    return links
-
-
-def extract_title(html_content: str) -> str:
-    """Extract the page title from the HTML content."""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    title_tag = soup.find('title')
-    # Return the title text or 'Untitled' if not found
-    return title_tag.get_text().strip() if title_tag else 'Untitled'
-
-
-async def crawl_website(url: str, max_pages: int = 5, max_depth: int = 2) -> List[Dict[str, str]]:
-    """Crawl a website asynchronously, respecting depth and page limits."""
-    crawled_data = []
-    visited_urls = set()
-    to_crawl = [(url, 0)]  # A queue of (URL, depth) tuples
-
-    # Use an asynchronous web crawler for efficient fetching
-    async with AsyncWebCrawler(verbose=False) as crawler:
-        # Continue crawling while there are pages in the queue and page limit is not reached
-        while to_crawl and len(crawled_data) < max_pages:
-            current_url, current_depth = to_crawl.pop(0)
-
-            # Skip if the URL has been visited or the crawl depth is exceeded
-            if current_url in visited_urls or current_depth > max_depth:
-                continue
-
-            visited_urls.add(current_url)
-            # Fetch the content of the current URL
-            result = await crawler.arun(url=current_url)
-
-            # Process the result if the crawl was successful
-            if result.success:
-                title = extract_title(result.html) if result.html else 'Untitled'
-                # Prefer Markdown content, fall back to cleaned HTML
-                content = result.markdown if result.markdown else result.cleaned_html
-
-                # Add the extracted data to our list if content exists
-                if content:
-                    crawled_data.append(
-                        {'url': current_url, 'content': content, 'title': title, 'depth': current_depth}
-                    )
-
-                # If not at max depth, find new links to add to the queue
-                if current_depth < max_depth and result.html:
-                    links = extract_links(result.html, current_url)
-                    for link in links:
-                        # Add new, unvisited links to the crawl queue
-                        if link not in visited_urls:
-                            to_crawl.append((link, current_depth + 1))
-
-    return crawled_data
-
-
-def create_vector_store(crawled_data: List[Dict[str, str]], api_key: str):
-    """Create a FAISS vector store from the crawled website content."""
-    documents = []
-    # Convert crawled data into LangChain Document objects
-    for item in crawled_data:
-        # Ensure content is not just whitespace
-        if item['content'].strip():
-            doc = Document(
-                page_content=item['content'],
-                metadata={'source': item['url'], 'title': item['title'], 'depth': item['depth']},
-            )
-            documents.append(doc)
-
-    # Split documents into smaller chunks for effective embedding
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-    splits = text_splitter.split_documents(documents)
-
-    # Generate embeddings for the document chunks
+def open_site_index(website_url: str, api_key: str) -> SiteIndex:
+    """Open the persisted index of the site a URL belongs to, loading it if it was saved before."""
+    # Split pages into chunks along their Markdown headings, keeping code blocks and tables whole
+    text_splitter = MarkdownChunker(chunk_size=1000, chunk_overlap=200)
+    # Generate embeddings for the document chunks, several batches at a time
     embeddings = OpenAIEmbeddings(openai_api_key=api_key)
-    # Create the FAISS vector store from the chunks and their embeddings
-    vector_store = FAISS.from_documents(splits, embeddings)
+    site_index = SiteIndex(website_url, embeddings, text_splitter)
+    site_index.load()
+    return site_index
 
-    return vector_store, len(splits)
+
+def create_vector_store(crawled_data: List[Dict[str, str]], api_key: str, website_url: str):
+    """Update the site's persisted FAISS index with the crawled content, embedding only new or changed pages."""
+    site_index = open_site_index(website_url, api_key)
+    embedded_pages, unchanged_pages, num_chunks = site_index.update(crawled_data)
+    return site_index, embedded_pages, unchanged_pages, num_chunks
 
 
 def create_conversation_chain(vector_store, api_key: str):
     """Create a conversational retrieval chain with memory."""
-    # Initialize the language model
-    llm = ChatOpenAI(temperature=0.7, model_name='gpt-3.5-turbo', openai_api_key=api_key)
+    # Initialize the language model, streaming the tokens of its answers
+    llm = ChatOpenAI(
+        temperature=0.7, model_name='gpt-3.5-turbo', openai_api_key=api_key, streaming=True, tags=[ANSWER_TAG]
+    )
+    # A separate, untagged model rewrites follow-up questions, so only answer tokens are streamed
+    condense_question_llm = ChatOpenAI(temperature=0.7, model_name='gpt-3.5-turbo', openai_api_key=api_key)
     # Set up memory to retain chat history
     memory = ConversationBufferMemory(memory_key='chat_history', return_messages=True, output_key='answer')
 
     # Construct the conversational retrieval chain
     return ConversationalRetrievalChain.from_llm(
         llm=llm,
-        retriever=vector_store.as_retriever(search_kwargs={'k': 3}),  # Retrieve top 3 relevant chunks
+        condense_question_llm=condense_question_llm,
+        # Retrieve the top 3 relevant chunks, among the pages chosen in the chat's filter
+        retriever=FilteredFAISSRetriever.from_vector_store(vector_store, k=3),
         memory=memory,
         return_source_documents=True,
     )
@@ -150,6 +75,8 @@ def initialize_session_state():
         st.session_state.chat_history = []
     if 'crawled_data' not in st.session_state:
         st.session_state.crawled_data = None
+    if 'checked_site' not in st.session_state:
+        st.session_state.checked_site = None
 
 
 def render_sidebar():
@@ -180,13 +107,21 @@ def render_sidebar():
         # Create number inputs for crawl parameters
         max_pages = st.number_input('Maximum Pages', min_value=1, max_value=50, value=5)
         max_depth = st.number_input('Crawl Depth', min_value=0, max_value=5, value=1)
+        concurrency = st.number_input('Concurrent Fetches', min_value=1, max_value=16, value=4)
+        delay = st.number_input('Delay Between Requests (s)', min_value=0.0, max_value=10.0, value=0.0, step=0.1)
+        use_sitemap = st.checkbox('Seed from sitemap.xml', value=False, help='Also queue pages listed in the sitemap')
 
-        st.caption(f'📊 Will crawl up to {max_pages} pages at depth {max_depth}')
+        st.caption(f'📊 Will crawl up to {max_pages} pages at depth {max_depth}, {concurrency} at a time')
         st.markdown('---')
 
         # Create the primary button to initiate the crawl and processing
         crawl_button = st.button('🕷️ Crawl & Process', use_container_width=True, type='primary')
 
+        # Create a button to check a saved site for changed pages
+        refresh_button = st.button(
+            '🔁 Refresh Saved Index', use_container_width=True, disabled=not st.session_state.crawled_data
+        )
+
         # Create a button to reset the application state
         if st.button('🔄 Reset', use_container_width=True):
             st.session_state.conversation = None
@@ -199,7 +134,7 @@ def render_sidebar():
         # Display crawl results in the sidebar after processing is complete
         if st.session_state.crawled_data:
             st.success('✅ Website processed!')
-            st.metric('Pages Crawled', len(st.session_state.crawled_data))
+            st.metric('Pages Indexed', len(st.session_state.crawled_data))
 
             # Show the list of crawled pages in an expander
             with st.expander('📄 Crawled Pages'):
@@ -210,10 +145,28 @@ def render_sidebar():
                     st.caption(item['url'])
                     st.markdown('---')
 
-    return openai_api_key, website_url, max_pages, max_depth, crawl_button
+    return (
+        openai_api_key,
+        website_url,
+        max_pages,
+        max_depth,
+        concurrency,
+        delay,
+        use_sitemap,
+        crawl_button,
+        refresh_button,
+    )
 
 
-def handle_crawl_and_process(openai_api_key: str, website_url: str, max_pages: int, max_depth: int):
+def handle_crawl_and_process(
+    openai_api_key: str,
+    website_url: str,
+    max_pages: int,
+    max_depth: int,
+    concurrency: int = 4,
+    delay: float = 0.0,
+    use_sitemap: bool = False,
+):
     """Handle the crawl and processing logic."""
     # Validate that the API key and URL are provided
     if not openai_api_key:
@@ -226,24 +179,108 @@ def handle_crawl_and_process(openai_api_key: str, website_url: str, max_pages: i
 
     # Show a spinner while the website is being crawled
     with st.spinner(f'🕷️ Crawling website...'):
-        crawled_data = asyncio.run(crawl_website(website_url, max_pages, max_depth))
-        st.session_state.crawled_data = crawled_data
+        # Queue the pages listed in the sitemap next to the start URL
+        seed_urls = [entry.url for entry in discover_sitemap(website_url, max_urls=max_pages)] if use_sitemap else []
+        crawled_data = asyncio.run(
+            crawl_website(
+                website_url,
+                max_pages,
+                max_depth,
+                concurrency=concurrency,
+                max_per_host=concurrency,
+                delay=delay,
+                seed_urls=seed_urls,
+            )
+        )
 
     # Proceed only if crawling returned some data
     if crawled_data:
-        # Show a spinner while the content is being processed into a vector store
+        # Show a spinner while new and changed pages are embedded into the site's saved index
         with st.spinner('🧠 Processing content...'):
-            vector_store, num_chunks = create_vector_store(crawled_data, openai_api_key)
-            conversation = create_conversation_chain(vector_store, openai_api_key)
+            site_index, embedded_pages, unchanged_pages, num_chunks = create_vector_store(
+                crawled_data, openai_api_key, website_url
+            )
+            conversation = create_conversation_chain(site_index.vector_store, openai_api_key)
             st.session_state.conversation = conversation
+            st.session_state.crawled_data = site_index.crawled_pages()
+            st.session_state.checked_site = site_index.base_domain
             st.session_state.chat_history = []  # Clear previous chat history
 
-        st.success(f'✅ Processed {len(crawled_data)} pages into {num_chunks} chunks!')
+        st.success(
+            f'✅ Processed {len(crawled_data)} pages: {embedded_pages} embedded into {num_chunks} chunks, '
+            f'{unchanged_pages} unchanged (embedding: {site_index.executor.stats})'
+        )
         st.rerun()  # Rerun to update the UI and display the chat interface
     else:
         st.error('❌ No content extracted from the website')
 
 
+def handle_refresh(
+    openai_api_key: str, website_url: str, max_pages: int, concurrency: int = 4, use_sitemap: bool = False
+):
+    """Recheck the saved site's most overdue pages and re-embed the ones that changed."""
+    if not openai_api_key or not website_url:
+        return
+
+    site_index = open_site_index(website_url, openai_api_key)
+    if site_index.vector_store is None:
+        st.error('❌ This site has not been crawled yet')
+        return
+
+    # Show a spinner while due pages are checked with conditional requests
+    with st.spinner('🔁 Checking pages for changes...'):
+        report = asyncio.run(refresh_site(site_index, max_pages, concurrency, use_sitemap=use_sitemap))
+
+    if report.checked == 0:
+        st.info('✅ Every page was checked recently; nothing is due')
+        return
+
+    # Rebuild the chain only when the index changed
+    if report.chunks:
+        st.session_state.conversation = create_conversation_chain(site_index.vector_store, openai_api_key)
+    st.session_state.crawled_data = site_index.crawled_pages()
+    st.success(f'✅ {report}')
+
+
+def load_saved_site(openai_api_key: str, website_url: str):
+    """Open the saved index of the entered site, once per site, so a crawled site is ready without recrawling."""
+    if not openai_api_key or not website_url:
+        return
+
+    base_domain = get_base_domain(website_url)
+    # Check each site once, so a reset does not bring the saved index straight back
+    if st.session_state.checked_site == base_domain:
+        return
+    st.session_state.checked_site = base_domain
+
+    site_index = open_site_index(website_url, openai_api_key)
+    if site_index.vector_store is None:
+        return
+
+    st.session_state.conversation = create_conversation_chain(site_index.vector_store, openai_api_key)
+    st.session_state.crawled_data = site_index.crawled_pages()
+    st.session_state.chat_history = []
+    st.rerun()  # Rerun to show the loaded pages and the chat interface
+
+
+def render_retrieval_filter():
+    """Let the user limit answers to chosen pages and crawl depths, and apply it to the chain's retriever."""
+    pages = st.session_state.crawled_data or []
+    with st.expander('🔎 Limit answers to'):
+        titles = {page['url']: page['title'] or page['url'] for page in pages}
+        selected = st.multiselect('Pages', list(titles), format_func=titles.get, placeholder='All pages')
+        deepest = max((page['depth'] for page in pages), default=0)
+        max_depth = st.slider('Max crawl depth', 0, deepest, deepest) if deepest else 0
+
+    # Matching chunks are looked up in the retriever's metadata index before the vector search
+    search_filter = {}
+    if selected:
+        search_filter['source'] = selected
+    if max_depth < deepest:
+        search_filter['depth'] = {'$lte': max_depth}
+    st.session_state.conversation.retriever.filter = search_filter or None
+
+
 def render_chat_interface():
     """Render the chat interface."""
     # Display the chat interface only if the conversation chain is ready
@@ -252,11 +289,14 @@ def render_chat_interface():
 
     st.markdown('---')
     st.subheader('💬 Chat with the Website Content')
+    render_retrieval_filter()
 
     # Display previous messages from the chat history
     for message in st.session_state.chat_history:
         with st.chat_message(message['role']):
             st.markdown(message['content'])
+            if 'latency' in message:
+                st.caption(message['latency'])
             # If the message is from the assistant, show the sources it used
             if message['role'] == 'assistant' and 'sources' in message:
                 with st.expander('📚 Sources'):
@@ -274,25 +314,26 @@ def render_chat_interface():
 
         # Generate and display the assistant's response
         with st.chat_message('assistant'):
-            with st.spinner('Thinking...'):
-                # Send the question to the conversation chain to get a response
-                response = st.session_state.conversation({'question': user_question})
-                answer = response['answer']
-                source_documents = response.get('source_documents', [])
-
-                st.markdown(answer)
-
-                # Extract unique source URLs from the response documents
-                sources = list({doc.metadata.get('source', 'Unknown') for doc in source_documents})
-
-                # Display the sources in an expander if any were found
-                if sources:
-                    with st.expander('📚 Sources'):
-                        for source in sources:
-                            st.caption(f'- {source}')
+            # Send the question to the conversation chain and write the answer as its tokens arrive
+            stream = AnswerStream(st.session_state.conversation, user_question)
+            answer = st.write_stream(stream)
+            source_documents = stream.result.get('source_documents', [])
+            latency = str(stream)
+            st.caption(latency)
+
+            # Extract unique source URLs from the response documents
+            sources = list({doc.metadata.get('source', 'Unknown') for doc in source_documents})
+
+            # Display the sources in an expander if any were found
+            if sources:
+                with st.expander('📚 Sources'):
+                    for source in sources:
+                        st.caption(f'- {source}')
 
-                # Add the assistant's response and sources to the chat history
-                st.session_state.chat_history.append({'role': 'assistant', 'content': answer, 'sources': sources})
+            # Add the assistant's response, its latency and sources to the chat history
+            st.session_state.chat_history.append(
+                {'role': 'assistant', 'content': answer, 'sources': sources, 'latency': latency}
+            )
 
 
 ################################ Main Entry Point ################################
@@ -311,11 +352,28 @@ def main():
     initialize_session_state()
 
     # Render sidebar and get user inputs
-    openai_api_key, website_url, max_pages, max_depth, crawl_button = render_sidebar()
+    (
+        openai_api_key,
+        website_url,
+        max_pages,
+        max_depth,
+        concurrency,
+        delay,
+        use_sitemap,
+        crawl_button,
+        refresh_button,
+    ) = render_sidebar()
+
+    # Reopen the site's saved index, if it was crawled before
+    load_saved_site(openai_api_key, website_url)
 
     # Handle crawl and process action
     if crawl_button:
-        handle_crawl_and_process(openai_api_key, website_url, max_pages, max_depth)
+        handle_crawl_and_process(openai_api_key, website_url, max_pages, max_depth, concurrency, delay, use_sitemap)
+
+    # Handle refresh of the saved index
+    if refresh_button:
+        handle_refresh(openai_api_key, website_url, max_pages, concurrency, use_sitemap)
 
     # Render chat interface
     render_chat_interface()
@@ -0,0 +1,324 @@
+"""
+Concurrent crawl engine for the Crawl4AI chatbot.
+A deduplicating, depth-ordered frontier feeds a bounded pool of fetches with per-host politeness limits.
+"""
+
+import asyncio
+import heapq
+import posixpath
+import re
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+from crawl4ai import AsyncWebCrawler
+
+# Fastest available HTML parser: selectolax, then lxml, then the standard library
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+
+    PARSER_BACKEND = 'selectolax'
+except ImportError:
+    try:
+        from lxml import html as lxml_html
+
+        PARSER_BACKEND = 'lxml'
+    except ImportError:
+        PARSER_BACKEND = 'html.parser'
+
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAMS = {'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content', 'gclid', 'fbclid'}
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Elements whose text is never page content
+SKIPPED_TAGS = ('script', 'style', 'noscript')
+
+# Pages larger than this are tokenized in a stream instead of parsed into a tree
+STREAMING_PARSE_CHARS = 2_000_000
+
+
+def get_base_domain(url: str) -> str:
+    """Parse a URL to extract its scheme and network location (domain)."""
+    parsed = urlparse(url)
+    return f'{parsed.scheme}://{parsed.netloc}'
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL, so variants of the same page are crawled once."""
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or '').lower()
+
+    # Keep the port only when it is not the scheme's default
+    netloc = host
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        netloc = f'{host}:{parsed.port}'
+
+    # Resolve '.' and '..' segments, keeping a trailing slash
+    path = parsed.path or '/'
+    normalized_path = posixpath.normpath(path)
+    if path.endswith('/') and normalized_path != '/':
+        normalized_path += '/'
+    if normalized_path.startswith('//'):
+        normalized_path = '/' + normalized_path.lstrip('/')
+
+    # Sort query parameters and drop tracking ones; the fragment never reaches the server
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if k not in TRACKING_PARAMS))
+    return urlunparse((scheme, netloc, normalized_path, '', query, ''))
+
+
+@dataclass
+class ParsedPage:
+    """Everything the crawler needs from one page's HTML."""
+
+    title: str
+    links: Set[str]
+    text: str
+
+
+class _PageTokenizer(HTMLParser):
+    """Streaming pass over HTML collecting title, anchors and visible text without building a tree."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title_parts: List[str] = []
+        self.hrefs: List[str] = []
+        self.text_parts: List[str] = []
+        self._in_title = False
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            href = dict(attrs).get('href')
+            if href:
+                self.hrefs.append(href)
+        elif tag == 'title':
+            self._in_title = True
+        elif tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+        elif tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title_parts.append(data)
+        elif not self._skip_depth:
+            self.text_parts.append(data)
+
+
+def clean_text(text: str) -> str:
+    """Collapse the whitespace left between HTML elements."""
+    text = re.sub(r'\s+\n', '\n', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = re.sub(r'[ \t]{2,}', ' ', text)
+    return text.strip()
+
+
+def _parse_streaming(html_content: str) -> Tuple[str, List[str], str]:
+    tokenizer = _PageTokenizer()
+    tokenizer.feed(html_content)
+    tokenizer.close()
+    return ''.join(tokenizer.title_parts), tokenizer.hrefs, '\n'.join(tokenizer.text_parts)
+
+
+def _parse_selectolax(html_content: str) -> Tuple[str, List[str], str]:
+    tree = SelectolaxParser(html_content)
+    title_node = tree.css_first('title')
+    hrefs = [node.attributes.get('href') for node in tree.css('a[href]')]
+    for node in tree.css(', '.join(SKIPPED_TAGS)):
+        node.decompose()
+    root = tree.body or tree.root
+    text = root.text(separator='\n') if root is not None else ''
+    return title_node.text() if title_node is not None else '', [href for href in hrefs if href], text
+
+
+def _parse_lxml(html_content: str) -> Tuple[str, List[str], str]:
+    # Parse bytes so pages carrying an XML encoding declaration are accepted
+    document = lxml_html.fromstring(
+        html_content.encode('utf-8', 'replace'), parser=lxml_html.HTMLParser(encoding='utf-8')
+    )
+    title = document.findtext('.//title') or ''
+    hrefs = document.xpath('//a/@href')
+    for element in document.xpath(' | '.join(f'//{tag}' for tag in SKIPPED_TAGS)):
+        element.drop_tree()
+    body = document.find('body')
+    root = body if body is not None else document
+    return title, [str(href) for href in hrefs], '\n'.join(root.itertext())
+
+
+def parse_page(html_content: str, base_url: str) -> ParsedPage:
+    """Parse a page once, returning its title, internal links and cleaned text.
+
+    Uses selectolax or lxml when installed and the standard library's streaming
+    html.parser otherwise. Pages over STREAMING_PARSE_CHARS always go through the
+    streaming tokenizer, which never holds a full document tree in memory.
+    """
+    if not html_content:
+        return ParsedPage('Untitled', set(), '')
+
+    parse = _parse_streaming
+    if len(html_content) <= STREAMING_PARSE_CHARS and PARSER_BACKEND != 'html.parser':
+        parse = _parse_selectolax if PARSER_BACKEND == 'selectolax' else _parse_lxml
+    try:
+        title, hrefs, text = parse(html_content)
+    except Exception:
+        # Fall back to the tolerant tokenizer for markup the fast parsers reject
+        title, hrefs, text = _parse_streaming(html_content)
+
+    links = set()
+    base_domain = get_base_domain(base_url)
+    for href in hrefs:
+        # Convert relative URLs to absolute URLs
+        absolute_url = urljoin(base_url, href.strip())
+        # Only include links that belong to the same base domain
+        if get_base_domain(absolute_url) == base_domain:
+            links.add(absolute_url)
+
+    # Return the title text or 'Untitled' if not found
+    return ParsedPage(title.strip() or 'Untitled', links, clean_text(text))
+
+
+class CrawlFrontier:
+    """Priority queue of URLs to crawl: shallowest first, then in discovery order.
+
+    URLs are normalised and deduplicated when they are pushed, so a page linked
+    from many others is queued once, and URLs beyond max_depth are never queued.
+    """
+
+    def __init__(self, max_depth: int):
+        self.max_depth = max_depth
+        self._heap: List[Tuple[int, int, str]] = []
+        self._seen: Set[str] = set()
+        self._counter = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, url: str, depth: int) -> bool:
+        """Queue a URL unless it was seen before or is too deep; returns whether it was queued."""
+        url = normalize_url(url)
+        if depth > self.max_depth or url in self._seen:
+            return False
+        self._seen.add(url)
+        heapq.heappush(self._heap, (depth, self._counter, url))
+        self._counter += 1
+        return True
+
+    def mark_seen(self, url: str):
+        """Record a URL reached another way (e.g. the target of a redirect)."""
+        self._seen.add(normalize_url(url))
+
+    def pop(self) -> Tuple[str, int]:
+        """Next (url, depth) to fetch."""
+        depth, _, url = heapq.heappop(self._heap)
+        return url, depth
+
+
+class HostLimiter:
+    """Cap concurrent requests per host and space out their start times."""
+
+    def __init__(self, max_per_host: int = 2, min_delay: float = 0.0):
+        self.max_per_host = max(max_per_host, 1)
+        self.min_delay = max(min_delay, 0.0)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Hold one of the host's request slots for the duration of a fetch."""
+        host = urlparse(url).netloc
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.max_per_host))
+        async with semaphore:
+            if self.min_delay:
+                # Reserve the next start time under a lock so concurrent fetches queue up behind each other
+                async with self._locks.setdefault(host, asyncio.Lock()):
+                    now = time.monotonic()
+                    start = max(now, self._next_start.get(host, now))
+                    self._next_start[host] = start + self.min_delay
+                await asyncio.sleep(start - now)
+            yield
+
+
+async def crawl_website(
+    url: str,
+    max_pages: int = 5,
+    max_depth: int = 2,
+    concurrency: int = 4,
+    max_per_host: int = 4,
+    delay: float = 0.0,
+    seed_urls: Optional[List[str]] = None,
+) -> List[Dict[str, str]]:
+    """Crawl a website with several fetches in flight, respecting depth and page limits.
+
+    A fetch is only started while the pages already collected plus the fetches in flight
+    stay below max_pages, so the limit holds exactly even though fetches complete out of order.
+    Seed URLs (e.g. from the site's sitemap) are queued next to the start URL at depth 0.
+    """
+    frontier = CrawlFrontier(max_depth)
+    for start_url in [url, *(seed_urls or [])]:
+        frontier.push(start_url, 0)
+    limiter = HostLimiter(max_per_host, delay)
+    crawled_data: List[Dict[str, str]] = []
+
+    # Use an asynchronous web crawler for efficient fetching
+    async with AsyncWebCrawler(verbose=False) as crawler:
+
+        async def fetch(page_url: str, depth: int):
+            async with limiter.slot(page_url):
+                return page_url, depth, await crawler.arun(url=page_url)
+
+        in_flight: Set[asyncio.Task] = set()
+        while True:
+            # Start fetches while there is work, free capacity and room under the page limit
+            while frontier and len(in_flight) < concurrency and len(crawled_data) + len(in_flight) < max_pages:
+                in_flight.add(asyncio.create_task(fetch(*frontier.pop())))
+            if not in_flight:
+                break
+
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    current_url, current_depth, result = task.result()
+                except Exception:
+                    # A page that cannot be fetched frees its slot for the next URL
+                    continue
+                if not result.success:
+                    continue
+                if getattr(result, 'url', None):
+                    frontier.mark_seen(result.url)
+
+                # One parse yields the title, the links and a plain-text fallback
+                page = parse_page(result.html or '', current_url)
+                # Prefer Markdown content, fall back to the page's cleaned text
+                content = result.markdown if result.markdown else page.text
+
+                # Add the extracted data to our list if content exists, with the validators needed to detect changes
+                if content:
+                    headers = {key.lower(): value for key, value in (getattr(result, 'response_headers', None) or {}).items()}
+                    crawled_data.append(
+                        {
+                            'url': current_url,
+                            'content': content,
+                            'title': page.title,
+                            'depth': current_depth,
+                            'etag': headers.get('etag'),
+                            'last_modified': headers.get('last-modified'),
+                        }
+                    )
+
+                # If not at max depth, queue new links; the frontier drops duplicates
+                if current_depth < max_depth:
+                    for link in sorted(page.links):
+                        frontier.push(link, current_depth + 1)
+
+    # Fetches finish out of order; report pages breadth-first like a sequential crawl
+    crawled_data.sort(key=lambda item: item['depth'])
+    return crawled_data
@@ -0,0 +1,117 @@
+"""
+Batched, concurrent embedding for the Crawl4AI chatbots.
+Chunks are embedded in fixed-size batches with several requests in flight, and every completed batch is added to the
+FAISS index while later batches are still being embedded.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Deque, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_community.vectorstores import FAISS
+
+# Chunks per embedding request and requests in flight, sized for hosted embedding APIs
+DEFAULT_BATCH_SIZE = int(os.getenv('EMBED_BATCH_SIZE', '64'))
+DEFAULT_MAX_IN_FLIGHT = int(os.getenv('EMBED_CONCURRENCY', '4'))
+
+
+@dataclass
+class EmbeddingThroughput:
+    """Chunks embedded, requests made and retries needed, with the time it took."""
+
+    chunks: int = 0
+    batches: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f'{self.chunks} chunks in {self.seconds:.1f}s '
+            f'({self.chunks_per_second:.0f} chunks/s, {self.retries} retries)'
+        )
+
+
+class EmbeddingExecutor:
+    """Embed chunks in batches with a bounded number of requests in flight.
+
+    Batches come back in submission order as soon as each completes, so the index grows while
+    later batches are embedded. A failed request is retried with exponential backoff and jitter.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+    ):
+        self.embeddings = embeddings
+        self.batch_size = max(batch_size, 1)
+        self.max_in_flight = max(max_in_flight, 1)
+        self.max_retries = max(max_retries, 0)
+        self.backoff = backoff
+        self.stats = EmbeddingThroughput()
+        self._lock = threading.Lock()
+
+    def stream(self, texts: Sequence[str]) -> Iterator[Tuple[int, List[List[float]]]]:
+        """Yield (offset, vectors) for each batch in order, while later batches are in flight."""
+        started = time.perf_counter()
+        pending: Deque[Tuple[int, Future]] = deque()
+        with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='embed') as pool:
+            try:
+                for offset in range(0, len(texts), self.batch_size):
+                    batch = list(texts[offset : offset + self.batch_size])
+                    pending.append((offset, pool.submit(self._embed_batch, batch)))
+                    # One batch waits behind the busy workers, so none idles while the caller indexes
+                    if len(pending) > self.max_in_flight:
+                        offset, future = pending.popleft()
+                        yield offset, future.result()
+                while pending:
+                    offset, future = pending.popleft()
+                    yield offset, future.result()
+            finally:
+                for _, future in pending:
+                    future.cancel()
+                with self._lock:
+                    self.stats.seconds += time.perf_counter() - started
+
+    def build_faiss(self, documents, ids: Optional[List[str]] = None, vector_store: Optional[FAISS] = None) -> FAISS:
+        """Embed documents into a FAISS index, creating it from the first batch unless one is given."""
+        texts = [doc.page_content for doc in documents]
+        for offset, vectors in self.stream(texts):
+            batch = documents[offset : offset + len(vectors)]
+            text_embeddings = list(zip(texts[offset : offset + len(vectors)], vectors))
+            metadatas = [doc.metadata for doc in batch]
+            batch_ids = ids[offset : offset + len(vectors)] if ids else None
+            if vector_store is None:
+                vector_store = FAISS.from_embeddings(text_embeddings, self.embeddings, metadatas=metadatas, ids=batch_ids)
+            else:
+                vector_store.add_embeddings(text_embeddings, metadatas=metadatas, ids=batch_ids)
+        return vector_store
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                vectors = self.embeddings.embed_documents(texts)
+                break
+            except Exception:
+                # Rate limits and transient API errors: back off and try again
+                if attempt == self.max_retries:
+                    raise
+                with self._lock:
+                    self.stats.retries += 1
+                time.sleep(self.backoff * (2**attempt) * (1 + random.random()))
+        with self._lock:
+            self.stats.chunks += len(texts)
+            self.stats.batches += 1
+        return vectors
@@ -0,0 +1,138 @@
+"""
+Metadata-filtered retrieval over a site's FAISS index.
+The chunks carrying each page URL, title and crawl depth are indexed once, and a filtered search hands FAISS only
+their positions, so candidates are pruned before vectors are scored instead of post-filtering the top k.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import faiss
+import numpy as np
+from langchain.schema import Document
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+
+# Chunk metadata the crawler attaches and searches can be filtered on
+FILTER_FIELDS = ('source', 'title', 'depth')
+
+_COMPARISONS = {
+    '$eq': lambda value, operand: value == operand,
+    '$ne': lambda value, operand: value != operand,
+    '$gt': lambda value, operand: value > operand,
+    '$gte': lambda value, operand: value >= operand,
+    '$lt': lambda value, operand: value < operand,
+    '$lte': lambda value, operand: value <= operand,
+    '$in': lambda value, operand: value in operand,
+}
+
+
+class MetadataIndex:
+    """Positions in a FAISS index of the chunks with each value of the filter fields."""
+
+    def __init__(self, vector_store, fields=FILTER_FIELDS):
+        self.vector_store = vector_store
+        self.fields = tuple(fields)
+        self._postings: Dict[str, Dict[Any, np.ndarray]] = {}
+        self._mapping: Optional[Dict[int, str]] = None
+        self._count = 0
+        self._build()
+
+    def _build(self):
+        postings: Dict[str, Dict[Any, List[int]]] = {field: {} for field in self.fields}
+        docstore = self.vector_store.docstore
+        for position, doc_id in self.vector_store.index_to_docstore_id.items():
+            doc = docstore.search(doc_id)
+            if not isinstance(doc, Document):
+                continue
+            for field in self.fields:
+                if field in doc.metadata:
+                    postings[field].setdefault(doc.metadata[field], []).append(position)
+        self._postings = {
+            field: {value: np.array(positions, dtype=np.int64) for value, positions in values.items()}
+            for field, values in postings.items()
+        }
+        # Deleting chunks replaces the position mapping and adding them grows it, either way the index is rebuilt
+        self._mapping = self.vector_store.index_to_docstore_id
+        self._count = len(self._mapping)
+
+    def positions(self, filter: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Sorted positions of the chunks matching a filter, or None when it is empty.
+
+        A filter maps fields to a value, a list of values or comparisons such as {'$lte': 1}, e.g.
+        {'source': ['https://example.com/a', 'https://example.com/b'], 'depth': {'$lte': 1}}.
+        """
+        if not filter:
+            return None
+        mapping = self.vector_store.index_to_docstore_id
+        if mapping is not self._mapping or len(mapping) != self._count:
+            self._build()
+
+        matched: Optional[np.ndarray] = None
+        for field, condition in filter.items():
+            if field not in self._postings:
+                raise ValueError(f'Cannot filter on {field!r}, indexed fields are {", ".join(self.fields)}')
+            if isinstance(condition, dict):
+                for operator in condition:
+                    if operator not in _COMPARISONS:
+                        raise ValueError(f'Unsupported filter operator {operator!r} on {field!r}')
+            elif isinstance(condition, (list, tuple, set)):
+                condition = {'$in': list(condition)}
+            else:
+                condition = {'$eq': condition}
+
+            lists = [
+                positions
+                for value, positions in self._postings[field].items()
+                if all(_matches(value, operator, operand) for operator, operand in condition.items())
+            ]
+            field_positions = np.unique(np.concatenate(lists)) if lists else np.empty(0, dtype=np.int64)
+            matched = field_positions if matched is None else np.intersect1d(matched, field_positions)
+        return matched
+
+
+def _matches(value: Any, operator: str, operand: Any) -> bool:
+    try:
+        return bool(_COMPARISONS[operator](value, operand))
+    except TypeError:
+        # Incomparable types (e.g. a depth against a string) never match
+        return False
+
+
+class FilteredFAISSRetriever(BaseRetriever):
+    """Retrieve the k nearest chunks of a FAISS store among those whose metadata matches filter.
+
+    Set filter between questions to limit answers to chosen pages or crawl depths; None searches every chunk.
+    """
+
+    vector_store: Any
+    metadata_index: MetadataIndex
+    k: int = 3
+    filter: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_vector_store(cls, vector_store, k: int = 3, filter: Optional[Dict[str, Any]] = None):
+        """Index the store's chunk metadata and wrap it in a retriever."""
+        return cls(vector_store=vector_store, metadata_index=MetadataIndex(vector_store), k=k, filter=filter)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        store = self.vector_store
+        positions = self.metadata_index.positions(self.filter)
+        k = self.k if positions is None else min(self.k, len(positions))
+        if k == 0:
+            return []
+
+        vector = np.array([store.embedding_function.embed_query(query)], dtype=np.float32)
+        if getattr(store, '_normalize_L2', False):
+            faiss.normalize_L2(vector)
+        # Only the selected positions are scored
+        params = None if positions is None else faiss.SearchParameters(sel=faiss.IDSelectorBatch(positions))
+        _, indices = store.index.search(vector, k, params=params)
+
+        documents = []
+        for position in indices[0]:
+            if position == -1:
+                continue
+            doc = store.docstore.search(store.index_to_docstore_id[int(position)])
+            if isinstance(doc, Document):
+                documents.append(doc)
+        return documents
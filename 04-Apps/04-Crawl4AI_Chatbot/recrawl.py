@@ -0,0 +1,298 @@
+"""
+Sitemap discovery and change-aware recrawling for the Crawl4AI chatbot.
+Pages are checked with conditional GETs in order of how overdue they are, and only pages that changed are crawled
+and embedded again.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import time
+import urllib.error
+import urllib.request
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+from urllib.robotparser import RobotFileParser
+
+from crawler import crawl_website, get_base_domain, normalize_url
+
+USER_AGENT = 'Crawl4AI-Chatbot/1.0'
+
+# Revisit intervals in seconds, bounded so a page is never checked too often or forgotten
+MIN_INTERVAL = 3600
+DEFAULT_INTERVAL = 86400
+MAX_INTERVAL = 30 * 86400
+CHANGEFREQ_SECONDS = {
+    'always': MIN_INTERVAL,
+    'hourly': MIN_INTERVAL,
+    'daily': 86400,
+    'weekly': 7 * 86400,
+    'monthly': MAX_INTERVAL,
+    'yearly': MAX_INTERVAL,
+    'never': MAX_INTERVAL,
+}
+
+
+@dataclass
+class FetchResponse:
+    """Outcome of one HTTP GET; status 0 means the request failed before a response."""
+
+    status: int
+    url: str
+    body: bytes = b''
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+
+@dataclass
+class SitemapEntry:
+    """A page listed in the site's sitemap."""
+
+    url: str
+    lastmod: Optional[float] = None
+    changefreq: Optional[str] = None
+
+
+@dataclass
+class RefreshReport:
+    """What one recrawl pass checked and changed."""
+
+    checked: int = 0
+    unchanged: int = 0
+    changed: int = 0
+    added: int = 0
+    failed: int = 0
+    chunks: int = 0
+    elapsed: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f'{self.checked} pages checked: {self.unchanged} unchanged, {self.changed} changed, '
+            f'{self.added} new, {self.failed} failed ({self.chunks} chunks embedded in {self.elapsed:.1f}s)'
+        )
+
+
+def http_get(url: str, etag: Optional[str] = None, last_modified: Optional[str] = None, timeout: float = 15.0):
+    """GET a URL, sending the stored validators so an unchanged page costs a bodiless 304."""
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    if etag:
+        request.add_header('If-None-Match', etag)
+    if last_modified:
+        request.add_header('If-Modified-Since', last_modified)
+
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            headers = {key.lower(): value for key, value in response.headers.items()}
+            return FetchResponse(response.status, response.geturl(), response.read(), headers)
+    except urllib.error.HTTPError as e:
+        # urllib reports 304 Not Modified as an error
+        headers = {key.lower(): value for key, value in (e.headers or {}).items()}
+        return FetchResponse(e.code, url, b'', headers)
+    except (urllib.error.URLError, OSError):
+        return FetchResponse(0, url)
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[float]:
+    """Timestamp of a sitemap <lastmod> (W3C datetime), or None if it cannot be parsed."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_sitemap(body: bytes) -> Tuple[List[SitemapEntry], List[str]]:
+    """Page entries and nested sitemap URLs of a sitemap or sitemap index document."""
+    if body[:2] == b'\x1f\x8b':
+        body = gzip.decompress(body)
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError:
+        return [], []
+
+    entries, sitemaps = [], []
+    for element in root:
+        # Compare local names so any namespace prefix is accepted
+        values = {child.tag.rsplit('}', 1)[-1]: (child.text or '').strip() for child in element}
+        if not values.get('loc'):
+            continue
+        if element.tag.rsplit('}', 1)[-1] == 'sitemap':
+            sitemaps.append(values['loc'])
+        else:
+            entries.append(
+                SitemapEntry(values['loc'], parse_lastmod(values.get('lastmod')), values.get('changefreq') or None)
+            )
+    return entries, sitemaps
+
+
+def read_robots(base_url: str, fetch=http_get) -> RobotFileParser:
+    """The site's robots.txt rules; a missing file allows everything."""
+    robots = RobotFileParser(urljoin(base_url, '/robots.txt'))
+    response = fetch(robots.url)
+    lines = response.body.decode('utf-8', 'replace').splitlines() if response.status == 200 else []
+    robots.parse(lines)
+    return robots
+
+
+def discover_sitemap(url: str, max_urls: int = 500, fetch=http_get) -> List[SitemapEntry]:
+    """Pages of the site's sitemaps, found via robots.txt or at /sitemap.xml.
+
+    Nested sitemap indexes are followed, pages outside the site or disallowed by
+    robots.txt are dropped, and at most max_urls entries are returned.
+    """
+    base_domain = get_base_domain(normalize_url(url))
+    robots = read_robots(base_domain, fetch)
+    pending = list(robots.site_maps() or [urljoin(base_domain, '/sitemap.xml')])
+    visited, entries, seen_urls = set(), [], set()
+
+    while pending and len(entries) < max_urls:
+        sitemap_url = pending.pop(0)
+        if sitemap_url in visited:
+            continue
+        visited.add(sitemap_url)
+        response = fetch(sitemap_url)
+        if response.status != 200:
+            continue
+
+        page_entries, nested = parse_sitemap(response.body)
+        pending.extend(nested)
+        for entry in page_entries:
+            entry.url = normalize_url(entry.url)
+            if entry.url in seen_urls or get_base_domain(entry.url) != base_domain:
+                continue
+            if not robots.can_fetch(USER_AGENT, entry.url):
+                continue
+            seen_urls.add(entry.url)
+            entries.append(entry)
+    return entries[:max_urls]
+
+
+class RecrawlScheduler:
+    """Choose which indexed pages to check next, most overdue first.
+
+    Each page carries a revisit interval that halves when a check finds it changed
+    and doubles when it did not, seeded from the sitemap's changefreq. A page is due
+    once the time since its last check exceeds its interval; new sitemap pages and
+    pages whose sitemap lastmod is newer than the last check come first.
+    """
+
+    def __init__(self, pages: Dict[str, Dict], entries: Optional[List[SitemapEntry]] = None):
+        self.pages = pages
+        self.entries = {entry.url: entry for entry in entries or []}
+
+    def interval(self, url: str) -> float:
+        """Current revisit interval of a page in seconds."""
+        page = self.pages.get(url, {})
+        if page.get('change_interval'):
+            return page['change_interval']
+        entry = self.entries.get(url)
+        return CHANGEFREQ_SECONDS.get(entry.changefreq if entry else None, DEFAULT_INTERVAL)
+
+    def priority(self, url: str, now: float) -> float:
+        """How overdue a page is: at least 1.0 once due, infinite if it was never indexed or is known to have changed."""
+        page = self.pages.get(url)
+        entry = self.entries.get(url)
+        if page is None or not page.get('checked_at'):
+            return float('inf')
+        if entry and entry.lastmod and entry.lastmod > page['checked_at']:
+            return float('inf')
+        return (now - page['checked_at']) / self.interval(url)
+
+    def due(self, limit: int, now: Optional[float] = None) -> List[str]:
+        """Up to limit URLs whose check is due, most overdue first."""
+        now = time.time() if now is None else now
+        ranked = sorted(((self.priority(url, now), url) for url in {*self.pages, *self.entries}), reverse=True)
+        return [url for priority, url in ranked if priority >= 1.0][:limit]
+
+    def record_check(self, url: str, changed: bool, now: Optional[float] = None):
+        """Adapt a page's revisit interval after checking it."""
+        page = self.pages.get(url)
+        if page is None:
+            return
+        now = time.time() if now is None else now
+        interval = self.interval(url)
+        page['change_interval'] = max(MIN_INTERVAL, interval / 2) if changed else min(MAX_INTERVAL, interval * 2)
+        page['checked_at'] = now
+        if changed:
+            page['changed_at'] = now
+
+
+async def refresh_site(
+    site_index, max_pages: int = 20, concurrency: int = 4, use_sitemap: bool = True, fetch=http_get
+) -> RefreshReport:
+    """Bring a saved site index up to date, fetching and embedding only pages that changed.
+
+    Due pages are checked with conditional GETs; a 304, or a body identical to the last one,
+    leaves the page untouched. Changed and newly listed pages are crawled again and
+    passed to the site index, which re-embeds them.
+    """
+    started = time.perf_counter()
+    report = RefreshReport()
+    entries = await asyncio.to_thread(discover_sitemap, site_index.base_domain, fetch=fetch) if use_sitemap else []
+    scheduler = RecrawlScheduler(site_index.pages, entries)
+    due = scheduler.due(max_pages)
+    previous = {url: dict(site_index.pages[url]) for url in due if url in site_index.pages}
+
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def check(url: str) -> Tuple[str, FetchResponse]:
+        page = previous.get(url, {})
+        async with semaphore:
+            return url, await asyncio.to_thread(fetch, url, page.get('etag'), page.get('last_modified'))
+
+    to_crawl, responses = [], {}
+    for url, response in await asyncio.gather(*(check(url) for url in due)):
+        report.checked += 1
+        responses[url] = response
+        page = previous.get(url)
+        if response.status == 0 or response.status >= 400:
+            report.failed += 1
+        elif response.not_modified or (page and page.get('body_hash') == hashlib.sha256(response.body).hexdigest()):
+            report.unchanged += 1
+            scheduler.record_check(url, changed=False)
+        else:
+            to_crawl.append(url)
+
+    if to_crawl:
+        crawled_data = await crawl_website(
+            to_crawl[0], max_pages=len(to_crawl), max_depth=0, concurrency=concurrency, seed_urls=to_crawl[1:]
+        )
+        for item in crawled_data:
+            # Keep the depth at which the page was first discovered
+            item['depth'] = previous.get(item['url'], {}).get('depth', 1)
+        _, _, report.chunks = site_index.update(crawled_data)
+
+        for url in to_crawl:
+            page = site_index.pages.get(url)
+            if page is None:
+                report.failed += 1
+                continue
+            changed = url not in previous or page['content_hash'] != previous[url]['content_hash']
+            if url not in previous:
+                report.added += 1
+            elif changed:
+                report.changed += 1
+            else:
+                report.unchanged += 1
+            # Carry the learned interval over to the replaced record, then adapt it
+            if url in previous and 'change_interval' in previous[url]:
+                page.setdefault('change_interval', previous[url]['change_interval'])
+            scheduler.record_check(url, changed=changed)
+            response = responses[url]
+            page['body_hash'] = hashlib.sha256(response.body).hexdigest()
+            page['etag'] = response.headers.get('etag') or page.get('etag')
+            page['last_modified'] = response.headers.get('last-modified') or page.get('last_modified')
+
+    site_index.save()
+    report.elapsed = time.perf_counter() - started
+    return report
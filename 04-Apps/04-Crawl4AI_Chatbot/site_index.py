@@ -0,0 +1,150 @@
+"""
+Persistent per-site FAISS indexes for the Crawl4AI chatbot.
+Each site keeps its crawled pages and their chunk embeddings on disk, so reopening it is instant and recrawls
+only embed the pages that changed.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from langchain.schema import Document
+from langchain_community.vectorstores import FAISS
+
+from crawler import get_base_domain, normalize_url
+from embedding_executor import EmbeddingExecutor
+
+# Directory holding one sub-directory per crawled site
+SITE_INDEX_DIR = os.getenv('SITE_INDEX_DIR', 'site_indexes')
+MANIFEST_FILE = 'pages.json'
+
+
+def content_hash(content: str) -> str:
+    """SHA-256 of a page's extracted content."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def site_directory(url: str, root: str = SITE_INDEX_DIR) -> str:
+    """Directory of the index for the site a URL belongs to, named after its base domain."""
+    slug = re.sub(r'[^A-Za-z0-9.-]+', '_', get_base_domain(normalize_url(url))).strip('_')
+    return os.path.join(root, slug)
+
+
+class SiteIndex:
+    """A site's crawled pages and FAISS index, kept in sync on disk.
+
+    The manifest records every page's content hash, validators (ETag and Last-Modified)
+    and chunk ids. Updating with freshly crawled pages re-embeds only the pages whose
+    content changed and replaces their old chunks; pages not reached by a crawl are kept.
+    """
+
+    def __init__(
+        self, url: str, embeddings, text_splitter, root: str = SITE_INDEX_DIR, executor: Optional[EmbeddingExecutor] = None
+    ):
+        self.base_domain = get_base_domain(normalize_url(url))
+        self.directory = site_directory(url, root)
+        self.embeddings = embeddings
+        self.executor = executor or EmbeddingExecutor(embeddings)
+        self.text_splitter = text_splitter
+        self.pages: Dict[str, Dict] = {}
+        self.vector_store: Optional[FAISS] = None
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(os.path.join(self.directory, MANIFEST_FILE))
+
+    def load(self) -> bool:
+        """Load the saved pages and index; returns whether the site had been indexed before."""
+        if not self.exists:
+            return False
+        if not os.path.exists(os.path.join(self.directory, 'index.faiss')):
+            # Without the index the recorded pages have no embeddings, so start over
+            return False
+        with open(os.path.join(self.directory, MANIFEST_FILE), encoding='utf-8') as f:
+            self.pages = json.load(f)['pages']
+        # The pickled docstore was written by this app, so deserializing it is safe
+        self.vector_store = FAISS.load_local(self.directory, self.embeddings, allow_dangerous_deserialization=True)
+        return True
+
+    def is_unchanged(self, item: Dict[str, str]) -> bool:
+        """Whether a crawled page matches what is already indexed."""
+        previous = self.pages.get(item['url'])
+        if previous is None:
+            return False
+        # A matching ETag vouches for the content; otherwise compare hashes
+        if item.get('etag') and item.get('etag') == previous.get('etag'):
+            return True
+        return content_hash(item['content']) == previous['content_hash']
+
+    def update(self, crawled_data: List[Dict[str, str]]) -> Tuple[int, int, int]:
+        """Index new and changed pages, returning (pages embedded, pages unchanged, chunks embedded)."""
+        embedded_pages, unchanged_pages = 0, 0
+        stale_ids: List[str] = []
+        documents: List[Document] = []
+        ids: List[str] = []
+
+        for item in crawled_data:
+            # Ensure content is not just whitespace
+            if not item['content'].strip():
+                continue
+            if self.is_unchanged(item):
+                unchanged_pages += 1
+                self.pages[item['url']].update(title=item['title'], depth=item['depth'], checked_at=time.time())
+                continue
+
+            digest = content_hash(item['content'])
+            previous = self.pages.get(item['url'])
+            if previous:
+                stale_ids.extend(previous['chunk_ids'])
+
+            # Split the page into chunks; ids include the content hash so a new version never clashes with the old
+            page = Document(
+                page_content=item['content'],
+                metadata={'source': item['url'], 'title': item['title'], 'depth': item['depth']},
+            )
+            chunks = self.text_splitter.split_documents([page])
+            url_key = hashlib.sha1(item['url'].encode('utf-8')).hexdigest()[:16]
+            chunk_ids = [f'{url_key}-{digest[:12]}-{i}' for i in range(len(chunks))]
+            documents.extend(chunks)
+            ids.extend(chunk_ids)
+            embedded_pages += 1
+
+            self.pages[item['url']] = {
+                'url': item['url'],
+                'title': item['title'],
+                'depth': item['depth'],
+                'content': item['content'],
+                'content_hash': digest,
+                'etag': item.get('etag'),
+                'last_modified': item.get('last_modified'),
+                'chunk_ids': chunk_ids,
+                'checked_at': time.time(),
+            }
+
+        if stale_ids and self.vector_store is not None:
+            self.vector_store.delete(stale_ids)
+        if documents:
+            # Batches are embedded concurrently and added to the index as they complete
+            self.vector_store = self.executor.build_faiss(documents, ids, self.vector_store)
+
+        self.save()
+        return embedded_pages, unchanged_pages, len(documents)
+
+    def save(self):
+        """Write the index, then the manifest that refers to it."""
+        os.makedirs(self.directory, exist_ok=True)
+        if self.vector_store is not None:
+            self.vector_store.save_local(self.directory)
+        # Replace the manifest atomically so a crash never leaves it half written
+        manifest_path = os.path.join(self.directory, MANIFEST_FILE)
+        temp_path = manifest_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'base_domain': self.base_domain, 'pages': self.pages}, f)
+        os.replace(temp_path, manifest_path)
+
+    def crawled_pages(self) -> List[Dict]:
+        """Every indexed page, shallowest first, in the shape crawl_website returns."""
+        return sorted(self.pages.values(), key=lambda page: page['depth'])
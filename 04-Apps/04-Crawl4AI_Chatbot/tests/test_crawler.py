@@ -0,0 +1,149 @@
+"""Tests for the concurrent crawl engine."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import crawler
+from crawler import CrawlFrontier, HostLimiter, crawl_website, normalize_url, parse_page
+
+SITE = {
+    'https://example.com/': ['/a', '/b', 'https://other.com/x'],
+    'https://example.com/a': ['/c', '/?utm_source=feed', '#top'],
+    'https://example.com/b': ['/a', '/c'],
+    'https://example.com/c': ['/d'],
+    'https://example.com/d': [],
+}
+
+
+class FakeCrawler:
+    """Stand-in for AsyncWebCrawler serving the pages of SITE and counting fetches."""
+
+    fetched = []
+
+    def __init__(self, **kwargs):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def arun(self, url):
+        FakeCrawler.fetched.append(url)
+        await asyncio.sleep(0)
+        if url not in SITE:
+            return SimpleNamespace(success=False)
+        links = ''.join(f'<a href="{href}">link</a>' for href in SITE[url])
+        html = f'<html><head><title>{url}</title></head><body><p>Page {url}</p>{links}</body></html>'
+        return SimpleNamespace(success=True, html=html, markdown=f'Page {url}', url=url,
+                               response_headers={'ETag': f'"{len(url)}"'})
+
+
+@pytest.fixture
+def fake_crawler(monkeypatch):
+    """Serve SITE instead of the network."""
+    FakeCrawler.fetched = []
+    monkeypatch.setattr(crawler, 'AsyncWebCrawler', FakeCrawler)
+    return FakeCrawler
+
+
+def test_normalize_url_merges_variants():
+    """Test that variants of the same page normalise to one URL."""
+    canonical = 'https://example.com/docs/page?a=1&b=2'
+    for variant in [
+        'HTTPS://Example.COM:443/docs/page?b=2&a=1',
+        'https://example.com/docs/./guide/../page?a=1&b=2&utm_source=x#intro',
+        ' https://example.com/docs//page?a=1&b=2 ',
+    ]:
+        assert normalize_url(variant) == canonical
+    assert normalize_url('https://example.com') == 'https://example.com/'
+    assert normalize_url('http://example.com:8080/docs/') == 'http://example.com:8080/docs/'
+
+
+def test_frontier_deduplicates_and_orders_by_depth():
+    """Test that URLs are queued once, within max_depth, shallowest first."""
+    frontier = CrawlFrontier(max_depth=1)
+
+    assert frontier.push('https://example.com/b', 1)
+    assert frontier.push('https://example.com/', 0)
+    assert not frontier.push('https://example.com/#top', 0)
+    assert not frontier.push('https://example.com/deep', 2)
+    assert frontier.push('https://example.com/a', 1)
+    frontier.mark_seen('https://example.com/redirected')
+    assert not frontier.push('https://example.com/redirected', 1)
+
+    assert [frontier.pop() for _ in range(len(frontier))] == [
+        ('https://example.com/', 0), ('https://example.com/b', 1), ('https://example.com/a', 1)
+    ]
+
+
+def test_parse_page_extracts_title_links_and_text():
+    """Test that one parse yields the title, same-site links and visible text."""
+    html = (
+        '<html><head><title> Docs </title><style>p {}</style></head><body>'
+        '<a href="/guide">Guide</a><a href="https://other.com/">Other</a>'
+        '<script>var hidden = 1;</script><p>Visible   text</p></body></html>'
+    )
+    page = parse_page(html, 'https://example.com/index.html')
+
+    assert page.title == 'Docs'
+    assert page.links == {'https://example.com/guide'}
+    assert 'Visible text' in page.text
+    assert 'hidden' not in page.text
+    assert parse_page('', 'https://example.com/').title == 'Untitled'
+
+
+def test_streaming_parser_matches_tree_parser(monkeypatch):
+    """Test that large pages parsed by the streaming tokenizer give the same result."""
+    html = '<html><head><title>Big</title></head><body><a href="/next">Next</a><p>Body</p></body></html>'
+    expected = parse_page(html, 'https://example.com/')
+    monkeypatch.setattr(crawler, 'STREAMING_PARSE_CHARS', 10)
+
+    page = parse_page(html, 'https://example.com/')
+    assert (page.title, page.links) == (expected.title, expected.links)
+    assert 'Body' in page.text
+
+
+def test_crawl_respects_page_limit_and_deduplicates(fake_crawler):
+    """Test that each page is fetched once and the page limit holds with fetches in flight."""
+    pages = asyncio.run(crawl_website('https://example.com/', max_pages=10, max_depth=3, concurrency=3))
+
+    assert sorted(page['url'] for page in pages) == sorted(SITE)
+    assert sorted(fake_crawler.fetched) == sorted(SITE)
+    assert [page['depth'] for page in pages] == sorted(page['depth'] for page in pages)
+    assert pages[0]['etag'] == '"20"'
+
+    fake_crawler.fetched = []
+    pages = asyncio.run(crawl_website('https://example.com/', max_pages=2, max_depth=3, concurrency=4))
+    assert len(pages) == 2
+    assert len(fake_crawler.fetched) == 2
+
+
+def test_crawl_stops_at_max_depth(fake_crawler):
+    """Test that links beyond max_depth are never fetched."""
+    pages = asyncio.run(crawl_website('https://example.com/', max_pages=10, max_depth=1))
+
+    assert sorted(page['url'] for page in pages) == [
+        'https://example.com/', 'https://example.com/a', 'https://example.com/b'
+    ]
+
+
+def test_host_limiter_spaces_out_requests():
+    """Test that requests to one host start at least min_delay apart."""
+    limiter = HostLimiter(max_per_host=4, min_delay=0.05)
+    starts = []
+
+    async def request():
+        async with limiter.slot('https://example.com/page'):
+            starts.append(time.monotonic())
+
+    async def main():
+        await asyncio.gather(*(request() for _ in range(3)))
+
+    asyncio.run(main())
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    assert all(gap >= 0.045 for gap in gaps)
@@ -0,0 +1,82 @@
+"""Tests for metadata-filtered retrieval over a site's FAISS index."""
+
+import pytest
+from langchain.schema import Document
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+from filtered_retriever import FilteredFAISSRetriever, MetadataIndex
+
+PAGES = [
+    ('https://example.com/', 'Home', 0),
+    ('https://example.com/install', 'Install', 1),
+    ('https://example.com/api', 'API', 1),
+    ('https://example.com/api/auth', 'Auth', 2),
+]
+
+
+class KeywordEmbeddings(Embeddings):
+    """Embeddings with one dimension per keyword, so the nearest chunk is predictable."""
+
+    KEYWORDS = ('install', 'token', 'welcome')
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [float(text.lower().count(keyword)) + 0.01 for keyword in self.KEYWORDS]
+
+
+@pytest.fixture
+def vector_store():
+    """FAISS store holding one chunk per page, each mentioning tokens."""
+    documents = [
+        Document(page_content=f'{title} page, token {i}', metadata={'source': url, 'title': title, 'depth': depth})
+        for i, (url, title, depth) in enumerate(PAGES)
+    ]
+    return FAISS.from_documents(documents, KeywordEmbeddings())
+
+
+def test_metadata_index_resolves_filters(vector_store):
+    """Test that values, lists and comparisons select the matching positions."""
+    index = MetadataIndex(vector_store)
+
+    assert index.positions(None) is None
+    assert index.positions({'depth': 1}).tolist() == [1, 2]
+    assert index.positions({'depth': {'$gte': 1, '$lt': 2}}).tolist() == [1, 2]
+    assert index.positions({'source': ['https://example.com/', 'https://example.com/api/auth']}).tolist() == [0, 3]
+    assert index.positions({'depth': {'$gt': 0}, 'title': 'Auth'}).tolist() == [3]
+    assert index.positions({'depth': {'$gt': 'x'}}).tolist() == []
+    with pytest.raises(ValueError):
+        index.positions({'author': 'me'})
+    with pytest.raises(ValueError):
+        index.positions({'depth': {'$regex': '1'}})
+
+
+def test_retriever_searches_only_matching_chunks(vector_store):
+    """Test that a filtered search returns the nearest chunks among the matching pages."""
+    retriever = FilteredFAISSRetriever.from_vector_store(vector_store, k=3)
+    assert len(retriever.invoke('token')) == 3
+
+    retriever.filter = {'depth': {'$lte': 1}}
+    results = retriever.invoke('token')
+    assert {doc.metadata['source'] for doc in results} == {url for url, _, depth in PAGES if depth <= 1}
+
+    retriever.filter = {'source': 'https://example.com/api/auth'}
+    assert [doc.metadata['title'] for doc in retriever.invoke('token')] == ['Auth']
+
+    retriever.filter = {'title': 'Missing'}
+    assert retriever.invoke('token') == []
+
+
+def test_metadata_index_follows_store_changes(vector_store):
+    """Test that adding and deleting chunks rebuilds the index before the next filtered search."""
+    retriever = FilteredFAISSRetriever.from_vector_store(vector_store, k=5, filter={'depth': 3})
+    assert retriever.invoke('install') == []
+
+    vector_store.add_documents([Document(page_content='install deep page', metadata={'source': 'deep', 'depth': 3})])
+    assert [doc.page_content for doc in retriever.invoke('install')] == ['install deep page']
+
+    vector_store.delete([vector_store.index_to_docstore_id[0]])
+    retriever.filter = {'depth': 0}
+    assert retriever.invoke('welcome') == []
@@ -0,0 +1,171 @@
+"""Tests for sitemap discovery and change-aware recrawling."""
+
+import asyncio
+import gzip
+import hashlib
+
+import recrawl
+from recrawl import (
+    DEFAULT_INTERVAL, MIN_INTERVAL, FetchResponse, RecrawlScheduler, SitemapEntry, discover_sitemap, parse_sitemap,
+    refresh_site,
+)
+
+URLSET = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/a</loc><lastmod>2024-05-01</lastmod><changefreq>weekly</changefreq></url>
+  <url><loc> https://example.com/b </loc></url>
+  <url><lastmod>2024-05-01</lastmod></url>
+</urlset>"""
+
+SITEMAP_INDEX = b"""<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/pages.xml.gz</loc></sitemap>
+</sitemapindex>"""
+
+
+def fake_fetch(documents):
+    """Fetch function serving a dict of URL to body, recording the requests it gets."""
+    requests = []
+
+    def fetch(url, etag=None, last_modified=None, timeout=15.0):
+        requests.append((url, etag))
+        if url not in documents:
+            return FetchResponse(404, url)
+        body = documents[url]
+        if isinstance(body, FetchResponse):
+            return body
+        return FetchResponse(200, url, body)
+
+    fetch.requests = requests
+    return fetch
+
+
+def test_parse_sitemap_reads_entries_and_indexes():
+    """Test that urlsets, sitemap indexes and gzipped sitemaps are parsed."""
+    entries, nested = parse_sitemap(URLSET)
+
+    assert nested == []
+    assert [entry.url for entry in entries] == ['https://example.com/a', 'https://example.com/b']
+    assert entries[0].changefreq == 'weekly'
+    assert entries[0].lastmod == 1714521600.0
+    assert entries[1].lastmod is None
+
+    assert parse_sitemap(SITEMAP_INDEX) == ([], ['https://example.com/pages.xml.gz'])
+    assert parse_sitemap(gzip.compress(URLSET))[0] == entries
+    assert parse_sitemap(b'<html>not xml') == ([], [])
+
+
+def test_discover_sitemap_follows_robots_and_indexes():
+    """Test that sitemaps listed in robots.txt are followed and disallowed or offsite pages dropped."""
+    pages = b"""<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+      <url><loc>https://example.com/docs/?utm_source=x</loc></url>
+      <url><loc>https://example.com/private/page</loc></url>
+      <url><loc>https://other.com/page</loc></url>
+      <url><loc>https://example.com/docs/</loc></url>
+    </urlset>"""
+    fetch = fake_fetch({
+        'https://example.com/robots.txt': b'User-agent: *\nDisallow: /private/\nSitemap: https://example.com/index.xml\n',
+        'https://example.com/index.xml': SITEMAP_INDEX,
+        'https://example.com/pages.xml.gz': gzip.compress(pages),
+    })
+
+    entries = discover_sitemap('https://example.com/docs/intro', fetch=fetch)
+    assert [entry.url for entry in entries] == ['https://example.com/docs/']
+
+
+def test_discover_sitemap_defaults_to_sitemap_xml():
+    """Test that /sitemap.xml is tried when robots.txt lists no sitemap."""
+    fetch = fake_fetch({'https://example.com/sitemap.xml': URLSET})
+
+    entries = discover_sitemap('https://example.com/', max_urls=1, fetch=fetch)
+    assert [entry.url for entry in entries] == ['https://example.com/a']
+
+
+def test_scheduler_orders_by_overdue_ratio():
+    """Test that new and changed pages come first, then pages by how overdue they are."""
+    now = 1_000_000.0
+    pages = {
+        'https://example.com/fresh': {'checked_at': now - 60},
+        'https://example.com/stale': {'checked_at': now - 3 * DEFAULT_INTERVAL},
+        'https://example.com/due': {'checked_at': now - 2 * DEFAULT_INTERVAL},
+        'https://example.com/updated': {'checked_at': now - 60},
+    }
+    entries = [
+        SitemapEntry('https://example.com/new'),
+        SitemapEntry('https://example.com/updated', lastmod=now - 30),
+    ]
+    scheduler = RecrawlScheduler(pages, entries)
+
+    due = scheduler.due(limit=10, now=now)
+    assert set(due[:2]) == {'https://example.com/new', 'https://example.com/updated'}
+    assert due[2:] == ['https://example.com/stale', 'https://example.com/due']
+    assert scheduler.due(limit=1, now=now)[0] in {'https://example.com/new', 'https://example.com/updated'}
+
+
+def test_scheduler_adapts_intervals():
+    """Test that intervals halve on change and double otherwise, seeded from changefreq."""
+    pages = {'https://example.com/a': {'checked_at': 1.0}}
+    scheduler = RecrawlScheduler(pages, [SitemapEntry('https://example.com/a', changefreq='hourly')])
+    assert scheduler.interval('https://example.com/a') == MIN_INTERVAL
+
+    scheduler.record_check('https://example.com/a', changed=True, now=10.0)
+    assert pages['https://example.com/a']['change_interval'] == MIN_INTERVAL
+    assert pages['https://example.com/a']['changed_at'] == 10.0
+
+    scheduler.record_check('https://example.com/a', changed=False, now=20.0)
+    scheduler.record_check('https://example.com/a', changed=False, now=30.0)
+    assert pages['https://example.com/a']['change_interval'] == 4 * MIN_INTERVAL
+    assert pages['https://example.com/a']['checked_at'] == 30.0
+
+
+class FakeSiteIndex:
+    """Site index recording the pages it is asked to update."""
+
+    def __init__(self, pages):
+        self.base_domain = 'https://example.com'
+        self.pages = pages
+        self.updated = []
+        self.saved = False
+
+    def update(self, crawled_data):
+        for item in crawled_data:
+            self.updated.append(item['url'])
+            self.pages[item['url']] = {
+                'url': item['url'], 'depth': item['depth'], 'checked_at': 1.0,
+                'content_hash': hashlib.sha256(item['content'].encode('utf-8')).hexdigest(),
+            }
+        return len(crawled_data), 0, 2 * len(crawled_data)
+
+    def save(self):
+        self.saved = True
+
+
+def test_refresh_site_recrawls_only_changed_pages(monkeypatch):
+    """Test that 304s and identical bodies are skipped and changed pages re-embedded."""
+    old_hash = hashlib.sha256(b'old').hexdigest()
+    pages = {
+        url: {'url': url, 'depth': 1, 'checked_at': 1.0, 'etag': '"v1"', 'body_hash': old_hash,
+              'content_hash': hashlib.sha256(b'old').hexdigest()}
+        for url in ('https://example.com/same', 'https://example.com/304', 'https://example.com/changed')
+    }
+    site_index = FakeSiteIndex(pages)
+    fetch = fake_fetch({
+        'https://example.com/same': b'old',
+        'https://example.com/304': FetchResponse(304, 'https://example.com/304'),
+        'https://example.com/changed': FetchResponse(200, 'https://example.com/changed', b'new', {'etag': '"v2"'}),
+    })
+
+    async def fake_crawl(url, max_pages, max_depth, concurrency, seed_urls):
+        return [{'url': page_url, 'content': 'new content', 'depth': 0} for page_url in [url, *seed_urls]]
+
+    monkeypatch.setattr(recrawl, 'crawl_website', fake_crawl)
+    report = asyncio.run(refresh_site(site_index, use_sitemap=False, fetch=fetch))
+
+    assert (report.checked, report.unchanged, report.changed, report.failed) == (3, 2, 1, 0)
+    assert report.chunks == 2
+    assert site_index.updated == ['https://example.com/changed']
+    assert ('https://example.com/304', '"v1"') in fetch.requests
+    changed = pages['https://example.com/changed']
+    assert changed['depth'] == 1
+    assert changed['etag'] == '"v2"'
+    assert changed['body_hash'] == hashlib.sha256(b'new').hexdigest()
+    assert site_index.saved
@@ -0,0 +1,88 @@
+"""Tests for persistent per-site FAISS indexes."""
+
+import hashlib
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from embedding_executor import EmbeddingExecutor
+from markdown_chunker import MarkdownChunker
+from site_index import SiteIndex, site_directory
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic embeddings derived from a hash of the text, counting the texts embedded."""
+
+    def __init__(self):
+        self.embedded = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        digest = hashlib.sha256(text.encode('utf-8')).digest()
+        return [byte / 255 for byte in digest[:8]]
+
+
+def _page(url, content, etag=None):
+    return {'url': url, 'content': content, 'title': url.rsplit('/', 1)[-1], 'depth': 1, 'etag': etag}
+
+
+@pytest.fixture
+def embeddings():
+    """Embeddings shared by the indexes of a test."""
+    return HashEmbeddings()
+
+
+def _site_index(temp_dir, embeddings):
+    return SiteIndex(
+        'https://Example.com/docs/', embeddings, MarkdownChunker(chunk_size=200, chunk_overlap=0),
+        root=str(temp_dir), executor=EmbeddingExecutor(embeddings, batch_size=2),
+    )
+
+
+def test_site_directory_is_named_after_the_domain(temp_dir):
+    """Test that every URL of a site maps to the same directory."""
+    root = str(temp_dir)
+    assert site_directory('https://example.com/a', root) == site_directory('HTTPS://EXAMPLE.com/b?x=1', root)
+    assert site_directory('https://example.com/', root).endswith('https_example.com')
+
+
+def test_update_embeds_only_new_and_changed_pages(temp_dir, embeddings):
+    """Test that unchanged pages are skipped and changed pages replace their chunks."""
+    index = _site_index(temp_dir, embeddings)
+    pages = [_page('https://example.com/a', '# A\n\nFirst page.'), _page('https://example.com/b', 'Second page.')]
+    assert index.update(pages) == (2, 0, 2)
+
+    embedded = embeddings.embedded
+    assert index.update([_page('https://example.com/a', '# A\n\nFirst page.')]) == (0, 1, 0)
+    assert embeddings.embedded == embedded
+
+    old_ids = index.pages['https://example.com/b']['chunk_ids']
+    assert index.update([_page('https://example.com/b', 'Second page, revised.')]) == (1, 0, 1)
+    stored = set(index.vector_store.index_to_docstore_id.values())
+    assert not stored & set(old_ids)
+    assert len(stored) == 2
+
+
+def test_matching_etag_skips_the_page(temp_dir, embeddings):
+    """Test that a page whose ETag is unchanged is not embedded again."""
+    index = _site_index(temp_dir, embeddings)
+    index.update([_page('https://example.com/a', 'Version one.', etag='"1"')])
+
+    assert index.update([_page('https://example.com/a', 'Rendered differently.', etag='"1"')]) == (0, 1, 0)
+
+
+def test_saved_index_reloads(temp_dir, embeddings):
+    """Test that pages and vectors survive reopening the site."""
+    index = _site_index(temp_dir, embeddings)
+    assert not index.load()
+    index.update([_page('https://example.com/a', 'First page.'), _page('https://example.com/b', 'Second page.')])
+
+    reopened = _site_index(temp_dir, embeddings)
+    assert reopened.load()
+    assert sorted(reopened.pages) == ['https://example.com/a', 'https://example.com/b']
+    nearest = reopened.vector_store.similarity_search('Second page.', k=1)[0]
+    assert nearest.metadata['source'] == 'https://example.com/b'
+    assert [page['url'] for page in reopened.crawled_pages()] == ['https://example.com/a', 'https://example.com/b']